@@ -4,7 +4,10 @@ import fnmatch
 import json
 import logging
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
 from collections.abc import Generator
 from pathlib import Path
 from zipfile import ZipFile
@@ -158,6 +161,40 @@ def add_file_to_package(
         raise
 
 
+def compile_ui_files(plugin_dir: Path, output_dir: Path) -> list[Path]:
+    """
+    Compile the plugin's Qt Designer UI files into Python form classes.
+
+    Each <name>.ui file is compiled to ui_<name>.py in the corresponding directory of the output directory,
+    so the form can be imported as a module next to the UI file. The plugin loads UI files at runtime without them.
+
+    :param plugin_dir: The directory of the plugin to search for UI files.
+    :param output_dir: The directory to write the compiled modules to. The plugin directory's name is kept.
+    :return: List of the compiled modules. Empty if the UI compiler is not available.
+    :raises OSError: If a UI file could not be compiled.
+    """
+    ui_files = [path for path in walk(plugin_dir) if path.suffix == ".ui"]
+    if not ui_files:
+        return []
+    uic = shutil.which("pyside6-uic")
+    if uic is None:
+        logging.warning("pyside6-uic not found. UI files will be loaded at runtime instead.")
+        return []
+
+    compiled = []
+    for ui_file in ui_files:
+        module_path = output_dir / plugin_dir.name / ui_file.parent.relative_to(plugin_dir) / f"ui_{ui_file.stem}.py"
+        module_path.parent.mkdir(parents=True, exist_ok=True)
+        logging.info(f"Compiling {ui_file} to {module_path.name}")
+        try:
+            subprocess.run([uic, str(ui_file), "-o", str(module_path)], check=True, capture_output=True, text=True)  # noqa: S603
+        except subprocess.CalledProcessError as e:
+            msg = f"Error compiling UI file {ui_file}: {e.stderr.strip()}"
+            raise OSError(msg) from e
+        compiled.append(module_path)
+    return compiled
+
+
 def package_plugin(plugin_dir: Path, extra_files: list[str | Path] | None = None) -> None:
     """Create the plugin package.
 
@@ -170,6 +207,8 @@ def package_plugin(plugin_dir: Path, extra_files: list[str | Path] | None = None
                 ├── __init__.py
                 ├── <plugin files>
 
+    UI files are compiled into Python form classes and added next to them, see compile_ui_files.
+
     :param plugin_dir: The directory of the plugin to package.
     :param extra_files: List of extra files to include in the package's root.
     :raises RuntimeError: If an error occurs while creating the package.
@@ -205,10 +244,12 @@ def package_plugin(plugin_dir: Path, extra_files: list[str | Path] | None = None
 
     extra_files = extra_files or []
     try:
-        with ZipFile(package_filepath, "w") as zfile:
+        with ZipFile(package_filepath, "w") as zfile, tempfile.TemporaryDirectory() as build_dir:
             for filepath in walk(plugin_dir):
                 if file_filter.filter(filepath):
                     add_file_to_package(zfile, filepath, plugin_dir.parent, plugin_dir.name)
+            for filepath in compile_ui_files(plugin_dir, Path(build_dir)):
+                add_file_to_package(zfile, filepath, Path(build_dir), plugin_dir.name)
             for extra_file in extra_files:
                 extra_file_path = Path(extra_file).absolute()
                 if extra_file_path.exists():
@@ -1,7 +1,11 @@
 from functools import partial
+from typing import TYPE_CHECKING
 
-from custommipmapsexport.gui import MipmapExportGraphToolBar, get_ui_manager, on_new_graphview_created
-from custommipmapsexport.logger import logger
+# Only what's needed to register the plugin is imported on load. Everything else is imported on first use.
+if TYPE_CHECKING:
+    from custommipmapsexport.encoderworker import EncoderWorker
+    from custommipmapsexport.graphutils import PackageIndex
+    from sd.api.qtforpythonuimgrwrapper import QtForPythonUIMgrWrapper
 
 
 class MipmapExportPlugin:
@@ -9,25 +13,99 @@ class MipmapExportPlugin:
 
     # States we need to keep track of for registering/unregistering.
     graphview_created_callback_id: int = 0
+    encoder_worker: "EncoderWorker | None" = None
+    encoder_worker_failed: bool = False
+    package_index: "PackageIndex | None" = None
+    file_callback_ids: tuple[int, ...] = ()
 
     @classmethod
     def initialize(cls) -> None:
         """Initialize the Mipmap Export Plugin."""
-        if ui_manager := get_ui_manager():
+        import sd
+        from custommipmapsexport.logger import logger, setup_logger
+
+        setup_logger()
+        if ui_manager := sd.getContext().getSDApplication().getQtForPythonUIMgr():
             # Register a callback to know when GraphViews are created. Creates the toolbar.
             cls.graphview_created_callback_id = ui_manager.registerGraphViewCreatedCallback(
-                partial(on_new_graphview_created, ui_manager=ui_manager)
+                partial(cls.on_graphview_created, ui_manager=ui_manager)
             )
             logger.info("Mipmap Export Plugin initialized.\nToolbar will be attached to newly opened graph views.")
 
     @classmethod
     def uninitialize(cls) -> None:
         """Uninitialize the Mipmap Export Plugin."""
-        if ui_manager := get_ui_manager():
+        import sd
+        from custommipmapsexport.logger import logger, shutdown_logger
+
+        app = sd.getContext().getSDApplication()
+        for callback_id in cls.file_callback_ids:
+            app.unregisterCallback(callback_id)
+        cls.file_callback_ids = ()
+        cls.package_index = None
+        if ui_manager := app.getQtForPythonUIMgr():
             ui_manager.unregisterCallback(cls.graphview_created_callback_id)
+            # Toolbars only exist if the module was imported for a graph view.
+            from custommipmapsexport.toolbar import MipmapExportGraphToolBar
+
             MipmapExportGraphToolBar.remove_all_toolbars()
+        if cls.encoder_worker is not None:
+            cls.encoder_worker.stop()
+            cls.encoder_worker = None
+        cls.encoder_worker_failed = False
 
         logger.info("Mipmap Export Plugin unloaded.")
+        shutdown_logger()
+
+    @classmethod
+    def on_graphview_created(cls, graphview_id: int, ui_manager: "QtForPythonUIMgrWrapper") -> None:
+        """Attach the toolbar to a new graph view."""
+        from custommipmapsexport.toolbar import on_new_graphview_created
+
+        on_new_graphview_created(
+            graphview_id,
+            ui_manager,
+            get_encoder=cls.get_encoder_worker,
+            get_package_index=cls.get_package_index,
+        )
+
+    @classmethod
+    def get_encoder_worker(cls) -> "EncoderWorker | None":
+        """Get the encoder worker, starting it on first use. None if it can't be started."""
+        if cls.encoder_worker is None and not cls.encoder_worker_failed:
+            cls.start_encoder_worker()
+        return cls.encoder_worker
+
+    @classmethod
+    def start_encoder_worker(cls) -> None:
+        """Start the encoder worker process. Exports are encoded in Designer's process if that fails."""
+        from custommipmapsexport.encoderworker import EncoderWorker
+        from custommipmapsexport.logger import logger
+
+        worker = EncoderWorker()
+        try:
+            worker.start()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Encoder worker could not be started, encoding in-process instead: {e}")
+            cls.encoder_worker_failed = True
+            return
+        cls.encoder_worker = worker
+
+    @classmethod
+    def get_package_index(cls) -> "PackageIndex":
+        """Get the index of the graphs' packages, creating it on first use."""
+        if cls.package_index is None:
+            import sd
+            from custommipmapsexport.graphutils import PackageIndex
+
+            cls.package_index = PackageIndex()
+            # Rebuild the index whenever packages are loaded or closed.
+            app = sd.getContext().getSDApplication()
+            cls.file_callback_ids = (
+                app.registerAfterFileLoadedCallback(cls.package_index.invalidate),
+                app.registerBeforeFileClosedCallback(cls.package_index.invalidate),
+            )
+        return cls.package_index
 
 
 #
@@ -0,0 +1,205 @@
+"""Pack many DDS files into a single archive with a binary index, and read their mipmap levels without copying them.
+
+Archive Format
+--------------
+
+Everything is little-endian::
+
+    [Header][DDS files, each starting at a multiple of 4 KiB][Index]
+
+    [Header]:: magic "MIPA", uint32 version, uint32 number of entries, uint32 number of levels, uint64 index offset
+    [Index]:: entries, sorted by name hash, followed by the levels of all entries
+        [Entry]:: uint64 name hash, uint64 offset, uint64 size, uint32 FourCC (0 if uncompressed), bits per pixel,
+                  width, height, mipmap levels, layers, index of the entry's first level, reserved
+        [Level]:: uint64 offset, uint64 size of a mipmap level of a layer, the levels of each layer in turn
+
+Offsets are from the start of the archive. The payloads are the DDS files as they were exported, so they can be
+extracted as they are. Appending writes the new files and a new index after the old index, and only then points the
+header to it, so an interrupted append leaves the archive as it was. Entries of names that were appended again point
+to their latest file.
+This module doesn't import the sd package.
+"""
+
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+from collections.abc import Iterable
+from pathlib import Path
+from typing import IO, NamedTuple
+
+from custommipmapsexport.ddsfile import DDPF_FOURCC, DDSError, DDSFile, check_flags
+
+ARCHIVE_SUFFIX = ".mipa"
+ARCHIVE_MAGIC = b"MIPA"
+ARCHIVE_VERSION = 1
+# Payloads start at page boundaries, so each file can be mapped and read without touching its neighbors' pages.
+PAYLOAD_ALIGNMENT = 4096
+HEADER = struct.Struct("<4sIIIQ")
+ENTRY = struct.Struct("<QQQ8I")
+LEVEL = struct.Struct("<QQ")
+# Bytes copied at once when appending a file to the archive.
+COPY_CHUNK = 1 << 20
+
+
+class ArchiveEntry(NamedTuple):
+    """A DDS file in the archive, see the module's docstring."""
+
+    name_hash: int
+    offset: int
+    size: int
+    fourcc: int
+    bpp: int
+    width: int
+    height: int
+    levels: int
+    layers: int
+    first_level: int
+
+
+def get_name_hash(name: str) -> int:
+    """Get the 64-bit hash the archive indexes a file's name by."""
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def align(value: int, alignment: int = PAYLOAD_ALIGNMENT) -> int:
+    """Round the value up to a multiple of the alignment."""
+    return -(-value // alignment) * alignment
+
+
+def read_index(fd: IO[bytes]) -> tuple[dict[int, ArchiveEntry], list[tuple[int, int]], int]:
+    """
+    Read the index of an archive.
+
+    :param fd: The archive, opened in binary mode.
+    :return: The entries by name hash, the levels, and where the index starts.
+    :raises ddsfile.DDSError: If the file isn't an archive.
+    """
+    fd.seek(0)
+    header = fd.read(HEADER.size)
+    if len(header) < HEADER.size:
+        msg = "Truncated archive header"
+        raise DDSError(msg)
+    magic, version, n_entries, n_levels, index_offset = HEADER.unpack(header)
+    if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+        msg = f"Not a texture archive of version {ARCHIVE_VERSION}"
+        raise DDSError(msg)
+    fd.seek(index_offset)
+    index = fd.read(ENTRY.size * n_entries + LEVEL.size * n_levels)
+    if len(index) < ENTRY.size * n_entries + LEVEL.size * n_levels:
+        msg = "Truncated archive index"
+        raise DDSError(msg)
+    entries = [ArchiveEntry(*fields[:-1]) for fields in ENTRY.iter_unpack(index[: ENTRY.size * n_entries])]
+    levels: list[tuple[int, int]] = list(LEVEL.iter_unpack(index[ENTRY.size * n_entries :]))
+    return {entry.name_hash: entry for entry in entries}, levels, index_offset
+
+
+def append_to_archive(archive_path: Path, files: Iterable[tuple[str, Path]]) -> int:
+    """
+    Append DDS files to the archive, creating it if it doesn't exist.
+
+    :param archive_path: The path of the archive.
+    :param files: The name to store each file under, and its path.
+    :return: The number of files in the archive.
+    :raises ddsfile.DDSError: If a file isn't a DDS file, or the archive is corrupt.
+    """
+    mode = "r+b" if archive_path.exists() else "w+b"
+    with archive_path.open(mode) as fd:
+        if mode == "r+b":
+            entries, levels, end = read_index(fd)
+            # Keep the old index intact until the header points to the new one.
+            end += ENTRY.size * len(entries) + LEVEL.size * len(levels)
+        else:
+            entries, levels, end = {}, [], HEADER.size
+        for name, filepath in files:
+            dds = DDSFile(str(filepath))
+            offset = align(end)
+            size = filepath.stat().st_size
+            fd.seek(offset)
+            with filepath.open("rb") as source:
+                shutil.copyfileobj(source, fd, COPY_CHUNK)
+            meta = dds.meta
+            fourcc = meta.pf_fourcc if check_flags(meta.pf_flags, DDPF_FOURCC) else 0
+            name_hash = get_name_hash(name)
+            # Levels of replaced entries are left in the table, they're only referenced through their entry.
+            entries[name_hash] = ArchiveEntry(
+                name_hash,
+                offset,
+                size,
+                fourcc,
+                meta.pf_rgbBitCount,
+                meta.width,
+                meta.height,
+                max(1, dds.count),
+                dds.layers,
+                len(levels),
+            )
+            levels.extend((offset + level_offset, level_size) for level_offset, level_size in dds.get_level_offsets())
+            end = offset + size
+        sorted_entries = [entries[name_hash] for name_hash in sorted(entries)]
+        fd.seek(end)
+        fd.write(b"".join(ENTRY.pack(*entry, 0) for entry in sorted_entries))
+        fd.write(b"".join(LEVEL.pack(*level) for level in levels))
+        fd.truncate()
+        fd.flush()
+        os.fsync(fd.fileno())
+        # The header is rewritten last, which commits the append.
+        fd.seek(0)
+        fd.write(HEADER.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, len(sorted_entries), len(levels), end))
+    return len(entries)
+
+
+class ArchiveReader:
+    """
+    Memory-map an archive and get the mipmap levels of its files as views of the mapping, without copying them.
+
+    Views returned by the reader must be released before it's closed.
+    """
+
+    def __init__(self, archive_path: Path) -> None:
+        with archive_path.open("rb") as fd:
+            self.entries, self._levels, _ = read_index(fd)
+            self._map = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, name: str) -> bool:
+        return get_name_hash(name) in self.entries
+
+    def close(self) -> None:
+        """Unmap the archive."""
+        self._view.release()
+        self._map.close()
+
+    def get_entry(self, name: str) -> ArchiveEntry:
+        """
+        Get the index entry of a file.
+
+        :param name: The name the file was stored under.
+        :raises KeyError: If the archive has no file of the name.
+        """
+        return self.entries[get_name_hash(name)]
+
+    def get_file(self, name: str) -> memoryview:
+        """Get the whole DDS file of the name, see get_entry."""
+        entry = self.get_entry(name)
+        return self._view[entry.offset : entry.offset + entry.size]
+
+    def get_levels(self, name: str) -> list[memoryview]:
+        """
+        Get the mipmap levels of the file of the name, see get_entry.
+
+        :return: Views of the levels of each layer in turn, like DDSFile.images.
+        """
+        entry = self.get_entry(name)
+        levels = self._levels[entry.first_level : entry.first_level + entry.levels * entry.layers]
+        return [self._view[offset : offset + size] for offset, size in levels]
@@ -0,0 +1,155 @@
+"""Pack many small outputs into a single atlas texture, which is encoded once, with a JSON sidecar of their UVs.
+
+Textures are placed on shelves, sorted by height. Each slot is aligned to 4x4 blocks, so no compressed block mixes two
+textures, and surrounded by a gutter of repeated edge pixels, so filtering and mipmaps don't bleed neighbors in.
+This module doesn't import the sd package.
+"""
+
+import json
+import math
+from collections.abc import Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, BufferTexture, PixelTexture, get_tex_view
+from custommipmapsexport.uncompressed import get_8bit_pixels, get_source_channels, reorder_channels
+
+# Width of the gutter around each texture in pixels. Keeps the first mipmap levels free of neighboring textures.
+DEFAULT_GUTTER = 8
+BLOCK_SIZE = 4
+
+
+class AtlasRect(NamedTuple):
+    """Position and size of a texture within the atlas in pixels, without its gutter."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class AtlasLayout(NamedTuple):
+    """Size of the atlas and the rectangles of its textures."""
+
+    width: int
+    height: int
+    rects: list[AtlasRect]
+
+
+def align(value: int, alignment: int = BLOCK_SIZE) -> int:
+    """Round the value up to a multiple of the alignment."""
+    return -(-value // alignment) * alignment
+
+
+def next_power_of_two(value: int) -> int:
+    """Get the smallest power of two not below the value."""
+    return 1 << max(0, value - 1).bit_length()
+
+
+def shelf_pack(slots: Sequence[tuple[int, int]], width: int) -> tuple[list[tuple[int, int]], int]:
+    """
+    Place the slots on shelves from left to right, starting a new shelf when a slot doesn't fit anymore.
+
+    :param slots: Width and height of each slot.
+    :param width: The width of the shelves.
+    :return: The position of each slot and the total height of the shelves.
+    """
+    positions = [(0, 0)] * len(slots)
+    x = y = shelf_height = 0
+    for i in sorted(range(len(slots)), key=lambda i: (slots[i][1], slots[i][0]), reverse=True):
+        slot_width, slot_height = slots[i]
+        if x + slot_width > width:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        positions[i] = (x, y)
+        x += slot_width
+        shelf_height = max(shelf_height, slot_height)
+    return positions, y + shelf_height
+
+
+def pack_rects(sizes: Sequence[tuple[int, int]], gutter: int = DEFAULT_GUTTER) -> AtlasLayout:
+    """
+    Find a compact layout for textures of the given sizes in an atlas with power of two sides.
+
+    :param sizes: Width and height of each texture.
+    :param gutter: Width of the gutter around each texture in pixels, a multiple of BLOCK_SIZE.
+    :return: The atlas layout, with the rectangles in the order of the sizes.
+    :raises ValueError: If no sizes are given or the gutter isn't aligned to blocks.
+    """
+    if not sizes:
+        msg = "An atlas needs at least one texture."
+        raise ValueError(msg)
+    if gutter % BLOCK_SIZE:
+        msg = f"The gutter of {gutter} pixels must be a multiple of {BLOCK_SIZE}, to keep the textures block aligned."
+        raise ValueError(msg)
+    slots = [(align(width + 2 * gutter), align(height + 2 * gutter)) for width, height in sizes]
+    narrowest = next_power_of_two(max(width for width, _ in slots))
+    square = next_power_of_two(math.isqrt(sum(width * height for width, height in slots)))
+    best: tuple[int, int, int, list[tuple[int, int]]] | None = None
+    # Try the widths around a square atlas and keep the smallest, preferring squarer ones.
+    for atlas_width in {max(narrowest, square // 2), max(narrowest, square), max(narrowest, square * 2)}:
+        positions, height = shelf_pack(slots, atlas_width)
+        atlas_height = next_power_of_two(height)
+        key = (atlas_width * atlas_height, abs(atlas_width - atlas_height))
+        if best is None or key < best[:2]:
+            best = (*key, atlas_width, positions)
+    _, _, atlas_width, positions = best  # type: ignore[misc]
+    rects = [
+        AtlasRect(x + gutter, y + gutter, width, height)
+        for (x, y), (width, height) in zip(positions, sizes, strict=True)
+    ]
+    return AtlasLayout(atlas_width, next_power_of_two(max(rect.y + rect.height + gutter for rect in rects)), rects)
+
+
+def blit(atlas: BufferTexture, sd_tex: PixelTexture, rect: AtlasRect, gutter: int = DEFAULT_GUTTER) -> None:
+    """
+    Copy the texture into its rectangle of the atlas and fill its gutter with the nearest edge pixels.
+
+    :param atlas: The atlas to copy into.
+    :param sd_tex: The texture to copy, converted to 8 bits and the atlas' channels.
+    :param rect: The texture's rectangle in the atlas.
+    :param gutter: Width of the gutter around the texture in pixels.
+    """
+    target = "L" if atlas.getBytesPerPixel() == 1 else CHANNEL_ORDER
+    pixels = reorder_channels(get_8bit_pixels(get_tex_view(sd_tex)), get_source_channels(sd_tex), target)
+    pixels = memoryview(pixels).cast("B")
+    bpp = len(target)
+    atlas_width = atlas.getSize()[0]
+    row_bytes = rect.width * bpp
+    for row in range(-gutter, rect.height + gutter):
+        source_row = min(max(row, 0), rect.height - 1)
+        line = pixels[source_row * row_bytes : (source_row + 1) * row_bytes]
+        start = ((rect.y + row) * atlas_width + rect.x - gutter) * bpp
+        atlas.buffer[start : start + gutter * bpp] = line[:bpp].tobytes() * gutter
+        start += gutter * bpp
+        atlas.buffer[start : start + row_bytes] = line
+        start += row_bytes
+        atlas.buffer[start : start + gutter * bpp] = line[-bpp:].tobytes() * gutter
+
+
+def write_sidecar(filepath: Path, layout: AtlasLayout, names: Sequence[str], gutter: int = DEFAULT_GUTTER) -> Path:
+    """
+    Write the rectangles of the atlas' textures as JSON.
+
+    UVs are normalized to the atlas' size with the origin at the top left, like the pixel rectangles.
+
+    :param filepath: The path of the JSON file to write.
+    :param layout: The atlas layout.
+    :param names: The output names of the textures, used as keys.
+    :param gutter: Width of the gutter around each texture in pixels.
+    :return: The path of the written file.
+    """
+    textures = {
+        name: {
+            **rect._asdict(),
+            "uv": [
+                rect.x / layout.width,
+                rect.y / layout.height,
+                (rect.x + rect.width) / layout.width,
+                (rect.y + rect.height) / layout.height,
+            ],
+        }
+        for name, rect in zip(names, layout.rects, strict=True)
+    }
+    sidecar = {"width": layout.width, "height": layout.height, "gutter": gutter, "textures": textures}
+    filepath.write_text(json.dumps(sidecar, indent=2), encoding="utf-8")
+    return filepath
@@ -0,0 +1,138 @@
+"""Run the crunch encoder on intermediate files.
+
+This module doesn't import the sd package, so the encoder worker can use it outside of Designer.
+"""
+
+import contextlib
+import importlib.resources
+import logging
+import subprocess
+import time
+from collections import deque
+from collections.abc import Iterable
+from itertools import chain
+from pathlib import Path
+from typing import NamedTuple
+
+# The same logger as custommipmapsexport.logger, whose handlers are only set up within Designer.
+logger = logging.getLogger("MIPmapsExporter")
+
+# Maximum number of the encoder's output lines to log per second. Further lines are only counted.
+OUTPUT_LINES_PER_SECOND = 20
+# Number of the last output lines to keep for the error message if the encoder fails.
+OUTPUT_TAIL_LINES = 20
+# Containers the encoder can write. DDS holds any format, CRN is supercompressed, KTX is the container for ETC formats.
+FILE_FORMATS = ("dds", "crn", "ktx")
+ETC_FORMATS = frozenset({"etc1", "etc2", "etc2a", "etc1s", "etc2as"})
+# Formats that can be supercompressed to CRN.
+CRN_FORMATS = frozenset(
+    {"dxt1", "dxt5", "dxt5_ccxy", "dxt5_xgxr", "dxt5_xgbr", "dxt5_agbr", "dxt5a", "3dc", "dxn", "etc1", "etc2a"}
+)
+
+
+class OutputSummary(NamedTuple):
+    """Summary of the encoder's output."""
+
+    lines: int
+    suppressed: int
+    tail: list[str]
+
+
+def log_output(stream: Iterable[str], lines_per_second: int = OUTPUT_LINES_PER_SECOND) -> OutputSummary:
+    """
+    Log the lines of the encoder's output at debug level while they arrive.
+
+    :param stream: The output to log, line by line.
+    :param lines_per_second: Maximum number of lines to log per second. Further lines are counted, but not logged.
+    :return: Summary of the output, with the last lines.
+    """
+    tail: deque[str] = deque(maxlen=OUTPUT_TAIL_LINES)
+    n_lines = n_suppressed = 0
+    window_start = time.monotonic()
+    n_logged_in_window = 0
+    verbose = logger.isEnabledFor(logging.DEBUG)
+    for raw_line in stream:
+        if not (line := raw_line.rstrip()):
+            continue
+        n_lines += 1
+        tail.append(line)
+        if not verbose:
+            continue
+        now = time.monotonic()
+        if now - window_start >= 1.0:
+            window_start = now
+            n_logged_in_window = 0
+        if n_logged_in_window < lines_per_second:
+            logger.debug(line)
+            n_logged_in_window += 1
+        else:
+            n_suppressed += 1
+    return OutputSummary(n_lines, n_suppressed, list(tail))
+
+
+def validate_file_format(compression: str, file_format: str) -> None:
+    """
+    Check that the container can hold the compression method.
+
+    :param compression: The compression method.
+    :param file_format: The container, one of FILE_FORMATS.
+    :raises ValueError: If the container is unknown or can't hold the compression method.
+    """
+    if file_format not in FILE_FORMATS:
+        msg = f"Unknown file format {file_format}, expected one of {', '.join(FILE_FORMATS)}."
+        raise ValueError(msg)
+    compression = compression.lower()
+    if file_format == "crn" and compression not in CRN_FORMATS:
+        msg = f"Compression {compression} can't be written to CRN files, use DDS or KTX instead."
+        raise ValueError(msg)
+    if file_format == "dds" and compression in ETC_FORMATS:
+        msg = f"Compression {compression} can't be written to DDS files, use KTX or CRN instead."
+        raise ValueError(msg)
+
+
+def compress_files(files: list[Path], destination: Path, compression: str, file_format: str = "dds", **kwargs) -> int:
+    """
+    Compress the given files to the destination using the specified compression.
+
+    :param files: The files to compress.
+    :param destination: The destination to save the compressed files.
+    :param compression: The compression method to use.
+    :param file_format: The container of the compressed files, one of FILE_FORMATS. It's also their extension.
+    :param kwargs: Additional arguments for the compression command.
+    :return: The return code of the compression command.
+    :raises ValueError: If the container can't hold the compression method.
+    :raises subprocess.CalledProcessError: If the compression command failed.
+    """
+    validate_file_format(compression, file_format)
+    crunch_app = importlib.resources.files("custommipmapsexport") / "bin" / "crunch_x64"
+    cmd = [
+        str(crunch_app),
+        "-nostats",
+        "-noprogress",
+        *chain(*[("-file", str(f)) for f in files]),
+        "-fileformat",
+        file_format,
+        "-outdir",
+        str(destination),
+        f"-{compression}",
+        *chain(*kwargs.items()),
+    ]
+    with contextlib.suppress(ValueError):
+        cmd.remove("")
+    # Validate or sanitize the cmd list to ensure it contains only trusted input.
+    if not all(isinstance(arg, str) for arg in cmd):
+        msg = "Command contains non-string arguments."
+        raise ValueError(msg)
+    # This is a hobby project, so the user should be aware of the risks.
+    # Stream the output, so it doesn't pile up in memory and gets logged while the encoder runs.
+    with subprocess.Popen(  # noqa: S603
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace"
+    ) as process:
+        summary = log_output(process.stdout or ())
+    if process.returncode != 0:
+        logger.error("\n".join(summary.tail))
+        raise subprocess.CalledProcessError(process.returncode, cmd)
+    if summary.suppressed:
+        logger.debug(f"{summary.suppressed} of {summary.lines} lines of encoder output were not logged.")
+    logger.info(f"Compressed {len(files)} files to {destination}.")
+    return process.returncode
@@ -45,13 +45,21 @@ DDS Format
             Caps2
             Reserved1 * 2
         Reserverd2
+    [DX10 Header]:: (only if the FourCC is DX10, everything is uint32)
+        DxgiFormat
+        ResourceDimension
+        MiscFlag
+        ArraySize
+        MiscFlags2
+
+Cubemaps store the mipmap levels of each face in turn, in the order +X, -X, +Y, -Y, +Z, -Z. Texture arrays store
+the levels of each slice in turn the same way, which DDSFile calls layers.
 
 """
 
+import os
 from struct import calcsize, pack, unpack
 
-from custommipmapsexport.logger import logger
-
 # DDSURFACEDESC2 dwFlags
 DDSD_CAPS = 0x00000001
 DDSD_HEIGHT = 0x00000002
@@ -64,6 +72,7 @@ DDSD_DEPTH = 0x00800000
 
 # DDPIXELFORMAT dwFlags
 DDPF_ALPHAPIXELS = 0x00000001
+DDPF_ALPHA = 0x00000002
 DDPF_FOURCC = 0x00000004
 DDPF_RGB = 0x00000040
 DDPF_LUMINANCE = 0x00020000
@@ -82,6 +91,15 @@ DDSCAPS2_CUBEMAP_NEGATIVEY = 0x00002000
 DDSCAPS2_CUBEMAP_POSITIVEZ = 0x00004000
 DDSCAPS2_CUBEMAP_NEGATIVEZ = 0x00008000
 DDSCAPS2_VOLUME = 0x00200000
+DDSCAPS2_CUBEMAP_ALLFACES = (
+    DDSCAPS2_CUBEMAP_POSITIVEX
+    | DDSCAPS2_CUBEMAP_NEGATIVEX
+    | DDSCAPS2_CUBEMAP_POSITIVEY
+    | DDSCAPS2_CUBEMAP_NEGATIVEY
+    | DDSCAPS2_CUBEMAP_POSITIVEZ
+    | DDSCAPS2_CUBEMAP_NEGATIVEZ
+)
+CUBEMAP_FACES = 6
 
 # Common FOURCC codes
 DDS_DXTN = 0x00545844
@@ -90,6 +108,52 @@ DDS_DXT2 = 0x32545844
 DDS_DXT3 = 0x33545844
 DDS_DXT4 = 0x34545844
 DDS_DXT5 = 0x35545844
+DDS_DX10 = 0x30315844
+
+# DDS_HEADER_DXT10 fields
+DXGI_FORMAT_R8G8B8A8_UNORM = 28
+DXGI_FORMAT_R8G8_UNORM = 49
+DXGI_FORMAT_R8_UNORM = 61
+DXGI_FORMAT_A8_UNORM = 65
+DXGI_FORMAT_BC1_UNORM = 71
+DXGI_FORMAT_BC2_UNORM = 74
+DXGI_FORMAT_BC3_UNORM = 77
+DXGI_FORMAT_B8G8R8A8_UNORM = 87
+DXGI_FORMAT_B8G8R8X8_UNORM = 88
+DDS_DIMENSION_TEXTURE2D = 3
+DDS_RESOURCE_MISC_TEXTURECUBE = 0x4
+DDS_ALPHA_MODE_UNKNOWN = 0
+DDS_ALPHA_MODE_PREMULTIPLIED = 2
+
+# Formats supported by DDSFile.add_image
+FOURCC_FORMATS = {"dxt1": DDS_DXT1, "dxt2": DDS_DXT2, "dxt3": DDS_DXT3, "dxt4": DDS_DXT4, "dxt5": DDS_DXT5}
+# Uncompressed formats by name and bits per pixel: pixel format flags and default (R, G, B, A) bit masks.
+PIXEL_FORMATS = {
+    ("rgb", 24): (DDPF_RGB, (0x00FF0000, 0x0000FF00, 0x000000FF, 0x00000000)),
+    ("rgb", 32): (DDPF_RGB, (0x00FF0000, 0x0000FF00, 0x000000FF, 0x00000000)),
+    ("rgba", 32): (DDPF_RGB | DDPF_ALPHAPIXELS, (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)),
+    ("alpha", 8): (DDPF_ALPHA, (0x00000000, 0x00000000, 0x00000000, 0x000000FF)),
+    ("luminance", 8): (DDPF_LUMINANCE, (0x000000FF, 0x00000000, 0x00000000, 0x00000000)),
+    ("luminance_alpha", 16): (DDPF_LUMINANCE | DDPF_ALPHAPIXELS, (0x000000FF, 0x00000000, 0x00000000, 0x0000FF00)),
+}
+
+# Legacy pixel formats of DXGI formats: pixel format flags, FourCC, bits per pixel and (R, G, B, A) bit masks.
+DXGI_FORMATS = {
+    DXGI_FORMAT_BC1_UNORM: (DDPF_FOURCC, DDS_DXT1, 0, (0, 0, 0, 0)),
+    DXGI_FORMAT_BC2_UNORM: (DDPF_FOURCC, DDS_DXT3, 0, (0, 0, 0, 0)),
+    DXGI_FORMAT_BC3_UNORM: (DDPF_FOURCC, DDS_DXT5, 0, (0, 0, 0, 0)),
+    DXGI_FORMAT_B8G8R8A8_UNORM: (DDPF_RGB | DDPF_ALPHAPIXELS, 0, 32, (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)),
+    DXGI_FORMAT_B8G8R8X8_UNORM: (DDPF_RGB, 0, 32, (0x00FF0000, 0x0000FF00, 0x000000FF, 0x00000000)),
+    DXGI_FORMAT_R8G8B8A8_UNORM: (DDPF_RGB | DDPF_ALPHAPIXELS, 0, 32, (0x000000FF, 0x0000FF00, 0x00FF0000, 0xFF000000)),
+    DXGI_FORMAT_A8_UNORM: (DDPF_ALPHA, 0, 8, (0x00000000, 0x00000000, 0x00000000, 0x000000FF)),
+    DXGI_FORMAT_R8_UNORM: (DDPF_LUMINANCE, 0, 8, (0x000000FF, 0x00000000, 0x00000000, 0x00000000)),
+    DXGI_FORMAT_R8G8_UNORM: (DDPF_LUMINANCE | DDPF_ALPHAPIXELS, 0, 16, (0xFF, 0x00, 0x00, 0xFF00)),
+}
+# Premultiplied FourCC formats and the DXGI formats' FourCC they're stored as, with the premultiplied alpha mode.
+PREMULTIPLIED_FOURCC = {DDS_DXT2: DDS_DXT3, DDS_DXT4: DDS_DXT5}
+
+# Maximum number of buffers per writev call, the minimum value POSIX allows for IOV_MAX.
+IOV_MAX = 16
 
 
 def dxt_to_str(dxt):
@@ -157,6 +221,41 @@ def dxt_size(w, h, dxt):
     return -1
 
 
+def get_dxgi_format(meta):
+    """Get the DXGI format and alpha mode of the legacy pixel format in the header fields."""
+    fourcc = meta.pf_fourcc if check_flags(meta.pf_flags, DDPF_FOURCC) else 0
+    alpha_mode = DDS_ALPHA_MODE_PREMULTIPLIED if fourcc in PREMULTIPLIED_FOURCC else DDS_ALPHA_MODE_UNKNOWN
+    fourcc = PREMULTIPLIED_FOURCC.get(fourcc, fourcc)
+    pixel_format = (
+        meta.pf_flags & (DDPF_RGB | DDPF_ALPHAPIXELS | DDPF_ALPHA | DDPF_LUMINANCE),
+        meta.pf_rgbBitCount,
+        (meta.pf_rBitMask, meta.pf_gBitMask, meta.pf_bBitMask, meta.pf_aBitMask),
+    )
+    for dxgi_format, (flags, dxgi_fourcc, bpp, masks) in DXGI_FORMATS.items():
+        if fourcc == dxgi_fourcc and (fourcc or pixel_format == (flags, bpp, masks)):
+            return dxgi_format, alpha_mode
+    msg = "The pixel format has no DXGI format for texture arrays"
+    raise DDSError(msg)
+
+
+def write_vectored(fd, buffers):
+    """Write all buffers to the file descriptor without joining them first."""
+    views = [view for buffer in buffers if (view := memoryview(buffer).cast("B")).nbytes]
+    if not hasattr(os, "writev"):  # Not available on Windows.
+        for view in views:
+            remaining = view
+            while remaining:
+                remaining = remaining[os.write(fd, remaining) :]
+        return
+    while views:
+        written = os.writev(fd, views[:IOV_MAX])
+        # Drop what was written and continue with the rest after a partial write.
+        while views and written >= views[0].nbytes:
+            written -= views.pop(0).nbytes
+        if written:
+            views[0] = views[0][written:]
+
+
 class QueryDict(dict):  # type: ignore[type-arg]
     """A dictionary that allows for attribute-style access."""
 
@@ -208,6 +307,8 @@ class DDSFile:
         self._fmt = None
         self.meta = meta = QueryDict()
         self.count = 0
+        self.layers = 1
+        self.cubemap = False
         self.images = []
         self.images_size = []
         for field, _ in DDSFile.fields:
@@ -256,6 +357,14 @@ class DDSFile:
             msg = "Not a DDS texture"
             raise DDSError(msg)
 
+        if check_flags(meta.caps2, DDSCAPS2_VOLUME):
+            msg = "Volume textures are not supported"
+            raise DDSError(msg)
+        self.cubemap = check_flags(meta.caps2, DDSCAPS2_CUBEMAP)
+        self.layers = bin(meta.caps2 & DDSCAPS2_CUBEMAP_ALLFACES).count("1") if self.cubemap else 1
+        if check_flags(meta.pf_flags, DDPF_FOURCC) and meta.pf_fourcc == DDS_DX10:
+            data = self._load_dx10_header(data)
+
         self.count = 1
         if check_flags(meta.flags, DDSD_MIPMAPCOUNT):
             if not check_flags(meta.caps1, DDSCAPS_COMPLEX | DDSCAPS_MIPMAP):
@@ -264,7 +373,7 @@ class DDSFile:
             self.count = meta.mipmapCount
 
         hasrgb = check_flags(meta.pf_flags, DDPF_RGB)
-        hasalpha = check_flags(meta.pf_flags, DDPF_ALPHAPIXELS)
+        hasalpha = check_flags(meta.pf_flags, DDPF_ALPHAPIXELS) or check_flags(meta.pf_flags, DDPF_ALPHA)
         hasluminance = check_flags(meta.pf_flags, DDPF_LUMINANCE)
         dxt = block = pitch = 0
         bpp = meta.pf_rgbBitCount if hasrgb or hasalpha or hasluminance else None
@@ -299,40 +408,73 @@ class DDSFile:
             else:
                 size = dxt_size(meta.width, meta.height, dxt)
 
-        w = meta.width
-        h = meta.height
         images = self.images
         images_size = self.images_size
-        for i in range(self.count):
-            if dxt in (0, 1, 2, 3):
-                size = align_value(block * w, 4) * h
-            else:
-                size = dxt_size(w, h, dxt)
-            image, data = data[:size], data[size:]
-            if len(image) < size:
-                msg = f"Truncated image for mipmap {i}"
+        for _ in range(self.layers):
+            w = meta.width
+            h = meta.height
+            for i in range(self.count):
+                if dxt in (0, 1, 2, 3):
+                    # Rows are tightly packed, pitch = (width * bpp + 7) / 8.
+                    size = block * w * h
+                else:
+                    size = dxt_size(w, h, dxt)
+                image, data = data[:size], data[size:]
+                if len(image) < size:
+                    msg = f"Truncated image for mipmap {i}"
+                    raise DDSError(msg)
+                images_size.append((w, h))
+                images.append(image)
+                if w == 1 and h == 1:
+                    break
+                w = max(1, w // 2)
+                h = max(1, h // 2)
+            if i + 1 < self.count:
+                msg = "Not enough images"
                 raise DDSError(msg)
-            images_size.append((w, h))
-            images.append(image)
-            if w == 1 and h == 1:
-                break
-            w = max(1, w // 2)
-            h = max(1, h // 2)
 
         if len(images) == 0:
             msg = "No images available"
             raise DDSError(msg)
-        if len(images) < self.count:
-            msg = "Not enough images"
-            raise DDSError(msg)
 
         self._dxt = dxt
 
+    def _load_dx10_header(self, data):
+        """Read the layers and the pixel format from the DX10 header, and return the data after it."""
+        fmt = "I" * 5
+        fmt_size = calcsize(fmt)
+        if len(data) < fmt_size:
+            msg = "Truncated DX10 header"
+            raise DDSError(msg)
+        dxgi_format, dimension, misc_flag, array_size, alpha_mode = unpack(fmt, data[:fmt_size])
+        if dimension != DDS_DIMENSION_TEXTURE2D or dxgi_format not in DXGI_FORMATS:
+            msg = f"Unsupported DXGI format {dxgi_format} or dimension {dimension}"
+            raise DDSError(msg)
+        self.cubemap = check_flags(misc_flag, DDS_RESOURCE_MISC_TEXTURECUBE)
+        self.layers = max(1, array_size) * (CUBEMAP_FACES if self.cubemap else 1)
+        # Translate to the legacy pixel format, so the images are read like those of legacy files.
+        meta = self.meta
+        meta.pf_flags, meta.pf_fourcc, meta.pf_rgbBitCount, masks = DXGI_FORMATS[dxgi_format]
+        meta.pf_rBitMask, meta.pf_gBitMask, meta.pf_bBitMask, meta.pf_aBitMask = masks
+        if alpha_mode == DDS_ALPHA_MODE_PREMULTIPLIED:
+            premultiplied = {fourcc: premultiplied for premultiplied, fourcc in PREMULTIPLIED_FOURCC.items()}
+            meta.pf_fourcc = premultiplied.get(meta.pf_fourcc, meta.pf_fourcc)
+        return data[fmt_size:]
+
     def save(self, filename):
         if len(self.images) == 0:
             msg = "No images to save"
             raise DDSError(msg)
+        if len(self.images) != self.layers * max(1, self.count):
+            msg = f"Each of the {self.layers} layers needs {self.count} mipmap levels"
+            raise DDSError(msg)
 
+        # Unbuffered, so image data is handed to the OS as is instead of being copied into a buffer first.
+        with open(filename, "wb", buffering=0) as fd:
+            write_vectored(fd.fileno(), [self.get_header(), *self.images])
+
+    def get_header(self):
+        """Get the bytes in front of the images in a saved file: the magic, the header and the DX10 header, if any."""
         fields = dict(DDSFile.fields)
         fields_keys = list(fields.keys())
         fields_index = list(fields.values())
@@ -344,19 +486,117 @@ class DDSFile:
             else:
                 value = 0
             header.append(value)
-
-        with open(filename, "wb") as fd:
-            fd.write(b"DDS ")
-            fd.write(pack("I" * 31, *header))
-            for image in self.images:
-                fd.write(image)
-
-    def add_image(self, level, bpp, fmt, width, height, data):
-        if bpp != 32:  # noqa: PLR2004
-            msg = "Bits per pixel (bpp) must be 32."
+        dx10_header = self._get_dx10_header(header, fields)
+        return b"DDS " + pack("I" * 31, *header) + dx10_header
+
+    def get_level_offsets(self):
+        """
+        Get where each image starts in a saved file, and its size in bytes.
+
+        :return: (offset, size) of each image, in the order of images: the mipmap levels of each layer in turn.
+        """
+        offset = len(self.get_header())
+        offsets = []
+        for image in self.images:
+            size = memoryview(image).nbytes
+            offsets.append((offset, size))
+            offset += size
+        return offsets
+
+    def get_mip_tail(self, level):
+        """
+        Get a file with the mipmap levels from the given one on, of every layer. The images aren't copied.
+
+        :param level: The first mipmap level to keep. It becomes the top level of the returned file.
+        """
+        count = max(1, self.count)
+        if not 0 <= level < count:
+            msg = f"Level {level} is not one of the {count} mipmap levels"
+            raise DDSError(msg)
+        tail = DDSFile()
+        tail.meta.update(self.meta)
+        tail._fmt, tail._dxt = self._fmt, self._dxt
+        tail.layers, tail.cubemap = self.layers, self.cubemap
+        for layer in range(self.layers):
+            tail.images.extend(self.images[layer * count + level : (layer + 1) * count])
+            tail.images_size.extend(self.images_size[layer * count + level : (layer + 1) * count])
+        meta = tail.meta
+        meta.width, meta.height = max(1, self.meta.width >> level), max(1, self.meta.height >> level)
+        if check_flags(meta.flags, DDSD_LINEARSIZE):
+            meta.pitchOrLinearSize = memoryview(tail.images[0]).nbytes
+        elif check_flags(meta.flags, DDSD_PITCH):
+            meta.pitchOrLinearSize = align_value(meta.pf_rgbBitCount * meta.width, 8) // 8
+        tail.count = count - level
+        if check_flags(meta.flags, DDSD_MIPMAPCOUNT):
+            meta.mipmapCount = tail.count
+        return tail
+
+    def _get_dx10_header(self, header, fields):
+        """Set the header fields of cubemaps and texture arrays, and get the DX10 header that arrays need."""
+        if self.layers == 1 and not self.cubemap:
+            return b""
+        header[fields["caps1"]] |= DDSCAPS_COMPLEX
+        if self.cubemap:
+            if self.layers % CUBEMAP_FACES or self.meta.width != self.meta.height:
+                msg = f"A cubemap needs square faces and a multiple of {CUBEMAP_FACES} layers, not {self.layers}"
+                raise DDSError(msg)
+            header[fields["caps2"]] |= DDSCAPS2_CUBEMAP | DDSCAPS2_CUBEMAP_ALLFACES
+            if self.layers == CUBEMAP_FACES:
+                return b""  # A single cubemap doesn't need the DX10 header.
+        dxgi_format, alpha_mode = get_dxgi_format(self.meta)
+        header[fields["pf_flags"]] = DDPF_FOURCC
+        header[fields["pf_fourcc"]] = DDS_DX10
+        for field in ("pf_rgbBitCount", "pf_rBitMask", "pf_gBitMask", "pf_bBitMask", "pf_aBitMask"):
+            header[fields[field]] = 0
+        misc_flag = DDS_RESOURCE_MISC_TEXTURECUBE if self.cubemap else 0
+        array_size = self.layers // CUBEMAP_FACES if self.cubemap else self.layers
+        return pack("I" * 5, dxgi_format, DDS_DIMENSION_TEXTURE2D, misc_flag, array_size, alpha_mode)
+
+    def get_image(self, level, layer=0):
+        """Get the image of the given mipmap level of a face or array slice."""
+        return self.images[layer * max(1, self.count) + level]
+
+    def add_layer(self, other):
+        """
+        Add all mipmap levels of a single surface file as the next layer, e.g. a face of a cubemap or an array slice.
+
+        :param other: A DDSFile with a single layer. Further layers need the same size, format and mipmap levels.
+        """
+        if other.layers != 1:
+            msg = f"Can't add a file with {other.layers} layers as a layer"
+            raise DDSError(msg)
+        if not self.images:
+            self.meta.update(other.meta)
+            self._fmt, self._dxt, self.count = other._fmt, other._dxt, max(1, other.count)
+            self.images.extend(other.images)
+            self.images_size.extend(other.images_size)
+            self.layers = 1
+            return
+        keys = ("width", "height", *(field for field, _ in DDSFile.fields if field.startswith("pf_")))
+        if any(self.meta[key] != other.meta[key] for key in keys) or len(other.images) != self.count:
+            msg = "Layers must have the same size, format and number of mipmap levels"
+            raise DDSError(msg)
+        self.images.extend(other.images)
+        self.images_size.extend(other.images_size)
+        self.layers += 1
+
+    def add_image(self, level, bpp, fmt, width, height, data, masks=None, layer=0):
+        """
+        Add an image as the given mipmap level.
+
+        Layers, i.e. faces of a cubemap or slices of a texture array, are added one after the other. The first layer
+        sets the number of mipmap levels, size and format of all layers.
+
+        :param data: Any object supporting the buffer protocol. It is stored without copying.
+        :param masks: Bit masks of the R, G, B and A channels of uncompressed formats, if not the default.
+        :param layer: Index of the face or array slice.
+        """
+        formats = dict.fromkeys((*(name for name, _ in PIXEL_FORMATS), *FOURCC_FORMATS))
+        if fmt not in formats:
+            msg = f"Format must be one of: {', '.join(formats)}."
             raise ValueError(msg)
-        if fmt not in ("rgb", "rgba", "dxt1", "dxt2", "dxt3", "dxt4", "dxt5"):
-            msg = "Format must be one of: rgb, rgba, dxt1, dxt2, dxt3, dxt4, dxt5."
+        if (fmt, bpp) not in PIXEL_FORMATS and not (fmt in FOURCC_FORMATS and bpp == 32):  # noqa: PLR2004
+            msg = f"Bits per pixel (bpp) {bpp} not supported by format {fmt}."
             raise ValueError(msg)
         if level < 0:
             msg = "Level must be non-negative."
@@ -364,6 +604,15 @@ class DDSFile:
         if width <= 0 or height <= 0:
             msg = "Width and height must be positive integers."
             raise ValueError(msg)
+        if layer < 0:
+            msg = "Layer must be non-negative."
+            raise ValueError(msg)
+        if layer > 0:
+            self._add_layer_image(level, fmt, width, height, data, layer)
+            return
+        if self.layers > 1:
+            msg = "Levels of the first layer must be added before other layers"
+            raise DDSError(msg)
 
         meta = self.meta
         images = self.images
@@ -382,29 +631,20 @@ class DDSFile:
             meta.width = width
             meta.height = height
             meta.flags |= DDSD_LINEARSIZE
-            meta.pitchOrLinearSize = len(data)
+            meta.pitchOrLinearSize = memoryview(data).nbytes
 
             self._initialize_pixel_format(meta, 0xFF000000)
-            if fmt in ("rgb", "rgba"):
-                meta.pf_flags |= DDPF_RGB
-                self._initialize_pixel_format(meta, 0x00000000)
-                if fmt == "rgba":
-                    meta.pf_flags |= DDPF_ALPHAPIXELS
-                    meta.pf_aBitMask = 0xFF000000
+            if fmt not in FOURCC_FORMATS:
+                pf_flags, default_masks = PIXEL_FORMATS[fmt, bpp]
+                meta.pf_flags |= pf_flags
+                meta.pf_rgbBitCount = bpp
+                meta.pf_rBitMask, meta.pf_gBitMask, meta.pf_bBitMask, meta.pf_aBitMask = masks or default_masks
             else:
                 meta.pf_flags |= DDPF_FOURCC
-                if fmt == "dxt1":
-                    meta.pf_fourcc = DDS_DXT1
-                elif fmt == "dxt2":
-                    meta.pf_fourcc = DDS_DXT2
-                elif fmt == "dxt3":
-                    meta.pf_fourcc = DDS_DXT3
-                elif fmt == "dxt4":
-                    meta.pf_fourcc = DDS_DXT4
-                elif fmt == "dxt5":
-                    meta.pf_fourcc = DDS_DXT5
+                meta.pf_fourcc = FOURCC_FORMATS[fmt]
 
             images.append(data)
+            self.count = 1
         else:
             if level != len(images):
                 msg = f"Level {level} does not match the number of images {len(images)}"
@@ -417,7 +657,23 @@ class DDSFile:
 
             meta.flags |= DDSD_MIPMAPCOUNT
             meta.caps1 |= DDSCAPS_COMPLEX | DDSCAPS_MIPMAP
-            meta.mipmapCount = len(images)
+            meta.mipmapCount = self.count = len(images)
+
+    def _add_layer_image(self, level, fmt, width, height, data, layer):
+        """Add an image to a layer after the first one, see add_image."""
+        if layer == self.layers and level == 0 and len(self.images) == self.layers * self.count:
+            self.layers += 1
+        expected_level = len(self.images) - (self.layers - 1) * self.count
+        if layer != self.layers - 1 or level != expected_level or level >= self.count:
+            msg = f"Level {level} of layer {layer} is out of order"
+            raise DDSError(msg)
+        if fmt != self._fmt:
+            msg = f"Format {fmt} does not match the expected format {self._fmt}"
+            raise DDSError(msg)
+        if (width, height) != (max(1, self.meta.width >> level), max(1, self.meta.height >> level)):
+            msg = f"Size {width}x{height} of level {level} does not match the first layer"
+            raise DDSError(msg)
+        self.images.append(data)
 
     def _initialize_pixel_format(self, meta, arg1):
         meta.pf_rgbBitCount = 32
@@ -450,6 +706,8 @@ class DDSFile:
 if __name__ == "__main__":
     import sys
 
+    from custommipmapsexport.logger import logger
+
     if len(sys.argv) == 1:
         logger.info("Usage: python ddsfile.py <file1> <file2> ...")
         sys.exit(0)
@@ -0,0 +1,156 @@
+"""Find outputs that are a single flat color or identical to each other, so the encoder doesn't process them in full.
+
+Flat outputs in S3TC formats are written in-process with solid blocks. Duplicates are only written once and then
+hard-linked or copied to their other names.
+This module doesn't import the sd package.
+"""
+
+import hashlib
+import os
+import shutil
+import struct
+from pathlib import Path
+
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.dxt import encode_solid_block
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, PixelTexture, get_pixel_layout, get_tex_view
+from custommipmapsexport.premultiply import STRAIGHT_FORMATS
+from custommipmapsexport.uncompressed import get_mip_count
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, flat textures are found by comparing the buffer to itself shifted by one pixel.
+    np = None  # type: ignore[assignment]
+
+# Compression methods whose flat textures are written in-process, with the DDSFile format they're stored as.
+SOLID_FORMATS = {"dxt1": "dxt1", "dxt1a": "dxt1", "dxt2": "dxt2", "dxt3": "dxt3", "dxt4": "dxt4", "dxt5": "dxt5"}
+# Bytes compared at once when looking for a flat texture, so textures that aren't flat are rejected early.
+CHUNK_BYTES = 1 << 20
+DIGEST_SIZE = 16
+
+
+def get_constant_pixel(sd_tex: PixelTexture) -> bytes | None:
+    """
+    Check whether all pixels of the texture are the same.
+
+    :param sd_tex: The texture to check.
+    :return: The raw bytes of the pixel if the texture is flat, otherwise None.
+    """
+    flat = get_tex_view(sd_tex).cast("B")
+    bytes_per_pixel = sd_tex.getBytesPerPixel()
+    first = flat[:bytes_per_pixel]
+    chunk = CHUNK_BYTES - CHUNK_BYTES % bytes_per_pixel
+    if np is not None:
+        # Compare whole pixels as integers, a 16-byte pixel as two.
+        dtype = f"u{bytes_per_pixel}" if bytes_per_pixel <= 8 else "u8"  # noqa: PLR2004
+        pixels = np.frombuffer(flat, dtype=dtype)
+        reference = np.frombuffer(first, dtype=dtype)
+        step = chunk // pixels.itemsize
+        for start in range(0, len(pixels), step):
+            block = pixels[start : start + step].reshape(-1, len(reference))
+            if not (block == reference).all():
+                return None
+        return bytes(first)
+    for start in range(0, flat.nbytes - bytes_per_pixel, chunk):
+        end = min(start + chunk, flat.nbytes - bytes_per_pixel)
+        if flat[start + bytes_per_pixel : end + bytes_per_pixel] != flat[start:end]:
+            return None
+    return bytes(first)
+
+
+def get_fingerprint(sd_tex: PixelTexture, constant_pixel: bytes | None = None) -> bytes:
+    """
+    Get a key that's equal for textures with identical size and pixels.
+
+    :param sd_tex: The texture to get the key for.
+    :param constant_pixel: The texture's pixel if it's flat, see get_constant_pixel. Flat textures aren't hashed.
+    :return: The key.
+    """
+    dim_x, dim_y = sd_tex.getSize()
+    header = struct.pack("<III", dim_x, dim_y, sd_tex.getBytesPerPixel())
+    if constant_pixel is not None:
+        return b"flat" + header + constant_pixel
+    digest = hashlib.blake2b(header, digest_size=DIGEST_SIZE)
+    digest.update(get_tex_view(sd_tex).cast("B"))
+    return digest.digest()
+
+
+def get_rgba(pixel: bytes, bytes_per_pixel: int) -> tuple[int, int, int, int]:
+    """
+    Convert a single pixel of a texture to 8-bit RGBA.
+
+    :param pixel: The raw bytes of the pixel.
+    :param bytes_per_pixel: The number of bytes per pixel of the texture.
+    :return: The red, green, blue and alpha values. Grayscale pixels are opaque.
+    """
+    layout = get_pixel_layout(bytes_per_pixel)
+    values = memoryview(pixel).cast(layout.typecode)
+    if layout.typecode == "H":
+        channels = [value >> 8 for value in values]
+    elif layout.typecode == "f":
+        channels = [round(min(max(value, 0.0), 1.0) * 255) for value in values]
+    else:
+        channels = list(values)
+    if layout.channels == 1:
+        return channels[0], channels[0], channels[0], 255
+    r, g, b, a = (channels[CHANNEL_ORDER.index(channel)] for channel in "RGBA")
+    return r, g, b, a
+
+
+def can_export_constant(compression: str, file_format: str = "dds") -> bool:
+    """
+    Check whether flat textures can be written in-process with the given compression.
+
+    :param compression: The compression method to use.
+    :param file_format: The container of the files, see crunch.FILE_FORMATS.
+    :return: True if the compression is an S3TC format written to DDS files, otherwise False.
+    """
+    return file_format == "dds" and compression in SOLID_FORMATS
+
+
+def export_constant(
+    filepath: Path, size: tuple[int, int], rgba: tuple[int, int, int, int], compression: str, **kwargs
+) -> Path:
+    """
+    Write a DDS file of a single color, with the same mipmap levels as the encoder would generate.
+
+    The blocks of a flat texture are all the same, so a single block is encoded and repeated. Mipmaps of a flat texture
+    have the same color.
+
+    :param filepath: The path of the DDS file to write.
+    :param size: The width and height of the texture.
+    :param rgba: The 8-bit color, already premultiplied for DXT2 and DXT4 like the pixels handed to the encoder.
+    :param compression: One of the compression methods in SOLID_FORMATS.
+    :param kwargs: Arguments for the compression command, for the mipmap settings.
+    :return: The path of the written file.
+    """
+    fmt = SOLID_FORMATS[compression]
+    if compression == "dxt1":
+        rgba = (*rgba[:3], 255)  # Keep the block in four color mode, ignoring alpha like the encoder.
+    block = encode_solid_block(rgba, STRAIGHT_FORMATS.get(fmt, fmt))
+    width, height = size
+    dds = DDSFile()
+    for level in range(get_mip_count(width, height, **kwargs)):
+        level_width, level_height = max(1, width >> level), max(1, height >> level)
+        n_blocks = ((level_width + 3) // 4) * ((level_height + 3) // 4)
+        dds.add_image(level, 32, fmt, level_width, level_height, block * n_blocks)
+    dds.save(filepath)
+    return filepath
+
+
+def link_or_copy(source: Path, target: Path) -> Path:
+    """
+    Hard-link the target to the source file, or copy it where links aren't supported.
+
+    An existing target is replaced.
+
+    :param source: The file to link to.
+    :param target: The path of the link or copy.
+    :return: The target path.
+    """
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:  # E.g. file systems without hard links, like FAT32.
+        shutil.copyfile(source, target)
+    return target
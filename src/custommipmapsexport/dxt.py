@@ -0,0 +1,190 @@
+"""Decode S3TC (DXT) compressed images with NumPy, e.g. to measure the error of the encoder's output.
+
+Blocks of a single color are encoded without NumPy, to write flat textures without the encoder.
+This module doesn't import the sd package.
+"""
+
+import struct
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+try:
+    import numpy as np
+except ImportError:  # Decoding is only needed for optional features, which are skipped without NumPy.
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+# Bytes per 4x4 block of the formats that can be decoded.
+BLOCK_BYTES = {"dxt1": 8, "dxt2": 16, "dxt3": 16, "dxt4": 16, "dxt5": 16}
+
+
+def unpack_565(colors: "npt.NDArray[np.uint16]") -> "npt.NDArray[np.int32]":
+    """
+    Expand RGB565 colors to 8 bits per channel.
+
+    :param colors: The packed colors.
+    :return: The colors with a trailing axis for the R, G and B channels.
+    """
+    colors = colors.astype(np.int32)
+    r, g, b = (colors >> 11) & 0x1F, (colors >> 5) & 0x3F, colors & 0x1F
+    return np.stack([(r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)], axis=-1)
+
+
+def decode_color_blocks(blocks: "npt.NDArray[np.uint8]", *, four_color: bool) -> "npt.NDArray[np.int32]":
+    """
+    Decode the color part of S3TC blocks.
+
+    :param blocks: The 8-byte color blocks with the shape (n, 8).
+    :param four_color: Whether the blocks always use four colors, as in DXT2-5. DXT1 blocks with the first endpoint not
+        greater than the second use three colors and transparent black instead.
+    :return: The RGBA pixels of the blocks with the shape (n, 16, 4), in row-major order within each block.
+    """
+    endpoints = np.ascontiguousarray(blocks[:, :4]).view("<u2")
+    p0, p1 = unpack_565(endpoints[:, 0]), unpack_565(endpoints[:, 1])
+    opaque = four_color | (endpoints[:, 0] > endpoints[:, 1])
+    palette = np.empty((len(blocks), 4, 4), dtype=np.int32)
+    palette[:, 0, :3] = p0
+    palette[:, 1, :3] = p1
+    palette[:, 2, :3] = np.where(opaque[:, None], (2 * p0 + p1) // 3, (p0 + p1) // 2)
+    palette[:, 3, :3] = np.where(opaque[:, None], (p0 + 2 * p1) // 3, 0)
+    palette[:, :3, 3] = 255
+    palette[:, 3, 3] = np.where(opaque, 255, 0)
+    bits = np.ascontiguousarray(blocks[:, 4:8]).view("<u4")
+    indices = (bits >> (2 * np.arange(16, dtype=np.uint32))) & 0b11
+    return palette[np.arange(len(blocks))[:, None], indices]
+
+
+def decode_explicit_alpha(blocks: "npt.NDArray[np.uint8]") -> "npt.NDArray[np.int32]":
+    """
+    Decode the 4-bit alpha blocks of DXT2 and DXT3.
+
+    :param blocks: The 8-byte alpha blocks with the shape (n, 8).
+    :return: The alpha of the blocks' pixels with the shape (n, 16).
+    """
+    bits = np.ascontiguousarray(blocks).view("<u8")
+    return ((bits >> (4 * np.arange(16, dtype=np.uint64))) & 0xF).astype(np.int32) * 17
+
+
+def decode_interpolated_alpha(blocks: "npt.NDArray[np.uint8]") -> "npt.NDArray[np.int32]":
+    """
+    Decode the interpolated alpha blocks of DXT4 and DXT5.
+
+    :param blocks: The 8-byte alpha blocks with the shape (n, 8).
+    :return: The alpha of the blocks' pixels with the shape (n, 16).
+    """
+    a0, a1 = blocks[:, 0:1].astype(np.int32), blocks[:, 1:2].astype(np.int32)
+    steps8, steps6 = np.arange(1, 7), np.arange(1, 5)
+    palette8 = np.concatenate([a0, a1, ((7 - steps8) * a0 + steps8 * a1) // 7], axis=1)
+    extremes = np.broadcast_to(np.array([0, 255]), (len(blocks), 2))
+    palette6 = np.concatenate([a0, a1, ((5 - steps6) * a0 + steps6 * a1) // 5, extremes], axis=1)
+    palette = np.where(a0 > a1, palette8, palette6)
+    padded = np.zeros((len(blocks), 8), dtype=np.uint8)
+    padded[:, :6] = blocks[:, 2:]
+    indices = (padded.view("<u8") >> (3 * np.arange(16, dtype=np.uint64))) & 0b111
+    return palette[np.arange(len(blocks))[:, None], indices.astype(np.intp)]
+
+
+def decode_dxt(data: Any, width: int, height: int, fmt: str) -> "npt.NDArray[np.uint8]":
+    """
+    Decode an S3TC compressed image.
+
+    :param data: The compressed image, any object supporting the buffer protocol.
+    :param width: Width of the image.
+    :param height: Height of the image.
+    :param fmt: One of the formats in BLOCK_BYTES. Premultiplied DXT2 and DXT4 are decoded as they are stored.
+    :return: The RGBA pixels with the shape (height, width, 4).
+    :raises ImportError: If NumPy is not available.
+    :raises ValueError: If the format isn't supported or the data is too short.
+    """
+    if np is None:
+        msg = "NumPy is required to decode DXT images."
+        raise ImportError(msg)
+    if fmt not in BLOCK_BYTES:
+        msg = f"Can't decode images in the format {fmt}."
+        raise ValueError(msg)
+    blocks_x, blocks_y = max(1, (width + 3) // 4), max(1, (height + 3) // 4)
+    size = blocks_x * blocks_y * BLOCK_BYTES[fmt]
+    if memoryview(data).nbytes < size:
+        msg = f"Expected {size} bytes for a {width}x{height} {fmt} image."
+        raise ValueError(msg)
+    blocks = np.frombuffer(data, dtype=np.uint8, count=size).reshape(-1, BLOCK_BYTES[fmt])
+    if fmt == "dxt1":
+        pixels = decode_color_blocks(blocks, four_color=False)
+    else:
+        pixels = decode_color_blocks(blocks[:, 8:], four_color=True)
+        alpha = blocks[:, :8]
+        pixels[..., 3] = decode_explicit_alpha(alpha) if fmt in ("dxt2", "dxt3") else decode_interpolated_alpha(alpha)
+    # Blocks are stored row by row, pixels within a block too.
+    image = pixels.reshape(blocks_y, blocks_x, 4, 4, 4).transpose(0, 2, 1, 3, 4).reshape(blocks_y * 4, blocks_x * 4, 4)
+    return image[:height, :width].astype(np.uint8)
+
+
+def pack_565(r: int, g: int, b: int) -> int:
+    """
+    Pack 5-bit red, 6-bit green and 5-bit blue endpoint values into an RGB565 color.
+
+    :param r: The red value in 0-31.
+    :param g: The green value in 0-63.
+    :param b: The blue value in 0-31.
+    :return: The packed color.
+    """
+    return (r << 11) | (g << 5) | b
+
+
+@lru_cache(maxsize=512)  # Every 8-bit value for both endpoint sizes.
+def fit_endpoints(value: int, bits: int) -> tuple[int, int]:
+    """
+    Find the endpoint values whose 2/3 interpolant comes closest to an 8-bit channel value.
+
+    :param value: The 8-bit value.
+    :param bits: The bits of the endpoint values, 5 or 6.
+    :return: The first and second endpoint value. Ties prefer endpoints close to each other, which are more robust
+        against the rounding of different decoders.
+    """
+    expand = [(e << (8 - bits)) | (e >> (2 * bits - 8)) for e in range(1 << bits)]
+    candidates = ((e0, e1) for e0 in range(1 << bits) for e1 in range(1 << bits))
+    return min(
+        candidates,
+        key=lambda pair: (abs((2 * expand[pair[0]] + expand[pair[1]]) // 3 - value), abs(pair[0] - pair[1])),
+    )
+
+
+def encode_solid_block(rgba: tuple[int, int, int, int], fmt: str) -> bytes:
+    """
+    Encode a 4x4 block of a single color as close to the color as the format allows.
+
+    Colors that can be represented in RGB565 are encoded exactly. DXT1 blocks with alpha below 128 become transparent
+    black, like in DXT1A. Premultiplied DXT2 and DXT4 blocks store the color multiplied by alpha.
+
+    :param rgba: The 8-bit color.
+    :param fmt: One of the formats in BLOCK_BYTES.
+    :return: The encoded block.
+    :raises ValueError: If the format isn't supported.
+    """
+    if fmt not in BLOCK_BYTES:
+        msg = f"Can't encode blocks in the format {fmt}."
+        raise ValueError(msg)
+    r, g, b, a = rgba
+    if fmt in ("dxt2", "dxt4"):
+        r, g, b = ((channel * a + 127) // 255 for channel in (r, g, b))
+    if fmt == "dxt1" and a < 128:  # noqa: PLR2004
+        # Three color mode, where index 3 is transparent black.
+        return struct.pack("<HHI", 0, 0, 0xFFFFFFFF)
+
+    (r0, r1), (g0, g1), (b0, b1) = fit_endpoints(r, 5), fit_endpoints(g, 6), fit_endpoints(b, 5)
+    color0, color1 = pack_565(r0, g0, b0), pack_565(r1, g1, b1)
+    if color0 > color1:
+        color = struct.pack("<HHI", color0, color1, 0xAAAAAAAA)  # Index 2 is 2/3 of the first endpoint.
+    elif color0 < color1:
+        # Keep DXT1 blocks in four color mode, where index 3 is 2/3 of the second endpoint.
+        color = struct.pack("<HHI", color1, color0, 0xFFFFFFFF)
+    else:
+        color = struct.pack("<HHI", color0, color1, 0)
+    if fmt == "dxt1":
+        return color
+    if fmt in ("dxt2", "dxt3"):
+        nibble = (a + 8) // 17
+        return bytes([nibble << 4 | nibble]) * 8 + color
+    return bytes([a, a]) + bytes(6) + color
@@ -0,0 +1,259 @@
+"""Long-lived encoder process that takes jobs over a pipe and pixel data through shared memory.
+
+Intermediate files are written and crunch is run by the worker, outside of Designer's process and GIL.
+This module doesn't import the sd package, because the worker runs in a plain Python interpreter.
+"""
+
+import ctypes
+import multiprocessing
+import sys
+import tempfile
+import threading
+from collections.abc import Sequence
+from multiprocessing import resource_tracker, shared_memory, spawn
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, TypedDict
+
+from custommipmapsexport.crunch import compress_files
+from custommipmapsexport.intermediate import can_write_intermediate, write_intermediate
+from custommipmapsexport.pixelbuffer import PixelTexture, get_tex_view
+
+
+class ImageJob(TypedDict):
+    """A single image in an encoding job."""
+
+    shm_name: str
+    size: tuple[int, int]
+    bytes_per_pixel: int
+    name: str
+
+
+class EncodeJob(TypedDict):
+    """A batch of images to encode with the same settings."""
+
+    images: list[ImageJob]
+    destination: str
+    compression: str
+    file_format: str
+    arguments: dict[str, str]
+
+
+class SharedTexture:
+    """Texture whose pixel buffer lives in a shared memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, size: tuple[int, int], bytes_per_pixel: int) -> None:
+        self._size = size
+        self._bytes_per_pixel = bytes_per_pixel
+        # Only keep the address, since a ctypes object exporting the buffer would prevent closing the block.
+        self._address = ctypes.addressof(ctypes.c_char.from_buffer(shm.buf))
+
+    def getSize(self) -> tuple[int, int]:  # noqa: N802  # Mimic the SDTexture interface.
+        return self._size
+
+    def getBytesPerPixel(self) -> int:  # noqa: N802
+        return self._bytes_per_pixel
+
+    def getPixelBufferAddress(self) -> int:  # noqa: N802
+        return self._address
+
+
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to a shared memory block without registering it with the resource tracker.
+
+    Designer's process creates, registers and unlinks the blocks. The worker shares its resource tracker, which keeps
+    one registration per block, so the worker's registration couldn't be undone without dropping Designer's as well.
+
+    :param name: The name of the block.
+    :return: The attached block.
+    """
+    # Before Python 3.13, which adds track=False, attaching always registers the block. Jobs are run one at a time on
+    # the worker's main thread, so nothing else registers resources meanwhile.
+    register = resource_tracker.register
+    resource_tracker.register = lambda *_: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+def run_job(job: EncodeJob) -> int:
+    """
+    Write the job's images to intermediate files and compress them.
+
+    :param job: The job to run.
+    :return: The return code of the compression command.
+    """
+    with tempfile.TemporaryDirectory(prefix="SD_DDS_export_") as temp_dir:
+        files = []
+        for image in job["images"]:
+            shm = attach_shared_memory(image["shm_name"])
+            try:
+                texture = SharedTexture(shm, image["size"], image["bytes_per_pixel"])
+                files.append(write_intermediate(Path(temp_dir) / f"{image['name']}.dds", texture))
+            finally:
+                shm.close()
+        return compress_files(
+            files, Path(job["destination"]), job["compression"], file_format=job["file_format"], **job["arguments"]
+        )
+
+
+def serve(conn: Connection) -> None:
+    """
+    Run jobs received from the connection until None is received or the connection is closed.
+
+    Each job is answered with a tuple of the return code and an error message, or None if there was no error.
+
+    :param conn: The worker's end of the pipe.
+    """
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        try:
+            conn.send((run_job(job), None))
+        except Exception as e:
+            conn.send((-1, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+def find_python_executable() -> str:
+    """
+    Find a Python interpreter to run the worker with.
+
+    :return: The path to the interpreter.
+    :raises FileNotFoundError: If no interpreter was found.
+    """
+    executable = Path(sys.executable)
+    if executable.name.lower().startswith("python"):
+        return str(executable)
+    # Embedded interpreters report the host application as executable, so look for the bundled interpreter instead.
+    prefix = Path(sys.exec_prefix)
+    candidates = [prefix / "python.exe", prefix / "bin" / "python3", prefix / "bin" / "python"]
+    try:
+        return str(next(candidate for candidate in candidates if candidate.is_file()))
+    except StopIteration:
+        msg = f"No Python interpreter found for the encoder worker in {prefix}."
+        raise FileNotFoundError(msg) from None
+
+
+class EncoderWorker:
+    """Client to start, stop and send jobs to the encoder worker process."""
+
+    def __init__(self, python_executable: str | None = None) -> None:
+        self._python_executable = python_executable
+        self._process: Any = None
+        self._conn: Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self) -> bool:
+        """Return whether the worker process is alive."""
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        """Start the worker process, if it's not running already."""
+        if self.is_running:
+            return
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, worker_conn = ctx.Pipe()
+        self._process = ctx.Process(target=serve, args=(worker_conn,), name="MIPmapsEncoder", daemon=True)
+        # The executable is global to all spawn contexts, so only set it while starting the worker.
+        previous_executable = spawn.get_executable()
+        ctx.set_executable(self._python_executable or find_python_executable())
+        try:
+            self._process.start()
+        finally:
+            ctx.set_executable(previous_executable)
+            worker_conn.close()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the worker process after it finished its current job.
+
+        :param timeout: Seconds to wait for the worker to exit before terminating it.
+        """
+        if self._conn is not None:
+            try:
+                self._conn.send(None)
+            except OSError:
+                pass  # The worker is gone already.
+            self._conn.close()
+            self._conn = None
+        if self._process is not None:
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+
+    def compress(
+        self,
+        textures: Sequence[PixelTexture],
+        filenames: Sequence[str],
+        destination: Path,
+        compression: str,
+        file_format: str = "dds",
+        **kwargs,
+    ) -> int:
+        """
+        Hand the textures over to the worker and wait for it to compress them.
+
+        Only textures that can be written as intermediate files are supported, see can_write_intermediate.
+
+        :param textures: The textures to compress.
+        :param filenames: The filenames to use for the compressed files.
+        :param destination: The destination directory of the compressed files.
+        :param compression: The compression method to use.
+        :param file_format: The container of the compressed files, see crunch.FILE_FORMATS.
+        :param kwargs: Additional arguments for the compression command.
+        :return: The return code of the compression command.
+        :raises RuntimeError: If the worker isn't running or failed to run the job.
+        :raises ValueError: If any of the textures isn't supported.
+        """
+        if not self.is_running or self._conn is None:
+            msg = "The encoder worker is not running."
+            raise RuntimeError(msg)
+        pairs = list(zip(textures, filenames, strict=True))
+        if unsupported := [name for tex, name in pairs if not can_write_intermediate(tex)]:
+            msg = f"The encoder worker can't handle textures with more than 8 bits per channel: {unsupported}"
+            raise ValueError(msg)
+
+        blocks: list[shared_memory.SharedMemory] = []
+        try:
+            images: list[ImageJob] = []
+            for tex, name in pairs:
+                view = get_tex_view(tex).cast("B")
+                shm = shared_memory.SharedMemory(create=True, size=view.nbytes)
+                blocks.append(shm)
+                shm.buf[: view.nbytes] = view
+                dim_x, dim_y = tex.getSize()
+                images.append(
+                    {
+                        "shm_name": shm.name,
+                        "size": (dim_x, dim_y),
+                        "bytes_per_pixel": tex.getBytesPerPixel(),
+                        "name": name,
+                    }
+                )
+            job: EncodeJob = {
+                "images": images,
+                "destination": str(destination),
+                "compression": compression,
+                "file_format": file_format,
+                "arguments": kwargs,
+            }
+            with self._lock:
+                self._conn.send(job)
+                returncode, error = self._conn.recv()
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+        if error is not None:
+            msg = f"The encoder worker failed: {error}"
+            raise RuntimeError(msg)
+        return returncode
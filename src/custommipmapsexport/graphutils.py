@@ -1,16 +1,41 @@
-import contextlib
-import importlib.resources
+import re
 import shutil
-import subprocess
 import tempfile
 import time
+from collections.abc import Iterator, Sequence
+from contextlib import nullcontext
 from ctypes import string_at
+from functools import lru_cache
 from itertools import chain
 from pathlib import Path
-from typing import TypedDict
+from typing import NamedTuple, TypedDict, cast
 
 import sd
+from custommipmapsexport.archive import ARCHIVE_SUFFIX, append_to_archive
+from custommipmapsexport.atlas import DEFAULT_GUTTER, blit, pack_rects, write_sidecar
+from custommipmapsexport.crunch import compress_files, validate_file_format
+from custommipmapsexport.dedupe import (
+    can_export_constant,
+    export_constant,
+    get_constant_pixel,
+    get_fingerprint,
+    get_rgba,
+    link_or_copy,
+)
+from custommipmapsexport.encoderworker import EncoderWorker
+from custommipmapsexport.intermediate import can_write_intermediate, write_intermediate
 from custommipmapsexport.logger import logger
+from custommipmapsexport.packing import PackSpec, pack_channels
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, BufferTexture
+from custommipmapsexport.premultiply import PREMULTIPLIED_FORMATS, premultiply
+from custommipmapsexport.profiling import is_profiling_enabled, profile_export
+from custommipmapsexport.qualitysearch import find_dxt_qualities, fit_resolution
+from custommipmapsexport.replicate import replicate_files
+from custommipmapsexport.streaming import STREAM_LAYOUTS, split_mips
+from custommipmapsexport.texturearray import combine_layers, encode_layers, validate_layers
+from custommipmapsexport.tiling import can_encode_tiled, encode_tiled
+from custommipmapsexport.timings import StageTimings
+from custommipmapsexport.uncompressed import DEFAULT_GAMMA, can_export_uncompressed, export_uncompressed
 from sd.api.sbs.sdsbscompgraph import SDSBSCompGraph
 from sd.api.sdbasetypes import int2
 from sd.api.sdgraph import SDGraph
@@ -21,6 +46,15 @@ from sd.api.sdtexture import SDTexture
 from sd.api.sdvalueint2 import SDValueInt2
 from sd.api.sdvaluetexture import SDValueTexture
 
+# Feedback messages of an export.
+EXPORT_DONE = "Export done"
+EXPORT_ERROR = "Error encountered. See console for details."
+
+
+def get_user_packages() -> list[SDPackage]:
+    """Get the packages opened by the user."""
+    return list(sd.getContext().getSDApplication().getPackageMgr().getUserPackages())
+
 
 def find_package_of_graph(graph: SDGraph) -> SDPackage | None:
     """
@@ -31,32 +65,168 @@ def find_package_of_graph(graph: SDGraph) -> SDPackage | None:
     :param graph: The graph to find the package for.
     :return: The package containing the graph, or None if not found.
     """
-    pkg_manager = sd.getContext().getSDApplication().getPackageMgr()
-    return next((pkg for pkg in pkg_manager.getUserPackages() if pkg.findResourceFromUrl(graph.getUrl())), None)
+    return next((pkg for pkg in get_user_packages() if pkg.findResourceFromUrl(graph.getUrl())), None)
+
+
+class PackageIndex:
+    """Index of the user packages by the URLs of their resources, to find a graph's package without a scan."""
+
+    def __init__(self) -> None:
+        self._packages: dict[str, SDPackage] | None = None
+
+    def invalidate(self, *_args) -> None:
+        """Drop the index, so it gets rebuilt on the next lookup. Can be used as callback for file events."""
+        self._packages = None
+
+    def build(self) -> dict[str, SDPackage]:
+        """
+        Build the index from all resources of the user packages.
+
+        :return: The package of each resource's URL. The first package wins if a URL is used by several.
+        """
+        packages: dict[str, SDPackage] = {}
+        for pkg in get_user_packages():
+            for resource in pkg.getChildrenResources(True):
+                packages.setdefault(resource.getUrl(), pkg)
+        return packages
+
+    def find(self, graph: SDGraph) -> SDPackage | None:
+        """
+        Find the package of the given graph.
+
+        :param graph: The graph to find the package for.
+        :return: The package containing the graph, or None if not found.
+        """
+        if self._packages is None:
+            self._packages = self.build()
+        url = graph.getUrl()
+        if (pkg := self._packages.get(url)) is None:
+            # Graphs created or renamed since the index was built, or packages that were created but not loaded.
+            if (pkg := find_package_of_graph(graph)) is not None:
+                self._packages[url] = pkg
+        return pkg
+
+
+class OutputInfo(NamedTuple):
+    """Metadata of an output node, fetched once so it can be reused for grouping, display and naming."""
+
+    uid: str
+    node: SDNode
+    identifier: str
+    label: str
+    description: str
+    user_data: str
+    group: str
+
+
+def get_annotation(node: SDNode, annotation_id: str) -> str:
+    """
+    Get the string value of the node's annotation.
+
+    :param node: The node to get the annotation from.
+    :param annotation_id: The identifier of the annotation.
+    :return: The annotation's value, or an empty string if it's not set.
+    """
+    value = node.getAnnotationPropertyValueFromId(annotation_id)
+    return (value.get() or "") if value is not None else ""  # type: ignore[attr-defined]
+
+
+def get_output_info(node: SDNode) -> OutputInfo:
+    """
+    Fetch the metadata of the output node.
+
+    :param node: The output node.
+    :return: The node's metadata.
+    """
+    return OutputInfo(
+        uid=node.getIdentifier(),
+        node=node,
+        identifier=node.getProperties(SDPropertyCategory.Output)[0].getId(),  # Seems hacky, but works.
+        label=get_annotation(node, "label"),
+        description=get_annotation(node, "description"),
+        user_data=get_annotation(node, "userdata"),
+        group=get_annotation(node, "group") or "default",
+    )
 
 
-def get_group_mapping(graph: SDGraph) -> dict[str, list[tuple[str, str]]]:
+def get_outputs_info(graph: SDGraph) -> dict[str, OutputInfo]:
+    """
+    Fetch the metadata of all output nodes of the graph.
+
+    :param graph: The graph to get the output nodes from.
+    :return: A dictionary with the nodes' uids as keys and their metadata as values, in the graph's output order.
+    """
+    infos = (get_output_info(node) for node in graph.getOutputNodes())
+    return {info.uid: info for info in infos}
+
+
+def get_group_mapping(graph: SDGraph, outputs: dict[str, OutputInfo] | None = None) -> dict[str, list[tuple[str, str]]]:
     """
     Return a dictionary with output groups as keys and node's identifier, uid (tuple) as values.
 
     :param graph: The graph to get the group mapping for.
+    :param outputs: Metadata of the graph's outputs, as returned by get_outputs_info. Fetched if not given.
     :return: A dictionary with output groups as keys and node's identifier, uid (tuple) as values.
     """
-    outputs = graph.getOutputNodes()
+    if outputs is None:
+        outputs = get_outputs_info(graph)
     mapping: dict[str, list[tuple[str, str]]] = {}
-    for out in outputs:
-        group_value = out.getAnnotationPropertyValueFromId("group")
-        group = group_value.get() if group_value is not None else "default"  # type: ignore[attr-defined]
-        identifier = out.getProperties(SDPropertyCategory.Output)[0].getId()  # Seems hacky, but works.
-        uid = out.getIdentifier()
-        if group in mapping:
-            mapping[group].append((identifier, uid))
-        else:
-            mapping[group] = [(identifier, uid)]
+    for info in outputs.values():
+        mapping.setdefault(info.group, []).append((info.identifier, info.uid))
     return mapping
 
 
-def get_output_name(graph: SDGraph, node_id: str, pattern: str) -> str:
+class NamePattern(NamedTuple):
+    """An output name pattern split into literal text and the variables it uses."""
+
+    parts: tuple[str, ...]  # Literal text at even indices, variable names at odd indices.
+    variables: frozenset[str]
+
+    def substitute(self, values: dict[str, str]) -> str:
+        """
+        Substitute the pattern's variables with the given values.
+
+        :param values: Values for at least the variables used by the pattern.
+        :return: The resulting name.
+        """
+        return "".join(values[part] if i % 2 else part for i, part in enumerate(self.parts))
+
+
+# Variables that can be used in output name patterns, see get_output_name.
+PATTERN_VARIABLES = ("graph", "identifier", "description", "label", "user_data", "group")
+_PATTERN_RE = re.compile(rf"\$\(({'|'.join(PATTERN_VARIABLES)})\)")
+
+
+@lru_cache(maxsize=32)
+def compile_pattern(pattern: str) -> NamePattern:
+    """
+    Compile the output name pattern, so it only needs to be parsed once.
+
+    Unknown variables are kept as literal text.
+
+    :param pattern: The pattern to compile.
+    :return: The compiled pattern.
+    """
+    parts = tuple(_PATTERN_RE.split(pattern))
+    return NamePattern(parts, frozenset(parts[1::2]))
+
+
+def get_pattern_values(info: OutputInfo, variables: frozenset[str], graph_identifier: str = "") -> dict[str, str]:
+    """
+    Get the values of the pattern variables for the output.
+
+    :param info: The output's metadata.
+    :param variables: The variables to get values for.
+    :param graph_identifier: The identifier of the graph containing the output, if the variables include it.
+    :return: A dictionary with the variables as keys and their values.
+    """
+    values = {var: getattr(info, var) for var in variables if var != "graph"}
+    if "graph" in variables:
+        values["graph"] = graph_identifier
+    return values
+
+
+def get_output_name(graph: SDGraph, node_id: str, pattern: str, outputs: dict[str, OutputInfo] | None = None) -> str:
     """
     Get the output name based on the given pattern.
 
@@ -71,24 +241,61 @@ def get_output_name(graph: SDGraph, node_id: str, pattern: str) -> str:
     :param graph: The graph containing the node.
     :param node_id: The identifier of the node.
     :param pattern: The pattern to use for the output name.
+    :param outputs: Cached metadata of the graph's outputs. The node's metadata is fetched if it's not included.
     :return: The output name.
     """
-    node = graph.getNodeFromId(node_id)
-    if node is None:
-        msg = f"Node with id {node_id} not found in the graph."
-        raise ValueError(msg)
+    info = outputs.get(node_id) if outputs is not None else None
+    if info is None:
+        node = graph.getNodeFromId(node_id)
+        if node is None:
+            msg = f"Node with id {node_id} not found in the graph."
+            raise ValueError(msg)
+        info = get_output_info(node)
+
+    compiled = compile_pattern(pattern)
+    graph_identifier = graph.getIdentifier() if "graph" in compiled.variables else ""
+    return compiled.substitute(get_pattern_values(info, compiled.variables, graph_identifier))
+
+
+def get_packed_name(graph: SDGraph, pattern: str, name: str) -> str:
+    """
+    Get the output name of a packed texture based on the given pattern.
+
+    The packed texture's name is used for the identifier and the label, the other output variables are empty.
+
+    :param graph: The graph containing the packed outputs.
+    :param pattern: The pattern to use for the output name.
+    :param name: The name of the packed texture.
+    :return: The output name.
+    """
+    compiled = compile_pattern(pattern)
+    values = dict.fromkeys(compiled.variables, "")
+    values.update({key: name for key in ("identifier", "label") if key in values})
+    if "graph" in values:
+        values["graph"] = graph.getIdentifier()
+    return compiled.substitute(values)
 
-    mapping = {"$(graph)": graph.getIdentifier()}
-    mapping["$(identifier)"] = node.getProperties(SDPropertyCategory.Output)[0].getId()
-    mapping["$(description)"] = node.getAnnotationPropertyValueFromId("description").get()  # type:ignore[union-attr]
-    mapping["$(label)"] = node.getAnnotationPropertyValueFromId("label").get()  # type:ignore[union-attr]
-    mapping["$(user_data)"] = node.getAnnotationPropertyValueFromId("userdata").get()  # type:ignore[union-attr]
-    group = node.getAnnotationPropertyValueFromId("group").get() or "default"  # type:ignore[union-attr]
-    mapping["$(group)"] = group
 
-    for k, v in mapping.items():
-        pattern = pattern.replace(k, v)
-    return pattern
+def resolve_pack_spec(
+    graph: SDGraph, spec: PackSpec, outputs: dict[str, OutputInfo] | None = None
+) -> dict[str, tuple[str, str]]:
+    """
+    Find the outputs of the packing spec by their identifiers.
+
+    :param graph: The graph containing the outputs.
+    :param spec: The packing spec.
+    :param outputs: Metadata of the graph's outputs, as returned by get_outputs_info. Fetched if not given.
+    :return: The uid of the output and the channel to take from it for each packed channel.
+    :raises ValueError: If an output isn't found in the graph.
+    """
+    uids = {identifier: uid for members in get_group_mapping(graph, outputs).values() for identifier, uid in members}
+    resolved = {}
+    for channel, source in spec.sources.items():
+        if (uid := uids.get(source.identifier)) is None:
+            msg = f"Output {source.identifier} of packed texture {spec.name} not found in the graph."
+            raise ValueError(msg)
+        resolved[channel] = (uid, source.channel or channel)
+    return resolved
 
 
 def get_sd_tex(node: SDNode) -> SDTexture | None:
@@ -107,6 +314,8 @@ def get_tex_bytes(sd_tex: SDTexture) -> bytes:
     """
     Get the texture bytes of the given texture.
 
+    This copies the whole pixel buffer. Use pixelbuffer.get_tex_view for read access without a copy.
+
     :param sd_tex: The texture to get the bytes for.
     :return: The texture bytes.
     """
@@ -136,41 +345,6 @@ def get_clamped_resolution(x: int, y: int, max_: int) -> tuple[int, int]:
     return res_x, res_y
 
 
-def compress_files(files: list[Path], destination: Path, compression: str, **kwargs) -> int:
-    """
-    Compress the given files to the destination using the specified compression.
-
-    :param files: The files to compress.
-    :param destination: The destination to save the compressed files.
-    :param compression: The compression method to use.
-    :param kwargs: Additional arguments for the compression command.
-    :return: The return code of the compression command.
-    """
-    crunch_app = importlib.resources.files("custommipmapsexport") / "bin" / "crunch_x64"
-    cmd = [
-        str(crunch_app),
-        "-nostats",
-        "-noprogress",
-        *chain(*[("-file", str(f)) for f in files]),
-        "-fileformat",
-        "dds",
-        "-outdir",
-        str(destination),
-        f"-{compression}",
-        *chain(*kwargs.items()),
-    ]
-    with contextlib.suppress(ValueError):
-        cmd.remove("")
-    # Validate or sanitize the cmd list to ensure it contains only trusted input.
-    if not all(isinstance(arg, str) for arg in cmd):
-        msg = "Command contains non-string arguments."
-        raise ValueError(msg)
-    # This is a hobby project, so the user should be aware of the risks.
-    completed = subprocess.run(cmd, capture_output=True, check=True)  # noqa: S603
-    logger.info(completed.stdout.decode())
-    return completed.returncode
-
-
 class NodesData(TypedDict):
     """Dictionary to hold the data of the output nodes."""
 
@@ -180,24 +354,32 @@ class NodesData(TypedDict):
     basenames: list[str]
 
 
-def get_nodes_data(graph: SDGraph, uids: list[str], pattern: str) -> NodesData:
+def get_nodes_data(
+    graph: SDGraph, uids: list[str], pattern: str, outputs: dict[str, OutputInfo] | None = None
+) -> NodesData:
     """
     Get the data of the nodes with the given uids.
 
     :param graph: The graph containing the nodes.
     :param uids: The uids of the nodes.
     :param pattern: The pattern to use for the output names.
+    :param outputs: Cached metadata of the graph's outputs. Metadata of nodes that aren't included is fetched.
     :return: A dictionary with the nodes data.
     """
     data: NodesData = {"uids": uids, "nodes": [], "identifiers": [], "basenames": []}
+    compiled = compile_pattern(pattern)
+    graph_identifier = graph.getIdentifier() if "graph" in compiled.variables else ""
 
     for uid in uids:
-        node = graph.getNodeFromId(uid)
-        if not node:
-            continue
-        data["nodes"].append(node)
-        data["identifiers"].append(node.getIdentifier())
-        data["basenames"].append(get_output_name(graph, uid, pattern))
+        info = outputs.get(uid) if outputs is not None else None
+        if info is None:
+            node = graph.getNodeFromId(uid)
+            if not node:
+                continue
+            info = get_output_info(node)
+        data["nodes"].append(info.node)
+        data["identifiers"].append(info.uid)
+        data["basenames"].append(compiled.substitute(get_pattern_values(info, compiled.variables, graph_identifier)))
     return data
 
 
@@ -205,6 +387,8 @@ def save_textures(destination: Path, textures: list[SDTexture], names: list[str]
     """
     Save the given textures to the destination with the specified names.
 
+    Textures with 8 bits per channel are written straight from their pixel buffers, skipping SDTexture.save.
+
     :param destination: The destination to save the textures.
     :param textures: The textures to save.
     :param names: The names to use for the saved textures.
@@ -215,8 +399,11 @@ def save_textures(destination: Path, textures: list[SDTexture], names: list[str]
     #       Don't bother for now.
     files = []
     for i, tex in enumerate(textures):
-        filepath = destination / f"{names[i]}.tga"
-        tex.save(str(filepath))
+        if can_write_intermediate(tex):
+            filepath = write_intermediate(destination / f"{names[i]}.dds", tex)
+        else:
+            filepath = destination / f"{names[i]}.tga"
+            tex.save(str(filepath))
         files.append(filepath)
     return files
 
@@ -244,37 +431,407 @@ def save_and_compress(
     textures: list[SDTexture],
     filenames: list[str],
     compression: str,
+    encoder: EncoderWorker | None = None,
+    *,
+    timings: StageTimings | None = None,
+    file_format: str = "dds",
     **kwargs,
 ) -> str:
     """
     Save the textures to the intermediate directory and compress them to the destination directory.
 
+    Textures that use an uncompressed format are written to DDS files directly, without the encoder.
+    Very large textures are split into tiles, which are encoded in parallel.
+    Textures with 8 bits per channel are handed over to the encoder worker, if it's running.
+
     :param intermediate_dir: The intermediate directory to save the textures.
     :param destination_dir: The destination directory to save the compressed files.
     :param textures: The textures to save and compress.
     :param filenames: The filenames to use for the saved textures.
     :param compression: The compression method to use.
+    :param encoder: The encoder worker to hand textures over to.
+    :param timings: Timings to add the time spent in each stage to.
+    :param file_format: The container of the compressed files, see crunch.FILE_FORMATS.
     :param kwargs: Additional arguments for the compression command.
     :return: A feedback message indicating the result of the operation.
     """
-    # First, save to intermediate file when not compressing data ourselves.
-    temp_files = save_textures(intermediate_dir, textures, filenames)
-    # Make sure all temp files are saved before continuing to compression.
-    wait_files_exist(temp_files)
-    # Call program to compress saved files.
-    return_code = compress_files(temp_files, destination_dir, compression, **kwargs)
-    return "Export done" if return_code == 0 else "Error encountered. See console for details."
+    if timings is None:
+        timings = StageTimings()
+    to_encode: list[tuple[SDTexture, str]] = []
+    with timings.measure("uncompressed"):
+        for tex, filename in zip(textures, filenames, strict=False):
+            if file_format == "dds" and can_export_uncompressed(tex, compression, **kwargs):
+                export_uncompressed(destination_dir / f"{filename}.dds", tex, compression, **kwargs)
+            else:
+                to_encode.append((tex, filename))
+
+    tiled = [(tex, name) for tex, name in to_encode if can_encode_tiled(tex, compression, file_format)]
+    if tiled:
+        to_encode = [(tex, name) for tex, name in to_encode if not can_encode_tiled(tex, compression, file_format)]
+        with timings.measure("tiled"):
+            for tex, name in tiled:
+                encode_tiled(destination_dir / f"{name}.dds", tex, compression, intermediate_dir, **kwargs)
+
+    return_code = 0
+    if encoder is not None and encoder.is_running:
+        handed_over = [(tex, name) for tex, name in to_encode if can_write_intermediate(tex)]
+        to_encode = [(tex, name) for tex, name in to_encode if not can_write_intermediate(tex)]
+        if handed_over:
+            textures_, names = zip(*handed_over, strict=True)
+            with timings.measure("handover"):
+                return_code |= encoder.compress(textures_, names, destination_dir, compression, file_format, **kwargs)
+
+    if to_encode:
+        with timings.measure("intermediate"):
+            # First, save to intermediate file when not compressing data ourselves.
+            temp_files = save_textures(intermediate_dir, [tex for tex, _ in to_encode], [name for _, name in to_encode])
+            # Make sure all temp files are saved before continuing to compression.
+            wait_files_exist(temp_files)
+        with timings.measure("encode"):
+            # Call program to compress saved files.
+            return_code |= compress_files(temp_files, destination_dir, compression, file_format, **kwargs)
+        # Release the disk space right away, as further batches may follow.
+        for f in temp_files:
+            f.unlink(missing_ok=True)
+    return EXPORT_DONE if return_code == 0 else EXPORT_ERROR
+
+
+def get_texture_size(sd_tex: SDTexture) -> int:
+    """
+    Get the size of the texture's pixel buffer in bytes.
+
+    :param sd_tex: The texture to get the size for.
+    :return: The size in bytes.
+    """
+    dim_x, dim_y = sd_tex.getSize()  # type: ignore[attr-defined]  # Can unpack int2
+    return dim_x * dim_y * sd_tex.getBytesPerPixel()
+
+
+def get_window_size(texture_size: int, memory_budget: int | None, n_textures: int) -> int:
+    """
+    Get the number of textures to process at once within the memory budget.
+
+    :param texture_size: The size of a single texture in bytes.
+    :param memory_budget: The maximum number of bytes of textures to hold at once. None or 0 means unlimited.
+    :param n_textures: The total number of textures.
+    :return: The number of textures per batch, at least 1.
+    """
+    if not memory_budget:
+        return max(1, n_textures)
+    return max(1, min(n_textures, memory_budget // max(1, texture_size)))
+
+
+def stream_textures(
+    nodes: list[SDNode], names: list[str], memory_budget: int | None = None
+) -> Iterator[tuple[list[SDTexture], list[str]]]:
+    """
+    Yield the nodes' textures in batches that fit into the memory budget.
+
+    The batch size is based on the first texture, since all outputs of a graph share its output size.
+    A batch's textures are only fetched when it's requested, so previous batches can be released in the meantime.
+
+    :param nodes: The output nodes to get the textures from.
+    :param names: The output names of the nodes.
+    :param memory_budget: The maximum number of bytes of textures to hold at once. None or 0 means unlimited.
+    :return: Yields lists of textures and their names. Nodes without a texture are skipped.
+    """
+    window = 0
+    start = 0
+    while start < len(nodes):
+        batch: list[SDTexture] = []
+        batch_names: list[str] = []
+        for node, name in zip(nodes[start:], names[start:], strict=True):
+            start += 1
+            if (tex := get_sd_tex(node)) is None:
+                continue
+            if not window:
+                window = get_window_size(get_texture_size(tex), memory_budget, len(nodes))
+            batch.append(tex)
+            batch_names.append(name)
+            if len(batch) >= window:
+                break
+        # Don't keep the last texture alive while the next batch is fetched.
+        tex = None
+        if batch:
+            yield batch, batch_names
+
+
+def build_atlas(
+    nodes: list[SDNode], names: list[str], sidecar: Path, gutter: int = DEFAULT_GUTTER
+) -> BufferTexture | None:
+    """
+    Pack the nodes' textures into an atlas and write the JSON sidecar with their rectangles.
+
+    The textures are fetched twice, once for the layout and once to copy them, so only one of them is held at once.
+
+    :param nodes: The output nodes to get the textures from.
+    :param names: The output names of the nodes, used as keys in the sidecar.
+    :param sidecar: The path of the sidecar to write.
+    :param gutter: Width of the gutter around each texture in pixels, see atlas.pack_rects.
+    :return: The atlas with 8 bits per channel, grayscale if all textures are. None if no node has a texture.
+    """
+    sizes: list[tuple[int, int]] = []
+    atlas_nodes: list[SDNode] = []
+    atlas_names: list[str] = []
+    grayscale = True
+    for node, name in zip(nodes, names, strict=True):
+        if (tex := get_sd_tex(node)) is None:
+            continue
+        dim_x, dim_y = tex.getSize()  # type: ignore[attr-defined]  # Can unpack int2
+        sizes.append((dim_x, dim_y))
+        atlas_nodes.append(node)
+        atlas_names.append(name)
+        grayscale = grayscale and tex.getBytesPerPixel() in (1, 2)
+        del tex
+    if not sizes:
+        return None
+
+    layout = pack_rects(sizes, gutter)
+    atlas = BufferTexture(layout.width, layout.height, 1 if grayscale else len(CHANNEL_ORDER))
+    for node, rect in zip(atlas_nodes, layout.rects, strict=True):
+        blit(atlas, get_sd_tex(node), rect, gutter)  # type: ignore[arg-type]  # Checked above.
+    write_sidecar(sidecar, layout, atlas_names, gutter)
+    logger.info(f"Packed {len(sizes)} outputs into a {layout.width}x{layout.height} atlas.")
+    return atlas
+
+
+def export_layers(
+    nodes: list[SDNode],
+    names: list[str],
+    filepath: Path,
+    compression: str,
+    temp_dir: Path,
+    *,
+    cubemap: bool = False,
+    linear_premultiply: bool = False,
+    **kwargs,
+) -> Path:
+    """
+    Combine the nodes' textures into the layers of a single DDS file, in the order of the nodes.
+
+    The textures are fetched and saved one at a time, then encoded in parallel.
+
+    :param nodes: The output nodes to get the textures from.
+    :param names: The output names of the nodes.
+    :param filepath: The path of the DDS file to write.
+    :param compression: The compression method to use, one of texturearray.LAYER_FORMATS.
+    :param temp_dir: The directory for intermediate files.
+    :param cubemap: Whether every six textures are the faces of a cubemap, see texturearray.FACE_NAMES.
+    :param linear_premultiply: Whether to premultiply the color of DXT2 and DXT4 layers in linear space.
+    :param kwargs: Additional arguments for the compression command.
+    :return: The path of the written file.
+    :raises ValueError: If a node has no texture, which would shift all later textures to the wrong layer.
+    """
+    layers_dir = temp_dir / "layers"
+    layers_dir.mkdir(exist_ok=True)
+    layer_files: list[Path] = []
+    intermediates: list[Path] = []
+    for node, output_name in zip(nodes, names, strict=True):
+        if (tex := get_sd_tex(node)) is None:
+            msg = f"Output {output_name} has no texture to combine into {filepath.name}."
+            raise ValueError(msg)
+        if compression in PREMULTIPLIED_FORMATS:
+            gamma = float(kwargs.get("-gamma", DEFAULT_GAMMA))
+            tex = cast("SDTexture", premultiply(tex, linear=linear_premultiply, gamma=gamma))
+        # Name the layers by index, since output names needn't be unique.
+        name = f"layer{len(layer_files)}"
+        if can_export_uncompressed(tex, compression, **kwargs):
+            layer_files.append(export_uncompressed(layers_dir / f"{name}.dds", tex, compression, **kwargs))
+        else:
+            intermediates.extend(save_textures(temp_dir, [tex], [name]))
+            layer_files.append(layers_dir / f"{name}.dds")
+        del tex
+    wait_files_exist(intermediates)
+    encode_layers(intermediates, layers_dir, compression, **kwargs)
+    combine_layers(layer_files, filepath, cubemap=cubemap)
+    kind = "cubemap" if cubemap else "texture array"
+    logger.info(f"Combined {len(layer_files)} outputs into a {kind}.")
+    return filepath
+
+
+def stream_packed_textures(
+    graph: SDGraph, packed: dict[str, dict[str, tuple[str, str]]]
+) -> Iterator[tuple[list[SDTexture], list[str]]]:
+    """
+    Yield the packed textures one at a time, so only one of them is held at once.
+
+    :param graph: The graph containing the outputs.
+    :param packed: The output name of each packed texture with its resolved sources, see resolve_pack_spec.
+    :return: Yields lists with a single packed texture and its name.
+    :raises ValueError: If an output has no texture.
+    """
+    for name, channels in packed.items():
+        sources = {}
+        for channel, (uid, source_channel) in channels.items():
+            node = graph.getNodeFromId(uid)
+            if node is None or (tex := get_sd_tex(node)) is None:
+                msg = f"Output {uid} packed into {name} has no texture."
+                raise ValueError(msg)
+            sources[channel] = (tex, source_channel)
+        # The packed texture quacks like an SDTexture with 8 bits per channel.
+        yield [cast("SDTexture", pack_channels(sources))], [name]
+
+
+def skip_redundant(
+    textures: list[SDTexture],
+    names: list[str],
+    destination: Path,
+    compression: str,
+    seen: dict[bytes, str],
+    file_format: str = "dds",
+    **kwargs,
+) -> tuple[list[SDTexture], list[str], list[tuple[str, str]]]:
+    """
+    Write flat textures in-process and find textures identical to previous ones, so the encoder can skip them.
+
+    :param textures: The textures to export.
+    :param names: The output names of the textures.
+    :param destination: The destination directory of the files.
+    :param compression: The compression method to use.
+    :param seen: The output name of each fingerprint exported so far, see dedupe.get_fingerprint. New ones are added.
+    :param file_format: The container of the files, see crunch.FILE_FORMATS.
+    :param kwargs: Additional arguments for the compression command.
+    :return: The textures left to encode, their names and the output names of the duplicates with their originals.
+    """
+    to_encode: list[SDTexture] = []
+    to_encode_names: list[str] = []
+    duplicates: list[tuple[str, str]] = []
+    for tex, name in zip(textures, names, strict=True):
+        pixel = get_constant_pixel(tex)
+        fingerprint = get_fingerprint(tex, pixel)
+        if (original := seen.setdefault(fingerprint, name)) != name:
+            duplicates.append((name, original))
+        elif pixel is not None and can_export_constant(compression, file_format):
+            logger.info(f"Writing {name} as a flat color.")
+            dim_x, dim_y = tex.getSize()  # type: ignore[attr-defined]  # Can unpack int2
+            rgba = get_rgba(pixel, tex.getBytesPerPixel())
+            export_constant(destination / f"{name}.dds", (dim_x, dim_y), rgba, compression, **kwargs)
+        else:
+            to_encode.append(tex)
+            to_encode_names.append(name)
+    return to_encode, to_encode_names, duplicates
+
+
+def get_encode_groups(
+    textures: list[SDTexture],
+    names: list[str],
+    compression: str,
+    min_psnr: float | None = None,
+    timings: StageTimings | None = None,
+    **kwargs,
+) -> list[tuple[list[SDTexture], list[str], dict[str, str]]]:
+    """
+    Split the textures into groups that are encoded with the same arguments.
+
+    With a minimum PSNR, each texture gets the fastest -dxtQuality setting that reaches it, see find_dxt_qualities.
+
+    :param textures: The textures to encode.
+    :param names: The output names of the textures.
+    :param compression: The compression method to use.
+    :param min_psnr: The minimum PSNR in dB. None or 0 means the -dxtQuality setting in kwargs is used for all textures.
+    :param timings: Timings to add the time spent searching the settings to.
+    :param kwargs: Additional arguments for the compression command.
+    :return: The textures, their names and the arguments for the compression command of each group.
+    """
+    if timings is None:
+        timings = StageTimings()
+    qualities = None
+    if min_psnr:
+        with timings.measure("search"):
+            qualities = find_dxt_qualities(textures, compression, min_psnr, **kwargs)
+    if qualities is None:
+        return [(textures, names, kwargs)]
+
+    groups: dict[str, tuple[list[SDTexture], list[str]]] = {}
+    for tex, name, quality in zip(textures, names, qualities, strict=True):
+        logger.info(f"Encoding {name} with -dxtQuality {quality}.")
+        group_textures, group_names = groups.setdefault(quality, ([], []))
+        group_textures.append(tex)
+        group_names.append(name)
+    return [
+        (group_textures, group_names, {**kwargs, "-dxtQuality": quality})
+        for quality, (group_textures, group_names) in groups.items()
+    ]
+
+
+def encode_batch(
+    textures: list[SDTexture],
+    names: list[str],
+    intermediate_dir: Path,
+    destination_dir: Path,
+    compression: str,
+    encoder: EncoderWorker | None = None,
+    *,
+    min_psnr: float | None = None,
+    timings: StageTimings | None = None,
+    file_format: str = "dds",
+    **kwargs,
+) -> list[tuple[str, list[str]]]:
+    """
+    Encode a batch of textures, in groups that are encoded with the same arguments, see get_encode_groups.
+
+    The groups only exist in this function, so their textures are released when it returns, before the next batch
+    is fetched.
+
+    :param textures: The textures to encode.
+    :param names: The output names of the textures.
+    :param intermediate_dir: The intermediate directory to save the textures.
+    :param destination_dir: The destination directory to save the compressed files.
+    :param compression: The compression method to use.
+    :param encoder: The encoder worker to hand textures over to.
+    :param min_psnr: The minimum PSNR in dB. None or 0 means the -dxtQuality setting in kwargs is used for all textures.
+    :param timings: Timings to add the time spent in each stage to.
+    :param file_format: The container of the compressed files, see crunch.FILE_FORMATS.
+    :param kwargs: Additional arguments for the compression command.
+    :return: The feedback message of each group and the names of its textures.
+    """
+    if timings is None:
+        timings = StageTimings()
+    groups = get_encode_groups(textures, names, compression, min_psnr, timings, **kwargs)
+    return [
+        (
+            save_and_compress(
+                intermediate_dir,
+                destination_dir,
+                group_textures,
+                group_names,
+                compression,
+                encoder,
+                timings=timings,
+                file_format=file_format,
+                **arguments,
+            ),
+            group_names,
+        )
+        for group_textures, group_names, arguments in groups
+    ]
 
 
 def export_dds_files(
     graph: SDSBSCompGraph,
     output_uids: list[str],
-    destination: str | Path,
+    destination: str | Path | Sequence[str | Path],
     pattern: str,
     compression: str,
     max_resolution: int | None = None,
     *,
     custom_lvls: bool = False,
+    encoder: EncoderWorker | None = None,
+    memory_budget: int | None = None,
+    outputs: dict[str, OutputInfo] | None = None,
+    timings: StageTimings | None = None,
+    profile: bool = False,
+    size_budget: int | None = None,
+    min_psnr: float | None = None,
+    file_format: str = "dds",
+    packing: list[PackSpec] | None = None,
+    atlas: str | None = None,
+    array: str | None = None,
+    cubemap: bool = False,
+    stream_levels: int = 0,
+    stream_layout: str = "chunks",
+    archive: str | None = None,
+    linear_premultiply: bool = False,
     **kwargs,
 ) -> str:
     """
@@ -282,18 +839,138 @@ def export_dds_files(
 
     :param graph: The graph to export the DDS files from.
     :param output_uids: The uids of the output nodes.
-    :param destination: The destination to save the DDS files.
+    :param destination: The destination to save the DDS files, or a list of destinations. The files are encoded into
+        the first one and then replicated to the others, see replicate.replicate_files.
     :param pattern: The pattern to use for the output names.
     :param compression: The compression method to use.
     :param max_resolution: The maximum resolution for the output files.
     :param custom_lvls: Whether to use custom levels for the output files.
+    :param encoder: The encoder worker to hand textures over to. Textures are encoded in-process without it.
+    :param memory_budget: The maximum number of bytes of output textures to hold at once. None means unlimited.
+    :param outputs: Cached metadata of the graph's outputs, as returned by get_outputs_info.
+    :param timings: Timings to add the time spent in each stage to.
+    :param profile: Whether to write a CPU and memory profile of the export to the destination, see profile_export.
+        Also enabled by the environment variable in profiling.PROFILE_ENV.
+    :param size_budget: The maximum size of each file in bytes. Lowers the resolution until the files fit, if needed.
+        The size of a DDS file is used as upper bound for the other containers.
+    :param min_psnr: The minimum PSNR in dB of each texture, to find the fastest -dxtQuality setting that reaches it.
+        Ignored for CRN files, whose quality only depends on -quality.
+    :param file_format: The container of the files, one of crunch.FILE_FORMATS. It's also their extension.
+    :param packing: Textures to pack channels of outputs into, see packing.parse_pack_specs. They're exported in
+        addition to the outputs and named with the pattern, with the spec's name as identifier and label.
+    :param atlas: The name of an atlas to pack the outputs into, instead of exporting them to separate files. It's
+        named with the pattern like packed textures. Its JSON sidecar has the outputs' rectangles, by output name.
+    :param array: The name of a DDS file to combine the outputs into as the slices of a texture array, in their order,
+        instead of exporting them to separate files. It's named with the pattern like packed textures.
+    :param cubemap: Whether every six outputs of the array are the faces of a cubemap, see texturearray.FACE_NAMES.
+    :param stream_levels: The number of top mipmap levels to split off each DDS file for texture streaming, see
+        streaming.split_mips. Ignored for other containers.
+    :param stream_layout: How to store the split levels, one of streaming.STREAM_LAYOUTS.
+    :param archive: The name of an archive in the destination to append the DDS files to, instead of writing them as
+        separate files, see archive.append_to_archive. The files are stored under their output names.
+    :param linear_premultiply: Whether to premultiply the color of DXT2 and DXT4 textures in linear space, with the
+        -gamma setting in kwargs, instead of multiplying the gamma encoded color by alpha.
     :param kwargs: Additional arguments for the compression command.
     :return: A feedback message indicating the result of the operation.
     """
-    out_data: NodesData = get_nodes_data(graph, output_uids, pattern)
+    if timings is None:
+        timings = StageTimings()
+    destinations = [Path(destination)] if isinstance(destination, str | Path) else [Path(path) for path in destination]
+    if not destinations:
+        msg = "At least one destination is required."
+        raise ValueError(msg)
+    profiler = profile_export(destinations[0], timings) if profile or is_profiling_enabled() else nullcontext()
+    with profiler:
+        return _export_dds_files(
+            graph,
+            output_uids,
+            destinations[0],
+            pattern,
+            compression,
+            max_resolution,
+            custom_lvls=custom_lvls,
+            encoder=encoder,
+            memory_budget=memory_budget,
+            outputs=outputs,
+            timings=timings,
+            size_budget=size_budget,
+            min_psnr=min_psnr,
+            file_format=file_format,
+            packing=packing or [],
+            atlas=atlas,
+            array=array,
+            cubemap=cubemap,
+            stream_levels=stream_levels,
+            stream_layout=stream_layout,
+            archive=archive,
+            linear_premultiply=linear_premultiply,
+            mirrors=destinations[1:],
+            **kwargs,
+        )
+
+
+def _export_dds_files(
+    graph: SDSBSCompGraph,
+    output_uids: list[str],
+    destination: Path,
+    pattern: str,
+    compression: str,
+    max_resolution: int | None,
+    *,
+    custom_lvls: bool,
+    encoder: EncoderWorker | None,
+    memory_budget: int | None,
+    outputs: dict[str, OutputInfo] | None,
+    timings: StageTimings,
+    size_budget: int | None,
+    min_psnr: float | None,
+    file_format: str,
+    packing: list[PackSpec],
+    atlas: str | None,
+    array: str | None,
+    cubemap: bool,
+    stream_levels: int,
+    stream_layout: str,
+    archive: str | None,
+    linear_premultiply: bool,
+    mirrors: list[Path],
+    **kwargs,
+) -> str:
+    """
+    Export DDS files from the given graph, see export_dds_files for the parameters.
+
+    :param mirrors: The destinations after the first, to replicate the exported files to.
+    """
+    out_data: NodesData = get_nodes_data(graph, output_uids, pattern, outputs)
     temp_dir = Path(tempfile.mkdtemp(prefix="SD_DDS_export_"))
+    # Files for an archive are written to a temporary directory first, then appended.
+    files_dir = temp_dir / "archive" if archive else destination
 
     try:
+        validate_file_format(compression, file_format)
+        if min_psnr and file_format == "crn":
+            logger.warning("Quality search is not supported for CRN files, using the chosen settings instead.")
+            min_psnr = None
+        if array:
+            if atlas:
+                msg = "Outputs can be combined into an atlas or a texture array, but not both."
+                raise ValueError(msg)
+            validate_layers(compression, file_format, len(out_data["nodes"]), cubemap=cubemap)
+        if stream_levels and file_format != "dds":
+            logger.warning("Streamed mipmap levels are only split off DDS files, exporting whole files instead.")
+            stream_levels = 0
+        if archive:
+            if file_format != "dds" or stream_levels:
+                msg = "Only whole DDS files can be appended to an archive."
+                raise ValueError(msg)
+            files_dir.mkdir()
+        if stream_layout not in STREAM_LAYOUTS:
+            msg = f"Stream layout must be one of: {', '.join(STREAM_LAYOUTS)}."
+            raise ValueError(msg)
+        packed = {
+            get_packed_name(graph, pattern, spec.name): resolve_pack_spec(graph, spec, outputs) for spec in packing
+        }
+
         out_size_prp = graph.getPropertyFromId("$outputsize", SDPropertyCategory.Input)
         if out_size_prp is None:
             msg = "Output size property not found in the graph."
@@ -307,6 +984,13 @@ def export_dds_files(
         out_x, out_y = out_size_value.get()  # type: ignore[attr-defined]   # log2
         out_size_inheritance = graph.getPropertyInheritanceMethod(out_size_prp)  # Get inheritance.
 
+        if size_budget:
+            res_x, res_y = get_clamped_resolution(out_x, out_y, max_resolution) if max_resolution else (out_x, out_y)
+            fitted = fit_resolution(res_x, res_y, size_budget, compression, **kwargs)
+            if fitted < max(res_x, res_y):
+                logger.info(f"Lowering the resolution to {2**fitted} to fit the size budget.")
+                max_resolution = fitted
+
         if max_resolution:
             res_x, res_y = get_clamped_resolution(out_x, out_y, max_resolution)
             graph.setPropertyInheritanceMethod(out_size_prp, SDPropertyInheritanceMethod.Absolute)
@@ -316,21 +1000,120 @@ def export_dds_files(
             msg = "Export failed: Custom levels not implemented yet."
             raise NotImplementedError(msg)
 
-        graph.compute()
-        textures = [tex for node in out_data["nodes"] if (tex := get_sd_tex(node)) is not None]
-        if not textures:
+        with timings.measure("compute"):
+            graph.compute()
+        feedback = ""
+        # Fingerprints of the exported textures, to find duplicates across batches.
+        seen: dict[bytes, str] = {}
+        # Names of the written files, to split off their streamed levels at the end.
+        exported: list[str] = []
+        # Filenames of further files written to the destination, to replicate them along with the exported files.
+        extra_files: list[str] = []
+        if array:
+            array_name = get_packed_name(graph, pattern, array)
+            with timings.measure("array"):
+                export_layers(
+                    out_data["nodes"],
+                    out_data["basenames"],
+                    files_dir / f"{array_name}.dds",
+                    compression,
+                    temp_dir,
+                    cubemap=cubemap,
+                    linear_premultiply=linear_premultiply,
+                    **kwargs,
+                )
+            exported.append(array_name)
+            feedback = EXPORT_DONE
+            outputs_batches: Iterator[tuple[list[SDTexture], list[str]]] = iter([])
+        elif atlas:
+            atlas_name = get_packed_name(graph, pattern, atlas)
+            with timings.measure("atlas"):
+                atlas_tex = build_atlas(out_data["nodes"], out_data["basenames"], destination / f"{atlas_name}.json")
+            extra_files.append(f"{atlas_name}.json")
+            # The atlas quacks like an SDTexture with 8 bits per channel.
+            outputs_batches = iter([([cast("SDTexture", atlas_tex)], [atlas_name])] if atlas_tex is not None else [])
+            del atlas_tex
+        else:
+            outputs_batches = stream_textures(out_data["nodes"], out_data["basenames"], memory_budget)
+        batches = chain(outputs_batches, stream_packed_textures(graph, packed))
+        while True:
+            with timings.measure("fetch"):
+                batch = next(batches, None)
+            if batch is None:
+                break
+            textures, names = batch
+            if compression in PREMULTIPLIED_FORMATS:
+                # Premultiply before anything else reads the pixels, so flat and tiled textures are premultiplied too.
+                with timings.measure("premultiply"):
+                    gamma = float(kwargs.get("-gamma", DEFAULT_GAMMA))
+                    textures = [
+                        cast("SDTexture", premultiply(tex, linear=linear_premultiply, gamma=gamma)) for tex in textures
+                    ]
+            with timings.measure("dedupe"):
+                textures, names, duplicates = skip_redundant(
+                    textures, names, files_dir, compression, seen, file_format, **kwargs
+                )
+            feedback = feedback or EXPORT_DONE
+            results = (
+                encode_batch(
+                    textures,
+                    names,
+                    temp_dir,
+                    files_dir,
+                    compression,
+                    encoder,
+                    min_psnr=min_psnr,
+                    timings=timings,
+                    file_format=file_format,
+                    **kwargs,
+                )
+                if textures
+                else []
+            )
+            for result, group_names in results:
+                feedback = result if feedback != EXPORT_ERROR else feedback
+                exported.extend(group_names)
+            for name, original in duplicates:
+                logger.info(f"Linking {name} to the identical {original}.")
+                link_or_copy(files_dir / f"{original}.{file_format}", files_dir / f"{name}.{file_format}")
+                exported.append(name)
+            # Drop the batch before the next one is fetched.
+            del textures, batch
+        if not feedback:
             msg = "No valid textures found in the graph nodes."
             raise ValueError(msg)
-
-        feedback = save_and_compress(
-            temp_dir, Path(destination), textures, out_data["basenames"], compression, **kwargs
-        )
+        if stream_levels and feedback == EXPORT_DONE:
+            with timings.measure("streaming"):
+                for name in exported:
+                    # Files are replaced, not rewritten in place, so duplicates linked to them keep all levels.
+                    levels = split_mips(destination / f"{name}.dds", stream_levels, stream_layout)
+                    if stream_layout == "chunks":
+                        extra_files.extend(f"{name}.mip{level.level}" for level in levels)
+        if archive and feedback == EXPORT_DONE:
+            with timings.measure("archive"):
+                count = append_to_archive(
+                    destination / f"{archive}{ARCHIVE_SUFFIX}", [(name, files_dir / f"{name}.dds") for name in exported]
+                )
+            logger.info(f"Appended {len(exported)} files to {archive}{ARCHIVE_SUFFIX}, which now has {count}.")
+        if mirrors and feedback == EXPORT_DONE:
+            filenames = [f"{archive}{ARCHIVE_SUFFIX}"] if archive else [f"{name}.{file_format}" for name in exported]
+            filenames.extend(extra_files)
+            with timings.measure("replicate"):
+                # Exports are appended to archives in place, which would change linked replicas as well.
+                methods = replicate_files(destination, mirrors, filenames, link=not archive)
+            summary = ", ".join(f"{count} by {method}" for method, count in methods.items())
+            logger.info(f"Replicated {len(filenames)} files to {len(mirrors)} more destinations: {summary}.")
 
         if max_resolution:
             graph.setPropertyInheritanceMethod(out_size_prp, out_size_inheritance)
             graph.setPropertyValue(out_size_prp, SDValueInt2.sNew(int2(out_x, out_y)))
-            graph.compute()
+            with timings.measure("restore"):
+                graph.compute()
 
+    except ValueError as e:
+        # Invalid settings or outputs, which the user can fix in the dialog.
+        logger.error(f"An error occurred: {e}")
+        feedback = f"Export failed: {e}"
     except Exception as e:
         logger.error(f"An error occurred: {e}")
         feedback = (
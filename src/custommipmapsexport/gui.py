@@ -1,54 +1,76 @@
 # Ignore attr-defined error for mypy that happen for Qt classes and widgets read from the UI file.
 # mypy: disable-error-code="attr-defined"
-import importlib.resources
-import weakref
+from collections.abc import Callable
 from enum import StrEnum
-from functools import partial
 from pathlib import Path
-from typing import ClassVar
 
-from PySide6 import QtCore, QtGui, QtSvg, QtUiTools, QtWidgets
-
-import sd
-from custommipmapsexport.graphutils import export_dds_files, find_package_of_graph, get_group_mapping, get_output_name
-from sd.api.qtforpythonuimgrwrapper import QtForPythonUIMgrWrapper
-
-DEFAULT_ICON_SIZE = 24
-
-
-def get_ui_manager() -> QtForPythonUIMgrWrapper | None:
-    """Get the UI Manager from the current context."""
-    ctx = sd.getContext()
-    app = ctx.getSDApplication()
-    return app.getQtForPythonUIMgr()
+from PySide6 import QtCore, QtUiTools, QtWidgets
+
+from custommipmapsexport.crunch import FILE_FORMATS
+from custommipmapsexport.encoderworker import EncoderWorker
+from custommipmapsexport.graphutils import (
+    OutputInfo,
+    PackageIndex,
+    export_dds_files,
+    find_package_of_graph,
+    get_group_mapping,
+    get_output_name,
+    get_outputs_info,
+)
+from custommipmapsexport.logger import flush_logger
+from custommipmapsexport.outputmodel import OutputTreeModel
+from custommipmapsexport.packing import parse_pack_specs
+from custommipmapsexport.profiling import is_profiling_enabled
+from custommipmapsexport.streaming import STREAM_LAYOUTS
+from custommipmapsexport.toolbar import get_ui_manager
+
+# The form is only compiled when packaging the plugin, so load the UI file when running from source.
+try:
+    from custommipmapsexport.res.ui_dialog import Ui_Dialog
+except ImportError:
+    Ui_Dialog = None
 
 
 class ExportDialog(QtCore.QObject):
     """Handles all the events in the ui."""
 
-    def __init__(self, ui_file: str, graphview_id: int, parent: QtCore.QObject | None = None):
+    def __init__(
+        self,
+        ui_file: str,
+        graphview_id: int,
+        parent: QtCore.QObject | None = None,
+        get_encoder: Callable[[], EncoderWorker | None] | None = None,
+        package_index: PackageIndex | None = None,
+    ):
         super().__init__(parent)
-        ui_qfile = QtCore.QFile(ui_file)
-        ui_qfile.open(QtCore.QFile.ReadOnly)
-        loader = QtUiTools.QUiLoader()
-        self.window = loader.load(ui_file)
-        ui_qfile.close()
+        # The encoder worker is only started when exporting for the first time.
+        self.__get_encoder = get_encoder
+        self.__package_index = package_index
+        self.window = load_dialog_window(ui_file)
 
         ui_manager = get_ui_manager()
         if ui_manager is None:
             msg = "Failed to get UI Manager."
             raise RuntimeError(msg)
         self.__graph = ui_manager.getGraphFromGraphViewID(graphview_id)
+        # Metadata of the graph's outputs, fetched once per show for the tree, the name preview and the export.
+        self.outputs: dict[str, OutputInfo] = {}
 
         # State variables' defaults.
         self.destination_path = str(Path(self.get_pkg_path()).parent)
-        self.unchecked_tree_items: list[str] = []  # list of uids.
 
         class WidgetNames(StrEnum):
             DEST_EDIT = "edit_dest"
             COMPRESSION = "comboBox_compression"
+            FILE_FORMAT = "comboBox_file_format"
             PATTERN = "edit_pattern"
             PATTERN_PREVIEW = "pattern_preview"
+            PACKING = "edit_packing"
+            ATLAS = "edit_atlas"
+            ARRAY = "edit_array"
+            CUBEMAP = "check_cubemap"
+            ARCHIVE = "edit_archive"
+            MIRRORS = "edit_mirrors"
             TREE = "tree"
             MAX_RESOLUTION = "comboBox_res"
             USE_GRAPH_RESOLUTION = "check_graph_res"
@@ -65,14 +87,28 @@ class ExportDialog(QtCore.QObject):
             BLUR = "blur_spinBox"
             MAX_MIP_LVLS = "max_lvls_spinBox"
             WRAP = "wrap_checkBox"
+            MEMORY_BUDGET = "memory_budget_spinBox"
+            SIZE_BUDGET = "size_budget_spinBox"
+            MIN_PSNR = "min_psnr_spinBox"
+            STREAM_LEVELS = "stream_levels_spinBox"
+            STREAM_LAYOUT = "stream_layout_comboBox"
+            LINEAR_PREMULTIPLY = "linear_premultiply_checkBox"
+            PROFILE = "profile_checkBox"
             BTN_EXPORT_T2 = "btn_export_t2"
 
         # Get references to widgets from tab1.
         self.dest_edit = self.window.findChild(QtWidgets.QLineEdit, WidgetNames.DEST_EDIT)
         self.compression = self.window.findChild(QtWidgets.QComboBox, WidgetNames.COMPRESSION)
+        self.file_format = self.window.findChild(QtWidgets.QComboBox, WidgetNames.FILE_FORMAT)
         self.pattern = self.window.findChild(QtWidgets.QLineEdit, WidgetNames.PATTERN)
         self.pattern_preview = self.window.findChild(QtWidgets.QLabel, WidgetNames.PATTERN_PREVIEW)
-        self.tree = self.window.findChild(QtWidgets.QTreeWidget, WidgetNames.TREE)
+        self.packing = self.window.findChild(QtWidgets.QLineEdit, WidgetNames.PACKING)
+        self.atlas = self.window.findChild(QtWidgets.QLineEdit, WidgetNames.ATLAS)
+        self.array = self.window.findChild(QtWidgets.QLineEdit, WidgetNames.ARRAY)
+        self.cubemap = self.window.findChild(QtWidgets.QCheckBox, WidgetNames.CUBEMAP)
+        self.archive = self.window.findChild(QtWidgets.QLineEdit, WidgetNames.ARCHIVE)
+        self.mirrors = self.window.findChild(QtWidgets.QLineEdit, WidgetNames.MIRRORS)
+        self.tree = self.window.findChild(QtWidgets.QTreeView, WidgetNames.TREE)
         self.max_resolution = self.window.findChild(QtWidgets.QComboBox, WidgetNames.MAX_RESOLUTION)
         self.use_graph_resolution = self.window.findChild(QtWidgets.QCheckBox, WidgetNames.USE_GRAPH_RESOLUTION)
         btn_browse = self.window.findChild(QtWidgets.QPushButton, WidgetNames.BTN_BROWSE)
@@ -90,14 +126,28 @@ class ExportDialog(QtCore.QObject):
         self.blur = self.window.findChild(QtWidgets.QDoubleSpinBox, WidgetNames.BLUR)
         self.max_mip_lvls = self.window.findChild(QtWidgets.QSpinBox, WidgetNames.MAX_MIP_LVLS)
         self.wrap = self.window.findChild(QtWidgets.QCheckBox, WidgetNames.WRAP)
+        self.memory_budget = self.window.findChild(QtWidgets.QSpinBox, WidgetNames.MEMORY_BUDGET)
+        self.size_budget = self.window.findChild(QtWidgets.QSpinBox, WidgetNames.SIZE_BUDGET)
+        self.min_psnr = self.window.findChild(QtWidgets.QDoubleSpinBox, WidgetNames.MIN_PSNR)
+        self.stream_levels = self.window.findChild(QtWidgets.QSpinBox, WidgetNames.STREAM_LEVELS)
+        self.stream_layout = self.window.findChild(QtWidgets.QComboBox, WidgetNames.STREAM_LAYOUT)
+        self.linear_premultiply = self.window.findChild(QtWidgets.QCheckBox, WidgetNames.LINEAR_PREMULTIPLY)
+        self.profile = self.window.findChild(QtWidgets.QCheckBox, WidgetNames.PROFILE)
         self.btn_export_t2 = self.window.findChild(QtWidgets.QPushButton, WidgetNames.BTN_EXPORT_T2)
 
         # Ensure all widgets are found in the dialog.
         widgets = [
             (self.dest_edit, WidgetNames.DEST_EDIT),
             (self.compression, WidgetNames.COMPRESSION),
+            (self.file_format, WidgetNames.FILE_FORMAT),
             (self.pattern, WidgetNames.PATTERN),
             (self.pattern_preview, WidgetNames.PATTERN_PREVIEW),
+            (self.packing, WidgetNames.PACKING),
+            (self.atlas, WidgetNames.ATLAS),
+            (self.array, WidgetNames.ARRAY),
+            (self.cubemap, WidgetNames.CUBEMAP),
+            (self.archive, WidgetNames.ARCHIVE),
+            (self.mirrors, WidgetNames.MIRRORS),
             (self.tree, WidgetNames.TREE),
             (self.max_resolution, WidgetNames.MAX_RESOLUTION),
             (self.use_graph_resolution, WidgetNames.USE_GRAPH_RESOLUTION),
@@ -114,6 +164,13 @@ class ExportDialog(QtCore.QObject):
             (self.blur, WidgetNames.BLUR),
             (self.max_mip_lvls, WidgetNames.MAX_MIP_LVLS),
             (self.wrap, WidgetNames.WRAP),
+            (self.memory_budget, WidgetNames.MEMORY_BUDGET),
+            (self.size_budget, WidgetNames.SIZE_BUDGET),
+            (self.min_psnr, WidgetNames.MIN_PSNR),
+            (self.stream_levels, WidgetNames.STREAM_LEVELS),
+            (self.stream_layout, WidgetNames.STREAM_LAYOUT),
+            (self.linear_premultiply, WidgetNames.LINEAR_PREMULTIPLY),
+            (self.profile, WidgetNames.PROFILE),
             (self.btn_export_t2, WidgetNames.BTN_EXPORT_T2),
         ]
         for widget, name in widgets:
@@ -122,17 +179,22 @@ class ExportDialog(QtCore.QObject):
                 raise RuntimeError(msg)
 
         # Populate widgets with defaults. We already checked for None, so ignore the type checker.
+        self.tree_model = OutputTreeModel(self)
+        self.tree.setModel(self.tree_model)
         self.dest_edit.setText(self.destination_path)
         self.pattern.setText("$(graph)_$(identifier)")
         self.populate_compression(self.compression)
+        self.populate_file_format()
         self.populate_resolution(self.max_resolution)
         self.populate_dxt_quality()
         self.populate_filter()
+        self.populate_stream_layout()
+        self.profile.setChecked(is_profiling_enabled())
 
         # Connect widgets to actions.
         self.dest_edit.editingFinished.connect(self.on_destination_changed)
         self.pattern.editingFinished.connect(self.on_pattern_changed)
-        self.tree.itemClicked.connect(self.on_tree_item_clicked)
+        self.tree.clicked.connect(self.on_tree_item_clicked)
         btn_sel_all.clicked.connect(self.on_select_all)
         btn_sel_none.clicked.connect(self.on_select_none)
         btn_browse.clicked.connect(self.on_browse_destination)
@@ -140,26 +202,21 @@ class ExportDialog(QtCore.QObject):
         self.btn_export_t2.clicked.connect(self.on_export)
 
     def show(self):
-        self.tree.clear()
-        self.populate_tree(self.tree)
+        self.outputs = get_outputs_info(self.__graph)
+        # ToDo: Move default to top if present.
+        self.tree_model.set_groups(get_group_mapping(self.__graph, self.outputs))
         # If no outputs, show only warning.
-        if self.tree.invisibleRootItem().childCount() == 0:
+        if self.tree_model.rowCount() == 0:
             self.show_warning("No Graph Outputs", "There is no output image to export from the selected graph.")
             return
 
         # Find the first valid output item in the tree to set as the current item.
-        current_item = None
-        root = self.tree.invisibleRootItem()
-        for i in range(root.childCount()):
-            group = root.child(i)
-            if group.childCount() > 0:
-                current_item = group.child(0)
-                break
-
-        if current_item is None:
+        current_index = self.tree_model.get_first_output_index()
+        if not current_index.isValid():
             self.show_warning("No Valid Outputs", "There are no valid output images to export from the selected graph.")
             return
-        self.tree.setCurrentItem(current_item)
+        self.tree.expandAll()
+        self.tree.setCurrentIndex(current_index)
         self.on_pattern_changed()
         self.feedback.setText("")
         self.window.show()
@@ -175,28 +232,12 @@ class ExportDialog(QtCore.QObject):
         msg_box.exec()
 
     def get_pkg_path(self):
-        pkg = find_package_of_graph(self.__graph)
+        if self.__package_index is not None:
+            pkg = self.__package_index.find(self.__graph)
+        else:
+            pkg = find_package_of_graph(self.__graph)
         return pkg.getFilePath()
 
-    def populate_tree(self, tree):
-        # ToDo: Move default to top if present.
-        groups = get_group_mapping(self.__graph)
-        for group_name, ids in groups.items():
-            group = QtWidgets.QTreeWidgetItem([group_name])
-            items = []
-            for identifier, uid in ids:
-                item = QtWidgets.QTreeWidgetItem([identifier])
-                item.setData(1, QtCore.Qt.EditRole, uid)
-                if uid in self.unchecked_tree_items:
-                    item.setCheckState(0, QtCore.Qt.Unchecked)
-                else:
-                    item.setCheckState(0, QtCore.Qt.Checked)
-                items.append(item)
-            group.addChildren(items)
-            tree.addTopLevelItem(group)
-            group.setExpanded(True)
-            self.update_group_checkstate(group)
-
     def populate_compression(self, box):
         formats = [
             "DXT1",
@@ -221,10 +262,16 @@ class ExportDialog(QtCore.QObject):
             "L8",
             "A8",
             "A8L8",
-            "A8R8G8B",
+            "A8R8G8B8",
         ]
         box.addItems(formats)
 
+    def populate_file_format(self):
+        self.file_format.addItems([file_format.upper() for file_format in FILE_FORMATS])
+
+    def populate_stream_layout(self):
+        self.stream_layout.addItems([layout.capitalize() for layout in STREAM_LAYOUTS])
+
     def populate_resolution(self, box):
         for i in range(13, 1, -1):  # Minimum resolution in a block compression is 4x4.
             box.addItem(str(2**i), i)  # Set log2 as hidden value.
@@ -240,72 +287,17 @@ class ExportDialog(QtCore.QObject):
         self.filter.addItems(options)
         self.filter.setCurrentIndex(4)
 
-    def on_tree_item_clicked(self, item):
-        if self.tree.indexOfTopLevelItem(item) == -1:
-            self.update_group_checkstate(item.parent())
-            self.tree.setCurrentItem(item)
+    def on_tree_item_clicked(self, index):
+        # Check states are handled by the model, only outputs change the preview.
+        if self.tree_model.get_uid(index) is not None:
+            self.tree.setCurrentIndex(index)
             self.on_pattern_changed()
-        else:
-            self.on_group_clicked(item)
-        self.update_unchecked_items()
-
-    def on_group_clicked(self, group):
-        n_children = group.childCount()
-        if group.checkState(0) == QtCore.Qt.Checked:
-            new_state = QtCore.Qt.Checked
-        elif group.checkState(0) == QtCore.Qt.Unchecked:
-            new_state = QtCore.Qt.Unchecked
-        else:  # Do nothing when partially checked.
-            return
-
-        for i in range(n_children):
-            item = group.child(i)
-            item.setCheckState(0, new_state)
-
-    def update_group_checkstate(self, group):
-        n_checked = 0
-        n_children = group.childCount()
-        for i in range(n_children):
-            item = group.child(i)
-            if item.checkState(0):
-                n_checked += 1
-        if n_checked == 0:
-            group.setCheckState(0, QtCore.Qt.Unchecked)
-        elif n_checked == n_children:
-            group.setCheckState(0, QtCore.Qt.Checked)
-        else:
-            group.setCheckState(0, QtCore.Qt.PartiallyChecked)
-
-    def update_unchecked_items(self):
-        """Rebuilds the unchecked items list.
-
-        Inefficient method. But there aren't many calls expected.
-        """
-        self.unchecked_tree_items.clear()
-        iterator = QtWidgets.QTreeWidgetItemIterator(self.tree)  # type: ignore[call-overload]  # self.tree is not None.
-        while iterator.value():
-            item = iterator.value()
-            if item.text(1) and not item.checkState(0):  # Exclude groups.
-                self.unchecked_tree_items.append(item.text(1))
-            next(iterator)
 
     def on_select_all(self):
-        iterator = QtWidgets.QTreeWidgetItemIterator(self.tree)  # type: ignore[call-overload]  # self.tree is not None.
-        while iterator.value():
-            item = iterator.value()
-            item.setCheckState(0, QtCore.Qt.Checked)
-            next(iterator)
-        self.unchecked_tree_items.clear()
+        self.tree_model.set_all_checked(checked=True)
 
     def on_select_none(self):
-        iterator = QtWidgets.QTreeWidgetItemIterator(self.tree)  # type: ignore[call-overload]  # self.tree is not None.
-        self.unchecked_tree_items.clear()
-        while iterator.value():
-            item = iterator.value()
-            item.setCheckState(0, QtCore.Qt.Unchecked)
-            if item.text(1):  # Exclude groups.
-                self.unchecked_tree_items.append(item.text(1))
-            next(iterator)
+        self.tree_model.set_all_checked(checked=False)
 
     def on_destination_changed(self, path=None):
         if not path:
@@ -319,8 +311,10 @@ class ExportDialog(QtCore.QObject):
         if not self.pattern.text():
             self.pattern.setText("$(identifier)")
 
-        item = self.tree.currentItem()
-        preview = get_output_name(self.__graph, item.text(1), self.pattern.text())
+        uid = self.tree_model.get_uid(self.tree.currentIndex())
+        if uid is None:
+            return
+        preview = get_output_name(self.__graph, uid, self.pattern.text(), self.outputs)
         self.pattern_preview.setText(preview)
 
     def on_browse_destination(self):
@@ -336,14 +330,7 @@ class ExportDialog(QtCore.QObject):
 
         :return: List of checked output IDs.
         """
-        checked_outputs = []
-        iterator = QtWidgets.QTreeWidgetItemIterator(self.tree)  # type: ignore[call-overload]  # self.tree is not None.
-        while iterator.value():
-            item = iterator.value()
-            if item.checkState(0) == QtCore.Qt.Checked and item.text(1):  # Exclude groups.
-                checked_outputs.append(item.text(1))
-            next(iterator)
-        return checked_outputs
+        return self.tree_model.get_checked_uids()
 
     def get_advanced_settings(self):
         settings = {"-quality": str(self.quality.value())}
@@ -360,7 +347,13 @@ class ExportDialog(QtCore.QObject):
         return settings
 
     def on_export(self):
-        if output_uids := self.get_checked_output_uids():
+        try:
+            packing = parse_pack_specs(self.packing.text())
+        except ValueError as e:
+            self.feedback.setText(str(e))
+            return
+        output_uids = self.get_checked_output_uids()
+        if output_uids or packing:
             # Disable export buttons while processing.
             self.btn_export.setEnabled(False)
             self.btn_export_t2.setEnabled(False)
@@ -372,102 +365,54 @@ class ExportDialog(QtCore.QObject):
                 max_res = None
 
             adv_settings = self.get_advanced_settings()
+            # A value of 0 is shown as unlimited.
+            memory_budget = self.memory_budget.value() * 1024**2 or None
+            size_budget = self.size_budget.value() * 1024 or None
+            min_psnr = self.min_psnr.value() or None
+            mirrors = [path.strip() for path in self.mirrors.text().split(";") if path.strip()]
 
             self.feedback.setText("Exporting...")
             result = export_dds_files(
                 self.__graph,
                 output_uids,
-                self.destination_path,
+                [self.destination_path, *mirrors],
                 self.pattern.text(),
                 compression,
                 max_resolution=max_res,
                 custom_lvls=False,
+                encoder=self.__get_encoder() if self.__get_encoder is not None else None,
+                memory_budget=memory_budget,
+                outputs=self.outputs,
+                profile=self.profile.isChecked(),
+                size_budget=size_budget,
+                min_psnr=min_psnr,
+                file_format=self.file_format.currentText().lower(),
+                packing=packing,
+                atlas=self.atlas.text().strip() or None,
+                array=self.array.text().strip() or None,
+                cubemap=self.cubemap.isChecked(),
+                stream_levels=self.stream_levels.value(),
+                stream_layout=self.stream_layout.currentText().lower(),
+                archive=self.archive.text().strip() or None,
+                linear_premultiply=self.linear_premultiply.isChecked(),
                 **adv_settings,
             )
             self.feedback.setText(result)
+            # Show the records queued during the export, like the encoder's output.
+            flush_logger()
             # Enable Export buttons.
             self.btn_export.setEnabled(True)
             self.btn_export_t2.setEnabled(True)
 
 
-def load_svg_icon(icon_name: str, size: int) -> QtGui.QIcon | None:
-    """Load an SVG icon from the resources.
+def load_dialog_window(ui_file: str) -> QtWidgets.QWidget:
+    """Create the dialog's window from the compiled form, or from the UI file if the form wasn't compiled.
 
-    :param icon_name: name of the icon to load.
-    :param size: size of the icon.
-    :return: QtGui.QIcon object or None if the icon could not be loaded.
+    :param ui_file: Path to the UI file to fall back to.
+    :return: The dialog's window.
     """
-    icon_file = importlib.resources.files("custommipmapsexport.res").joinpath(f"{icon_name}.svg")
-
-    svg_renderer = QtSvg.QSvgRenderer(str(icon_file))
-    if svg_renderer.isValid():
-        pixmap = QtGui.QPixmap(QtCore.QSize(size, size))
-
-        if not pixmap.isNull():
-            pixmap.fill(QtCore.Qt.transparent)
-            painter = QtGui.QPainter(pixmap)
-            svg_renderer.render(painter)
-            painter.end()
-
-        return QtGui.QIcon(pixmap)
-
-    return None
-
-
-class MipmapExportGraphToolBar(QtWidgets.QToolBar):
-    """Toolbar to call the export ui dialog."""
-
-    __toolbarList: ClassVar[dict[int, weakref.ReferenceType["MipmapExportGraphToolBar"]]] = {}
-
-    def __init__(self, graphview_id: int, ui_manager: QtForPythonUIMgrWrapper):
-        super().__init__(parent=ui_manager.getMainWindow())
-
-        self.setObjectName("olafhaag.com.mipmap_export_toolbar")
-
-        # Save the graphViewID for later use.
-        self.__graphViewID = graphview_id
-        # Load the UI from file.
-        ui_file = importlib.resources.files("custommipmapsexport.res").joinpath("dialog.ui")
-
-        self.dialog = self.load_ui(str(ui_file), parent=ui_manager.getMainWindow())
-
-        # Add actions to our toolbar.
-        export_icon_name = "mipmapexport"
-        export_icon = load_svg_icon(export_icon_name, DEFAULT_ICON_SIZE)
-        if export_icon is None:
-            msg = f"Failed to load export icon {export_icon_name} into toolbar."
-            raise RuntimeError(msg)
-        act = self.addAction(export_icon, "Export Custom Mipmaps")
-        act.setToolTip("Export outputs to compressed DDS files with mipmaps.")
-        act.triggered.connect(self.dialog.show)
-
-        self.__toolbarList[graphview_id] = weakref.ref(self)
-        self.destroyed.connect(partial(MipmapExportGraphToolBar.__on_toolbar_deleted, graphview_id=graphview_id))
-
-    def tooltip(self):
-        return self.tr("Mipmap Tools")
-
-    def load_ui(self, filename: str, parent: QtWidgets.QMainWindow | None = None) -> ExportDialog:
-        """Return an instance of the exporter dialog."""
-        return ExportDialog(filename, self.__graphViewID, parent)
-
-    @classmethod
-    def __on_toolbar_deleted(cls, graphview_id: int):
-        del cls.__toolbarList[graphview_id]
-
-    @classmethod
-    def remove_all_toolbars(cls):
-        for toolbar in cls.__toolbarList.values():
-            if ref := toolbar():
-                ref.deleteLater()
-
-
-def on_new_graphview_created(graphview_id: int, ui_manager: QtForPythonUIMgrWrapper) -> None:
-    """Create a new toolbar and adds it to the graph view when a new graph view is created."""
-    # Create our toolbar.
-    toolbar = MipmapExportGraphToolBar(graphview_id, ui_manager)
-
-    # Add our toolbar to the graph widget.
-    ui_manager.addToolbarToGraphView(
-        graphview_id, toolbar, icon=load_svg_icon("mipmaptools", DEFAULT_ICON_SIZE), tooltip=toolbar.tooltip()
-    )
+    if Ui_Dialog is not None:
+        window = QtWidgets.QDialog()
+        Ui_Dialog().setupUi(window)
+        return window
+    return QtUiTools.QUiLoader().load(ui_file)
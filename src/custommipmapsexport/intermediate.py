@@ -0,0 +1,56 @@
+"""Write Designer's pixel buffers to intermediate files for the encoder without going through SDTexture.save."""
+
+from pathlib import Path
+
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, PixelTexture, get_tex_view
+
+# Pixel sizes of 8-bit per channel textures, which the encoder can read from uncompressed DDS files as they are.
+SUPPORTED_BYTES_PER_PIXEL = (1, 4)
+
+
+def get_channel_masks(order: str) -> tuple[int, int, int, int]:
+    """
+    Get the bit masks of the R, G, B and A channels in a little-endian 32-bit pixel.
+
+    :param order: The order of the channels from the lowest address to the highest, e.g. "BGRA".
+    :return: The bit masks of the R, G, B and A channels.
+    """
+    r, g, b, a = (0xFF << (8 * order.index(channel)) for channel in "RGBA")
+    return r, g, b, a
+
+
+def can_write_intermediate(sd_tex: PixelTexture) -> bool:
+    """
+    Check whether the texture's pixel buffer can be written directly to an intermediate file.
+
+    :param sd_tex: The texture to check.
+    :return: True if the texture has 8 bits per channel, otherwise False.
+    """
+    return sd_tex.getBytesPerPixel() in SUPPORTED_BYTES_PER_PIXEL
+
+
+def write_intermediate(filepath: Path, sd_tex: PixelTexture) -> Path:
+    """
+    Write the texture's pixel buffer to an uncompressed DDS file.
+
+    The header describes the buffer's channel order, so the pixels are streamed to the file without conversion.
+
+    :param filepath: The path of the DDS file to write.
+    :param sd_tex: The texture to write.
+    :return: The path of the written file.
+    :raises ValueError: If the texture doesn't have 8 bits per channel.
+    """
+    if not can_write_intermediate(sd_tex):
+        msg = f"Can't write textures with {sd_tex.getBytesPerPixel()} bytes per pixel to an intermediate file."
+        raise ValueError(msg)
+
+    view = get_tex_view(sd_tex)
+    height, width, channels = view.shape  # type: ignore[misc]  # Views of textures are always 3D.
+    dds = DDSFile()
+    if channels == 1:
+        dds.add_image(0, 8, "luminance", width, height, view)
+    else:
+        dds.add_image(0, 32, "rgba", width, height, view, masks=get_channel_masks(CHANNEL_ORDER))
+    dds.save(filepath)
+    return filepath
@@ -0,0 +1,350 @@
+"""Repackage the mipmap levels of DDS files into KTX files and back, without encoding them again.
+
+Block compressed data is the same in both containers, only the headers and the order and alignment of the levels
+differ. DDS stores the levels of each layer in turn with tightly packed rows. KTX stores the layers of each level in
+turn, each level preceded by its size, with uncompressed rows padded to 4 bytes.
+
+KTX Format (version 1.1)
+------------------------
+
+::
+
+    [Identifier][Header][Key/Value Data][Level 0]...[Level n]
+
+    [Header]:: (everything is uint32)
+        Endianness, GlType, GlTypeSize, GlFormat, GlInternalFormat, GlBaseInternalFormat,
+        PixelWidth, PixelHeight, PixelDepth, NumberOfArrayElements, NumberOfFaces, NumberOfMipmapLevels,
+        BytesOfKeyValueData
+    [Level]:: uint32 ImageSize, then the images of each array element, and of each face within it
+
+ETC formats have no FourCC in DDS files, so KTX files with ETC data can't be converted.
+This module doesn't import the sd package.
+"""
+
+import argparse
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+
+from custommipmapsexport.ddsfile import (
+    CUBEMAP_FACES,
+    DDPF_ALPHA,
+    DDPF_ALPHAPIXELS,
+    DDPF_FOURCC,
+    DDPF_LUMINANCE,
+    DDPF_RGB,
+    DDS_DXT1,
+    DDS_DXT3,
+    DDS_DXT5,
+    PIXEL_FORMATS,
+    DDSError,
+    DDSFile,
+    align_value,
+    check_flags,
+)
+from custommipmapsexport.streaming import Buffer, write_atomic
+
+KTX_IDENTIFIER = b"\xabKTX 11\xbb\r\n\x1a\n"
+KTX_ENDIANNESS = 0x04030201
+KTX_HEADER = struct.Struct("<13I")
+# Alignment of uncompressed rows, of the faces of cubemaps and of the levels.
+KTX_ALIGNMENT = 4
+# DDS images are stored top row first.
+KTX_ORIENTATION = b"KTXorientation\x00S=r,T=d\x00"
+
+GL_UNSIGNED_BYTE = 0x1401
+GL_ALPHA = 0x1906
+GL_RGB = 0x1907
+GL_RGBA = 0x1908
+GL_LUMINANCE = 0x1909
+GL_LUMINANCE_ALPHA = 0x190A
+GL_BGR = 0x80E0
+GL_BGRA = 0x80E1
+GL_ALPHA8 = 0x803C
+GL_LUMINANCE8 = 0x8040
+GL_LUMINANCE8_ALPHA8 = 0x8045
+GL_RGB8 = 0x8051
+GL_RGBA8 = 0x8058
+GL_COMPRESSED_RGB_S3TC_DXT1_EXT = 0x83F0
+GL_COMPRESSED_RGBA_S3TC_DXT1_EXT = 0x83F1
+GL_COMPRESSED_RGBA_S3TC_DXT3_EXT = 0x83F2
+GL_COMPRESSED_RGBA_S3TC_DXT5_EXT = 0x83F3
+
+# Compressed formats: FourCC, DDSFile format and GL internal and base internal format.
+COMPRESSED_FORMATS = (
+    (DDS_DXT1, "dxt1", GL_COMPRESSED_RGB_S3TC_DXT1_EXT, GL_RGB),
+    (DDS_DXT1, "dxt1", GL_COMPRESSED_RGBA_S3TC_DXT1_EXT, GL_RGBA),
+    (DDS_DXT3, "dxt3", GL_COMPRESSED_RGBA_S3TC_DXT3_EXT, GL_RGBA),
+    (DDS_DXT5, "dxt5", GL_COMPRESSED_RGBA_S3TC_DXT5_EXT, GL_RGBA),
+)
+# Uncompressed formats: DDSFile format, bits per pixel, (R, G, B, A) bit masks and GL format, internal and base format.
+UNCOMPRESSED_FORMATS = (
+    ("rgba", 32, (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000), GL_BGRA, GL_RGBA8, GL_RGBA),
+    ("rgba", 32, (0x000000FF, 0x0000FF00, 0x00FF0000, 0xFF000000), GL_RGBA, GL_RGBA8, GL_RGBA),
+    ("rgb", 24, (0x00FF0000, 0x0000FF00, 0x000000FF, 0x00000000), GL_BGR, GL_RGB8, GL_RGB),
+    ("rgb", 24, (0x000000FF, 0x0000FF00, 0x00FF0000, 0x00000000), GL_RGB, GL_RGB8, GL_RGB),
+    ("alpha", 8, PIXEL_FORMATS["alpha", 8][1], GL_ALPHA, GL_ALPHA8, GL_ALPHA),
+    ("luminance", 8, PIXEL_FORMATS["luminance", 8][1], GL_LUMINANCE, GL_LUMINANCE8, GL_LUMINANCE),
+    (
+        "luminance_alpha",
+        16,
+        PIXEL_FORMATS["luminance_alpha", 16][1],
+        GL_LUMINANCE_ALPHA,
+        GL_LUMINANCE8_ALPHA8,
+        GL_LUMINANCE_ALPHA,
+    ),
+)
+# Containers that can be converted into each other, by their extension.
+CONTAINERS = ("dds", "ktx")
+
+
+class KTXHeader(NamedTuple):
+    """The header fields of a KTX file, see the module's docstring."""
+
+    endianness: int
+    gl_type: int
+    gl_type_size: int
+    gl_format: int
+    gl_internal_format: int
+    gl_base_internal_format: int
+    width: int
+    height: int
+    depth: int
+    array_elements: int
+    faces: int
+    levels: int
+    key_value_bytes: int
+
+
+def get_gl_format(dds: DDSFile) -> tuple[int, int, int, int, int]:
+    """
+    Get the GL type, type size, format, internal format and base internal format of the DDS file's pixel format.
+
+    :raises ddsfile.DDSError: If KTX files have no equivalent of the pixel format.
+    """
+    meta = dds.meta
+    if check_flags(meta.pf_flags, DDPF_FOURCC):
+        alpha = check_flags(meta.pf_flags, DDPF_ALPHAPIXELS)
+        for fourcc, _, internal_format, base_format in COMPRESSED_FORMATS:
+            if fourcc == meta.pf_fourcc and (fourcc != DDS_DXT1 or alpha == (base_format == GL_RGBA)):
+                return 0, 1, 0, internal_format, base_format
+    else:
+        flags = meta.pf_flags & (DDPF_RGB | DDPF_ALPHAPIXELS | DDPF_ALPHA | DDPF_LUMINANCE)
+        masks = (meta.pf_rBitMask, meta.pf_gBitMask, meta.pf_bBitMask, meta.pf_aBitMask)
+        for fmt, bpp, fmt_masks, gl_format, internal_format, base_format in UNCOMPRESSED_FORMATS:
+            if (flags, meta.pf_rgbBitCount, masks) == (PIXEL_FORMATS[fmt, bpp][0], bpp, fmt_masks):
+                return GL_UNSIGNED_BYTE, 1, gl_format, internal_format, base_format
+    msg = "The pixel format has no KTX equivalent"
+    raise DDSError(msg)
+
+
+def get_dds_format(header: KTXHeader) -> tuple[str, int, tuple[int, int, int, int] | None]:
+    """
+    Get the DDSFile format, bits per pixel and bit masks of the KTX file's GL format.
+
+    :raises ddsfile.DDSError: If DDS files have no equivalent of the GL format, like ETC formats.
+    """
+    if header.gl_type == 0:
+        for _, fmt, internal_format, _ in COMPRESSED_FORMATS:
+            if internal_format == header.gl_internal_format:
+                return fmt, 32, None
+    elif header.gl_type == GL_UNSIGNED_BYTE:
+        for fmt, bpp, masks, gl_format, internal_format, _ in UNCOMPRESSED_FORMATS:
+            if (gl_format, internal_format) == (header.gl_format, header.gl_internal_format):
+                return fmt, bpp, masks
+    msg = f"GL format 0x{header.gl_internal_format:04X} has no DDS equivalent"
+    raise DDSError(msg)
+
+
+def get_row_bytes(width: int, bpp: int, *, padded: bool) -> int:
+    """Get the bytes per row of uncompressed pixels, padded to the KTX alignment or tightly packed like DDS."""
+    row_bytes = width * bpp // 8
+    return align_value(row_bytes, KTX_ALIGNMENT) if padded else row_bytes
+
+
+def repack_rows(image: memoryview, height: int, row_bytes: int, target_row_bytes: int) -> memoryview:
+    """Copy the image's rows to rows of another size, adding or dropping padding. It's returned as is if they match."""
+    if row_bytes == target_row_bytes:
+        return image
+    repacked = memoryview(bytearray(target_row_bytes * height))
+    size = min(row_bytes, target_row_bytes)
+    for row in range(height):
+        start, target_start = row * row_bytes, row * target_row_bytes
+        repacked[target_start : target_start + size] = image[start : start + size]
+    return repacked
+
+
+def dds_to_ktx(source: Path, target: Path) -> Path:
+    """
+    Write the levels of a DDS file to a KTX file, without encoding them again.
+
+    :param source: The DDS file.
+    :param target: The path of the KTX file. It's replaced atomically.
+    :return: The target path.
+    :raises ddsfile.DDSError: If the DDS file can't be read, or KTX files can't hold its format.
+    """
+    dds = DDSFile(str(source))
+    gl_type, gl_type_size, gl_format, internal_format, base_format = get_gl_format(dds)
+    meta = dds.meta
+    faces = CUBEMAP_FACES if dds.cubemap else 1
+    array_elements = dds.layers // faces
+    levels = max(1, dds.count)
+    header = KTXHeader(
+        KTX_ENDIANNESS,
+        gl_type,
+        gl_type_size,
+        gl_format,
+        internal_format,
+        base_format,
+        meta.width,
+        meta.height,
+        0,
+        array_elements if array_elements > 1 else 0,
+        faces,
+        levels,
+        align_value(4 + len(KTX_ORIENTATION), KTX_ALIGNMENT),
+    )
+    key_value = struct.pack("<I", len(KTX_ORIENTATION)) + KTX_ORIENTATION
+    buffers: list[Buffer] = [KTX_IDENTIFIER, KTX_HEADER.pack(*header), key_value.ljust(header.key_value_bytes, b"\0")]
+    for level in range(levels):
+        width, height = dds.images_size[level]
+        images = [memoryview(dds.get_image(level, layer)).cast("B") for layer in range(dds.layers)]
+        if gl_type:
+            bpp = meta.pf_rgbBitCount
+            row_bytes = get_row_bytes(width, bpp, padded=False)
+            padded_row_bytes = get_row_bytes(width, bpp, padded=True)
+            images = [repack_rows(image, height, row_bytes, padded_row_bytes) for image in images]
+        # Non-array cubemaps give the size of a single face, everything else the size of the whole level.
+        image_size = images[0].nbytes if dds.cubemap and not header.array_elements else sum(i.nbytes for i in images)
+        buffers.append(struct.pack("<I", image_size))
+        for image in images:
+            buffers.append(image)
+            if padding := -image.nbytes % KTX_ALIGNMENT:
+                buffers.append(bytes(padding))
+    write_atomic(target, buffers)
+    return target
+
+
+def read_ktx_header(fd: BinaryIO) -> KTXHeader:
+    """
+    Read the header of a KTX file and skip its key/value data.
+
+    :raises ddsfile.DDSError: If the file isn't a little-endian KTX file of 2D textures.
+    """
+    if fd.read(len(KTX_IDENTIFIER)) != KTX_IDENTIFIER:
+        msg = "Invalid KTX identifier"
+        raise DDSError(msg)
+    data = fd.read(KTX_HEADER.size)
+    if len(data) < KTX_HEADER.size:
+        msg = "Truncated KTX header"
+        raise DDSError(msg)
+    header = KTXHeader(*KTX_HEADER.unpack(data))
+    if header.endianness != KTX_ENDIANNESS:
+        msg = "Big-endian KTX files are not supported"
+        raise DDSError(msg)
+    if header.depth > 1:
+        msg = "Volume textures are not supported"
+        raise DDSError(msg)
+    fd.seek(header.key_value_bytes, os.SEEK_CUR)
+    return header
+
+
+def ktx_to_dds(source: Path, target: Path) -> Path:
+    """
+    Write the levels of a KTX file to a DDS file, without encoding them again. Levels are read one at a time.
+
+    :param source: The KTX file.
+    :param target: The path of the DDS file. It's replaced atomically.
+    :return: The target path.
+    :raises ddsfile.DDSError: If the KTX file can't be read, or DDS files can't hold its format.
+    """
+    dds = DDSFile()
+    with source.open("rb") as fd:
+        header = read_ktx_header(fd)
+        fmt, bpp, masks = get_dds_format(header)
+        dds.cubemap = header.faces == CUBEMAP_FACES
+        layers = max(1, header.array_elements) * header.faces
+        # Images of each level by layer, since DDS files store the levels of each layer in turn.
+        images: list[list[tuple[int, int, memoryview]]] = [[] for _ in range(layers)]
+        for level in range(max(1, header.levels)):
+            width, height = max(1, header.width >> level), max(1, header.height >> level)
+            (image_size,) = struct.unpack("<I", fd.read(4))
+            # Non-array cubemaps give the size of a single face.
+            face_size = image_size if dds.cubemap and not header.array_elements else image_size // layers
+            for layer in range(layers):
+                image = memoryview(fd.read(face_size))
+                if image.nbytes < face_size:
+                    msg = f"Truncated image for mipmap {level}"
+                    raise DDSError(msg)
+                fd.seek(-face_size % KTX_ALIGNMENT, os.SEEK_CUR)
+                if header.gl_type:
+                    row_bytes = get_row_bytes(width, bpp, padded=True)
+                    packed_row_bytes = get_row_bytes(width, bpp, padded=False)
+                    image = repack_rows(image, height, row_bytes, packed_row_bytes)
+                images[layer].append((width, height, image))
+            fd.seek(-(face_size * layers) % KTX_ALIGNMENT, os.SEEK_CUR)
+    for layer, layer_images in enumerate(images):
+        for level, (width, height, image) in enumerate(layer_images):
+            dds.add_image(level, bpp, fmt, width, height, image, masks=masks, layer=layer)
+    write_atomic(target, [dds.get_header(), *dds.images])
+    return target
+
+
+def convert_file(source: Path, target: Path) -> Path:
+    """Convert a DDS file to KTX or the other way around, by the extension of the source."""
+    if source.suffix.lower() == ".dds":
+        return dds_to_ktx(source, target)
+    return ktx_to_dds(source, target)
+
+
+def convert_directory(
+    source_dir: Path, destination_dir: Path, file_format: str, max_workers: int | None = None
+) -> list[Path]:
+    """
+    Convert all files of the other container in the directory and its subdirectories to the given container.
+
+    Files are read and written in parallel, since the conversion only waits for the disk.
+
+    :param source_dir: The directory to convert the files of.
+    :param destination_dir: The directory to write the converted files to, with the same relative paths.
+    :param file_format: The container to convert to, one of CONTAINERS.
+    :param max_workers: The number of files to convert at once.
+    :return: The paths of the converted files.
+    :raises ValueError: If the container is unknown.
+    """
+    if file_format not in CONTAINERS:
+        msg = f"File format must be one of: {', '.join(CONTAINERS)}."
+        raise ValueError(msg)
+    source_format = next(container for container in CONTAINERS if container != file_format)
+    sources = [path for path in source_dir.rglob("*") if path.suffix.lower() == f".{source_format}"]
+    targets = [destination_dir / path.relative_to(source_dir).with_suffix(f".{file_format}") for path in sources]
+    for target in targets:
+        target.parent.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(convert_file, sources, targets))
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Convert a directory of textures from the command line.
+
+    :param argv: The command line arguments, sys.argv if None.
+    :return: The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", type=Path, help="Directory of the files to convert.")
+    parser.add_argument("destination", type=Path, help="Directory to write the converted files to.")
+    parser.add_argument("--to", choices=CONTAINERS, default="ktx", help="The container to convert to.")
+    parser.add_argument("--workers", type=int, help="Number of files to convert at once.")
+    args = parser.parse_args(argv)
+    converted = convert_directory(args.source, args.destination, args.to, args.workers)
+    print(f"Converted {len(converted)} files to {args.to.upper()}.")  # noqa: T201
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,136 @@
 import logging
+import os
+import threading
+from logging.handlers import QueueHandler
+from queue import Empty, SimpleQueue
+from typing import TYPE_CHECKING
 
-import sd
+if TYPE_CHECKING:
+    from PySide6 import QtCore
+
+# Environment variable to set the log level, e.g. DEBUG to see the encoder's output.
+LOG_LEVEL_ENV = "MIPMAPS_EXPORTER_LOG_LEVEL"
+DEFAULT_LOG_LEVEL = logging.INFO
+# Milliseconds between passing queued records to the handler from Qt's event loop.
+FLUSH_INTERVAL_MS = 200
 
 # Create a logger.
 logger = logging.getLogger("MIPmapsExporter")
 
 
-# Add a handler to redirect logging to Designer's console panel.
-ctx = sd.getContext()
-logger.addHandler(ctx.createRuntimeLogHandler())
-
-
 # Do not propagate log messages to Python's root logger.
 logger.propagate = False
 
 
-# Set the default log level if needed.
-logger.setLevel(logging.DEBUG)
+def get_log_level() -> int:
+    """
+    Get the log level from the environment.
+
+    :return: The level set in the environment by name or number, or the default level if it's not set or invalid.
+    """
+    value = os.environ.get(LOG_LEVEL_ENV, "").strip()
+    if value.isdigit():
+        return int(value)
+    level = logging.getLevelName(value.upper())
+    return level if isinstance(level, int) else DEFAULT_LOG_LEVEL
+
+
+# Set the default log level. Records below it aren't even created, so DEBUG output costs nothing by default.
+logger.setLevel(get_log_level())
+
+
+class MainThreadHandler(QueueHandler):
+    """
+    Handler that queues records from any thread and passes them to the target handler on the main thread only.
+
+    Logging a record never calls the target handler, so it never blocks, not even on the main thread. Designer's
+    runtime log handler isn't documented as thread-safe either. The main thread passes the queued records on when
+    the handler is flushed: periodically from Qt's event loop once the timer is started, and after each export.
+    Designer's console can't update while the main thread is busy with an export anyway.
+    """
+
+    def __init__(self, target: logging.Handler) -> None:
+        self.records: SimpleQueue[logging.LogRecord] = SimpleQueue()
+        super().__init__(self.records)
+        self.target = target
+        self.timer: QtCore.QTimer | None = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Arguments and exceptions are merged into the message in the calling thread, before they can change.
+        record = super().prepare(record)
+        record.stack_info = None
+        return record
+
+    def flush(self) -> None:
+        """Pass the queued records to the target handler, if called on the main thread."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        while True:
+            try:
+                record = self.records.get_nowait()
+            except Empty:
+                return
+            if record.levelno >= self.target.level:
+                self.target.handle(record)
+
+    def start_timer(self, interval_ms: int = FLUSH_INTERVAL_MS) -> None:
+        """
+        Flush the handler periodically from Qt's event loop, if the timer isn't running yet.
+
+        Call it on the main thread, which the timer fires on.
+
+        :param interval_ms: The milliseconds between flushes.
+        """
+        if self.timer is not None:
+            return
+        # Import here, Qt is only needed once the plugin shows its UI.
+        from PySide6 import QtCore
+
+        self.timer = QtCore.QTimer()
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(interval_ms)
+
+    def close(self) -> None:
+        if self.timer is not None:
+            self.timer.stop()
+            self.timer = None
+        super().close()
+
+
+def setup_logger(handler: logging.Handler | None = None) -> None:
+    """
+    Send log records to the handler on the main thread, if that wasn't set up yet.
+
+    Logging never calls the handler, see MainThreadHandler.
+
+    :param handler: The handler to write the records. Defaults to one for Designer's console panel.
+    """
+    if any(isinstance(h, MainThreadHandler) for h in logger.handlers):
+        return
+    if handler is None:
+        # Import here, so importing the logger has no side effects on Designer's context.
+        import sd
+
+        handler = sd.getContext().createRuntimeLogHandler()
+    logger.addHandler(MainThreadHandler(handler))
+
+
+def start_flush_timer() -> None:
+    """Pass queued records to the handler periodically from Qt's event loop. Call it on the main thread."""
+    for handler in logger.handlers:
+        if isinstance(handler, MainThreadHandler):
+            handler.start_timer()
+
+
+def flush_logger() -> None:
+    """Pass queued records to the handler, if called on the main thread."""
+    for handler in logger.handlers:
+        handler.flush()
+
+
+def shutdown_logger() -> None:
+    """Stop passing records to the handler, after all queued records were handled."""
+    for handler in [h for h in logger.handlers if isinstance(h, MainThreadHandler)]:
+        handler.flush()
+        handler.close()
+        logger.removeHandler(handler)
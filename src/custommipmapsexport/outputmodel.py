@@ -0,0 +1,206 @@
+"""Item model for the tree of a graph's outputs, grouped by their output group.
+
+The check states are kept in a set of checked uids and per-group counters, so queries don't need to walk the tree.
+This module doesn't import the sd package.
+"""
+
+from typing import Any
+
+from PySide6 import QtCore
+
+# Number of a group's output rows to add at once when the view asks for more.
+FETCH_BATCH_SIZE = 256
+# internalId of group indices. Output indices store their group's row + 1.
+_GROUP_ID = 0
+
+
+class OutputTreeModel(QtCore.QAbstractItemModel):
+    """Two-level model with output groups as top-level rows and their outputs as checkable child rows."""
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._groups: list[str] = []
+        self._outputs: list[list[tuple[str, str]]] = []  # Identifier and uid of each group's outputs.
+        self._fetched: list[int] = []  # Number of rows of each group known to the view.
+        self._n_checked: list[int] = []
+        self._checked: set[str] = set()
+        self._positions: dict[str, int] = {}  # Position of each uid in tree order.
+
+    def set_groups(self, groups: dict[str, list[tuple[str, str]]]) -> None:
+        """
+        Replace the outputs of the model.
+
+        Outputs that were unchecked before stay unchecked, all others are checked.
+
+        :param groups: Output groups as keys and the identifier and uid of their outputs as values.
+        """
+        unchecked = self._positions.keys() - self._checked
+        self.beginResetModel()
+        self._groups = list(groups)
+        self._outputs = [list(outputs) for outputs in groups.values()]
+        self._fetched = [0] * len(self._groups)
+        uids = [uid for outputs in self._outputs for _, uid in outputs]
+        self._positions = {uid: position for position, uid in enumerate(uids)}
+        self._checked = set(uids) - unchecked
+        self._n_checked = [sum(uid in self._checked for _, uid in outputs) for outputs in self._outputs]
+        self.endResetModel()
+
+    def get_checked_uids(self) -> list[str]:
+        """Get the uids of all checked outputs in tree order."""
+        return sorted(self._checked, key=self._positions.__getitem__)
+
+    def get_uid(self, index: QtCore.QModelIndex) -> str | None:
+        """Get the uid of the output at the index, or None if the index isn't an output."""
+        if not index.isValid() or index.internalId() == _GROUP_ID:
+            return None
+        return self._outputs[index.internalId() - 1][index.row()][1]
+
+    def get_first_output_index(self) -> QtCore.QModelIndex:
+        """Get the index of the first output of the first group that isn't empty, or an invalid index."""
+        for row, outputs in enumerate(self._outputs):
+            if outputs:
+                group_index = self.index(row, 0)
+                if self.canFetchMore(group_index):
+                    self.fetchMore(group_index)
+                return self.index(0, 0, group_index)
+        return QtCore.QModelIndex()
+
+    def set_all_checked(self, *, checked: bool) -> None:
+        """
+        Check or uncheck all outputs.
+
+        :param checked: Whether to check the outputs.
+        """
+        self._checked = set(self._positions) if checked else set()
+        self._n_checked = [len(outputs) if checked else 0 for outputs in self._outputs]
+        for row in range(len(self._groups)):
+            self._emit_group_changed(row, children=True)
+
+    def set_group_checked(self, group_row: int, *, checked: bool) -> None:
+        """
+        Check or uncheck all outputs of a group.
+
+        :param group_row: The row of the group.
+        :param checked: Whether to check the outputs.
+        """
+        uids = {uid for _, uid in self._outputs[group_row]}
+        if checked:
+            self._checked |= uids
+            self._n_checked[group_row] = len(uids)
+        else:
+            self._checked -= uids
+            self._n_checked[group_row] = 0
+        self._emit_group_changed(group_row, children=True)
+
+    def set_output_checked(self, group_row: int, row: int, *, checked: bool) -> None:
+        """
+        Check or uncheck a single output.
+
+        :param group_row: The row of the output's group.
+        :param row: The row of the output within its group.
+        :param checked: Whether to check the output.
+        """
+        uid = self._outputs[group_row][row][1]
+        if (uid in self._checked) == checked:
+            return
+        if checked:
+            self._checked.add(uid)
+            self._n_checked[group_row] += 1
+        else:
+            self._checked.discard(uid)
+            self._n_checked[group_row] -= 1
+        output_index = self.index(row, 0, self.index(group_row, 0))
+        self.dataChanged.emit(output_index, output_index, [QtCore.Qt.ItemDataRole.CheckStateRole])
+        self._emit_group_changed(group_row)
+
+    def get_group_check_state(self, group_row: int) -> QtCore.Qt.CheckState:
+        """Get the check state of a group from the number of its checked outputs."""
+        if self._n_checked[group_row] == 0:
+            return QtCore.Qt.CheckState.Unchecked
+        if self._n_checked[group_row] == len(self._outputs[group_row]):
+            return QtCore.Qt.CheckState.Checked
+        return QtCore.Qt.CheckState.PartiallyChecked
+
+    def _emit_group_changed(self, group_row: int, *, children: bool = False) -> None:
+        group_index = self.index(group_row, 0)
+        self.dataChanged.emit(group_index, group_index, [QtCore.Qt.ItemDataRole.CheckStateRole])
+        if children and self._fetched[group_row]:
+            first = self.index(0, 0, group_index)
+            last = self.index(self._fetched[group_row] - 1, 0, group_index)
+            self.dataChanged.emit(first, last, [QtCore.Qt.ItemDataRole.CheckStateRole])
+
+    # Overrides of QAbstractItemModel. Predefined names from the API.
+    def index(self, row: int, column: int, parent: Any = QtCore.QModelIndex()) -> QtCore.QModelIndex:
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, _GROUP_ID)
+        return self.createIndex(row, column, parent.row() + 1)
+
+    def parent(self, index: Any = QtCore.QModelIndex()) -> Any:
+        if not index.isValid() or index.internalId() == _GROUP_ID:
+            return QtCore.QModelIndex()
+        return self.createIndex(index.internalId() - 1, 0, _GROUP_ID)
+
+    def rowCount(self, parent: Any = QtCore.QModelIndex()) -> int:  # noqa: N802
+        if not parent.isValid():
+            return len(self._groups)
+        if parent.internalId() == _GROUP_ID and parent.column() == 0:
+            return self._fetched[parent.row()]
+        return 0
+
+    def columnCount(self, parent: Any = QtCore.QModelIndex()) -> int:  # noqa: N802
+        return 1
+
+    def hasChildren(self, parent: Any = QtCore.QModelIndex()) -> bool:  # noqa: N802
+        if not parent.isValid():
+            return bool(self._groups)
+        return parent.internalId() == _GROUP_ID and bool(self._outputs[parent.row()])
+
+    def canFetchMore(self, parent: Any) -> bool:  # noqa: N802
+        if not parent.isValid() or parent.internalId() != _GROUP_ID:
+            return False
+        return self._fetched[parent.row()] < len(self._outputs[parent.row()])
+
+    def fetchMore(self, parent: Any) -> None:  # noqa: N802
+        if not self.canFetchMore(parent):
+            return
+        group_row = parent.row()
+        first = self._fetched[group_row]
+        last = min(first + FETCH_BATCH_SIZE, len(self._outputs[group_row])) - 1
+        self.beginInsertRows(parent, first, last)
+        self._fetched[group_row] = last + 1
+        self.endInsertRows()
+
+    def flags(self, index: Any) -> QtCore.Qt.ItemFlag:
+        if not index.isValid():
+            return QtCore.Qt.ItemFlag.NoItemFlags
+        return QtCore.Qt.ItemFlag.ItemIsEnabled | QtCore.Qt.ItemFlag.ItemIsUserCheckable
+
+    def data(self, index: Any, role: int = QtCore.Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        is_group = index.internalId() == _GROUP_ID
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self._groups[index.row()] if is_group else self._outputs[index.internalId() - 1][index.row()][0]
+        if role == QtCore.Qt.ItemDataRole.CheckStateRole:
+            if is_group:
+                return self.get_group_check_state(index.row())
+            return (
+                QtCore.Qt.CheckState.Checked if self.get_uid(index) in self._checked else QtCore.Qt.CheckState.Unchecked
+            )
+        if role == QtCore.Qt.ItemDataRole.UserRole:
+            return None if is_group else self.get_uid(index)
+        return None
+
+    def setData(self, index: Any, value: Any, role: int = QtCore.Qt.ItemDataRole.EditRole) -> bool:  # noqa: N802
+        if not index.isValid() or role != QtCore.Qt.ItemDataRole.CheckStateRole:
+            return False
+        # The view passes the new state as integer.
+        checked = QtCore.Qt.CheckState(value) == QtCore.Qt.CheckState.Checked
+        if index.internalId() == _GROUP_ID:
+            # The view checks partially checked groups when clicked, which checks all of their outputs.
+            self.set_group_checked(index.row(), checked=checked)
+        else:
+            self.set_output_checked(index.internalId() - 1, index.row(), checked=checked)
+        return True
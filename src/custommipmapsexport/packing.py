@@ -0,0 +1,109 @@
+"""Pack channels of several outputs into one texture, e.g. occlusion, roughness and metallic into an ORM map.
+
+The channels are merged with slice assignments on the pixel buffers, so the packed texture is encoded only once.
+This module doesn't import the sd package.
+"""
+
+from typing import NamedTuple
+
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, BufferTexture, PixelTexture, get_tex_view
+from custommipmapsexport.uncompressed import get_8bit_pixels
+
+# Channels that can be packed, in the order they are written in a spec.
+CHANNELS = "RGBA"
+# Values of the channels that no output is packed into.
+DEFAULT_VALUES = {"R": 0, "G": 0, "B": 0, "A": 255}
+
+
+class ChannelSource(NamedTuple):
+    """An output to take a channel from."""
+
+    identifier: str
+    channel: str | None = None  # Channel of a color output, the packed channel if None. Ignored for grayscale outputs.
+
+
+class PackSpec(NamedTuple):
+    """The outputs to pack into the channels of a texture."""
+
+    name: str
+    sources: dict[str, ChannelSource]
+
+
+def parse_pack_specs(text: str) -> list[PackSpec]:
+    """
+    Parse packing specs like "ORM: R=ambientOcclusion, G=roughness, B=metallic; Mask: A=basecolor.A".
+
+    Several specs are separated by semicolons. Each assigns outputs by their identifier to channels of the texture with
+    the given name. Channels of color outputs can be chosen with a suffix.
+
+    :param text: The specs to parse.
+    :return: The parsed specs. Empty if the text is blank.
+    :raises ValueError: If a spec is malformed, or a name or channel is used twice.
+    """
+    specs: list[PackSpec] = []
+    for part in filter(None, (part.strip() for part in text.split(";"))):
+        name, separator, assignments = (s.strip() for s in part.partition(":"))
+        if not separator or not name:
+            msg = f"Packing spec '{part}' needs a name, e.g. 'ORM: R=ambientOcclusion'."
+            raise ValueError(msg)
+        if name in (spec.name for spec in specs):
+            msg = f"Packed texture {name} is defined twice."
+            raise ValueError(msg)
+        sources: dict[str, ChannelSource] = {}
+        for assignment in filter(None, (a.strip() for a in assignments.split(","))):
+            channel, _, source = (s.strip() for s in assignment.partition("="))
+            identifier, _, source_channel = source.partition(".")
+            channel, source_channel = channel.upper(), source_channel.upper()
+            if channel not in CHANNELS or not identifier or (source_channel and source_channel not in CHANNELS):
+                msg = f"Invalid channel assignment '{assignment}' of packed texture {name}, e.g. 'R=roughness'."
+                raise ValueError(msg)
+            if channel in sources:
+                msg = f"Channel {channel} of packed texture {name} is assigned twice."
+                raise ValueError(msg)
+            sources[channel] = ChannelSource(identifier, source_channel or None)
+        if not sources:
+            msg = f"Packed texture {name} has no channels assigned."
+            raise ValueError(msg)
+        specs.append(PackSpec(name, sources))
+    return specs
+
+
+def get_channel(sd_tex: PixelTexture, channel: str) -> memoryview:
+    """
+    Get the 8-bit values of a single channel of the texture.
+
+    :param sd_tex: The texture to get the channel from.
+    :param channel: One of CHANNELS. Grayscale textures have the same value in all channels.
+    :return: A flat view of the channel's values, strided if the texture has several channels.
+    """
+    view = get_tex_view(sd_tex)
+    n_channels = view.shape[2]  # type: ignore[index]
+    pixels = memoryview(get_8bit_pixels(view)).cast("B")
+    if n_channels == 1:
+        return pixels
+    return pixels[CHANNEL_ORDER.index(channel) :: n_channels]
+
+
+def pack_channels(sources: dict[str, tuple[PixelTexture, str]]) -> BufferTexture:
+    """
+    Pack channels of textures into the channels of a new texture.
+
+    :param sources: The texture and its channel to take for each channel of the new texture.
+    :return: The packed texture in Designer's channel order. Channels without a source have their DEFAULT_VALUES.
+    :raises ValueError: If no sources are given or the textures differ in size.
+    """
+    sizes = {tuple(tex.getSize()) for tex, _ in sources.values()}
+    if len(sizes) != 1:
+        msg = f"Packed textures need exactly one size, got {sorted(sizes)}."
+        raise ValueError(msg)
+    width, height = sizes.pop()
+    packed = BufferTexture(width, height)
+    stride = len(CHANNEL_ORDER)
+    for channel in CHANNELS:
+        offset = CHANNEL_ORDER.index(channel)
+        if channel in sources:
+            tex, source_channel = sources[channel]
+            packed.buffer[offset::stride] = get_channel(tex, source_channel)
+        elif DEFAULT_VALUES[channel]:
+            packed.buffer[offset::stride] = bytes([DEFAULT_VALUES[channel]]) * (width * height)
+    return packed
@@ -0,0 +1,138 @@
+"""Zero-copy access to the pixel buffers of Designer's textures.
+
+This module doesn't import the sd package, so it can be used with anything that quacks like an SDTexture.
+"""
+
+import ctypes
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, memoryviews work without it.
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+
+class PixelTexture(Protocol):
+    """The part of the SDTexture interface that is needed to access its pixel buffer."""
+
+    def getSize(self) -> Any: ...  # noqa: N802  # Predefined names from the API.
+
+    def getBytesPerPixel(self) -> int: ...  # noqa: N802
+
+    def getPixelBufferAddress(self) -> int: ...  # noqa: N802
+
+
+class PixelLayout(NamedTuple):
+    """Memory layout of a single pixel."""
+
+    channels: int
+    itemsize: int
+    typecode: str  # Format character for memoryview.cast and the struct module.
+
+    @property
+    def dtype(self) -> str:
+        """Return the NumPy dtype string of a single channel."""
+        return f"{'f' if self.typecode == 'f' else 'u'}{self.itemsize}"
+
+
+# Designer's integer formats are assumed for ambiguous sizes, e.g. 4 bytes are RGBA8 rather than L32F.
+LAYOUTS: dict[int, PixelLayout] = {
+    1: PixelLayout(1, 1, "B"),  # L8
+    2: PixelLayout(1, 2, "H"),  # L16
+    4: PixelLayout(4, 1, "B"),  # RGBA8
+    8: PixelLayout(4, 2, "H"),  # RGBA16
+    16: PixelLayout(4, 4, "f"),  # RGBA32F
+}
+
+# Order of the channels within a pixel of Designer's color textures, from the lowest address to the highest.
+CHANNEL_ORDER = "BGRA"
+
+
+class BufferTexture:
+    """Texture with 8-bit channels, whose pixel buffer is a bytearray, for textures assembled from other textures."""
+
+    def __init__(self, width: int, height: int, bytes_per_pixel: int = len(CHANNEL_ORDER)) -> None:
+        self._size = (width, height)
+        self._bytes_per_pixel = bytes_per_pixel
+        self.buffer = bytearray(width * height * bytes_per_pixel)
+        # Exporting the buffer keeps it from being resized while its address is in use.
+        self._array = (ctypes.c_ubyte * len(self.buffer)).from_buffer(self.buffer)
+
+    def getSize(self) -> tuple[int, int]:  # noqa: N802  # Mimic the SDTexture interface.
+        return self._size
+
+    def getBytesPerPixel(self) -> int:  # noqa: N802
+        return self._bytes_per_pixel
+
+    def getPixelBufferAddress(self) -> int:  # noqa: N802
+        return ctypes.addressof(self._array)
+
+
+class ArrayTexture:
+    """Texture whose pixel buffer is a NumPy array, e.g. to write downsampled levels with write_intermediate."""
+
+    def __init__(self, pixels: "npt.NDArray[np.uint8]") -> None:
+        self._pixels = np.ascontiguousarray(pixels)
+
+    def getSize(self) -> tuple[int, int]:  # noqa: N802  # Mimic the SDTexture interface.
+        height, width = self._pixels.shape[:2]
+        return width, height
+
+    def getBytesPerPixel(self) -> int:  # noqa: N802
+        return self._pixels.shape[2]
+
+    def getPixelBufferAddress(self) -> int:  # noqa: N802
+        return self._pixels.ctypes.data
+
+
+def get_pixel_layout(bytes_per_pixel: int) -> PixelLayout:
+    """
+    Get the memory layout of a pixel from its size.
+
+    :param bytes_per_pixel: The number of bytes per pixel, as returned by SDTexture.getBytesPerPixel().
+    :return: The pixel layout.
+    :raises ValueError: If there's no known layout with the given size.
+    """
+    try:
+        return LAYOUTS[bytes_per_pixel]
+    except KeyError:
+        msg = f"Unsupported pixel size of {bytes_per_pixel} bytes."
+        raise ValueError(msg) from None
+
+
+def get_tex_view(sd_tex: PixelTexture) -> memoryview:
+    """
+    Get a read-only view of the texture's pixel buffer without copying it.
+
+    The view has the shape (height, width, channels) and keeps the texture alive for as long as it's referenced.
+
+    :param sd_tex: The texture to get the view for.
+    :return: The read-only view of the pixel buffer.
+    """
+    dim_x, dim_y = sd_tex.getSize()
+    layout = get_pixel_layout(sd_tex.getBytesPerPixel())
+    nbytes = dim_x * dim_y * layout.channels * layout.itemsize
+    buffer = (ctypes.c_ubyte * nbytes).from_address(sd_tex.getPixelBufferAddress())
+    # The buffer is owned by the texture, so make sure it doesn't get freed while the view is in use.
+    buffer._texture = sd_tex  # type: ignore[attr-defined]
+    view = memoryview(buffer).cast("B")
+    return view.cast(layout.typecode, (dim_y, dim_x, layout.channels)).toreadonly()  # type: ignore[call-overload]
+
+
+def get_tex_array(sd_tex: PixelTexture) -> "npt.NDArray[Any]":
+    """
+    Get a read-only NumPy array of the texture's pixel buffer without copying it.
+
+    :param sd_tex: The texture to get the array for.
+    :return: The read-only array with the shape (height, width, channels).
+    :raises ImportError: If NumPy is not available.
+    """
+    if np is None:
+        msg = "NumPy is required for array access to pixel buffers."
+        raise ImportError(msg)
+    array = np.asarray(get_tex_view(sd_tex))
+    array.flags.writeable = False
+    return array
@@ -0,0 +1,73 @@
+"""Premultiply the color channels of textures by their alpha before encoding them to DXT2 or DXT4.
+
+Both formats hold premultiplied color by definition, but the encoder stores the pixels it gets as they are. The
+pixels are premultiplied in memory through a lookup table of every alpha and color pair, which also holds the result
+of premultiplying in linear space, so no further temporary files are written.
+This module doesn't import the sd package.
+"""
+
+from functools import lru_cache
+from itertools import repeat
+from operator import lshift, or_
+
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, BufferTexture, PixelTexture, get_tex_view
+from custommipmapsexport.uncompressed import DEFAULT_GAMMA, get_8bit_pixels
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, the table is looked up pixel by pixel.
+    np = None  # type: ignore[assignment]
+
+# Compression methods that hold premultiplied color, with the method whose blocks are the same but hold straight color.
+STRAIGHT_FORMATS = {"dxt2": "dxt3", "dxt4": "dxt5"}
+PREMULTIPLIED_FORMATS = frozenset(STRAIGHT_FORMATS)
+
+
+@lru_cache(maxsize=4)
+def get_premultiply_table(*, linear: bool = False, gamma: float = DEFAULT_GAMMA) -> bytes:
+    """
+    Get the premultiplied value of each 8-bit color value and alpha.
+
+    :param linear: Whether to premultiply the linear color, instead of the gamma encoded one.
+    :param gamma: The gamma of the color values, if linear.
+    :return: The premultiplied values, indexed by alpha << 8 | color.
+    """
+    if not linear:
+        return bytes((color * alpha + 127) // 255 for alpha in range(256) for color in range(256))
+    return bytes(
+        round(((color / 255) ** gamma * alpha / 255) ** (1 / gamma) * 255)
+        for alpha in range(256)
+        for color in range(256)
+    )
+
+
+def premultiply(sd_tex: PixelTexture, *, linear: bool = False, gamma: float = DEFAULT_GAMMA) -> PixelTexture:
+    """
+    Get a copy of the texture with its color premultiplied by its alpha and 8 bits per channel.
+
+    :param sd_tex: The texture to premultiply.
+    :param linear: Whether to premultiply the linear color, instead of the gamma encoded one.
+    :param gamma: The gamma of the color channels, if linear.
+    :return: The premultiplied copy. Grayscale textures have no alpha and are returned as they are.
+    """
+    view = get_tex_view(sd_tex)
+    height, width, channels = view.shape  # type: ignore[misc]  # Views of textures are always 3D.
+    if channels == 1:
+        return sd_tex
+    table = get_premultiply_table(linear=linear, gamma=gamma)
+    pixels = memoryview(get_8bit_pixels(view)).cast("B")
+    stride = len(CHANNEL_ORDER)
+    alpha = CHANNEL_ORDER.index("A")
+    colors = [i for i in range(stride) if i != alpha]
+    result = BufferTexture(width, height)
+    result.buffer[:] = pixels
+    if np is not None:
+        source = np.frombuffer(pixels, dtype=np.uint8).reshape(-1, stride)
+        target = np.frombuffer(result.buffer, dtype=np.uint8).reshape(-1, stride)
+        indices = source[:, colors] | source[:, alpha, None].astype(np.uint16) << 8
+        target[:, colors] = np.frombuffer(table, dtype=np.uint8)[indices]
+        return result
+    for color in colors:
+        keys = map(or_, map(lshift, pixels[alpha::stride], repeat(8)), pixels[color::stride])
+        result.buffer[color::stride] = bytes(map(table.__getitem__, keys))
+    return result
@@ -0,0 +1,92 @@
+"""Capture a CPU and memory profile of a single export, to find out why it's slow on a user's machine.
+
+The profilers are only imported when profiling is enabled, so exports without profiling don't pay for them.
+This module doesn't import the sd package.
+"""
+
+import io
+import os
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from custommipmapsexport.logger import logger
+from custommipmapsexport.timings import StageTimings
+
+# Environment variable to profile every export, e.g. for exports that aren't started from the dialog.
+PROFILE_ENV = "MIPMAPS_EXPORTER_PROFILE"
+# Number of functions and allocation sites to list in the report.
+REPORT_TOP = 25
+# Number of frames to keep per allocation. Deeper tracebacks make the export even slower while profiling.
+TRACEMALLOC_FRAMES = 1
+
+
+def is_profiling_enabled() -> bool:
+    """Check whether profiling is enabled in the environment."""
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def format_report(timings: StageTimings, stats: str, allocations: list[str], peak_memory: int) -> str:
+    """
+    Format the profiling results as plain text.
+
+    :param timings: Seconds spent in each stage of the export.
+    :param stats: The profiler's statistics of the slowest functions.
+    :param allocations: Descriptions of the allocation sites holding the most memory.
+    :param peak_memory: The peak memory allocated by Python during the export in bytes.
+    :return: The report.
+    """
+    lines = ["Stages:"]
+    lines += [f"  {stage:<14}{seconds:10.3f} s" for stage, seconds in timings.as_dict().items()]
+    lines += [f"  {'total':<14}{timings.total:10.3f} s", "", f"Peak traced memory: {peak_memory / 1024**2:.1f} MiB"]
+    lines += ["", f"Top {len(allocations)} allocations still held at the end of the export:"]
+    lines += [f"  {allocation}" for allocation in allocations]
+    lines += ["", stats]
+    return "\n".join(lines)
+
+
+@contextmanager
+def profile_export(destination: Path, timings: StageTimings, name: str | None = None) -> Iterator[None]:
+    """
+    Profile the code in the context with cProfile and tracemalloc and write the results to the destination.
+
+    Writes <name>.prof, which can be opened with pstats or snakeviz, and <name>.txt with the time spent in each stage
+    and the top functions and allocations. Failing to write the results is logged, but doesn't fail the export.
+
+    :param destination: The directory to write the results to.
+    :param timings: Timings of the export's stages to include in the report.
+    :param name: The name of the result files. Defaults to a name with the current time.
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    if name is None:
+        name = time.strftime("mipmaps_export_profile_%Y%m%d-%H%M%S")
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+
+        stats = io.StringIO()
+        pstats.Stats(profiler, stream=stats).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(REPORT_TOP)
+        allocations = [str(stat) for stat in snapshot.statistics("lineno")[:REPORT_TOP]]
+        report = format_report(timings, stats.getvalue(), allocations, peak_memory)
+        try:
+            profiler.dump_stats(destination / f"{name}.prof")
+            (destination / f"{name}.txt").write_text(report, encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not write the export profile to {destination}: {e}")
+        else:
+            logger.info(f"Export profile written to {destination / name}.prof and .txt")
@@ -0,0 +1,213 @@
+"""Find encoder settings for a target file size or quality, instead of guessing them.
+
+The size of a DDS file only depends on its resolution, format and mipmaps, so a size budget is met by lowering the
+resolution, which is computed without encoding anything. A minimum quality is met by the fastest -dxtQuality setting,
+whose encode of a downsampled proxy reaches the PSNR. The trial encodes of all settings run in parallel.
+This module doesn't import the sd package.
+"""
+
+import logging
+import math
+import tempfile
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from custommipmapsexport.crunch import compress_files
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.dxt import decode_dxt
+from custommipmapsexport.intermediate import write_intermediate
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, ArrayTexture, PixelTexture, get_tex_view
+from custommipmapsexport.uncompressed import FORMATS, get_8bit_pixels, get_mip_count
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, there are no proxies to encode, so only size budgets are supported.
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+# The same logger as custommipmapsexport.logger, whose handlers are only set up within Designer.
+logger = logging.getLogger("MIPmapsExporter")
+
+# Settings of the encoder's -dxtQuality option, from the fastest to the slowest.
+DXT_QUALITY_LADDER = ("superfast", "fast", "normal", "better", "uber")
+# Bytes per 4x4 block of the encoder's block compressed formats.
+BLOCK_BYTES = {
+    **dict.fromkeys(("dxt1", "dxt1a", "dxt5a", "etc1", "etc2", "etc1s"), 8),
+    **dict.fromkeys(("dxt2", "dxt3", "dxt4", "dxt5", "3dc", "dxn", "etc2a", "etc2as"), 16),
+    **dict.fromkeys(("dxt5_ccxy", "dxt5_xgxr", "dxt5_xgbr", "dxt5_agbr"), 16),
+}
+DDS_HEADER_SIZE = 128
+# Smallest resolution a size budget can lower the output to, as log2. Block compression needs at least 4x4 pixels.
+MIN_LOG2_RESOLUTION = 2
+# Formats whose trial encodes can be decoded, and the channels they store without swizzling or premultiplying.
+SEARCHABLE_FORMATS = {"dxt1": "RGB", "dxt1a": "RGBA", "dxt3": "RGBA", "dxt5": "RGBA"}
+# Maximum resolution of the proxies for the trial encodes.
+PROXY_SIZE = 256
+
+
+def get_dds_size(width: int, height: int, compression: str, **kwargs) -> int:
+    """
+    Get the size of the DDS file the encoder writes for an image.
+
+    :param width: Width of the image.
+    :param height: Height of the image.
+    :param compression: The compression method.
+    :param kwargs: Arguments for the compression command, for the mipmap settings.
+    :return: The size of the file in bytes.
+    :raises ValueError: If the size of the compression's blocks or pixels is unknown.
+    """
+    if compression not in FORMATS and compression not in BLOCK_BYTES:
+        msg = f"Unknown file size for compression {compression}."
+        raise ValueError(msg)
+    size = DDS_HEADER_SIZE
+    for level in range(get_mip_count(width, height, **kwargs)):
+        level_width, level_height = max(1, width >> level), max(1, height >> level)
+        if compression in FORMATS:
+            size += level_width * level_height * FORMATS[compression][1] // 8
+        else:
+            size += math.ceil(level_width / 4) * math.ceil(level_height / 4) * BLOCK_BYTES[compression]
+    return size
+
+
+def fit_resolution(log2_x: int, log2_y: int, size_budget: int, compression: str, **kwargs) -> int:
+    """
+    Get the largest resolution at which the output's file fits into the size budget, keeping its aspect ratio.
+
+    :param log2_x: The output's width as log2.
+    :param log2_y: The output's height as log2.
+    :param size_budget: The maximum size of the file in bytes.
+    :param compression: The compression method.
+    :param kwargs: Arguments for the compression command, for the mipmap settings.
+    :return: The resolution of the larger side as log2, like max_resolution of export_dds_files.
+        MIN_LOG2_RESOLUTION if not even that fits.
+    """
+    largest = max(log2_x, log2_y)
+    for max_resolution in range(largest, MIN_LOG2_RESOLUTION, -1):
+        shift = largest - max_resolution
+        width, height = 2 ** max(0, log2_x - shift), 2 ** max(0, log2_y - shift)
+        if get_dds_size(width, height, compression, **kwargs) <= size_budget:
+            return max_resolution
+    return min(largest, MIN_LOG2_RESOLUTION)
+
+
+def make_proxy(sd_tex: PixelTexture, size: int = PROXY_SIZE) -> "npt.NDArray[np.uint8]":
+    """
+    Downsample the texture with a box filter to at most the given size, but not below a single block.
+
+    :param sd_tex: The texture to downsample.
+    :param size: The maximum width and height of the proxy.
+    :return: The 8-bit pixels of the proxy with the shape (height, width, channels), in the texture's channel order.
+    """
+    view = get_tex_view(sd_tex)
+    height, width, channels = view.shape  # type: ignore[misc]
+    pixels = np.frombuffer(get_8bit_pixels(view), dtype=np.uint8).reshape(height, width, channels)
+    factor = min(max(1, max(width, height) // size), max(1, min(width, height) // 4))
+    if factor == 1:
+        return pixels
+    height, width = height // factor, width // factor
+    blocks = pixels[: height * factor, : width * factor].reshape(height, factor, width, factor, channels)
+    return np.rint(blocks.mean(axis=(1, 3))).astype(np.uint8)
+
+
+def get_rgba(pixels: "npt.NDArray[np.uint8]") -> "npt.NDArray[np.uint8]":
+    """
+    Get RGBA pixels from grayscale pixels or from pixels in Designer's channel order.
+
+    :param pixels: The pixels with the shape (height, width, channels).
+    :return: The pixels with the shape (height, width, 4).
+    """
+    if pixels.shape[2] == 1:
+        alpha = np.full_like(pixels, 255)
+        return np.concatenate([pixels, pixels, pixels, alpha], axis=2)
+    return pixels[..., [CHANNEL_ORDER.index(channel) for channel in "RGBA"]]
+
+
+def get_psnr(reference: "npt.NDArray[np.uint8]", decoded: "npt.NDArray[np.uint8]") -> float:
+    """
+    Compute the peak signal-to-noise ratio of 8-bit pixels.
+
+    :param reference: The original pixels.
+    :param decoded: The pixels after encoding and decoding, with the same shape.
+    :return: The PSNR in dB, infinite if the pixels are identical.
+    """
+    mse = np.mean((reference.astype(np.float32) - decoded.astype(np.float32)) ** 2)
+    return math.inf if mse == 0 else 10 * math.log10(255**2 / float(mse))
+
+
+def load_decoded(filepath: Path) -> "npt.NDArray[np.uint8]":
+    """
+    Decode the base level of a DXT compressed DDS file.
+
+    :param filepath: The file to decode.
+    :return: The RGBA pixels with the shape (height, width, 4).
+    """
+    dds = DDSFile(str(filepath))
+    return decode_dxt(dds.images[0], dds.meta.width, dds.meta.height, dds.dxt.removeprefix("s3tc_"))
+
+
+def choose_quality(scores: Sequence[float], min_psnr: float) -> str:
+    """
+    Choose the fastest setting that reaches the minimum PSNR.
+
+    :param scores: The PSNR of each setting in DXT_QUALITY_LADDER.
+    :param min_psnr: The minimum PSNR in dB.
+    :return: The setting, or the one with the best score if none reaches the minimum.
+    """
+    for quality, score in zip(DXT_QUALITY_LADDER, scores, strict=True):
+        if score >= min_psnr:
+            return quality
+    # Prefer slower settings if scores are equal.
+    return max(reversed(list(zip(scores, DXT_QUALITY_LADDER, strict=True))), key=lambda pair: pair[0])[1]
+
+
+def find_dxt_qualities(
+    textures: Sequence[PixelTexture], compression: str, min_psnr: float, **kwargs
+) -> list[str] | None:
+    """
+    Find the fastest -dxtQuality setting for each texture, whose encode reaches the minimum PSNR.
+
+    Proxies of all textures are encoded once per setting, with the settings running in parallel.
+
+    :param textures: The textures to find the setting for.
+    :param compression: The compression method.
+    :param min_psnr: The minimum PSNR in dB.
+    :param kwargs: Arguments for the compression command. Mipmaps and -dxtQuality are ignored for the trials.
+    :return: The setting for each texture, or None if the search isn't supported for the compression or without NumPy.
+    """
+    if compression in FORMATS:
+        return None  # Uncompressed formats have no settings to search.
+    if compression not in SEARCHABLE_FORMATS or np is None:
+        logger.warning(f"Quality search is not supported for {compression}, using the chosen settings instead.")
+        return None
+    channels = ["RGBA".index(channel) for channel in SEARCHABLE_FORMATS[compression]]
+    trial_arguments = {key: value for key, value in kwargs.items() if key != "-dxtQuality"}
+    trial_arguments["-mipMode"] = "None"
+
+    with tempfile.TemporaryDirectory(prefix="SD_DDS_search_") as temp_dir:
+        proxies = [make_proxy(tex) for tex in textures]
+        files = [
+            write_intermediate(Path(temp_dir) / f"proxy{i}.dds", ArrayTexture(proxy)) for i, proxy in enumerate(proxies)
+        ]
+
+        def encode(quality: str) -> Path:
+            output_dir = Path(temp_dir) / quality
+            output_dir.mkdir()
+            compress_files(files, output_dir, compression, **trial_arguments, **{"-dxtQuality": quality})
+            return output_dir
+
+        # The encoder runs in subprocesses, so threads are enough to run the trials in parallel.
+        with ThreadPoolExecutor(max_workers=len(DXT_QUALITY_LADDER)) as pool:
+            output_dirs = list(pool.map(encode, DXT_QUALITY_LADDER))
+
+        qualities = []
+        for proxy, file in zip(proxies, files, strict=True):
+            reference = get_rgba(proxy)[..., channels]
+            scores = [
+                get_psnr(reference, load_decoded(output_dir / file.name)[..., channels]) for output_dir in output_dirs
+            ]
+            qualities.append(choose_quality(scores, min_psnr))
+    return qualities
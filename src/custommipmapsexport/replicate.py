@@ -0,0 +1,122 @@
+"""Replicate exported files to further destinations, without encoding them again.
+
+The files are replicated from the destination they were encoded into. Each file is written to a temporary name next
+to its target and renamed over it, so readers never see a partial file. The cheapest way the file systems support is
+used, in this order:
+
+- A hard link, if both destinations are on the same file system.
+- A reflink, which shares the data until either file is changed, on Linux file systems like Btrfs and XFS.
+- ``os.copy_file_range``, which copies within the kernel, on Linux.
+- A buffered copy.
+
+Exported files are always replaced, never rewritten in place, so hard links don't carry later exports over. Archives
+are the exception, since exports are appended to them in place, so they're replicated without hard links.
+This module doesn't import the sd package.
+"""
+
+import os
+import shutil
+import sys
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where files are copied instead of reflinked.
+    fcntl = None  # type: ignore[assignment]
+
+# The ioctl request to share the data of one file with another, see ioctl_ficlone(2).
+FICLONE = 0x40049409
+# Bytes copied at once by the buffered copy.
+COPY_CHUNK = 1 << 20
+
+
+def copy_data(source: Path, target: Path) -> str:
+    """
+    Copy the file's data to the target, with a reflink or in the kernel where possible.
+
+    :param source: The file to copy.
+    :param target: The path of the copy. It's overwritten if it exists.
+    :return: The method used, "reflink", "copy_file_range" or "copy".
+    """
+    with source.open("rb", buffering=0) as src, target.open("wb", buffering=0) as dst:
+        if fcntl is not None and sys.platform == "linux":
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError:  # E.g. different file systems, or a file system without reflinks like ext4.
+                pass
+            else:
+                return "reflink"
+        if hasattr(os, "copy_file_range"):
+            remaining = os.fstat(src.fileno()).st_size
+            try:
+                while remaining > 0 and (copied := os.copy_file_range(src.fileno(), dst.fileno(), remaining)):
+                    remaining -= copied
+            except OSError:  # E.g. older kernels, which only copy within a file system.
+                pass
+            if remaining == 0:
+                return "copy_file_range"
+            # Start over, the raw files have no buffered positions to reset.
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+        shutil.copyfileobj(src, dst, COPY_CHUNK)
+    return "copy"
+
+
+def replicate_file(source: Path, target: Path, *, link: bool = True) -> str:
+    """
+    Replace the target with a hard link to the source, or a copy where links aren't supported.
+
+    :param source: The file to replicate.
+    :param target: The path of the replica.
+    :param link: Whether to try a hard link first. Files that are rewritten in place must be copied instead.
+    :return: The method used, "link" or one of those of copy_data.
+    """
+    temp_path = target.with_name(f".{target.name}.tmp")
+    temp_path.unlink(missing_ok=True)
+    try:
+        method = ""
+        if link:
+            try:
+                os.link(source, temp_path)
+                method = "link"
+            except OSError:  # E.g. different file systems, or file systems without hard links, like FAT32.
+                pass
+        if not method:
+            method = copy_data(source, temp_path)
+        os.replace(temp_path, target)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return method
+
+
+def replicate_files(
+    source_dir: Path,
+    destinations: Sequence[Path],
+    filenames: Sequence[str],
+    max_workers: int | None = None,
+    *,
+    link: bool = True,
+) -> Counter[str]:
+    """
+    Replicate the files to each destination, under the same names.
+
+    :param source_dir: The directory the files were exported to.
+    :param destinations: The directories to replicate them to. They're created if they don't exist. Destinations
+        that are the source directory are skipped.
+    :param filenames: The names of the files in the source directory.
+    :param max_workers: The maximum number of files replicated at once. None means the executor's default.
+    :param link: Whether to replicate the files by hard links where possible, see replicate_file.
+    :return: How many files were replicated with each method.
+    """
+    targets: list[tuple[Path, Path]] = []
+    for destination in dict.fromkeys(destinations):
+        if destination.resolve() == source_dir.resolve():
+            continue
+        destination.mkdir(parents=True, exist_ok=True)
+        targets.extend((source_dir / name, destination / name) for name in filenames)
+    with ThreadPoolExecutor(max_workers) as executor:
+        return Counter(executor.map(lambda pair: replicate_file(*pair, link=link), targets))
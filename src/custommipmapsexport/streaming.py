@@ -0,0 +1,121 @@
+"""Split the top mipmap levels off exported DDS files for texture streaming.
+
+An engine can then load the small mip tail first and stream in the large levels on demand. Two layouts are written
+from the levels already in the file:
+
+- ``chunks``: The DDS file keeps the mip tail only. Each split level is written to a file of its own next to it,
+  named ``<name>.mip<level>``, with that level's image of every layer in turn.
+- ``single``: One DDS file with the mip tail, directly followed by an offset table and the split levels. Loaders that
+  don't know the table read a valid DDS file of the mip tail, since they stop after its last image.
+
+The table starts with the magic ``MIPS`` and the number of entries as uint32. Each entry is little-endian uint32
+level, width, height, followed by uint64 offset and size of the level's data from the start of the file.
+This module doesn't import the sd package.
+"""
+
+import os
+import struct
+from collections.abc import Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+from custommipmapsexport.ddsfile import DDSError, DDSFile, write_vectored
+
+STREAM_LAYOUTS = ("chunks", "single")
+TABLE_MAGIC = b"MIPS"
+TABLE_HEADER = struct.Struct("<4sI")
+TABLE_ENTRY = struct.Struct("<IIIQQ")
+# Objects write_atomic writes, like the images of a DDSFile.
+Buffer = bytes | bytearray | memoryview
+
+
+class StreamedLevel(NamedTuple):
+    """A mipmap level that was split off the mip tail, and where its data is."""
+
+    level: int
+    width: int
+    height: int
+    offset: int
+    size: int
+
+
+def write_atomic(filepath: Path, buffers: Sequence[Buffer]) -> None:
+    """Write the buffers to a temporary file next to the path and rename it, so readers never see a partial file."""
+    temp_path = filepath.with_name(f".{filepath.name}.tmp")
+    try:
+        with temp_path.open("wb", buffering=0) as fd:
+            write_vectored(fd.fileno(), buffers)
+        os.replace(temp_path, filepath)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def get_saved_size(dds: DDSFile) -> int:
+    """Get the size of the DDS file in bytes when saved, i.e. where the data after its last image starts."""
+    offset, size = dds.get_level_offsets()[-1]
+    return offset + size
+
+
+def get_level_chunk(dds: DDSFile, level: int) -> list[Buffer]:
+    """Get the images of the mipmap level of every layer, in the order of the layers."""
+    return [dds.get_image(level, layer) for layer in range(dds.layers)]
+
+
+def split_mips(filepath: Path, streamed_levels: int, layout: str = "chunks") -> list[StreamedLevel]:
+    """
+    Split the top mipmap levels off a DDS file, replacing it with the mip tail.
+
+    :param filepath: The DDS file to split.
+    :param streamed_levels: The number of levels to split off. At least the smallest level stays in the mip tail.
+    :param layout: How to store the split levels, one of STREAM_LAYOUTS.
+    :return: The split levels. Their offsets are within the level files for chunks, within the DDS file otherwise.
+    :raises ValueError: If the layout is unknown.
+    :raises ddsfile.DDSError: If the file can't be read.
+    """
+    if layout not in STREAM_LAYOUTS:
+        msg = f"Layout must be one of: {', '.join(STREAM_LAYOUTS)}."
+        raise ValueError(msg)
+    dds = DDSFile(str(filepath))
+    streamed_levels = min(streamed_levels, max(1, dds.count) - 1)
+    if streamed_levels <= 0:
+        return []
+    tail = dds.get_mip_tail(streamed_levels)
+    tail_size = get_saved_size(tail)
+    chunks = [get_level_chunk(dds, level) for level in range(streamed_levels)]
+    levels = []
+    offset = tail_size + TABLE_HEADER.size + TABLE_ENTRY.size * streamed_levels if layout == "single" else 0
+    for level, chunk in enumerate(chunks):
+        width, height = dds.images_size[level]
+        size = sum(memoryview(image).nbytes for image in chunk)
+        levels.append(StreamedLevel(level, width, height, offset, size))
+        if layout == "single":
+            offset += size
+    if layout == "chunks":
+        for level, chunk in enumerate(chunks):
+            write_atomic(filepath.with_name(f"{filepath.stem}.mip{level}"), chunk)
+        write_atomic(filepath, [tail.get_header(), *tail.images])
+    else:
+        table = [TABLE_HEADER.pack(TABLE_MAGIC, len(levels)), *(TABLE_ENTRY.pack(*entry) for entry in levels)]
+        images = [image for chunk in chunks for image in chunk]
+        write_atomic(filepath, [tail.get_header(), *tail.images, *table, *images])
+    return levels
+
+
+def read_offset_table(filepath: Path) -> list[StreamedLevel]:
+    """
+    Read the offset table of a DDS file in the single layout.
+
+    :param filepath: The DDS file written by split_mips.
+    :return: The split levels, with their offsets within the file.
+    :raises ddsfile.DDSError: If the file has no offset table.
+    """
+    tail = DDSFile(str(filepath))
+    tail_size = get_saved_size(tail)
+    with filepath.open("rb") as fd:
+        fd.seek(tail_size)
+        magic, count = TABLE_HEADER.unpack(fd.read(TABLE_HEADER.size).ljust(TABLE_HEADER.size, b"\0"))
+        if magic != TABLE_MAGIC:
+            msg = "No offset table after the mip tail"
+            raise DDSError(msg)
+        entries = fd.read(TABLE_ENTRY.size * count)
+    return [StreamedLevel(*entry) for entry in TABLE_ENTRY.iter_unpack(entries)]
@@ -0,0 +1,82 @@
+"""Combine several outputs into a single DDS file, as the faces of a cubemap or the slices of a texture array.
+
+Each output is encoded to a file of its own first, with the encoder processes running in parallel. The mipmap levels of
+these files are then written one after the other into the layers of the combined file.
+This module doesn't import the sd package.
+"""
+
+import os
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from custommipmapsexport.crunch import compress_files
+from custommipmapsexport.ddsfile import CUBEMAP_FACES, DDSFile
+
+# Compression methods whose files can be combined. Formats without a DXGI format, like r8g8b8, can't be in arrays.
+LAYER_FORMATS = ("dxt1", "dxt1a", "dxt2", "dxt3", "dxt4", "dxt5", "a8r8g8b8", "a8", "l8", "a8l8")
+# Order of the faces of a cubemap, which the outputs are mapped to.
+FACE_NAMES = ("+X", "-X", "+Y", "-Y", "+Z", "-Z")
+
+
+def validate_layers(compression: str, file_format: str, n_layers: int, *, cubemap: bool = False) -> None:
+    """
+    Check that the outputs can be combined into a texture array or cubemap, before computing them.
+
+    :param compression: The compression method to use.
+    :param file_format: The container of the file, see crunch.FILE_FORMATS.
+    :param n_layers: The number of outputs to combine.
+    :param cubemap: Whether every six outputs are the faces of a cubemap.
+    :raises ValueError: If the container or compression doesn't support layers, or a cubemap lacks faces.
+    """
+    if file_format != "dds":
+        msg = f"Texture arrays and cubemaps can only be written to DDS files, not {file_format.upper()}."
+        raise ValueError(msg)
+    if compression not in LAYER_FORMATS:
+        msg = f"Texture arrays and cubemaps can't use {compression}, use one of {', '.join(LAYER_FORMATS)}."
+        raise ValueError(msg)
+    if not n_layers:
+        msg = "A texture array needs at least one output."
+        raise ValueError(msg)
+    if cubemap and n_layers % CUBEMAP_FACES:
+        msg = f"A cubemap needs {CUBEMAP_FACES} outputs per cube, in the order {', '.join(FACE_NAMES)}, not {n_layers}."
+        raise ValueError(msg)
+
+
+def encode_layers(
+    files: Sequence[Path], destination: Path, compression: str, max_workers: int | None = None, **kwargs
+) -> list[Path]:
+    """
+    Encode each file in its own encoder process, running in parallel.
+
+    :param files: The intermediate files to encode.
+    :param destination: The directory to write the encoded files to.
+    :param compression: The compression method to use.
+    :param max_workers: The number of files to encode at once, the number of CPUs if None.
+    :param kwargs: Arguments for the compression command.
+    :return: The paths of the encoded files, in the order of the files.
+    :raises subprocess.CalledProcessError: If the compression command failed.
+    """
+    if files:
+        # The encoder runs in subprocesses, so threads are enough to encode in parallel.
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            list(pool.map(lambda file: compress_files([file], destination, compression, **kwargs), files))
+    return [destination / f"{file.stem}.dds" for file in files]
+
+
+def combine_layers(files: Sequence[Path], filepath: Path, *, cubemap: bool = False) -> Path:
+    """
+    Write the DDS files as the layers of a single file.
+
+    :param files: The DDS files of the layers, all with the same size, format and mipmap levels.
+    :param filepath: The path of the combined file.
+    :param cubemap: Whether every six files are the faces of a cubemap.
+    :return: The path of the written file.
+    :raises ddsfile.DDSError: If the files don't match or can't be combined.
+    """
+    combined = DDSFile()
+    combined.cubemap = cubemap
+    for file in files:
+        combined.add_layer(DDSFile(str(file)))
+    combined.save(filepath)
+    return filepath
@@ -0,0 +1,231 @@
+"""Encode very large textures as tiles in parallel and stitch their blocks back together into a single DDS file.
+
+S3TC blocks are encoded independently, so a tile aligned to blocks encodes to the same blocks as its part of the whole
+texture. Mipmaps are generated up front with the box filter of the uncompressed export: a tile whose size is a power
+of two filters down to exactly its part of each level, so tiles need no border. Once they get small, the remaining
+levels are filtered from the stitched tiles and encoded as a whole.
+This module doesn't import the sd package.
+"""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from custommipmapsexport.crunch import compress_files
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.dxt import BLOCK_BYTES
+from custommipmapsexport.intermediate import write_intermediate
+from custommipmapsexport.pixelbuffer import ArrayTexture, PixelTexture, get_tex_view
+from custommipmapsexport.uncompressed import (
+    DEFAULT_GAMMA,
+    delinearize,
+    downsample,
+    get_8bit_pixels,
+    get_mip_count,
+    get_source_channels,
+    linearize,
+)
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, there are no mipmaps to filter per tile, so large textures are encoded whole.
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+# Width and height of the tiles in pixels, a power of two.
+TILE_SIZE = 2048
+# Smallest side of a texture to split into tiles. Smaller textures don't keep enough encoders busy to pay off.
+MIN_TILED_SIZE = 8192
+# Smallest mipmap level encoded per tile. Smaller levels are encoded as a whole, so blocks don't get too few per file.
+MIN_TILE_LEVEL_SIZE = 64
+# Compression methods whose blocks are independent, with the DDSFile format they're stored as.
+TILED_FORMATS = {"dxt1": "dxt1", "dxt1a": "dxt1", "dxt2": "dxt2", "dxt3": "dxt3", "dxt4": "dxt4", "dxt5": "dxt5"}
+BLOCK_SIZE = 4
+
+
+class TileResult(NamedTuple):
+    """The encoded levels of a tile."""
+
+    x: int  # Position of the tile in the base level in pixels.
+    y: int
+    levels: list[bytes]  # Blocks of each level encoded per tile, in rows.
+    tail: "npt.NDArray[np.float32] | None"  # The linear pixels of the first level that isn't encoded per tile.
+
+
+def can_encode_tiled(sd_tex: PixelTexture, compression: str, file_format: str = "dds") -> bool:
+    """
+    Check whether the texture is large enough to be encoded as tiles, and can be.
+
+    :param sd_tex: The texture to check.
+    :param compression: The compression method to use.
+    :param file_format: The container of the file, see crunch.FILE_FORMATS.
+    :return: True if the texture's sides are multiples of TILE_SIZE and at least MIN_TILED_SIZE, and its blocks are
+        written to a DDS file.
+    """
+    if np is None or file_format != "dds" or compression not in TILED_FORMATS:
+        return False
+    width, height = sd_tex.getSize()
+    return min(width, height) >= MIN_TILED_SIZE and width % TILE_SIZE == 0 and height % TILE_SIZE == 0
+
+
+def get_tile_level_count(count: int) -> int:
+    """
+    Get the number of mipmap levels that are encoded per tile.
+
+    :param count: The number of levels of the whole texture.
+    :return: The number of levels down to MIN_TILE_LEVEL_SIZE, at most count.
+    """
+    return min(count, max(1, (TILE_SIZE // MIN_TILE_LEVEL_SIZE).bit_length()))
+
+
+def encode_levels(levels: list["npt.NDArray[np.uint8]"], work_dir: Path, compression: str, **kwargs) -> list[bytes]:
+    """
+    Encode each level as its own image and read back its blocks.
+
+    :param levels: The 8-bit pixels of the levels with the shape (height, width, channels).
+    :param work_dir: An empty directory for the intermediate and encoded files.
+    :param compression: One of the compression methods in TILED_FORMATS.
+    :param kwargs: Arguments for the compression command. Mipmaps are turned off.
+    :return: The blocks of each level.
+    """
+    output_dir = work_dir / "out"
+    output_dir.mkdir()
+    files = [write_intermediate(work_dir / f"{i}.dds", ArrayTexture(level)) for i, level in enumerate(levels)]
+    compress_files(files, output_dir, compression, **{**kwargs, "-mipMode": "None"})
+    return [DDSFile(str(output_dir / file.name)).images[0] for file in files]
+
+
+def encode_tile(
+    pixels: "npt.NDArray[np.uint8]",
+    x: int,
+    y: int,
+    work_dir: Path,
+    compression: str,
+    count: int,
+    alpha: int | None = None,
+    **kwargs,
+) -> TileResult:
+    """
+    Generate the mipmap levels of a tile and encode those down to MIN_TILE_LEVEL_SIZE.
+
+    :param pixels: The 8-bit pixels of the whole texture with the shape (height, width, channels).
+    :param x: Left edge of the tile in pixels.
+    :param y: Top edge of the tile in pixels.
+    :param work_dir: An empty directory for the tile's files.
+    :param compression: One of the compression methods in TILED_FORMATS.
+    :param count: The number of levels of the whole texture.
+    :param alpha: Index of the linear alpha channel, if any.
+    :param kwargs: Arguments for the compression command.
+    :return: The tile's encoded levels.
+    """
+    gamma = float(kwargs.get("-gamma", DEFAULT_GAMMA))
+    tile = pixels[y : y + TILE_SIZE, x : x + TILE_SIZE]
+    levels = [tile]
+    tail = None
+    if count > 1:
+        linear = linearize(tile, gamma, alpha)
+        for _ in range(1, get_tile_level_count(count)):
+            linear = downsample(linear)
+            levels.append(delinearize(linear, gamma, alpha))
+        if count > len(levels):
+            tail = downsample(linear)
+    return TileResult(x, y, encode_levels(levels, work_dir, compression, **kwargs), tail)
+
+
+def stitch_blocks(target: bytearray, blocks: bytes, x: int, y: int, width: int, level_width: int, fmt: str) -> None:
+    """
+    Copy the block rows of a tile into the blocks of a whole level.
+
+    :param target: The blocks of the whole level.
+    :param blocks: The blocks of the tile.
+    :param x: Left edge of the tile in pixels, a multiple of BLOCK_SIZE.
+    :param y: Top edge of the tile in pixels, a multiple of BLOCK_SIZE.
+    :param width: Width of the tile in pixels.
+    :param level_width: Width of the whole level in pixels.
+    :param fmt: The DDSFile format of the blocks.
+    """
+    block_bytes = BLOCK_BYTES[fmt]
+    row_bytes = -(-width // BLOCK_SIZE) * block_bytes
+    target_row_bytes = -(-level_width // BLOCK_SIZE) * block_bytes
+    start = (y // BLOCK_SIZE) * target_row_bytes + (x // BLOCK_SIZE) * block_bytes
+    for row in range(len(blocks) // row_bytes):
+        offset = start + row * target_row_bytes
+        target[offset : offset + row_bytes] = blocks[row * row_bytes : (row + 1) * row_bytes]
+
+
+def encode_tiled(
+    filepath: Path, sd_tex: PixelTexture, compression: str, temp_dir: Path, max_workers: int | None = None, **kwargs
+) -> Path:
+    """
+    Encode the texture as tiles in parallel and write their blocks into a single DDS file.
+
+    The mipmaps are filtered with a box filter, regardless of the filter chosen for the encoder. The file has the same
+    blocks as if the whole texture and its levels were encoded one by one.
+
+    :param filepath: The path of the DDS file to write.
+    :param sd_tex: The texture to encode, see can_encode_tiled.
+    :param compression: One of the compression methods in TILED_FORMATS.
+    :param temp_dir: The directory for intermediate files.
+    :param max_workers: The number of tiles to encode at once, the number of CPUs if None.
+    :param kwargs: Arguments for the compression command.
+    :return: The path of the written file.
+    :raises subprocess.CalledProcessError: If the compression command failed.
+    """
+    fmt = TILED_FORMATS[compression]
+    view = get_tex_view(sd_tex)
+    height, width, channels = view.shape  # type: ignore[misc]
+    pixels = np.frombuffer(get_8bit_pixels(view), dtype=np.uint8).reshape(height, width, channels)
+    source = get_source_channels(sd_tex)
+    alpha = source.index("A") if "A" in source else None
+    count = get_mip_count(width, height, **kwargs)
+    n_tile_levels = get_tile_level_count(count)
+    level_sizes = [(max(1, width >> level), max(1, height >> level)) for level in range(count)]
+    levels = [
+        bytearray(-(-w // BLOCK_SIZE) * -(-h // BLOCK_SIZE) * BLOCK_BYTES[fmt]) for w, h in level_sizes[:n_tile_levels]
+    ]
+    tail = None
+    tail_blocks: list[bytes] = []
+    if count > n_tile_levels:
+        tail_width, tail_height = level_sizes[n_tile_levels]
+        tail = np.empty((tail_height, tail_width, channels), dtype=np.float32)
+
+    with tempfile.TemporaryDirectory(prefix="tiles_", dir=temp_dir) as work_dir:
+
+        def encode(position: tuple[int, int]) -> TileResult:
+            tile_dir = Path(work_dir) / f"{position[0]}_{position[1]}"
+            tile_dir.mkdir()
+            return encode_tile(pixels, *position, tile_dir, compression, count, alpha, **kwargs)
+
+        positions = [(x, y) for y in range(0, height, TILE_SIZE) for x in range(0, width, TILE_SIZE)]
+        # The encoder runs in subprocesses and NumPy releases the GIL, so threads are enough to encode in parallel.
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            for result in pool.map(encode, positions):
+                for level, blocks in enumerate(result.levels):
+                    x, y, size = result.x >> level, result.y >> level, TILE_SIZE >> level
+                    stitch_blocks(levels[level], blocks, x, y, size, level_sizes[level][0], fmt)
+                if tail is not None and result.tail is not None:
+                    tail_y, tail_x = result.y >> n_tile_levels, result.x >> n_tile_levels
+                    tail_height, tail_width = result.tail.shape[:2]
+                    tail[tail_y : tail_y + tail_height, tail_x : tail_x + tail_width] = result.tail
+
+        if tail is not None:
+            gamma = float(kwargs.get("-gamma", DEFAULT_GAMMA))
+            tail_levels = [delinearize(tail, gamma, alpha)]
+            while n_tile_levels + len(tail_levels) < count:
+                tail = downsample(tail)
+                tail_levels.append(delinearize(tail, gamma, alpha))
+            tail_dir = Path(work_dir) / "tail"
+            tail_dir.mkdir()
+            tail_blocks = encode_levels(tail_levels, tail_dir, compression, **kwargs)
+
+    dds = DDSFile()
+    for level, ((level_width, level_height), blocks) in enumerate(
+        zip(level_sizes, [*levels, *tail_blocks], strict=True)
+    ):
+        dds.add_image(level, 32, fmt, level_width, level_height, blocks)
+    dds.save(filepath)
+    return filepath
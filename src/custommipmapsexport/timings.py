@@ -0,0 +1,38 @@
+"""Wall-clock timings of the stages of an export, to find out where the time goes.
+
+This module doesn't import the sd package.
+"""
+
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class StageTimings:
+    """Accumulated seconds spent in each stage of an export. Stages that run repeatedly, e.g. per batch, add up."""
+
+    def __init__(self) -> None:
+        self.seconds: defaultdict[str, float] = defaultdict(float)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Add the time spent in the context to the stage.
+
+        :param stage: The name of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[stage] += time.perf_counter() - start
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the seconds per stage in the order the stages were first entered."""
+        return dict(self.seconds)
+
+    @property
+    def total(self) -> float:
+        """Return the sum of all stages in seconds."""
+        return sum(self.seconds.values())
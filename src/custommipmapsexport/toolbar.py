@@ -0,0 +1,150 @@
+"""Toolbar of the graph views, which opens the export dialog.
+
+Only the toolbar is created when a graph view opens. The dialog and the export code are imported on first use.
+"""
+
+# Ignore attr-defined error for mypy that happen for Qt classes.
+# mypy: disable-error-code="attr-defined"
+import importlib.resources
+import weakref
+from collections.abc import Callable
+from functools import cache, partial
+from typing import TYPE_CHECKING, ClassVar
+
+from PySide6 import QtCore, QtGui, QtSvg, QtWidgets
+
+import sd
+from custommipmapsexport.logger import start_flush_timer
+from sd.api.qtforpythonuimgrwrapper import QtForPythonUIMgrWrapper
+
+if TYPE_CHECKING:
+    from custommipmapsexport.encoderworker import EncoderWorker
+    from custommipmapsexport.graphutils import PackageIndex
+    from custommipmapsexport.gui import ExportDialog
+
+DEFAULT_ICON_SIZE = 24
+
+
+def get_ui_manager() -> QtForPythonUIMgrWrapper | None:
+    """Get the UI Manager from the current context."""
+    ctx = sd.getContext()
+    app = ctx.getSDApplication()
+    return app.getQtForPythonUIMgr()
+
+
+@cache
+def load_svg_icon(icon_name: str, size: int, device_pixel_ratio: float = 1.0) -> QtGui.QIcon | None:
+    """Load an SVG icon from the resources.
+
+    Rendered icons are cached, so each icon is only rasterized once per size and device pixel ratio.
+
+    :param icon_name: name of the icon to load.
+    :param size: size of the icon.
+    :param device_pixel_ratio: ratio of physical to logical pixels of the screen the icon is shown on.
+    :return: QtGui.QIcon object or None if the icon could not be loaded.
+    """
+    icon_file = importlib.resources.files("custommipmapsexport.res").joinpath(f"{icon_name}.svg")
+
+    svg_renderer = QtSvg.QSvgRenderer(str(icon_file))
+    if svg_renderer.isValid():
+        physical_size = round(size * device_pixel_ratio)
+        pixmap = QtGui.QPixmap(QtCore.QSize(physical_size, physical_size))
+
+        if not pixmap.isNull():
+            pixmap.fill(QtCore.Qt.transparent)
+            painter = QtGui.QPainter(pixmap)
+            svg_renderer.render(painter)
+            painter.end()
+            pixmap.setDevicePixelRatio(device_pixel_ratio)
+
+        return QtGui.QIcon(pixmap)
+
+    return None
+
+
+class MipmapExportGraphToolBar(QtWidgets.QToolBar):
+    """Toolbar to call the export ui dialog."""
+
+    __toolbarList: ClassVar[dict[int, weakref.ReferenceType["MipmapExportGraphToolBar"]]] = {}
+
+    def __init__(
+        self,
+        graphview_id: int,
+        ui_manager: QtForPythonUIMgrWrapper,
+        get_encoder: Callable[[], "EncoderWorker | None"] | None = None,
+        get_package_index: Callable[[], "PackageIndex | None"] | None = None,
+    ):
+        super().__init__(parent=ui_manager.getMainWindow())
+
+        self.setObjectName("olafhaag.com.mipmap_export_toolbar")
+
+        # Save the graphViewID and the plugin's services for later use.
+        self.__graphViewID = graphview_id
+        self.__get_encoder = get_encoder
+        self.__get_package_index = get_package_index
+        self.__main_window = ui_manager.getMainWindow()
+        # The dialog is created when it's opened the first time and then reused for this graph view.
+        self.dialog: ExportDialog | None = None
+
+        # Add actions to our toolbar.
+        export_icon_name = "mipmapexport"
+        export_icon = load_svg_icon(export_icon_name, DEFAULT_ICON_SIZE, self.devicePixelRatioF())
+        if export_icon is None:
+            msg = f"Failed to load export icon {export_icon_name} into toolbar."
+            raise RuntimeError(msg)
+        act = self.addAction(export_icon, "Export Custom Mipmaps")
+        act.setToolTip("Export outputs to compressed DDS files with mipmaps.")
+        act.triggered.connect(self.show_dialog)
+
+        self.__toolbarList[graphview_id] = weakref.ref(self)
+        self.destroyed.connect(partial(MipmapExportGraphToolBar.__on_toolbar_deleted, graphview_id=graphview_id))
+
+    def tooltip(self):
+        return self.tr("Mipmap Tools")
+
+    def load_ui(self, filename: str, parent: QtWidgets.QMainWindow | None = None) -> "ExportDialog":
+        """Return an instance of the exporter dialog."""
+        # The dialog pulls in the export code, so only import it when the dialog is opened for the first time.
+        from custommipmapsexport.gui import ExportDialog
+
+        package_index = self.__get_package_index() if self.__get_package_index is not None else None
+        return ExportDialog(filename, self.__graphViewID, parent, self.__get_encoder, package_index)
+
+    def show_dialog(self):
+        """Show the exporter dialog, creating it on first use."""
+        if self.dialog is None:
+            ui_file = importlib.resources.files("custommipmapsexport.res").joinpath("dialog.ui")
+            self.dialog = self.load_ui(str(ui_file), parent=self.__main_window)
+        self.dialog.show()
+
+    @classmethod
+    def __on_toolbar_deleted(cls, graphview_id: int):
+        del cls.__toolbarList[graphview_id]
+
+    @classmethod
+    def remove_all_toolbars(cls):
+        for toolbar in cls.__toolbarList.values():
+            if ref := toolbar():
+                ref.deleteLater()
+
+
+def on_new_graphview_created(
+    graphview_id: int,
+    ui_manager: QtForPythonUIMgrWrapper,
+    get_encoder: Callable[[], "EncoderWorker | None"] | None = None,
+    get_package_index: Callable[[], "PackageIndex | None"] | None = None,
+) -> None:
+    """Create a new toolbar and adds it to the graph view when a new graph view is created."""
+    # Qt is loaded now, so pass the queued log records to Designer's console from its event loop.
+    start_flush_timer()
+
+    # Create our toolbar.
+    toolbar = MipmapExportGraphToolBar(graphview_id, ui_manager, get_encoder, get_package_index)
+
+    # Add our toolbar to the graph widget.
+    ui_manager.addToolbarToGraphView(
+        graphview_id,
+        toolbar,
+        icon=load_svg_icon("mipmaptools", DEFAULT_ICON_SIZE, toolbar.devicePixelRatioF()),
+        tooltip=toolbar.tooltip(),
+    )
@@ -0,0 +1,240 @@
+"""Build uncompressed DDS files in-process from Designer's pixel buffers, without running the encoder."""
+
+from math import floor, log2
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.pixelbuffer import CHANNEL_ORDER, PixelTexture, get_tex_view
+
+try:
+    import numpy as np
+except ImportError:  # Without NumPy, only the channels can be reordered, but no mipmaps be generated.
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+# Compression options that don't need an encoder: DDSFile format, bits per pixel and channels in byte order.
+FORMATS: dict[str, tuple[str, int, str]] = {
+    "r8g8b8": ("rgb", 24, "BGR"),
+    "a8r8g8b8": ("rgba", 32, "BGRA"),
+    "a8": ("alpha", 8, "A"),
+    "l8": ("luminance", 8, "L"),
+    "a8l8": ("luminance_alpha", 16, "LA"),
+}
+# Defaults of the encoder, so the fast path respects the same settings.
+DEFAULT_GAMMA = 2.2
+DEFAULT_MAX_MIPS = 16
+# Integer weights of Rec. 709 luma, summing up to 256.
+LUMA_WEIGHTS = {"R": 54, "G": 183, "B": 19}
+
+
+def get_source_channels(sd_tex: PixelTexture) -> str:
+    """
+    Get the channels of the texture's pixels in byte order.
+
+    :param sd_tex: The texture to get the channels for.
+    :return: "L" for grayscale textures, otherwise the channel order of color textures.
+    """
+    return "L" if get_tex_view(sd_tex).shape[2] == 1 else CHANNEL_ORDER  # type: ignore[index]
+
+
+def get_mip_count(width: int, height: int, **kwargs) -> int:
+    """
+    Get the number of mipmap levels to generate, based on the encoder's arguments.
+
+    :param width: Width of the base level.
+    :param height: Height of the base level.
+    :param kwargs: Arguments for the compression command.
+    :return: Number of levels, including the base level.
+    """
+    if kwargs.get("-mipMode") == "None":
+        return 1
+    full_chain = floor(log2(max(width, height))) + 1
+    return min(full_chain, int(kwargs.get("-maxmips", DEFAULT_MAX_MIPS)))
+
+
+def can_export_uncompressed(sd_tex: PixelTexture, compression: str, **kwargs) -> bool:
+    """
+    Check whether the texture can be exported in-process with the given compression.
+
+    :param sd_tex: The texture to export.
+    :param compression: The compression method to use.
+    :param kwargs: Arguments for the compression command.
+    :return: True if the fast path can be used, otherwise False.
+    """
+    if compression not in FORMATS:
+        return False
+    if np is not None:
+        return True
+    # Pure Python can only pick bytes, but not compute luminance, convert floats or filter mipmaps.
+    view = get_tex_view(sd_tex)
+    height, width, _ = view.shape  # type: ignore[misc]
+    to_luminance = "L" in FORMATS[compression][2] and get_source_channels(sd_tex) != "L"
+    return view.format != "f" and not to_luminance and get_mip_count(width, height, **kwargs) == 1
+
+
+def get_8bit_pixels(view: memoryview) -> Any:
+    """
+    Get the pixels of a texture view with 8 bits per channel.
+
+    :param view: The view of the texture's pixel buffer.
+    :return: A flat buffer of the 8-bit pixels, the view itself if it already is 8-bit.
+    """
+    if view.format == "B":
+        return view.cast("B")
+    if view.format == "H":
+        # Keep the high byte of each little-endian channel. The copy is only half the size of the buffer.
+        return view.cast("B")[1::2].tobytes()
+    if np is None:
+        msg = "NumPy is required to convert floating point textures."
+        raise ImportError(msg)
+    return np.rint(np.clip(np.asarray(view), 0.0, 1.0) * 255).astype(np.uint8).reshape(-1)
+
+
+def reorder_channels(pixels: Any, source: str, target: str) -> Any:
+    """
+    Reorder, add or drop channels of interleaved 8-bit pixels.
+
+    :param pixels: Flat buffer of the source pixels.
+    :param source: Channels of the source pixels in byte order, e.g. "BGRA" or "L".
+    :param target: Channels of the target pixels in byte order.
+    :return: Flat buffer of the target pixels, the source buffer itself if the channels already match.
+    """
+    if source == target:
+        return pixels
+    pixels = memoryview(pixels).cast("B") if not isinstance(pixels, memoryview) else pixels
+    n_pixels = pixels.nbytes // len(source)
+    result = bytearray(n_pixels * len(target))
+    for i, channel in enumerate(target):
+        if channel in source:
+            plane: Any = pixels[source.index(channel) :: len(source)]
+        elif channel in "RGB" and source == "L":
+            plane = pixels
+        elif channel == "A":
+            plane = b"\xff" * n_pixels
+        else:  # Luminance of color pixels.
+            plane = get_luminance(pixels, source)
+        result[i :: len(target)] = plane
+    return result
+
+
+def get_luminance(pixels: Any, source: str) -> bytes:
+    """
+    Compute the luma of interleaved 8-bit color pixels.
+
+    :param pixels: Flat buffer of the color pixels.
+    :param source: Channels of the pixels in byte order.
+    :return: The 8-bit luma of each pixel.
+    """
+    if np is None:
+        msg = "NumPy is required to compute luminance."
+        raise ImportError(msg)
+    array = np.frombuffer(pixels, dtype=np.uint8).reshape(-1, len(source)).astype(np.uint16)
+    luma = sum(array[:, source.index(channel)] * weight for channel, weight in LUMA_WEIGHTS.items())
+    return ((luma + 128) >> 8).astype(np.uint8).tobytes()  # type: ignore[union-attr]
+
+
+def linearize(
+    pixels: "npt.NDArray[np.uint8]", gamma: float = DEFAULT_GAMMA, alpha: int | None = None
+) -> "npt.NDArray[np.float32]":
+    """
+    Convert 8-bit pixels to linear floats for filtering.
+
+    :param pixels: The pixels with the shape (height, width, channels).
+    :param gamma: The gamma of the color channels.
+    :param alpha: Index of the linear alpha channel, if any.
+    :return: The linear values between 0 and 1 with the same shape.
+    """
+    color = [c for c in range(pixels.shape[2]) if c != alpha]
+    linear = pixels.astype(np.float32)
+    linear /= 255
+    linear[..., color] **= gamma
+    return linear
+
+
+def downsample(linear: "npt.NDArray[np.float32]") -> "npt.NDArray[np.float32]":
+    """
+    Halve the size of linear pixels with a box filter, down to a single pixel per side.
+
+    :param linear: The linear pixels with the shape (height, width, channels).
+    :return: The next mipmap level of the pixels.
+    """
+    height, width = linear.shape[:2]
+    if height > 1:
+        linear = (linear[0 : height - 1 : 2] + linear[1:height:2]) * 0.5
+    if width > 1:
+        linear = (linear[:, 0 : width - 1 : 2] + linear[:, 1:width:2]) * 0.5
+    return linear
+
+
+def delinearize(
+    linear: "npt.NDArray[np.float32]", gamma: float = DEFAULT_GAMMA, alpha: int | None = None
+) -> "npt.NDArray[np.uint8]":
+    """
+    Convert linear pixels back to 8 bits, the inverse of linearize.
+
+    :param linear: The linear pixels with the shape (height, width, channels).
+    :param gamma: The gamma of the color channels.
+    :param alpha: Index of the linear alpha channel, if any.
+    :return: The 8-bit pixels with the same shape.
+    """
+    color = [c for c in range(linear.shape[2]) if c != alpha]
+    level = linear.copy()
+    level[..., color] **= 1 / gamma
+    return np.rint(level * 255).astype(np.uint8)
+
+
+def generate_mipmaps(
+    pixels: "npt.NDArray[np.uint8]", count: int, gamma: float = DEFAULT_GAMMA, alpha: int | None = None
+) -> list["npt.NDArray[np.uint8]"]:
+    """
+    Generate mipmap levels with a gamma correct box filter.
+
+    :param pixels: The base level with the shape (height, width, channels).
+    :param count: The number of levels to return, including the base level.
+    :param gamma: The gamma of the color channels.
+    :param alpha: Index of the linear alpha channel, if any.
+    :return: The mipmap levels, starting with the base level.
+    """
+    levels = [pixels]
+    current = linearize(pixels, gamma, alpha)
+    while len(levels) < count:
+        current = downsample(current)
+        levels.append(delinearize(current, gamma, alpha))
+    return levels
+
+
+def export_uncompressed(filepath: Path, sd_tex: PixelTexture, compression: str, **kwargs) -> Path:
+    """
+    Export the texture to an uncompressed DDS file with mipmaps, without temporary files or subprocesses.
+
+    Mipmaps are filtered with a box filter, regardless of the filter chosen for the encoder.
+
+    :param filepath: The path of the DDS file to write.
+    :param sd_tex: The texture to export.
+    :param compression: One of the uncompressed formats.
+    :param kwargs: Arguments for the compression command, for the mipmap settings.
+    :return: The path of the written file.
+    """
+    fmt, bpp, target = FORMATS[compression]
+    source = get_source_channels(sd_tex)
+    view = get_tex_view(sd_tex)
+    height, width, _ = view.shape  # type: ignore[misc]
+    count = get_mip_count(width, height, **kwargs)
+
+    dds = DDSFile()
+    base = get_8bit_pixels(view)
+    if count == 1:
+        dds.add_image(0, bpp, fmt, width, height, reorder_channels(base, source, target))
+    else:
+        array = np.frombuffer(base, dtype=np.uint8).reshape(height, width, len(source))
+        gamma = float(kwargs.get("-gamma", DEFAULT_GAMMA))
+        alpha = source.index("A") if "A" in source else None
+        for level, pixels in enumerate(generate_mipmaps(array, count, gamma, alpha)):
+            level_height, level_width = pixels.shape[:2]
+            data = reorder_channels(memoryview(pixels).cast("B"), source, target)  # type: ignore[arg-type]
+            dds.add_image(level, bpp, fmt, level_width, level_height, data)
+    dds.save(filepath)
+    return filepath
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Fall back to the fake sd package outside of Designer.
+sys.path.append(str(Path(__file__).parent / "stubs"))
@@ -0,0 +1,31 @@
+import ctypes
+from collections.abc import Callable
+
+import pytest
+
+
+class FakeTexture:
+    """Texture with a pixel buffer owned by ctypes, like Designer's SDTexture."""
+
+    def __init__(self, width: int, height: int, bytes_per_pixel: int, data: bytes | None = None) -> None:
+        self.size = (width, height)
+        self.bpp = bytes_per_pixel
+        nbytes = width * height * bytes_per_pixel
+        if data is None:
+            data = bytes(i % 256 for i in range(nbytes))
+        self.buffer = (ctypes.c_ubyte * nbytes).from_buffer_copy(data)
+
+    def getSize(self) -> tuple[int, int]:  # noqa: N802
+        return self.size
+
+    def getBytesPerPixel(self) -> int:  # noqa: N802
+        return self.bpp
+
+    def getPixelBufferAddress(self) -> int:  # noqa: N802
+        return ctypes.addressof(self.buffer)
+
+
+@pytest.fixture
+def make_texture() -> Callable[..., FakeTexture]:
+    """Fixture to create textures with a pixel buffer of the given size and content."""
+    return FakeTexture
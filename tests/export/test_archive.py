@@ -0,0 +1,77 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from custommipmapsexport.archive import PAYLOAD_ALIGNMENT, ArchiveReader, append_to_archive
+from custommipmapsexport.ddsfile import DDS_DXT1, DDSError, DDSFile
+
+
+def write_dds(filepath: Path, size: int = 8) -> list[bytes]:
+    """Write a DXT1 file with a full mip chain of random blocks and return the levels' data."""
+    dds = DDSFile()
+    levels = []
+    level = 0
+    while size >= 1:
+        levels.append(os.urandom(max(1, size // 4) ** 2 * 8))
+        dds.add_image(level, 32, "dxt1", size, size, levels[-1])
+        size //= 2
+        level += 1
+    dds.save(filepath)
+    return levels
+
+
+class TestArchive:
+    """Test suite for appending to and reading from an archive."""
+
+    def test_round_trip(self, tmp_path: Path) -> None:
+        """Test that the levels read from the archive are those of the files, and payloads are aligned."""
+        # Arrange
+        archive_path = tmp_path / "textures.mipa"
+        levels = {name: write_dds(tmp_path / f"{name}.dds") for name in ("albedo", "normal")}
+
+        # Act
+        count = append_to_archive(archive_path, [(name, tmp_path / f"{name}.dds") for name in levels])
+
+        # Assert
+        assert count == 2
+        with ArchiveReader(archive_path) as reader:
+            entry = reader.get_entry("normal")
+            assert (entry.width, entry.height, entry.levels, entry.fourcc) == (8, 8, 4, DDS_DXT1)
+            assert entry.offset % PAYLOAD_ALIGNMENT == 0
+            for name, expected in levels.items():
+                views = reader.get_levels(name)
+                assert [bytes(view) for view in views] == expected
+                assert bytes(reader.get_file(name)) == (tmp_path / f"{name}.dds").read_bytes()
+                for view in views:
+                    view.release()
+
+    def test_append_replaces(self, tmp_path: Path) -> None:
+        """Test that appending keeps earlier files and a name appended again points to its latest file."""
+        # Arrange
+        archive_path = tmp_path / "textures.mipa"
+        write_dds(tmp_path / "albedo.dds")
+        write_dds(tmp_path / "normal.dds")
+        append_to_archive(archive_path, [("albedo", tmp_path / "albedo.dds"), ("normal", tmp_path / "normal.dds")])
+        latest = write_dds(tmp_path / "albedo.dds", size=4)
+
+        # Act
+        count = append_to_archive(archive_path, [("albedo", tmp_path / "albedo.dds")])
+
+        # Assert
+        assert count == 2
+        with ArchiveReader(archive_path) as reader:
+            assert "normal" in reader
+            assert "missing" not in reader
+            assert [bytes(view) for view in reader.get_levels("albedo")] == latest
+
+    def test_not_an_archive(self, tmp_path: Path) -> None:
+        """Test that appending to a file that isn't an archive raises an error."""
+        # Arrange
+        archive_path = tmp_path / "textures.mipa"
+        archive_path.write_bytes(b"not an archive" * 10)
+        write_dds(tmp_path / "albedo.dds")
+
+        # Act & Assert
+        with pytest.raises(DDSError):
+            append_to_archive(archive_path, [("albedo", tmp_path / "albedo.dds")])
@@ -0,0 +1,111 @@
+import json
+from itertools import combinations
+from pathlib import Path
+
+import pytest
+
+from custommipmapsexport.atlas import AtlasLayout, AtlasRect, blit, pack_rects, write_sidecar
+from custommipmapsexport.pixelbuffer import BufferTexture
+
+# Outside of Designer, the fake sd package from tests/stubs is used, see tests/conftest.py.
+from sd.api.sdtexture import SDTexture
+
+
+def overlaps(a: AtlasRect, b: AtlasRect, gutter: int) -> bool:
+    """Check whether two rectangles overlap, including their gutters."""
+    return not (
+        a.x + a.width + gutter <= b.x - gutter
+        or b.x + b.width + gutter <= a.x - gutter
+        or a.y + a.height + gutter <= b.y - gutter
+        or b.y + b.height + gutter <= a.y - gutter
+    )
+
+
+class TestPackRects:
+    """Test suite for the pack_rects function."""
+
+    @pytest.mark.parametrize(
+        "sizes",
+        [[(64, 64)] * 16, [(32, 32), (64, 16), (6, 10), (128, 128), (16, 64)], [(1, 1)]],
+        ids=["uniform", "mixed", "single_pixel"],
+    )
+    def test_layout(self, sizes: list[tuple[int, int]]) -> None:
+        """Test that textures don't overlap with their gutters, fit into the atlas and start at block boundaries."""
+        # Act
+        layout = pack_rects(sizes, gutter=4)
+
+        # Assert
+        assert [(rect.width, rect.height) for rect in layout.rects] == sizes
+        assert all(not overlaps(a, b, 4) for a, b in combinations(layout.rects, 2))
+        assert all(rect.x % 4 == rect.y % 4 == 0 for rect in layout.rects)
+        assert all(rect.x >= 4 and rect.y >= 4 for rect in layout.rects)
+        assert all(rect.x + rect.width + 4 <= layout.width for rect in layout.rects)
+        assert all(rect.y + rect.height + 4 <= layout.height for rect in layout.rects)
+        assert layout.width & (layout.width - 1) == layout.height & (layout.height - 1) == 0
+
+    def test_compact(self) -> None:
+        """Test that equal textures are packed into a square atlas without wasted space."""
+        # Act
+        layout = pack_rects([(56, 56)] * 16, gutter=4)
+
+        # Assert
+        assert (layout.width, layout.height) == (256, 256)
+
+    @pytest.mark.parametrize(("sizes", "gutter"), [([], 4), ([(8, 8)], 3)], ids=["empty", "unaligned_gutter"])
+    def test_invalid(self, sizes: list[tuple[int, int]], gutter: int) -> None:
+        """Test that an empty atlas or a gutter that breaks block alignment raises an error."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            pack_rects(sizes, gutter)
+
+
+class TestBlit:
+    """Test suite for the blit function."""
+
+    def test_gutter(self) -> None:
+        """Test that the texture is copied and its edge pixels are repeated into the gutter."""
+        # Arrange
+        atlas = BufferTexture(8, 6, 1)
+        tex = SDTexture(2, 2, 1, bytes([1, 2, 3, 4]))
+
+        # Act
+        blit(atlas, tex, AtlasRect(4, 2, 2, 2), gutter=2)
+
+        # Assert
+        rows = [bytes(atlas.buffer[y * 8 : (y + 1) * 8]) for y in range(6)]
+        assert rows == [bytes([0, 0, 1, 1, 1, 2, 2, 2])] * 3 + [bytes([0, 0, 3, 3, 3, 4, 4, 4])] * 3
+
+    def test_grayscale_in_color_atlas(self) -> None:
+        """Test that grayscale textures are expanded to opaque gray in a color atlas."""
+        # Arrange
+        atlas = BufferTexture(4, 4)
+        tex = SDTexture(4, 4, 1, bytes([9]) * 16)
+
+        # Act
+        blit(atlas, tex, AtlasRect(0, 0, 4, 4), gutter=0)
+
+        # Assert
+        assert bytes(atlas.buffer) == bytes([9, 9, 9, 255]) * 16
+
+
+class TestWriteSidecar:
+    """Test suite for the write_sidecar function."""
+
+    def test_uvs(self, tmp_path: Path) -> None:
+        """Test that the rectangles are written by name with normalized UVs."""
+        # Arrange
+        layout = AtlasLayout(64, 32, [AtlasRect(8, 8, 16, 16)])
+
+        # Act
+        write_sidecar(tmp_path / "atlas.json", layout, ["decal"], gutter=8)
+
+        # Assert
+        sidecar = json.loads((tmp_path / "atlas.json").read_text())
+        assert sidecar["width"] == 64
+        assert sidecar["textures"]["decal"] == {
+            "x": 8,
+            "y": 8,
+            "width": 16,
+            "height": 16,
+            "uv": [0.125, 0.25, 0.375, 0.75],
+        }
@@ -0,0 +1,149 @@
+import logging
+import stat
+import subprocess
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from custommipmapsexport import crunch
+from custommipmapsexport.crunch import compress_files, log_output, validate_file_format
+
+
+@pytest.fixture
+def capture_logs(
+    caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[pytest.LogCaptureFixture]:
+    """Capture the plugin's records directly, since the logger doesn't propagate once it's set up."""
+    monkeypatch.setattr(crunch.logger, "propagate", False)
+    # The fixture's handler is replaced for each test phase, so remove the same one that was added.
+    handler = caplog.handler
+    crunch.logger.addHandler(handler)
+    yield caplog
+    crunch.logger.removeHandler(handler)
+
+
+@pytest.fixture
+def verbose_logger(capture_logs: pytest.LogCaptureFixture) -> pytest.LogCaptureFixture:
+    """Capture the plugin's records at debug level."""
+    capture_logs.set_level(logging.DEBUG, logger=crunch.logger.name)
+    return capture_logs
+
+
+@pytest.fixture
+def fake_crunch(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Replace the encoder with a script that prints its arguments and fails for the -fail argument."""
+    script = tmp_path / "bin" / "crunch_x64"
+    script.parent.mkdir()
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import sys\n"
+        "for arg in sys.argv[1:]:\n"
+        "    print(arg)\n"
+        "sys.exit(3 if '-fail' in sys.argv else 0)\n"
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(crunch.importlib.resources, "files", lambda _: tmp_path)
+    return script
+
+
+class TestLogOutput:
+    """Test suite for the log_output function."""
+
+    def test_summary(self, verbose_logger: pytest.LogCaptureFixture) -> None:
+        """Test that lines are logged and counted, skipping empty lines."""
+        # Act
+        summary = log_output(["first\n", "\n", "second\n"])
+
+        # Assert
+        assert summary == (2, 0, ["first", "second"])
+        assert [r.getMessage() for r in verbose_logger.records] == ["first", "second"]
+
+    def test_rate_limit(self, verbose_logger: pytest.LogCaptureFixture) -> None:
+        """Test that lines beyond the rate are counted but not logged."""
+        # Act
+        summary = log_output((f"line {i}" for i in range(10)), lines_per_second=3)
+
+        # Assert
+        assert (summary.lines, summary.suppressed) == (10, 7)
+        assert len(verbose_logger.records) == 3
+        assert summary.tail[-1] == "line 9"
+
+    def test_not_verbose(self, capture_logs: pytest.LogCaptureFixture) -> None:
+        """Test that nothing is logged below debug verbosity, but the output is still summarized."""
+        # Arrange
+        capture_logs.set_level(logging.INFO, logger=crunch.logger.name)
+
+        # Act
+        summary = log_output(["line"])
+
+        # Assert
+        assert summary == (1, 0, ["line"])
+        assert capture_logs.records == []
+
+
+class TestValidateFileFormat:
+    """Test suite for the validate_file_format function."""
+
+    @pytest.mark.parametrize(
+        ("compression", "file_format"),
+        [("DXT1", "dds"), ("dxt5", "crn"), ("etc1", "ktx"), ("etc2a", "crn"), ("a8r8g8b8", "ktx")],
+        ids=["dds", "crn", "etc_ktx", "etc_crn", "uncompressed_ktx"],
+    )
+    def test_valid(self, compression: str, file_format: str) -> None:
+        """Test that containers which can hold the compression method are accepted."""
+        # Act & Assert
+        validate_file_format(compression, file_format)
+
+    @pytest.mark.parametrize(
+        ("compression", "file_format"),
+        [("dxt1", "png"), ("dxt3", "crn"), ("a8r8g8b8", "crn"), ("ETC1", "dds")],
+        ids=["unknown", "dxt3_crn", "uncompressed_crn", "etc_dds"],
+    )
+    def test_invalid(self, compression: str, file_format: str) -> None:
+        """Test that containers which can't hold the compression method are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError, match=file_format.upper() if file_format != "png" else "Unknown"):
+            validate_file_format(compression, file_format)
+
+
+class TestCompressFiles:
+    """Test suite for the compress_files function."""
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="The fake encoder is a shebang script.")
+    def test_streams_output(self, fake_crunch: Path, verbose_logger: pytest.LogCaptureFixture, tmp_path: Path) -> None:
+        """Test that the encoder's output is logged line by line."""
+        # Act
+        returncode = compress_files([tmp_path / "a.dds"], tmp_path, "DXT1", **{"-quality": "128"})
+
+        # Assert
+        messages = [r.getMessage() for r in verbose_logger.records]
+        assert returncode == 0
+        assert "-DXT1" in messages
+        assert "128" in messages
+        assert messages[messages.index("-fileformat") + 1] == "dds"
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="The fake encoder is a shebang script.")
+    def test_file_format(self, fake_crunch: Path, verbose_logger: pytest.LogCaptureFixture, tmp_path: Path) -> None:
+        """Test that the container is passed to the encoder."""
+        # Act
+        compress_files([tmp_path / "a.dds"], tmp_path, "DXT5", "crn")
+
+        # Assert
+        messages = [r.getMessage() for r in verbose_logger.records]
+        assert messages[messages.index("-fileformat") + 1] == "crn"
+
+    def test_invalid_file_format(self, tmp_path: Path) -> None:
+        """Test that the encoder isn't run if the container can't hold the compression method."""
+        # Act & Assert
+        with pytest.raises(ValueError, match="CRN"):
+            compress_files([tmp_path / "a.dds"], tmp_path, "a8r8g8b8", "crn")
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="The fake encoder is a shebang script.")
+    def test_failure(self, fake_crunch: Path, verbose_logger: pytest.LogCaptureFixture, tmp_path: Path) -> None:
+        """Test that a failure raises an error and logs the last lines of the output."""
+        # Act & Assert
+        with pytest.raises(subprocess.CalledProcessError):
+            compress_files([tmp_path / "a.dds"], tmp_path, "DXT1", **{"-fail": ""})
+        assert any(r.levelno == logging.ERROR and "-DXT1" in r.getMessage() for r in verbose_logger.records)
@@ -0,0 +1,184 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from custommipmapsexport.ddsfile import DDS_DXT1, DDSError, DDSFile, write_vectored
+
+
+class TestWriteVectored:
+    """Test suite for the write_vectored function."""
+
+    def test_writes_all_buffers(self, tmp_path: Path) -> None:
+        """Test that all buffers are written in order, skipping empty ones."""
+        # Arrange
+        filepath = tmp_path / "out.bin"
+        buffers = [b"abc", b"", bytearray(b"def"), memoryview(b"ghij")[1:]]
+
+        # Act
+        with filepath.open("wb", buffering=0) as f:
+            write_vectored(f.fileno(), buffers)
+
+        # Assert
+        assert filepath.read_bytes() == b"abcdefhij"
+
+    def test_many_buffers(self, tmp_path: Path) -> None:
+        """Test writing more buffers than fit into a single system call."""
+        # Arrange
+        filepath = tmp_path / "out.bin"
+        buffers = [os.urandom(7) for _ in range(100)]
+
+        # Act
+        with filepath.open("wb", buffering=0) as f:
+            write_vectored(f.fileno(), buffers)
+
+        # Assert
+        assert filepath.read_bytes() == b"".join(buffers)
+
+
+class TestDDSFile:
+    """Test suite for the DDSFile class."""
+
+    def test_save_and_load_mipmaps(self, tmp_path: Path) -> None:
+        """Test that compressed mipmap levels survive a round trip."""
+        # Arrange
+        dds = DDSFile()
+        levels = [(8, 8, os.urandom(32)), (4, 4, os.urandom(8)), (2, 2, os.urandom(8)), (1, 1, os.urandom(8))]
+        for level, (width, height, data) in enumerate(levels):
+            dds.add_image(level, 32, "dxt1", width, height, data)
+
+        # Act
+        dds.save(tmp_path / "out.dds")
+        loaded = DDSFile(tmp_path / "out.dds")
+
+        # Assert
+        assert loaded.dxt == "s3tc_dxt1"
+        assert loaded.images == [data for _, _, data in levels]
+        assert loaded.images_size == [(width, height) for width, height, _ in levels]
+
+    def test_custom_masks(self, tmp_path: Path) -> None:
+        """Test that custom channel masks are written to the header."""
+        # Arrange
+        dds = DDSFile()
+        masks = (0x000000FF, 0x0000FF00, 0x00FF0000, 0xFF000000)
+
+        # Act
+        dds.add_image(0, 32, "rgba", 1, 1, b"\x01\x02\x03\x04", masks=masks)
+        dds.save(tmp_path / "out.dds")
+        loaded = DDSFile(tmp_path / "out.dds")
+
+        # Assert
+        meta = loaded.meta
+        assert (meta.pf_rBitMask, meta.pf_gBitMask, meta.pf_bBitMask, meta.pf_aBitMask) == masks
+
+    @pytest.mark.parametrize(
+        "bpp, fmt",
+        [(8, "rgba"), (32, "luminance"), (32, "bc7")],
+        ids=["wrong_bpp_rgba", "wrong_bpp_luminance", "unknown_format"],
+    )
+    def test_add_image_invalid(self, bpp: int, fmt: str) -> None:
+        """Test that invalid combinations of bits per pixel and format are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            DDSFile().add_image(0, bpp, fmt, 1, 1, b"\x00" * 4)
+
+    def test_cubemap_round_trip(self, tmp_path: Path) -> None:
+        """Test that six faces are saved as a legacy cubemap and loaded back in order."""
+        # Arrange
+        dds = DDSFile()
+        dds.cubemap = True
+        faces = [[os.urandom(8), os.urandom(8)] for _ in range(6)]
+        for layer, (level0, level1) in enumerate(faces):
+            dds.add_image(0, 32, "dxt1", 4, 4, level0, layer=layer)
+            dds.add_image(1, 32, "dxt1", 2, 2, level1, layer=layer)
+
+        # Act
+        dds.save(tmp_path / "cube.dds")
+        loaded = DDSFile(tmp_path / "cube.dds")
+
+        # Assert
+        assert loaded.cubemap
+        assert loaded.layers == 6
+        assert loaded.meta.pf_fourcc == DDS_DXT1
+        images = [loaded.get_image(level, layer) for layer in range(6) for level in range(2)]
+        assert images == [image for face in faces for image in face]
+
+    def test_array_round_trip(self, tmp_path: Path) -> None:
+        """Test that an array of uncompressed slices gets a DX10 header and loads back with its pixel format."""
+        # Arrange
+        slices = []
+        for index in range(3):
+            layer = DDSFile()
+            layer.add_image(0, 32, "rgba", 2, 2, bytes([index]) * 16)
+            slices.append(layer)
+        dds = DDSFile()
+
+        # Act
+        for layer in slices:
+            dds.add_layer(layer)
+        dds.save(tmp_path / "array.dds")
+        loaded = DDSFile(tmp_path / "array.dds")
+
+        # Assert
+        assert not loaded.cubemap
+        assert loaded.layers == 3
+        assert loaded.meta.pf_rgbBitCount == 32
+        assert loaded.images == [bytes([index]) * 16 for index in range(3)]
+
+    def test_add_layer_mismatch(self) -> None:
+        """Test that a layer with a different size than the first one is rejected."""
+        # Arrange
+        dds = DDSFile()
+        first, second = DDSFile(), DDSFile()
+        first.add_image(0, 32, "dxt1", 4, 4, b"\x00" * 8)
+        second.add_image(0, 32, "dxt1", 8, 8, b"\x00" * 32)
+        dds.add_layer(first)
+
+        # Act & Assert
+        with pytest.raises(DDSError):
+            dds.add_layer(second)
+
+    def test_cubemap_needs_six_faces(self, tmp_path: Path) -> None:
+        """Test that a cubemap with missing faces isn't saved."""
+        # Arrange
+        dds = DDSFile()
+        dds.cubemap = True
+        for layer in range(4):
+            dds.add_image(0, 32, "dxt1", 4, 4, b"\x00" * 8, layer=layer)
+
+        # Act & Assert
+        with pytest.raises(DDSError):
+            dds.save(tmp_path / "cube.dds")
+
+    def test_level_offsets(self, tmp_path: Path) -> None:
+        """Test that the offsets of the levels point at their images in the saved file."""
+        # Arrange
+        dds = DDSFile()
+        levels = [(8, 8, os.urandom(32)), (4, 4, os.urandom(8)), (2, 2, os.urandom(8))]
+        for level, (width, height, data) in enumerate(levels):
+            dds.add_image(level, 32, "dxt1", width, height, data)
+
+        # Act
+        dds.save(tmp_path / "out.dds")
+        offsets = dds.get_level_offsets()
+
+        # Assert
+        saved = (tmp_path / "out.dds").read_bytes()
+        assert [saved[offset : offset + size] for offset, size in offsets] == [data for _, _, data in levels]
+        assert offsets[-1][0] + offsets[-1][1] == len(saved)
+
+    def test_mip_tail(self, tmp_path: Path) -> None:
+        """Test that the mip tail is a valid file with the remaining levels at the size of its first level."""
+        # Arrange
+        dds = DDSFile()
+        levels = [(8, 4, os.urandom(64)), (4, 2, os.urandom(32)), (2, 1, os.urandom(8)), (1, 1, os.urandom(4))]
+        for level, (width, height, data) in enumerate(levels):
+            dds.add_image(level, 32, "rgba", width, height, data)
+
+        # Act
+        dds.get_mip_tail(2).save(tmp_path / "tail.dds")
+        loaded = DDSFile(tmp_path / "tail.dds")
+
+        # Assert
+        assert (loaded.meta.width, loaded.meta.height, loaded.count) == (2, 1, 2)
+        assert loaded.images == [data for _, _, data in levels[2:]]
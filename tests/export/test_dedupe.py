@@ -0,0 +1,179 @@
+import struct
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from custommipmapsexport import dedupe
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.dedupe import (
+    can_export_constant,
+    export_constant,
+    get_constant_pixel,
+    get_fingerprint,
+    get_rgba,
+    link_or_copy,
+)
+
+# Outside of Designer, the fake sd package from tests/stubs is used, see tests/conftest.py.
+from sd.api.sdtexture import SDTexture
+
+BGRA = bytes([10, 20, 30, 40])
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure_python"])
+def numpy_or_not(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Run the test with and without NumPy."""
+    if not request.param:
+        monkeypatch.setattr(dedupe, "np", None)
+    elif dedupe.np is None:
+        pytest.skip("NumPy is not available.")
+
+
+class TestGetConstantPixel:
+    """Test suite for the get_constant_pixel function."""
+
+    @pytest.mark.usefixtures("numpy_or_not")
+    @pytest.mark.parametrize("bytes_per_pixel", [1, 2, 4, 8, 16])
+    def test_flat(self, bytes_per_pixel: int) -> None:
+        """Test that the pixel of a flat texture is returned for all pixel sizes."""
+        # Arrange
+        pixel = bytes(range(1, bytes_per_pixel + 1))
+        tex = SDTexture(8, 4, bytes_per_pixel, pixel * 32)
+
+        # Act & Assert
+        assert get_constant_pixel(tex) == pixel
+
+    @pytest.mark.usefixtures("numpy_or_not")
+    def test_last_pixel_differs(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a single different pixel is found, also across chunks."""
+        # Arrange
+        monkeypatch.setattr(dedupe, "CHUNK_BYTES", 16)
+        tex = SDTexture(8, 4, 4, BGRA * 31 + bytes(4))
+
+        # Act & Assert
+        assert get_constant_pixel(tex) is None
+
+    @pytest.mark.usefixtures("numpy_or_not")
+    def test_single_pixel(self) -> None:
+        """Test that a texture with a single pixel is flat."""
+        # Act & Assert
+        assert get_constant_pixel(SDTexture(1, 1, 4, BGRA)) == BGRA
+
+
+class TestGetFingerprint:
+    """Test suite for the get_fingerprint function."""
+
+    def test_identical(self) -> None:
+        """Test that textures with the same size and pixels have the same key, others don't."""
+        # Arrange
+        tex = SDTexture(8, 4)
+
+        # Act
+        key = get_fingerprint(tex)
+
+        # Assert
+        assert key == get_fingerprint(SDTexture(8, 4))
+        assert key != get_fingerprint(SDTexture(4, 8))
+        assert key != get_fingerprint(SDTexture(8, 4, 4, bytes(128)))
+
+    def test_flat_not_hashed(self) -> None:
+        """Test that flat textures are keyed by their pixel without hashing the buffer."""
+        # Arrange
+        tex = SDTexture(8, 4, 4, BGRA * 32)
+
+        # Act
+        with patch.object(dedupe.hashlib, "blake2b") as mock_blake2b:
+            key = get_fingerprint(tex, BGRA)
+
+        # Assert
+        mock_blake2b.assert_not_called()
+        assert key != get_fingerprint(SDTexture(4, 8, 4, BGRA * 32), BGRA)
+
+
+class TestGetRgba:
+    """Test suite for the get_rgba function."""
+
+    @pytest.mark.parametrize(
+        ("pixel", "bytes_per_pixel", "expected"),
+        [
+            (BGRA, 4, (30, 20, 10, 40)),
+            (bytes([90]), 1, (90, 90, 90, 255)),
+            (struct.pack("<H", 0x80FF), 2, (128, 128, 128, 255)),
+            (struct.pack("<4f", 0.0, 0.5, 1.5, 1.0), 16, (255, 128, 0, 255)),
+        ],
+        ids=["rgba8", "l8", "l16", "rgba32f"],
+    )
+    def test_formats(self, pixel: bytes, bytes_per_pixel: int, expected: tuple[int, int, int, int]) -> None:
+        """Test that pixels of Designer's formats are converted to 8-bit RGBA."""
+        # Act & Assert
+        assert get_rgba(pixel, bytes_per_pixel) == expected
+
+
+class TestExportConstant:
+    """Test suite for the export_constant function."""
+
+    def test_mipmaps(self, tmp_path: Path) -> None:
+        """Test that all mipmap levels are written with the blocks of the color."""
+        # Act
+        export_constant(tmp_path / "flat.dds", (16, 8), (255, 0, 0, 255), "dxt5")
+
+        # Assert
+        dds = DDSFile(str(tmp_path / "flat.dds"))
+        assert (dds.dxt, dds.meta.width, dds.meta.height, dds.count) == ("s3tc_dxt5", 16, 8, 5)
+        assert [len(image) for image in dds.images] == [128, 32, 16, 16, 16]
+        assert dds.images[0][:16] * 8 == dds.images[0]
+
+    def test_no_mipmaps(self, tmp_path: Path) -> None:
+        """Test that the mipmap settings of the encoder are respected."""
+        # Act
+        export_constant(tmp_path / "flat.dds", (16, 16), (0, 0, 0, 0), "dxt1a", **{"-mipMode": "None"})
+
+        # Assert
+        dds = DDSFile(str(tmp_path / "flat.dds"))
+        assert (dds.dxt, dds.count) == ("s3tc_dxt1", 1)
+
+
+class TestCanExportConstant:
+    """Test suite for the can_export_constant function."""
+
+    @pytest.mark.parametrize(
+        ("compression", "file_format", "expected"),
+        [("dxt1", "dds", True), ("dxt5", "dds", True), ("dxt5", "crn", False), ("3dc", "dds", False)],
+        ids=["dxt1", "dxt5", "crn", "3dc"],
+    )
+    def test_formats(self, compression: str, file_format: str, expected: bool) -> None:
+        """Test that only S3TC formats in DDS files are written in-process."""
+        # Act & Assert
+        assert can_export_constant(compression, file_format) is expected
+
+
+class TestLinkOrCopy:
+    """Test suite for the link_or_copy function."""
+
+    def test_link(self, tmp_path: Path) -> None:
+        """Test that the target replaces an existing file and shares the source's content."""
+        # Arrange
+        source, target = tmp_path / "a.dds", tmp_path / "b.dds"
+        source.write_bytes(b"new")
+        target.write_bytes(b"old")
+
+        # Act
+        link_or_copy(source, target)
+
+        # Assert
+        assert target.read_bytes() == b"new"
+
+    def test_copy_fallback(self, tmp_path: Path) -> None:
+        """Test that the file is copied if hard links aren't supported."""
+        # Arrange
+        source, target = tmp_path / "a.dds", tmp_path / "b.dds"
+        source.write_bytes(b"data")
+
+        # Act
+        with patch.object(dedupe.os, "link", side_effect=OSError):
+            link_or_copy(source, target)
+
+        # Assert
+        assert target.read_bytes() == b"data"
+        assert target.stat().st_nlink == 1
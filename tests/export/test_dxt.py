@@ -0,0 +1,129 @@
+import struct
+
+import pytest
+
+from custommipmapsexport.dxt import decode_dxt, encode_solid_block
+
+np = pytest.importorskip("numpy")
+
+RED, BLUE = 0xF800, 0x001F
+
+
+def color_block(c0: int, c1: int, indices: list[int]) -> bytes:
+    """Pack a color block with the given endpoints and 2-bit indices in row-major order."""
+    return struct.pack("<HHI", c0, c1, sum(index << (2 * i) for i, index in enumerate(indices)))
+
+
+def alpha_block(a0: int, a1: int, indices: list[int]) -> bytes:
+    """Pack an interpolated alpha block with the given endpoints and 3-bit indices in row-major order."""
+    bits = sum(index << (3 * i) for i, index in enumerate(indices))
+    return bytes([a0, a1]) + bits.to_bytes(6, "little")
+
+
+class TestDecodeDxt:
+    """Test suite for the decode_dxt function."""
+
+    def test_dxt1_four_colors(self) -> None:
+        """Test that the endpoints and their interpolations are decoded at the indexed pixels."""
+        # Arrange
+        data = color_block(RED, BLUE, [0, 1, 2, 3] * 4)
+
+        # Act
+        pixels = decode_dxt(data, 4, 4, "dxt1")
+
+        # Assert
+        assert pixels.shape == (4, 4, 4)
+        assert pixels[0].tolist() == [[255, 0, 0, 255], [0, 0, 255, 255], [170, 0, 85, 255], [85, 0, 170, 255]]
+
+    def test_dxt1_transparent(self) -> None:
+        """Test that blocks with the first endpoint not greater than the second use transparent black."""
+        # Arrange
+        data = color_block(BLUE, RED, [2, 3] + [0] * 14)
+
+        # Act
+        pixels = decode_dxt(data, 4, 4, "dxt1")
+
+        # Assert
+        assert pixels[0, :2].tolist() == [[127, 0, 127, 255], [0, 0, 0, 0]]
+
+    def test_dxt5_alpha(self) -> None:
+        """Test that interpolated alpha is decoded in both the 8 and the 6 value mode."""
+        # Arrange
+        color = color_block(RED, RED, [0] * 16)
+        data = alpha_block(255, 0, [0, 1, 2, 7] + [0] * 12) + color + alpha_block(0, 255, [6, 7, 2] + [0] * 13) + color
+
+        # Act
+        pixels = decode_dxt(data, 8, 4, "dxt5")
+
+        # Assert
+        assert pixels[0, :, 3].tolist() == [255, 0, 218, 36, 0, 255, 51, 0]
+        assert (pixels[..., :3] == [255, 0, 0]).all()
+
+    def test_dxt3_alpha(self) -> None:
+        """Test that explicit 4-bit alpha is expanded to 8 bits."""
+        # Arrange
+        alpha = sum(value << (4 * i) for i, value in enumerate(range(16))).to_bytes(8, "little")
+        data = alpha + color_block(RED, RED, [0] * 16)
+
+        # Act
+        pixels = decode_dxt(data, 4, 4, "dxt3")
+
+        # Assert
+        assert pixels[..., 3].ravel().tolist() == [value * 17 for value in range(16)]
+
+    def test_block_order(self) -> None:
+        """Test that blocks are placed row by row and cropped to the image size."""
+        # Arrange
+        data = b"".join(color_block(color, color, [0] * 16) for color in (RED, BLUE, 0, 0xFFFF))
+
+        # Act
+        pixels = decode_dxt(data, 6, 6, "dxt1")
+
+        # Assert
+        assert pixels.shape == (6, 6, 4)
+        assert pixels[0, 5].tolist() == [0, 0, 255, 255]
+        assert pixels[5, 0].tolist() == [0, 0, 0, 255]
+        assert pixels[5, 5].tolist() == [255, 255, 255, 255]
+
+    def test_too_short(self) -> None:
+        """Test that data shorter than the image's blocks raises an error."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            decode_dxt(bytes(8), 8, 4, "dxt1")
+
+
+class TestEncodeSolidBlock:
+    """Test suite for the encode_solid_block function."""
+
+    @pytest.mark.parametrize("fmt", ["dxt1", "dxt3", "dxt5"])
+    def test_exact_color(self, fmt: str) -> None:
+        """Test that colors representable in RGB565 are decoded exactly."""
+        # Act
+        pixels = decode_dxt(encode_solid_block((255, 130, 0, 255), fmt), 4, 4, fmt)
+
+        # Assert
+        assert (pixels == [255, 130, 0, 255]).all()
+
+    @pytest.mark.parametrize("fmt", ["dxt1", "dxt2", "dxt3", "dxt4", "dxt5"])
+    @pytest.mark.parametrize("rgba", [(1, 2, 3, 255), (200, 100, 50, 255), (77, 177, 250, 128)], ids=str)
+    def test_closest_color(self, fmt: str, rgba: tuple[int, int, int, int]) -> None:
+        """Test that other colors are within a step of 8 bits, with premultiplied and quantized alpha."""
+        # Arrange
+        alpha = rgba[3] if fmt != "dxt1" else 255
+        expected = [(c * alpha + 127) // 255 if fmt in ("dxt2", "dxt4") else c for c in rgba[:3]]
+
+        # Act
+        pixels = decode_dxt(encode_solid_block(rgba if fmt != "dxt1" else (*rgba[:3], 255), fmt), 4, 4, fmt)
+
+        # Assert
+        assert (pixels == pixels[0, 0]).all()
+        assert np.abs(pixels[0, 0, :3].astype(int) - expected).max() <= 1
+        assert abs(int(pixels[0, 0, 3]) - alpha) <= (8 if fmt in ("dxt2", "dxt3") else 0)
+
+    def test_dxt1_transparent(self) -> None:
+        """Test that DXT1 blocks with alpha below half are transparent black."""
+        # Act
+        pixels = decode_dxt(encode_solid_block((255, 255, 255, 0), "dxt1"), 4, 4, "dxt1")
+
+        # Assert
+        assert (pixels == 0).all()
@@ -0,0 +1,237 @@
+import threading
+from collections.abc import Callable
+from multiprocessing import Pipe, resource_tracker, shared_memory, spawn
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.encoderworker import (
+    EncoderWorker,
+    SharedTexture,
+    attach_shared_memory,
+    find_python_executable,
+    run_job,
+    serve,
+)
+from custommipmapsexport.pixelbuffer import get_tex_view
+
+
+@pytest.fixture
+def shm_block() -> Any:
+    """Fixture to create a shared memory block that is cleaned up after the test."""
+    blocks = []
+
+    def create(data: bytes) -> shared_memory.SharedMemory:
+        shm = shared_memory.SharedMemory(create=True, size=len(data))
+        shm.buf[: len(data)] = data
+        blocks.append(shm)
+        return shm
+
+    yield create
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+
+class TestSharedTexture:
+    """Test suite for the SharedTexture class."""
+
+    def test_view_of_shared_memory(self, shm_block: Callable[[bytes], shared_memory.SharedMemory]) -> None:
+        """Test that the texture's pixel buffer is the shared memory block."""
+        # Arrange
+        shm = shm_block(bytes(range(16)))
+
+        # Act
+        view = get_tex_view(SharedTexture(shm, (2, 2), 4))
+
+        # Assert
+        assert view.shape == (2, 2, 4)
+        assert view.tobytes() == bytes(range(16))
+
+
+class TestAttachSharedMemory:
+    """Test suite for the attach_shared_memory function."""
+
+    @patch("multiprocessing.resource_tracker.register")
+    def test_not_registered(
+        self, mock_register: MagicMock, shm_block: Callable[[bytes], shared_memory.SharedMemory]
+    ) -> None:
+        """Test that the block is attached without registering it with the resource tracker again."""
+        # Arrange
+        shm = shm_block(bytes(range(16)))
+        mock_register.reset_mock()
+
+        # Act
+        attached = attach_shared_memory(shm.name)
+        data = bytes(attached.buf[:16])
+        attached.close()
+
+        # Assert
+        assert data == bytes(range(16))
+        mock_register.assert_not_called()
+        assert resource_tracker.register is mock_register
+
+
+class TestRunJob:
+    """Test suite for the run_job function."""
+
+    @patch("custommipmapsexport.encoderworker.compress_files", return_value=0)
+    def test_writes_intermediates(
+        self, mock_compress: MagicMock, shm_block: Callable[[bytes], shared_memory.SharedMemory], tmp_path: Path
+    ) -> None:
+        """Test that the shared pixels are written to intermediate files, which are then compressed."""
+        # Arrange
+        shm = shm_block(bytes(range(64)))
+        written: list[DDSFile] = []
+
+        def compress(files: list[Path], *args, **kwargs) -> int:
+            # Read the intermediates before the temporary directory is removed.
+            written.extend(DDSFile(f) for f in files)
+            return 0
+
+        mock_compress.side_effect = compress
+        job = {
+            "images": [{"shm_name": shm.name, "size": (4, 4), "bytes_per_pixel": 4, "name": "albedo"}],
+            "destination": str(tmp_path),
+            "compression": "dxt1",
+            "file_format": "crn",
+            "arguments": {"-quality": "128"},
+        }
+
+        # Act
+        result = run_job(job)  # type: ignore[arg-type]
+
+        # Assert
+        assert result == 0
+        assert mock_compress.call_args.args[1:] == (tmp_path, "dxt1")
+        assert mock_compress.call_args.kwargs == {"file_format": "crn", "-quality": "128"}
+        assert written[0].images[0] == bytes(range(64))
+
+
+class TestServe:
+    """Test suite for the serve function."""
+
+    @patch("custommipmapsexport.encoderworker.run_job", side_effect=[0, OSError("disk full")])
+    def test_answers_jobs_until_stopped(self, mock_run_job: MagicMock) -> None:
+        """Test that each job gets an answer, errors included, and None stops the loop."""
+        # Arrange
+        conn, worker_conn = Pipe()
+        thread = threading.Thread(target=serve, args=(worker_conn,))
+        thread.start()
+
+        # Act
+        conn.send({"job": 1})
+        first = conn.recv()
+        conn.send({"job": 2})
+        second = conn.recv()
+        conn.send(None)
+        thread.join(timeout=5)
+
+        # Assert
+        assert first == (0, None)
+        assert second == (-1, "OSError: disk full")
+        assert not thread.is_alive()
+
+
+class TestFindPythonExecutable:
+    """Test suite for the find_python_executable function."""
+
+    def test_embedded_interpreter(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the bundled interpreter is found when the executable is the host application."""
+        # Arrange
+        (tmp_path / "python.exe").touch()
+        monkeypatch.setattr("sys.executable", str(tmp_path / "Adobe Substance 3D Designer.exe"))
+        monkeypatch.setattr("sys.exec_prefix", str(tmp_path))
+
+        # Act & Assert
+        assert find_python_executable() == str(tmp_path / "python.exe")
+
+    def test_not_found(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that an error is raised when there's no interpreter."""
+        # Arrange
+        monkeypatch.setattr("sys.executable", str(tmp_path / "Designer.exe"))
+        monkeypatch.setattr("sys.exec_prefix", str(tmp_path))
+
+        # Act & Assert
+        with pytest.raises(FileNotFoundError):
+            find_python_executable()
+
+
+class TestEncoderWorker:
+    """Test suite for the EncoderWorker class."""
+
+    @pytest.fixture
+    def worker(self) -> Any:
+        """Fixture to run a worker process for the duration of a test."""
+        worker = EncoderWorker()
+        worker.start()
+        yield worker
+        worker.stop()
+
+    def test_executable_restored(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the interpreter of other spawned processes is restored after the worker started."""
+        # Arrange
+        monkeypatch.setattr(spawn, "_python_exe", spawn.get_executable())
+        spawn.set_executable("/other/python")
+        executable = spawn.get_executable()
+        worker = EncoderWorker()
+
+        # Act
+        worker.start()
+        worker.stop()
+
+        # Assert
+        assert spawn.get_executable() == executable
+
+    def test_start_stop(self, worker: EncoderWorker) -> None:
+        """Test that the worker process is alive until stopped."""
+        # Assert
+        assert worker.is_running
+
+        # Act
+        worker.stop()
+
+        # Assert
+        assert not worker.is_running
+
+    def test_error_is_raised(
+        self,
+        worker: EncoderWorker,
+        make_texture: Callable[..., Any],
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that a failing job raises an error in the client and cleans up shared memory."""
+        # Arrange
+        created = []
+        shared_memory_cls = shared_memory.SharedMemory
+
+        def tracking_shared_memory(*args, **kwargs) -> shared_memory.SharedMemory:
+            shm = shared_memory_cls(*args, **kwargs)
+            created.append(shm.name)
+            return shm
+
+        monkeypatch.setattr(shared_memory, "SharedMemory", tracking_shared_memory)
+
+        # Act & Assert
+        with pytest.raises(RuntimeError, match="encoder worker failed"):
+            # The encoder executable can't be run here, so the job fails in the worker after the handover.
+            worker.compress([make_texture(4, 4, 4)], ["out"], tmp_path, "dxt1", **{"-bogus": ""})
+        assert worker.is_running
+        with pytest.raises(FileNotFoundError):
+            shared_memory_cls(name=created[0])
+
+    def test_not_running(self, make_texture: Callable[..., Any], tmp_path: Path) -> None:
+        """Test that jobs are refused when the worker isn't running."""
+        # Act & Assert
+        with pytest.raises(RuntimeError):
+            EncoderWorker().compress([make_texture(4, 4, 4)], ["out"], tmp_path, "dxt1")
+
+    def test_unsupported_texture(self, worker: EncoderWorker, make_texture: Callable[..., Any], tmp_path: Path) -> None:
+        """Test that textures with more than 8 bits per channel are refused."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            worker.compress([make_texture(4, 4, 8)], ["out"], tmp_path, "dxt1")
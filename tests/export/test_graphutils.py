@@ -0,0 +1,646 @@
+import json
+import weakref
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custommipmapsexport import tiling
+from custommipmapsexport.archive import ArchiveReader
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.dxt import encode_solid_block
+from custommipmapsexport.graphutils import (
+    EXPORT_DONE,
+    OutputInfo,
+    PackageIndex,
+    compile_pattern,
+    export_dds_files,
+    get_encode_groups,
+    get_group_mapping,
+    get_nodes_data,
+    get_output_name,
+    get_window_size,
+    stream_textures,
+)
+from custommipmapsexport.packing import parse_pack_specs
+from custommipmapsexport.timings import StageTimings
+
+# Outside of Designer, the fake sd package from tests/stubs is used, see tests/conftest.py.
+from sd.api.sbs.sdsbscompgraph import SDSBSCompGraph
+from sd.api.sdproperty import SDPropertyCategory
+
+
+def make_info(uid: str, group: str = "default") -> OutputInfo:
+    """Create output metadata with values derived from the uid."""
+    return OutputInfo(uid, MagicMock(), f"{uid}_id", f"{uid}_label", f"{uid}_desc", f"{uid}_data", group)
+
+
+def make_package(*urls: str) -> MagicMock:
+    """Create a package containing resources with the given URLs."""
+    pkg = MagicMock()
+    resources = [MagicMock(**{"getUrl.return_value": url}) for url in urls]
+    pkg.getChildrenResources.return_value = resources
+    pkg.findResourceFromUrl.side_effect = lambda url: url in urls
+    return pkg
+
+
+class TestPackageIndex:
+    """Test suite for the PackageIndex class."""
+
+    @patch("custommipmapsexport.graphutils.get_user_packages")
+    def test_built_once(self, mock_get_user_packages: MagicMock) -> None:
+        """Test that the index is built on the first lookup and reused afterwards."""
+        # Arrange
+        packages = [make_package("pkg:///a"), make_package("pkg:///b", "pkg:///c")]
+        mock_get_user_packages.return_value = packages
+        index = PackageIndex()
+
+        # Act
+        found = [index.find(MagicMock(**{"getUrl.return_value": url})) for url in ("pkg:///c", "pkg:///a")]
+
+        # Assert
+        assert found == [packages[1], packages[0]]
+        mock_get_user_packages.assert_called_once()
+        packages[0].findResourceFromUrl.assert_not_called()
+
+    @patch("custommipmapsexport.graphutils.get_user_packages")
+    def test_invalidate(self, mock_get_user_packages: MagicMock) -> None:
+        """Test that the index is rebuilt after it was invalidated by a file callback."""
+        # Arrange
+        mock_get_user_packages.return_value = [make_package("pkg:///a")]
+        index = PackageIndex()
+        graph = MagicMock(**{"getUrl.return_value": "pkg:///a"})
+        index.find(graph)
+        reloaded = make_package("pkg:///a")
+        mock_get_user_packages.return_value = [reloaded]
+
+        # Act
+        index.invalidate("/path/to/file.sbs")
+
+        # Assert
+        assert index.find(graph) is reloaded
+
+    @patch("custommipmapsexport.graphutils.get_user_packages")
+    def test_fallback_scan(self, mock_get_user_packages: MagicMock) -> None:
+        """Test that graphs missing from the index are searched in the packages and added to the index."""
+        # Arrange
+        pkg = make_package("pkg:///a")
+        mock_get_user_packages.return_value = [pkg]
+        index = PackageIndex()
+        index.find(MagicMock(**{"getUrl.return_value": "pkg:///a"}))
+        pkg.findResourceFromUrl.side_effect = lambda url: url == "pkg:///new"
+        graph = MagicMock(**{"getUrl.return_value": "pkg:///new"})
+
+        # Act
+        found = [index.find(graph), index.find(graph)]
+
+        # Assert
+        assert found == [pkg, pkg]
+        pkg.findResourceFromUrl.assert_called_once_with("pkg:///new")
+
+
+class TestCompilePattern:
+    """Test suite for the compile_pattern function."""
+
+    @pytest.mark.parametrize(
+        "pattern, variables",
+        [
+            ("$(identifier)", {"identifier"}),
+            ("T_$(graph)_$(label)_$(graph)", {"graph", "label"}),
+            ("static", set()),
+            ("$(unknown)_$(group)", {"group"}),
+        ],
+        ids=["single", "repeated", "no_variables", "unknown_variable"],
+    )
+    def test_variables(self, pattern: str, variables: set[str]) -> None:
+        """Test that only the variables used in the pattern are listed."""
+        # Act & Assert
+        assert compile_pattern(pattern).variables == variables
+
+    def test_substitute(self) -> None:
+        """Test that variables are substituted and the remaining text is kept."""
+        # Arrange
+        compiled = compile_pattern("T_$(graph)_$(label)_$(unknown)")
+
+        # Act
+        name = compiled.substitute({"graph": "wood", "label": "Base Color"})
+
+        # Assert
+        assert name == "T_wood_Base Color_$(unknown)"
+
+
+class TestGetOutputName:
+    """Test suite for the get_output_name function."""
+
+    def test_cached_outputs(self) -> None:
+        """Test that cached metadata is used without looking up the node."""
+        # Arrange
+        graph = MagicMock()
+        graph.getIdentifier.return_value = "wood"
+        outputs = {"1": make_info("1", group="pbr")}
+
+        # Act
+        name = get_output_name(graph, "1", "$(graph)_$(group)_$(identifier)", outputs)
+
+        # Assert
+        assert name == "wood_pbr_1_id"
+        graph.getNodeFromId.assert_not_called()
+
+    def test_graph_not_fetched(self) -> None:
+        """Test that the graph's identifier is only fetched when the pattern uses it."""
+        # Arrange
+        graph = MagicMock()
+
+        # Act
+        get_output_name(graph, "1", "$(label)", {"1": make_info("1")})
+
+        # Assert
+        graph.getIdentifier.assert_not_called()
+
+    def test_missing_node(self) -> None:
+        """Test that an unknown node raises an error."""
+        # Arrange
+        graph = MagicMock()
+        graph.getNodeFromId.return_value = None
+
+        # Act & Assert
+        with pytest.raises(ValueError):
+            get_output_name(graph, "1", "$(label)", {})
+
+
+class TestGetGroupMapping:
+    """Test suite for the get_group_mapping function."""
+
+    def test_groups(self) -> None:
+        """Test that outputs are grouped in their order."""
+        # Arrange
+        outputs = {uid: make_info(uid, group) for uid, group in [("1", "a"), ("2", "b"), ("3", "a")]}
+
+        # Act
+        mapping = get_group_mapping(MagicMock(), outputs)
+
+        # Assert
+        assert mapping == {"a": [("1_id", "1"), ("3_id", "3")], "b": [("2_id", "2")]}
+
+
+class TestGetNodesData:
+    """Test suite for the get_nodes_data function."""
+
+    def test_cached_outputs(self) -> None:
+        """Test that names are built from cached metadata for the given uids only."""
+        # Arrange
+        graph = MagicMock()
+        graph.getIdentifier.return_value = "wood"
+        outputs = {uid: make_info(uid) for uid in "123"}
+
+        # Act
+        data = get_nodes_data(graph, ["3", "1"], "$(graph)_$(label)", outputs)
+
+        # Assert
+        assert data["basenames"] == ["wood_3_label", "wood_1_label"]
+        assert data["nodes"] == [outputs["3"].node, outputs["1"].node]
+        graph.getIdentifier.assert_called_once()
+        graph.getNodeFromId.assert_not_called()
+
+    def test_skips_missing_nodes(self) -> None:
+        """Test that uids of nodes that are neither cached nor in the graph are skipped."""
+        # Arrange
+        graph = MagicMock()
+        graph.getNodeFromId.return_value = None
+
+        # Act
+        data = get_nodes_data(graph, ["1", "2"], "$(label)", {"1": make_info("1")})
+
+        # Assert
+        assert data["basenames"] == ["1_label"]
+
+
+class TestGetWindowSize:
+    """Test suite for the get_window_size function."""
+
+    @pytest.mark.parametrize(
+        "texture_size, memory_budget, n_textures, expected",
+        [
+            (100, None, 40, 40),
+            (100, 0, 40, 40),
+            (100, 1000, 40, 10),
+            (100, 50, 40, 1),
+            (100, 10_000, 40, 40),
+            (100, None, 0, 1),
+        ],
+        ids=["unlimited", "zero_is_unlimited", "fits_ten", "budget_too_small", "budget_too_large", "no_textures"],
+    )
+    def test_window(self, texture_size: int, memory_budget: int | None, n_textures: int, expected: int) -> None:
+        """Test the number of textures that fit into the memory budget."""
+        # Act & Assert
+        assert get_window_size(texture_size, memory_budget, n_textures) == expected
+
+
+class TestStreamTextures:
+    """Test suite for the stream_textures function."""
+
+    @patch("custommipmapsexport.graphutils.get_sd_tex")
+    def test_batches(self, mock_get_sd_tex: MagicMock, make_texture: Callable[..., Any]) -> None:
+        """Test that textures are fetched lazily in batches within the budget, skipping nodes without texture."""
+        # Arrange
+        nodes = [f"node{i}" for i in range(5)]
+        textures = {node: make_texture(4, 4, 4) for node in nodes if node != "node1"}
+        mock_get_sd_tex.side_effect = textures.get
+        stream = stream_textures(nodes, [f"name{i}" for i in range(5)], memory_budget=2 * 64)  # type: ignore[arg-type]
+
+        # Act
+        first = next(stream)
+        fetched_after_first = mock_get_sd_tex.call_count
+        rest = list(stream)
+
+        # Assert
+        assert first[1] == ["name0", "name2"]
+        assert fetched_after_first == 3
+        assert [names for _, names in rest] == [["name3", "name4"]]
+
+    @patch("custommipmapsexport.graphutils.get_sd_tex", return_value=None)
+    def test_no_textures(self, mock_get_sd_tex: MagicMock) -> None:
+        """Test that nothing is yielded when no node has a texture."""
+        # Act & Assert
+        assert list(stream_textures(["node"], ["name"])) == []  # type: ignore[list-item]
+
+
+class TestExportDdsFiles:
+    """Test suite for the export_dds_files function, with the fake graph."""
+
+    @pytest.fixture
+    def graph(self) -> SDSBSCompGraph:
+        """Create a 64x32 graph with a color and a grayscale output."""
+        graph = SDSBSCompGraph("material", output_size=(6, 5))
+        graph.add_output("basecolor", 4, group="Material")
+        graph.add_output("height", 1, group="Material")
+        return graph
+
+    def test_uncompressed(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that all outputs are written with mipmaps and the stages are timed."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+        timings = StageTimings()
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(graph)_$(identifier)", "a8r8g8b8", timings=timings)
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["material_basecolor.dds", "material_height.dds"]
+        dds = DDSFile(str(tmp_path / "material_height.dds"))
+        assert (dds.meta.width, dds.meta.height, dds.count) == (64, 32, 7)
+        assert {"compute", "fetch", "uncompressed"} <= timings.seconds.keys()
+
+    def test_max_resolution(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the output size is clamped for the export and restored afterwards."""
+        # Arrange
+        uid = graph.getOutputNodes()[0].getIdentifier()
+        out_size = graph.getPropertyFromId("$outputsize", SDPropertyCategory.Input)
+
+        # Act
+        export_dds_files(graph, [uid], tmp_path, "$(identifier)", "r8g8b8", max_resolution=4, **{"-mipMode": "None"})
+
+        # Assert
+        dds = DDSFile(str(tmp_path / "basecolor.dds"))
+        assert (dds.meta.width, dds.meta.height, dds.count) == (16, 8, 1)
+        assert tuple(graph.getPropertyValue(out_size).get()) == (6, 5)  # type: ignore[arg-type, union-attr]
+        assert graph.compute_count == 2
+
+    def test_size_budget(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the resolution is lowered until the files fit into the size budget."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        export_dds_files(graph, uids, tmp_path, "$(identifier)", "a8r8g8b8", size_budget=4096)
+
+        # Assert
+        assert [(path.stat().st_size <= 4096) for path in sorted(tmp_path.iterdir())] == [True, True]
+        dds = DDSFile(str(tmp_path / "basecolor.dds"))
+        assert (dds.meta.width, dds.meta.height) == (32, 16)
+
+    def test_batches_released(self, graph: SDSBSCompGraph, tmp_path: Path, make_texture: Callable[..., Any]) -> None:
+        """Test that a batch's textures are released before the next batch is fetched, to stay within the budget."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+        refs: list[weakref.ref[Any]] = []
+        alive_at_fetch: list[int] = []
+
+        def get_sd_tex(_node: object) -> Any:
+            alive_at_fetch.append(sum(ref() is not None for ref in refs))
+            # Distinct gradients, so no texture is skipped as flat or duplicate.
+            tex = make_texture(8, 8, 4, bytes(i * (len(refs) + 1) % 256 for i in range(256)))
+            refs.append(weakref.ref(tex))
+            return tex
+
+        # Act
+        with patch("custommipmapsexport.graphutils.get_sd_tex", side_effect=get_sd_tex):
+            feedback = export_dds_files(graph, uids, tmp_path, "$(identifier)", "a8r8g8b8", memory_budget=1)
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert alive_at_fetch == [0, 0]
+
+    @patch("custommipmapsexport.graphutils.compress_files", return_value=0)
+    def test_file_format(self, mock_compress: MagicMock, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that uncompressed formats are handed to the encoder for containers other than DDS."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(identifier)", "a8r8g8b8", file_format="ktx")
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert [path.name for path in mock_compress.call_args.args[0]] == ["basecolor.dds", "height.dds"]
+        assert mock_compress.call_args.args[2:] == ("a8r8g8b8", "ktx")
+        assert list(tmp_path.iterdir()) == []
+
+    @patch("custommipmapsexport.graphutils.compress_files")
+    def test_invalid_file_format(self, mock_compress: MagicMock, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the export fails before computing the graph, saying the container can't hold the compression."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(identifier)", "dxt3", file_format="crn")
+
+        # Assert
+        assert feedback == "Export failed: Compression dxt3 can't be written to CRN files, use DDS or KTX instead."
+        assert graph.compute_count == 0
+        mock_compress.assert_not_called()
+
+    def test_destination_not_writable(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that failing to write the files points to the destination's permissions."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+        destination = tmp_path / "file.dds"
+        destination.write_bytes(b"")
+
+        # Act
+        feedback = export_dds_files(graph, uids, destination, "$(identifier)", "a8r8g8b8")
+
+        # Assert
+        assert feedback.startswith("Export failed: Make sure you have write permissions for the destination folder")
+
+    @patch("custommipmapsexport.graphutils.compress_files", return_value=0)
+    def test_flat_and_duplicate_outputs(self, mock_compress: MagicMock, tmp_path: Path) -> None:
+        """Test that flat outputs are written in-process and duplicates linked instead of being encoded again."""
+        # Arrange
+        graph = SDSBSCompGraph("material", output_size=(4, 4))
+        graph.add_output("basecolor")
+        graph.add_output("mask", 1, fill=bytes([255]))
+        graph.add_output("copy")
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        def compress(files: list[Path], destination: Path, *args, **kwargs) -> int:
+            for f in files:
+                (destination / f.name).write_bytes(b"encoded")
+            return 0
+
+        mock_compress.side_effect = compress
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(identifier)", "dxt1", memory_budget=1)
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert [path.name for call in mock_compress.call_args_list for path in call.args[0]] == ["basecolor.dds"]
+        assert (tmp_path / "copy.dds").read_bytes() == b"encoded"
+        mask = DDSFile(str(tmp_path / "mask.dds"))
+        assert (mask.dxt, mask.meta.width, mask.count) == ("s3tc_dxt1", 16, 5)
+
+    def test_packing(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that channels of outputs are packed into an additional texture named with the pattern."""
+        # Arrange
+        uid = graph.getOutputNodes()[0].getIdentifier()
+        packing = parse_pack_specs("ORM: R=height, G=basecolor.A")
+
+        # Act
+        feedback = export_dds_files(
+            graph, [uid], tmp_path, "$(graph)_$(identifier)", "a8r8g8b8", packing=packing, **{"-mipMode": "None"}
+        )
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["material_ORM.dds", "material_basecolor.dds"]
+        pixels = DDSFile(str(tmp_path / "material_ORM.dds")).images[0]
+        assert bytes(pixels[-4:]) == bytes([0, 255, 255, 255])  # BGRA of the gradients' last pixel.
+
+    def test_packing_unknown_output(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the export fails before computing the graph if a packed output doesn't exist."""
+        # Act
+        feedback = export_dds_files(
+            graph, [], tmp_path, "$(identifier)", "a8r8g8b8", packing=parse_pack_specs("ORM: R=missing")
+        )
+
+        # Assert
+        assert feedback != EXPORT_DONE
+        assert graph.compute_count == 0
+
+    def test_atlas(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the outputs are packed into a single file with a sidecar keyed by output name."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(graph)_$(identifier)", "a8r8g8b8", atlas="decals")
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["material_decals.dds", "material_decals.json"]
+        sidecar = json.loads((tmp_path / "material_decals.json").read_text())
+        assert sorted(sidecar["textures"]) == ["material_basecolor", "material_height"]
+        dds = DDSFile(str(tmp_path / "material_decals.dds"))
+        assert (dds.meta.width, dds.meta.height) == (sidecar["width"], sidecar["height"])
+
+    def test_array(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the outputs are combined into the slices of a single texture array, in their order."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        feedback = export_dds_files(
+            graph, uids, tmp_path, "$(graph)_$(identifier)", "a8r8g8b8", array="decals", **{"-mipMode": "None"}
+        )
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert [path.name for path in tmp_path.iterdir()] == ["material_decals.dds"]
+        dds = DDSFile(str(tmp_path / "material_decals.dds"))
+        assert (dds.layers, dds.cubemap) == (len(uids), False)
+
+    @patch("custommipmapsexport.graphutils.get_sd_tex", return_value=None)
+    def test_array_missing_texture(self, mock_get_sd_tex: MagicMock, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the export fails, naming the output, if an output has no texture for its slice."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(identifier)", "a8r8g8b8", array="decals")
+
+        # Assert
+        assert feedback == "Export failed: Output basecolor has no texture to combine into decals.dds."
+        assert list(tmp_path.iterdir()) == []
+
+    def test_stream_levels(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the top levels of each file are split off into chunk files after the export."""
+        # Arrange
+        uid = graph.getOutputNodes()[0].getIdentifier()
+
+        # Act
+        feedback = export_dds_files(graph, [uid], tmp_path, "$(identifier)", "a8r8g8b8", stream_levels=2)
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert sorted(path.suffix for path in tmp_path.iterdir()) == [".dds", ".mip0", ".mip1"]
+        dds = DDSFile(str(next(tmp_path.glob("*.dds"))))
+        assert dds.count == 5
+
+    def test_archive(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the files are appended to an archive under their output names, instead of written loose."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(graph)_$(identifier)", "a8r8g8b8", archive="textures")
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert [path.name for path in tmp_path.iterdir()] == ["textures.mipa"]
+        with ArchiveReader(tmp_path / "textures.mipa") as reader:
+            assert len(reader) == len(uids)
+            assert reader.get_entry("material_height").levels == 7
+
+    @patch("custommipmapsexport.graphutils.compress_files", return_value=0)
+    def test_premultiplied_flat_output(self, mock_compress: MagicMock, tmp_path: Path) -> None:
+        """Test that flat DXT4 outputs are premultiplied once, before the solid blocks are encoded."""
+        # Arrange
+        graph = SDSBSCompGraph("material", output_size=(3, 3))
+        graph.add_output("glass", fill=bytes([50, 100, 200, 128]))  # BGRA
+        uid = graph.getOutputNodes()[0].getIdentifier()
+        timings = StageTimings()
+
+        # Act
+        feedback = export_dds_files(graph, [uid], tmp_path, "$(identifier)", "dxt4", timings=timings)
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        mock_compress.assert_not_called()
+        dds = DDSFile(str(tmp_path / "glass.dds"))
+        assert dds.dxt == "s3tc_dxt4"
+        assert bytes(dds.images[0]) == encode_solid_block((100, 50, 25, 128), "dxt5") * 4
+        assert "premultiply" in timings.seconds
+
+    def test_mirrors(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that files are encoded into the first destination and replicated to the others, with split levels."""
+        # Arrange
+        uid = graph.getOutputNodes()[0].getIdentifier()
+        destinations = [tmp_path / "repo", tmp_path / "cache", tmp_path / "preview"]
+        destinations[0].mkdir()
+        timings = StageTimings()
+
+        # Act
+        feedback = export_dds_files(
+            graph, [uid], destinations, "$(identifier)", "a8r8g8b8", stream_levels=1, timings=timings
+        )
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        for destination in destinations:
+            assert sorted(path.name for path in destination.iterdir()) == ["basecolor.dds", "basecolor.mip0"]
+            assert (destination / "basecolor.dds").read_bytes() == (destinations[0] / "basecolor.dds").read_bytes()
+        assert "replicate" in timings.seconds
+
+    def test_archive_mirrors(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that archives are replicated as copies, so appending to one in place leaves the replicas intact."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+        destinations = [tmp_path / "repo", tmp_path / "cache"]
+        destinations[0].mkdir()
+        export_dds_files(graph, uids[:1], destinations, "$(identifier)", "a8r8g8b8", archive="textures")
+        replica = (destinations[1] / "textures.mipa").read_bytes()
+
+        # Act
+        feedback = export_dds_files(graph, uids[1:], destinations[:1], "$(identifier)", "a8r8g8b8", archive="textures")
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert not (destinations[1] / "textures.mipa").samefile(destinations[0] / "textures.mipa")
+        assert (destinations[1] / "textures.mipa").read_bytes() == replica
+        with ArchiveReader(destinations[0] / "textures.mipa") as reader:
+            assert len(reader) == len(uids)
+
+    def test_cubemap_missing_faces(self, graph: SDSBSCompGraph, tmp_path: Path) -> None:
+        """Test that the export fails before computing the graph if the outputs aren't six faces per cube."""
+        # Arrange
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(identifier)", "dxt1", array="sky", cubemap=True)
+
+        # Assert
+        assert feedback != EXPORT_DONE
+        assert graph.compute_count == 0
+
+    @patch("custommipmapsexport.graphutils.encode_tiled")
+    @patch("custommipmapsexport.graphutils.compress_files", return_value=0)
+    def test_tiled(
+        self,
+        mock_compress: MagicMock,
+        mock_encode_tiled: MagicMock,
+        graph: SDSBSCompGraph,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that textures large enough are encoded as tiles instead of being handed to the encoder as a whole."""
+        # Arrange
+        monkeypatch.setattr(tiling, "TILE_SIZE", 16)
+        monkeypatch.setattr(tiling, "MIN_TILED_SIZE", 32)
+        uids = [node.getIdentifier() for node in graph.getOutputNodes()]
+        timings = StageTimings()
+
+        # Act
+        feedback = export_dds_files(graph, uids, tmp_path, "$(identifier)", "dxt5", timings=timings)
+
+        # Assert
+        assert feedback == EXPORT_DONE
+        assert [call.args[0].name for call in mock_encode_tiled.call_args_list] == ["basecolor.dds", "height.dds"]
+        mock_compress.assert_not_called()
+        assert "tiled" in timings.seconds
+
+
+class TestGetEncodeGroups:
+    """Test suite for the get_encode_groups function."""
+
+    @patch("custommipmapsexport.graphutils.find_dxt_qualities", return_value=["fast", "uber", "fast"])
+    def test_grouped_by_quality(self, mock_find: MagicMock) -> None:
+        """Test that textures with the same -dxtQuality setting are encoded together."""
+        # Arrange
+        textures = [MagicMock(), MagicMock(), MagicMock()]
+
+        # Act
+        groups = get_encode_groups(
+            textures, ["a", "b", "c"], "dxt1", 40.0, **{"-dxtQuality": "normal", "-quality": "255"}
+        )
+
+        # Assert
+        assert [(names, arguments["-dxtQuality"]) for _, names, arguments in groups] == [
+            (["a", "c"], "fast"),
+            (["b"], "uber"),
+        ]
+        assert groups[0][0] == [textures[0], textures[2]]
+        assert groups[0][2]["-quality"] == "255"
+
+    @patch("custommipmapsexport.graphutils.find_dxt_qualities")
+    def test_without_min_psnr(self, mock_find: MagicMock) -> None:
+        """Test that all textures are encoded with the given arguments without a minimum PSNR."""
+        # Act
+        groups = get_encode_groups([MagicMock()], ["a"], "dxt1", None, **{"-dxtQuality": "normal"})
+
+        # Assert
+        assert [(names, arguments) for _, names, arguments in groups] == [(["a"], {"-dxtQuality": "normal"})]
+        mock_find.assert_not_called()
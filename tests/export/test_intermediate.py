@@ -0,0 +1,80 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.intermediate import can_write_intermediate, get_channel_masks, write_intermediate
+
+
+class TestGetChannelMasks:
+    """Test suite for the get_channel_masks function."""
+
+    @pytest.mark.parametrize(
+        "order, expected",
+        [
+            ("BGRA", (0x00FF0000, 0x0000FF00, 0x000000FF, 0xFF000000)),
+            ("RGBA", (0x000000FF, 0x0000FF00, 0x00FF0000, 0xFF000000)),
+        ],
+        ids=["BGRA", "RGBA"],
+    )
+    def test_masks(self, order: str, expected: tuple[int, int, int, int]) -> None:
+        """Test that the masks select the channel's byte in a little-endian pixel."""
+        # Act & Assert
+        assert get_channel_masks(order) == expected
+
+
+class TestCanWriteIntermediate:
+    """Test suite for the can_write_intermediate function."""
+
+    @pytest.mark.parametrize(
+        "bpp, expected",
+        [(1, True), (4, True), (2, False), (8, False), (16, False)],
+        ids=["L8", "RGBA8", "L16", "RGBA16", "RGBA32F"],
+    )
+    def test_only_8bit(self, make_texture: Callable[..., Any], bpp: int, expected: bool) -> None:
+        """Test that only textures with 8 bits per channel are supported."""
+        # Act & Assert
+        assert can_write_intermediate(make_texture(4, 4, bpp)) is expected
+
+
+class TestWriteIntermediate:
+    """Test suite for the write_intermediate function."""
+
+    @pytest.mark.parametrize(
+        "bpp, dxt",
+        [(1, "luminance"), (4, "rgba")],
+        ids=["L8", "RGBA8"],
+    )
+    def test_round_trip(self, make_texture: Callable[..., Any], tmp_path: Path, bpp: int, dxt: str) -> None:
+        """Test that the written file holds the unchanged pixel buffer."""
+        # Arrange
+        tex = make_texture(8, 4, bpp)
+        filepath = tmp_path / "out.dds"
+
+        # Act
+        result = write_intermediate(filepath, tex)
+
+        # Assert
+        dds = DDSFile(result)
+        assert dds.size == (8, 4)
+        assert dds.dxt == dxt
+        assert dds.images[0] == bytes(tex.buffer)
+
+    def test_header_size(self, make_texture: Callable[..., Any], tmp_path: Path) -> None:
+        """Test that the file is just the header followed by the pixels."""
+        # Arrange
+        tex = make_texture(16, 16, 4)
+
+        # Act
+        result = write_intermediate(tmp_path / "out.dds", tex)
+
+        # Assert
+        assert result.stat().st_size == 4 + 124 + 16 * 16 * 4
+
+    def test_unsupported(self, make_texture: Callable[..., Any], tmp_path: Path) -> None:
+        """Test that textures with more than 8 bits per channel are rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            write_intermediate(tmp_path / "out.dds", make_texture(4, 4, 8))
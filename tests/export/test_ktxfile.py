@@ -0,0 +1,121 @@
+import os
+import struct
+from pathlib import Path
+
+import pytest
+
+from custommipmapsexport.ddsfile import DDSError, DDSFile
+from custommipmapsexport.ktxfile import (
+    GL_BGR,
+    GL_COMPRESSED_RGB_S3TC_DXT1_EXT,
+    KTX_HEADER,
+    KTX_IDENTIFIER,
+    KTXHeader,
+    convert_directory,
+    dds_to_ktx,
+    ktx_to_dds,
+    read_ktx_header,
+)
+
+
+def write_dds(filepath: Path, fmt: str, bpp: int, sizes: list[tuple[int, int]], layers: int = 1) -> None:
+    """Write a DDS file of random images with the given level sizes."""
+    dds = DDSFile()
+    dds.cubemap = layers == 6
+    for layer in range(layers):
+        for level, (width, height) in enumerate(sizes):
+            n_bytes = max(1, width // 4) * max(1, height // 4) * 8 if fmt == "dxt1" else width * height * bpp // 8
+            dds.add_image(level, bpp, fmt, width, height, os.urandom(n_bytes), layer=layer)
+    dds.save(filepath)
+
+
+class TestConversion:
+    """Test suite for converting between DDS and KTX files."""
+
+    @pytest.mark.parametrize(
+        ("fmt", "bpp", "sizes", "layers"),
+        [
+            ("dxt1", 32, [(16, 8), (8, 4), (4, 2), (2, 1), (1, 1)], 1),
+            ("rgb", 24, [(5, 3), (2, 1), (1, 1)], 1),
+            ("luminance", 8, [(6, 6), (3, 3), (1, 1)], 1),
+            ("dxt1", 32, [(8, 8), (4, 4)], 6),
+            ("rgba", 32, [(4, 4), (2, 2), (1, 1)], 3),
+        ],
+        ids=["dxt1", "unaligned_rgb", "unaligned_luminance", "cubemap", "array"],
+    )
+    def test_round_trip(self, tmp_path: Path, fmt: str, bpp: int, sizes: list[tuple[int, int]], layers: int) -> None:
+        """Test that converting to KTX and back restores the same header fields and levels."""
+        # Arrange
+        write_dds(tmp_path / "in.dds", fmt, bpp, sizes, layers)
+        original = DDSFile(str(tmp_path / "in.dds"))
+
+        # Act
+        dds_to_ktx(tmp_path / "in.dds", tmp_path / "tex.ktx")
+        ktx_to_dds(tmp_path / "tex.ktx", tmp_path / "out.dds")
+
+        # Assert
+        converted = DDSFile(str(tmp_path / "out.dds"))
+        assert (converted.layers, converted.cubemap, converted.count) == (layers, layers == 6, len(sizes))
+        assert converted.meta == original.meta
+        assert [bytes(image) for image in converted.images] == [bytes(image) for image in original.images]
+
+    def test_ktx_layout(self, tmp_path: Path) -> None:
+        """Test that KTX rows of uncompressed levels are padded to 4 bytes and each level starts with its size."""
+        # Arrange
+        write_dds(tmp_path / "in.dds", "rgb", 24, [(3, 2)])
+
+        # Act
+        dds_to_ktx(tmp_path / "in.dds", tmp_path / "tex.ktx")
+
+        # Assert
+        with (tmp_path / "tex.ktx").open("rb") as fd:
+            header = read_ktx_header(fd)
+            (image_size,) = struct.unpack("<I", fd.read(4))
+        assert (header.gl_format, header.width, header.height, header.levels) == (GL_BGR, 3, 2, 1)
+        assert image_size == 2 * 12  # 9 bytes per row, padded to 12.
+
+    def test_compressed_header(self, tmp_path: Path) -> None:
+        """Test that DXT1 levels are tagged with the S3TC internal format and no GL type."""
+        # Arrange
+        write_dds(tmp_path / "in.dds", "dxt1", 32, [(4, 4), (2, 2), (1, 1)])
+
+        # Act
+        dds_to_ktx(tmp_path / "in.dds", tmp_path / "tex.ktx")
+
+        # Assert
+        with (tmp_path / "tex.ktx").open("rb") as fd:
+            header = read_ktx_header(fd)
+        assert (header.gl_type, header.gl_internal_format, header.faces) == (0, GL_COMPRESSED_RGB_S3TC_DXT1_EXT, 1)
+
+    def test_etc_rejected(self, tmp_path: Path) -> None:
+        """Test that KTX files with ETC data can't be converted, since DDS files can't hold it."""
+        # Arrange
+        header = KTXHeader(0x04030201, 0, 1, 0, 0x8D64, 0x1907, 4, 4, 0, 0, 1, 1, 0)
+        (tmp_path / "etc.ktx").write_bytes(KTX_IDENTIFIER + KTX_HEADER.pack(*header) + struct.pack("<I", 8) + bytes(8))
+
+        # Act & Assert
+        with pytest.raises(DDSError):
+            ktx_to_dds(tmp_path / "etc.ktx", tmp_path / "etc.dds")
+
+
+class TestConvertDirectory:
+    """Test suite for the convert_directory function."""
+
+    def test_keeps_relative_paths(self, tmp_path: Path) -> None:
+        """Test that files in subdirectories are converted to the same relative paths, and other files are skipped."""
+        # Arrange
+        source = tmp_path / "source"
+        (source / "props").mkdir(parents=True)
+        write_dds(source / "albedo.dds", "dxt1", 32, [(4, 4)])
+        write_dds(source / "props" / "crate.dds", "dxt1", 32, [(4, 4)])
+        (source / "readme.txt").write_text("not a texture")
+
+        # Act
+        converted = convert_directory(source, tmp_path / "ktx", "ktx", max_workers=2)
+
+        # Assert
+        assert sorted(path.relative_to(tmp_path / "ktx").as_posix() for path in converted) == [
+            "albedo.ktx",
+            "props/crate.ktx",
+        ]
+        assert all(path.exists() for path in converted)
@@ -0,0 +1,86 @@
+import pytest
+
+from custommipmapsexport.packing import ChannelSource, PackSpec, pack_channels, parse_pack_specs
+
+# Outside of Designer, the fake sd package from tests/stubs is used, see tests/conftest.py.
+from sd.api.sdtexture import SDTexture
+
+
+class TestParsePackSpecs:
+    """Test suite for the parse_pack_specs function."""
+
+    def test_specs(self) -> None:
+        """Test that several specs are parsed with their channel assignments."""
+        # Act
+        specs = parse_pack_specs(" ORM: R=ambientOcclusion, g=roughness, B=metallic ; Mask: A = basecolor.a;")
+
+        # Assert
+        assert specs == [
+            PackSpec(
+                "ORM",
+                {
+                    "R": ChannelSource("ambientOcclusion"),
+                    "G": ChannelSource("roughness"),
+                    "B": ChannelSource("metallic"),
+                },
+            ),
+            PackSpec("Mask", {"A": ChannelSource("basecolor", "A")}),
+        ]
+
+    def test_blank(self) -> None:
+        """Test that blank text means no packing."""
+        # Act & Assert
+        assert parse_pack_specs("  ") == []
+
+    @pytest.mark.parametrize(
+        ("text", "match"),
+        [
+            ("R=roughness", "needs a name"),
+            ("ORM: X=roughness", "Invalid channel"),
+            ("ORM: R=roughness.Z", "Invalid channel"),
+            ("ORM: R=", "Invalid channel"),
+            ("ORM: R=roughness, R=metallic", "assigned twice"),
+            ("ORM:", "no channels"),
+            ("ORM: R=roughness; ORM: G=metallic", "defined twice"),
+        ],
+        ids=["no_name", "channel", "source_channel", "no_source", "twice", "empty", "name_twice"],
+    )
+    def test_invalid(self, text: str, match: str) -> None:
+        """Test that malformed specs raise an error."""
+        # Act & Assert
+        with pytest.raises(ValueError, match=match):
+            parse_pack_specs(text)
+
+
+class TestPackChannels:
+    """Test suite for the pack_channels function."""
+
+    def test_grayscale_sources(self) -> None:
+        """Test that grayscale outputs are packed into channels and unassigned channels get their default."""
+        # Arrange
+        occlusion = SDTexture(2, 1, 1, bytes([10, 20]))
+        roughness = SDTexture(2, 1, 2, bytes([0xFF, 30, 0xFF, 40]))  # 16-bit, high bytes are kept.
+
+        # Act
+        packed = pack_channels({"R": (occlusion, "R"), "G": (roughness, "G")})
+
+        # Assert
+        assert packed.getSize() == (2, 1)
+        assert bytes(packed.buffer) == bytes([0, 30, 10, 255, 0, 40, 20, 255])  # BGRA
+
+    def test_color_source_channel(self) -> None:
+        """Test that the chosen channel of a color output is taken."""
+        # Arrange
+        basecolor = SDTexture(1, 1, 4, bytes([1, 2, 3, 4]))  # BGRA
+
+        # Act
+        packed = pack_channels({"R": (basecolor, "A"), "A": (basecolor, "B")})
+
+        # Assert
+        assert bytes(packed.buffer) == bytes([0, 0, 4, 1])
+
+    def test_sizes_differ(self) -> None:
+        """Test that outputs of different sizes can't be packed."""
+        # Act & Assert
+        with pytest.raises(ValueError, match="one size"):
+            pack_channels({"R": (SDTexture(2, 2, 1), "R"), "G": (SDTexture(4, 4, 1), "G")})
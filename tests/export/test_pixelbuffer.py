@@ -0,0 +1,86 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from custommipmapsexport.pixelbuffer import get_pixel_layout, get_tex_array, get_tex_view
+
+
+class TestGetPixelLayout:
+    """Test suite for the get_pixel_layout function."""
+
+    @pytest.mark.parametrize(
+        "bpp, channels, itemsize, dtype",
+        [(1, 1, 1, "u1"), (2, 1, 2, "u2"), (4, 4, 1, "u1"), (8, 4, 2, "u2"), (16, 4, 4, "f4")],
+        ids=["L8", "L16", "RGBA8", "RGBA16", "RGBA32F"],
+    )
+    def test_known_sizes(self, bpp: int, channels: int, itemsize: int, dtype: str) -> None:
+        """Test that known pixel sizes map to their layouts."""
+        # Act
+        layout = get_pixel_layout(bpp)
+
+        # Assert
+        assert (layout.channels, layout.itemsize, layout.dtype) == (channels, itemsize, dtype)
+
+    def test_unknown_size(self) -> None:
+        """Test that an unknown pixel size raises an error."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            get_pixel_layout(3)
+
+
+class TestGetTexView:
+    """Test suite for the get_tex_view function."""
+
+    def test_shape_and_format(self, make_texture: Callable[..., Any]) -> None:
+        """Test that the view has the shape (height, width, channels) and the channel format."""
+        # Arrange
+        tex = make_texture(4, 2, 8)
+
+        # Act
+        view = get_tex_view(tex)
+
+        # Assert
+        assert view.shape == (2, 4, 4)
+        assert view.format == "H"
+        assert view.readonly
+
+    def test_no_copy(self, make_texture: Callable[..., Any]) -> None:
+        """Test that the view reflects changes to the underlying buffer."""
+        # Arrange
+        tex = make_texture(2, 2, 4)
+        view = get_tex_view(tex)
+
+        # Act
+        tex.buffer[4] = 200
+
+        # Assert
+        assert view[0, 1, 0] == 200
+
+    def test_keeps_texture_alive(self, make_texture: Callable[..., Any]) -> None:
+        """Test that the view holds a reference to the texture."""
+        # Arrange
+        view = get_tex_view(make_texture(2, 2, 1))
+
+        # Act & Assert
+        assert view.tobytes() == bytes(range(4))
+
+
+class TestGetTexArray:
+    """Test suite for the get_tex_array function."""
+
+    def test_array(self, make_texture: Callable[..., Any]) -> None:
+        """Test that the array shares memory with the texture and is read-only."""
+        # Arrange
+        np = pytest.importorskip("numpy")
+        tex = make_texture(3, 2, 4)
+
+        # Act
+        array = get_tex_array(tex)
+        tex.buffer[0] = 42
+
+        # Assert
+        assert array.shape == (2, 3, 4)
+        assert array.dtype == np.uint8
+        assert array[0, 0, 0] == 42
+        assert not array.flags.writeable
@@ -0,0 +1,89 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from custommipmapsexport import premultiply as premultiply_module
+from custommipmapsexport.pixelbuffer import get_tex_view
+from custommipmapsexport.premultiply import get_premultiply_table, premultiply
+
+np = pytest.importorskip("numpy")
+
+
+def get_pixels(sd_tex: Any) -> Any:
+    """Get the texture's pixels as an array of shape (height, width, channels)."""
+    return np.asarray(get_tex_view(sd_tex))
+
+
+class TestGetPremultiplyTable:
+    """Test suite for the get_premultiply_table function."""
+
+    def test_straight(self) -> None:
+        """Test that colors are scaled by alpha and rounded, keeping them at opaque and zeroing them at transparent."""
+        # Act
+        table = get_premultiply_table()
+
+        # Assert
+        assert table[255 << 8 | 200] == 200
+        assert table[0 << 8 | 200] == 0
+        assert table[128 << 8 | 255] == 128
+        assert table[128 << 8 | 1] == 1
+
+    def test_linear(self) -> None:
+        """Test that the linear color is scaled, which keeps more of the gamma encoded color at partial alpha."""
+        # Act
+        table = get_premultiply_table(linear=True, gamma=2.2)
+
+        # Assert
+        assert table[255 << 8 | 200] == 200
+        assert table[0 << 8 | 200] == 0
+        assert table[128 << 8 | 255] == round(0.5 ** (1 / 2.2) * 255)
+        assert table[128 << 8 | 200] > get_premultiply_table()[128 << 8 | 200]
+
+
+class TestPremultiply:
+    """Test suite for the premultiply function."""
+
+    @pytest.fixture(params=[True, False], ids=["numpy", "pure_python"])
+    def numpy(self, request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Run the test with and without NumPy."""
+        if not request.param:
+            monkeypatch.setattr(premultiply_module, "np", None)
+
+    @pytest.mark.usefixtures("numpy")
+    @pytest.mark.parametrize("linear", [False, True], ids=["straight", "linear"])
+    def test_channels(self, make_texture: Callable[..., Any], linear: bool) -> None:
+        """Test that the color channels are looked up by their pixel's alpha, and alpha is kept."""
+        # Arrange
+        data = bytes(range(256)) * 16
+        tex = make_texture(32, 32, 4, data)
+        table = np.frombuffer(get_premultiply_table(linear=linear), dtype=np.uint8)
+        source = np.frombuffer(data, dtype=np.uint8).reshape(32, 32, 4)
+
+        # Act
+        pixels = get_pixels(premultiply(tex, linear=linear))
+
+        # Assert
+        expected = table[source[..., 3:].astype(np.uint16) << 8 | source[..., :3]]
+        assert (pixels[..., :3] == expected).all()
+        assert (pixels[..., 3] == source[..., 3]).all()
+
+    def test_16bit(self, make_texture: Callable[..., Any]) -> None:
+        """Test that 16-bit textures are premultiplied from their high bytes, to 8 bits per channel."""
+        # Arrange
+        tex = make_texture(2, 1, 8, bytes([0, 200, 0, 100, 0, 50, 0, 128]) * 2)
+
+        # Act
+        result = premultiply(tex)
+
+        # Assert
+        assert result.getBytesPerPixel() == 4
+        assert get_pixels(result)[0, 0].tolist() == [100, 50, 25, 128]
+
+    def test_grayscale_unchanged(self, make_texture: Callable[..., Any]) -> None:
+        """Test that grayscale textures, which have no alpha, are returned as they are."""
+        # Arrange
+        tex = make_texture(4, 4, 1)
+
+        # Act & Assert
+        assert premultiply(tex) is tex
@@ -0,0 +1,85 @@
+import logging
+import pstats
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from custommipmapsexport.graphutils import export_dds_files
+from custommipmapsexport.profiling import PROFILE_ENV, is_profiling_enabled, profile_export
+from custommipmapsexport.timings import StageTimings
+from sd.api.sbs.sdsbscompgraph import SDSBSCompGraph
+
+
+class TestIsProfilingEnabled:
+    """Test suite for the is_profiling_enabled function."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [(None, False), ("1", True), ("True", True), ("on", True), ("0", False), ("", False)],
+        ids=["unset", "one", "true", "on", "zero", "empty"],
+    )
+    def test_values(self, monkeypatch: pytest.MonkeyPatch, value: str | None, expected: bool) -> None:
+        """Test which values of the environment variable enable profiling."""
+        # Arrange
+        if value is None:
+            monkeypatch.delenv(PROFILE_ENV, raising=False)
+        else:
+            monkeypatch.setenv(PROFILE_ENV, value)
+
+        # Act & Assert
+        assert is_profiling_enabled() is expected
+
+
+class TestProfileExport:
+    """Test suite for the profile_export context manager."""
+
+    def test_writes_results(self, tmp_path: Path) -> None:
+        """Test that the profile and the report with stages and allocations are written to the destination."""
+        # Arrange
+        timings = StageTimings()
+
+        # Act
+        with profile_export(tmp_path, timings, "profile"), timings.measure("compute"):
+            data = [bytearray(1024) for _ in range(100)]
+
+        # Assert
+        report = (tmp_path / "profile.txt").read_text()
+        assert pstats.Stats(str(tmp_path / "profile.prof")).total_calls > 0  # type: ignore[attr-defined]
+        assert report.startswith("Stages:\n  compute")
+        assert "allocations still held" in report
+        assert "test_profiling.py" in report
+        assert not tracemalloc.is_tracing()
+        del data
+
+    def test_unwritable_destination(self, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+        """Test that failing to write the results is logged instead of raised."""
+        # Arrange
+        logger = logging.getLogger("MIPmapsExporter")
+        logger.addHandler(handler := caplog.handler)
+
+        # Act
+        try:
+            with profile_export(tmp_path / "missing", StageTimings()):
+                pass
+        finally:
+            logger.removeHandler(handler)
+
+        # Assert
+        assert "Could not write the export profile" in caplog.text
+
+    def test_export_from_environment(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        """Test that the environment variable enables profiling of exports, with the compute time in the report."""
+        # Arrange
+        monkeypatch.setenv(PROFILE_ENV, "1")
+        graph = SDSBSCompGraph(output_size=(5, 5))
+        uid = graph.add_output("basecolor").getIdentifier()
+
+        # Act
+        export_dds_files(graph, [uid], tmp_path, "$(identifier)", "a8r8g8b8")
+
+        # Assert
+        reports = list(tmp_path.glob("*.txt"))
+        assert len(reports) == 1
+        assert reports[0].with_suffix(".prof").is_file()
+        assert "  compute" in reports[0].read_text()
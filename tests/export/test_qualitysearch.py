@@ -0,0 +1,180 @@
+import math
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.qualitysearch import (
+    DXT_QUALITY_LADDER,
+    choose_quality,
+    find_dxt_qualities,
+    fit_resolution,
+    get_dds_size,
+    get_psnr,
+    make_proxy,
+)
+
+np = pytest.importorskip("numpy")
+
+
+def fake_compress(bad_qualities: tuple[str, ...]) -> Callable[..., int]:
+    """Create a fake encoder that writes solid red DXT1 files, or black ones for the given -dxtQuality settings."""
+
+    def compress(files: list[Path], destination: Path, _compression: str, **kwargs: str) -> int:
+        color = b"\x00\x00\x00\x00" if kwargs["-dxtQuality"] in bad_qualities else b"\x00\xf8\x00\xf8"
+        for file in files:
+            source = DDSFile(str(file))
+            n_blocks = (source.meta.width // 4) * (source.meta.height // 4)
+            dds = DDSFile()
+            dds.add_image(0, 32, "dxt1", source.meta.width, source.meta.height, (color + bytes(4)) * n_blocks)
+            dds.save(destination / file.name)
+        return 0
+
+    return compress
+
+
+class TestGetDdsSize:
+    """Test suite for the get_dds_size function."""
+
+    @pytest.mark.parametrize(
+        "width, height, compression, kwargs, expected",
+        [
+            (256, 256, "dxt1", {"-mipMode": "None"}, 128 + 64 * 64 * 8),
+            (256, 256, "dxt5", {"-mipMode": "None"}, 128 + 64 * 64 * 16),
+            (8, 8, "dxt1", {}, 128 + 4 * 8 + 8 + 8 + 8),
+            (4, 2, "a8r8g8b8", {}, 128 + 32 + 8 + 4),
+        ],
+        ids=["dxt1", "dxt5", "dxt1_mipmaps", "uncompressed_mipmaps"],
+    )
+    def test_sizes(self, width: int, height: int, compression: str, kwargs: dict[str, str], expected: int) -> None:
+        """Test the size of files with block compressed and uncompressed formats."""
+        # Act & Assert
+        assert get_dds_size(width, height, compression, **kwargs) == expected
+
+    def test_unknown_format(self) -> None:
+        """Test that an unknown compression raises an error."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            get_dds_size(4, 4, "bc7")
+
+
+class TestFitResolution:
+    """Test suite for the fit_resolution function."""
+
+    @pytest.mark.parametrize(
+        "log2_x, log2_y, size_budget, expected",
+        [(11, 11, 10**7, 11), (11, 11, 700_000, 10), (11, 10, 700_000, 10), (11, 11, 0, 2)],
+        ids=["fits", "halved", "keeps_aspect", "smallest"],
+    )
+    def test_resolution(self, log2_x: int, log2_y: int, size_budget: int, expected: int) -> None:
+        """Test that the largest resolution is picked whose DXT1 file with mipmaps fits into the budget."""
+        # Act & Assert
+        assert fit_resolution(log2_x, log2_y, size_budget, "dxt1") == expected
+
+
+class TestMakeProxy:
+    """Test suite for the make_proxy function."""
+
+    def test_downsampled(self, make_texture: Callable[..., Any]) -> None:
+        """Test that the proxy is box filtered to the maximum size."""
+        # Arrange
+        tex = make_texture(16, 8, 1, bytes(range(128)))
+
+        # Act
+        proxy = make_proxy(tex, size=4)
+
+        # Assert
+        assert proxy.shape == (4, 8, 1)  # Not smaller than a block.
+        assert proxy[0, 0, 0] == round((0 + 1 + 16 + 17) / 4)
+
+    def test_16bit(self, make_texture: Callable[..., Any]) -> None:
+        """Test that 16-bit textures are downsampled from the high bytes of their channels."""
+        # Arrange
+        tex = make_texture(64, 64, 8, bytes([0, 10, 0, 20, 0, 30, 0, 255]) * 64 * 64)  # RGBA16 as BGRA
+
+        # Act
+        proxy = make_proxy(tex, size=16)
+
+        # Assert
+        assert proxy.shape == (16, 16, 4)
+        assert (proxy == [10, 20, 30, 255]).all()
+
+    def test_small_texture(self, make_texture: Callable[..., Any]) -> None:
+        """Test that textures within the size are used as they are."""
+        # Arrange
+        tex = make_texture(4, 4, 4)
+
+        # Act & Assert
+        assert make_proxy(tex).shape == (4, 4, 4)
+
+
+class TestGetPsnr:
+    """Test suite for the get_psnr function."""
+
+    def test_identical(self) -> None:
+        """Test that identical pixels have an infinite PSNR."""
+        # Arrange
+        pixels = np.zeros((4, 4, 3), dtype=np.uint8)
+
+        # Act & Assert
+        assert get_psnr(pixels, pixels) == math.inf
+
+    def test_error(self) -> None:
+        """Test the PSNR of a known mean squared error."""
+        # Arrange
+        reference = np.zeros((4, 4, 3), dtype=np.uint8)
+
+        # Act & Assert
+        assert get_psnr(reference, reference + 1) == pytest.approx(20 * math.log10(255))
+
+
+class TestChooseQuality:
+    """Test suite for the choose_quality function."""
+
+    @pytest.mark.parametrize(
+        "scores, expected",
+        [([30, 35, 40, 41, 41], "normal"), ([20, 21, 22, 23, 23], "uber"), ([20, 30, 25, 25, 25], "fast")],
+        ids=["fastest_reaching", "best_prefers_slower", "best"],
+    )
+    def test_choice(self, scores: list[float], expected: str) -> None:
+        """Test that the fastest setting reaching 40 dB is chosen, or the best scoring one."""
+        # Act & Assert
+        assert choose_quality(scores, 40) == expected
+
+
+class TestFindDxtQualities:
+    """Test suite for the find_dxt_qualities function."""
+
+    @pytest.mark.parametrize(
+        ("bytes_per_pixel", "pixel"),
+        [(4, b"\x00\x00\xff\xff"), (8, b"\x00\x00\x00\x00\xff\xff\xff\xff")],
+        ids=["8bit", "16bit"],
+    )
+    @patch("custommipmapsexport.qualitysearch.compress_files")
+    def test_fastest_reaching(
+        self, mock_compress: MagicMock, make_texture: Callable[..., Any], bytes_per_pixel: int, pixel: bytes
+    ) -> None:
+        """Test that each setting is tried once for all textures and the fastest good enough one is chosen."""
+        # Arrange
+        mock_compress.side_effect = fake_compress(bad_qualities=("superfast", "fast"))
+        red = make_texture(8, 8, bytes_per_pixel, pixel * 64)  # BGRA
+
+        # Act
+        qualities = find_dxt_qualities([red, red], "dxt1", 40.0, **{"-dxtQuality": "uber", "-maxmips": "4"})
+
+        # Assert
+        assert qualities == ["normal", "normal"]
+        assert mock_compress.call_count == len(DXT_QUALITY_LADDER)
+        assert all(call.kwargs["-mipMode"] == "None" for call in mock_compress.call_args_list)
+        assert sorted(call.kwargs["-dxtQuality"] for call in mock_compress.call_args_list) == sorted(DXT_QUALITY_LADDER)
+
+    @pytest.mark.parametrize("compression", ["a8r8g8b8", "dxt5_xgbr", "etc1"])
+    @patch("custommipmapsexport.qualitysearch.compress_files")
+    def test_unsupported(self, mock_compress: MagicMock, compression: str, make_texture: Callable[..., Any]) -> None:
+        """Test that formats without settings or without a decoder aren't searched."""
+        # Act & Assert
+        assert find_dxt_qualities([make_texture(4, 4, 4)], compression, 40.0) is None
+        mock_compress.assert_not_called()
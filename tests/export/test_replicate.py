@@ -0,0 +1,120 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from custommipmapsexport import replicate
+from custommipmapsexport.replicate import copy_data, replicate_file, replicate_files
+
+
+@pytest.fixture
+def source(tmp_path: Path) -> Path:
+    """Create a file of a few MiB in a source directory."""
+    (tmp_path / "source").mkdir()
+    filepath = tmp_path / "source" / "albedo.dds"
+    filepath.write_bytes(os.urandom(3 * replicate.COPY_CHUNK + 5))
+    return filepath
+
+
+class TestCopyData:
+    """Test suite for the copy_data function."""
+
+    def test_fastest_method(self, source: Path, tmp_path: Path) -> None:
+        """Test that the file is copied completely with whichever method the file system supports."""
+        # Act
+        method = copy_data(source, tmp_path / "copy.dds")
+
+        # Assert
+        assert method in {"reflink", "copy_file_range", "copy"}
+        assert (tmp_path / "copy.dds").read_bytes() == source.read_bytes()
+
+    @patch("custommipmapsexport.replicate.fcntl", None)
+    def test_copy_file_range_failure(self, source: Path, tmp_path: Path) -> None:
+        """Test that a failed in-kernel copy starts over with a buffered copy, replacing the partial data."""
+        # Arrange
+        target = tmp_path / "copy.dds"
+        target.write_bytes(b"old" * 10)
+
+        def copy_file_range(src: int, dst: int, count: int) -> int:
+            if os.lseek(dst, 0, os.SEEK_CUR):
+                raise OSError(18, "Invalid cross-device link")
+            return os.write(dst, os.read(src, min(count, 100)))
+
+        # Act
+        with patch("os.copy_file_range", copy_file_range, create=True):
+            method = copy_data(source, target)
+
+        # Assert
+        assert method == "copy"
+        assert target.read_bytes() == source.read_bytes()
+
+
+class TestReplicateFile:
+    """Test suite for the replicate_file function."""
+
+    def test_hard_link(self, source: Path, tmp_path: Path) -> None:
+        """Test that the target is replaced with a hard link on the same file system, without temporary files left."""
+        # Arrange
+        target = tmp_path / "albedo.dds"
+        target.write_bytes(b"previous export")
+
+        # Act
+        method = replicate_file(source, target)
+
+        # Assert
+        assert method == "link"
+        assert target.samefile(source)
+        assert [path.name for path in tmp_path.iterdir() if path.is_file()] == ["albedo.dds"]
+
+    @patch("os.link", side_effect=OSError(18, "Invalid cross-device link"))
+    def test_copy_without_links(self, mock_link: object, source: Path, tmp_path: Path) -> None:
+        """Test that the file is copied where it can't be linked."""
+        # Act
+        method = replicate_file(source, tmp_path / "albedo.dds")
+
+        # Assert
+        assert method != "link"
+        assert not (tmp_path / "albedo.dds").samefile(source)
+        assert (tmp_path / "albedo.dds").read_bytes() == source.read_bytes()
+
+    def test_copy_without_link(self, source: Path, tmp_path: Path) -> None:
+        """Test that the file is copied if it mustn't be linked, even on the same file system."""
+        # Act
+        method = replicate_file(source, tmp_path / "textures.mipa", link=False)
+
+        # Assert
+        assert method != "link"
+        assert not (tmp_path / "textures.mipa").samefile(source)
+        assert (tmp_path / "textures.mipa").read_bytes() == source.read_bytes()
+
+    @patch("custommipmapsexport.replicate.copy_data", side_effect=OSError(28, "No space left on device"))
+    @patch("os.link", side_effect=OSError(18, "Invalid cross-device link"))
+    def test_failure_keeps_target(self, mock_link: object, mock_copy: object, source: Path, tmp_path: Path) -> None:
+        """Test that a failed copy leaves the previous target intact and removes the temporary file."""
+        # Arrange
+        target = tmp_path / "albedo.dds"
+        target.write_bytes(b"previous export")
+
+        # Act & Assert
+        with pytest.raises(OSError, match="No space"):
+            replicate_file(source, target)
+        assert target.read_bytes() == b"previous export"
+        assert not (tmp_path / ".albedo.dds.tmp").exists()
+
+
+class TestReplicateFiles:
+    """Test suite for the replicate_files function."""
+
+    def test_destinations(self, source: Path, tmp_path: Path) -> None:
+        """Test that the files are replicated to each new destination, skipping the source and repeated ones."""
+        # Arrange
+        destinations = [source.parent, tmp_path / "cache", tmp_path / "preview" / "textures", tmp_path / "cache"]
+
+        # Act
+        methods = replicate_files(source.parent, destinations, [source.name], max_workers=2)
+
+        # Assert
+        assert sum(methods.values()) == 2
+        assert (tmp_path / "cache" / "albedo.dds").read_bytes() == source.read_bytes()
+        assert (tmp_path / "preview" / "textures" / "albedo.dds").read_bytes() == source.read_bytes()
@@ -0,0 +1,89 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from custommipmapsexport.ddsfile import DDSError, DDSFile
+from custommipmapsexport.streaming import StreamedLevel, read_offset_table, split_mips
+
+SIZES = [(16, 8), (8, 4), (4, 2), (2, 1), (1, 1)]
+
+
+def write_mip_chain(filepath: Path) -> list[bytes]:
+    """Write a DDS file with a full RGBA mip chain of random pixels and return the levels' data."""
+    dds = DDSFile()
+    levels = [os.urandom(width * height * 4) for width, height in SIZES]
+    for level, ((width, height), data) in enumerate(zip(SIZES, levels, strict=True)):
+        dds.add_image(level, 32, "rgba", width, height, data)
+    dds.save(filepath)
+    return levels
+
+
+class TestSplitMips:
+    """Test suite for the split_mips function."""
+
+    def test_chunks(self, tmp_path: Path) -> None:
+        """Test that the top levels are moved to files of their own and the DDS file keeps the mip tail."""
+        # Arrange
+        filepath = tmp_path / "tex.dds"
+        levels = write_mip_chain(filepath)
+
+        # Act
+        streamed = split_mips(filepath, 2)
+
+        # Assert
+        assert streamed == [StreamedLevel(0, 16, 8, 0, 512), StreamedLevel(1, 8, 4, 0, 128)]
+        assert sorted(path.name for path in tmp_path.iterdir()) == ["tex.dds", "tex.mip0", "tex.mip1"]
+        assert [(tmp_path / f"tex.mip{level}").read_bytes() for level in range(2)] == levels[:2]
+        tail = DDSFile(str(filepath))
+        assert (tail.meta.width, tail.meta.height, tail.count) == (4, 2, 3)
+        assert tail.images == levels[2:]
+
+    def test_single(self, tmp_path: Path) -> None:
+        """Test that the mip tail loads as a DDS file, and the offset table points at the split levels."""
+        # Arrange
+        filepath = tmp_path / "tex.dds"
+        levels = write_mip_chain(filepath)
+
+        # Act
+        streamed = split_mips(filepath, 2, layout="single")
+
+        # Assert
+        assert [path.name for path in tmp_path.iterdir()] == ["tex.dds"]
+        assert read_offset_table(filepath) == streamed
+        data = filepath.read_bytes()
+        assert [data[entry.offset : entry.offset + entry.size] for entry in streamed] == levels[:2]
+        assert DDSFile(str(filepath)).images == levels[2:]
+
+    def test_keeps_smallest_level(self, tmp_path: Path) -> None:
+        """Test that more streamed levels than the file has leave the smallest level in the mip tail."""
+        # Arrange
+        filepath = tmp_path / "tex.dds"
+        write_mip_chain(filepath)
+
+        # Act
+        streamed = split_mips(filepath, 10)
+
+        # Assert
+        assert len(streamed) == len(SIZES) - 1
+        assert DDSFile(str(filepath)).size == (1, 1)
+
+    def test_unknown_layout(self, tmp_path: Path) -> None:
+        """Test that an unknown layout is rejected."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            split_mips(tmp_path / "tex.dds", 1, layout="zip")
+
+
+class TestReadOffsetTable:
+    """Test suite for the read_offset_table function."""
+
+    def test_no_table(self, tmp_path: Path) -> None:
+        """Test that a file without offset table raises an error."""
+        # Arrange
+        filepath = tmp_path / "tex.dds"
+        write_mip_chain(filepath)
+
+        # Act & Assert
+        with pytest.raises(DDSError):
+            read_offset_table(filepath)
@@ -0,0 +1,80 @@
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custommipmapsexport.ddsfile import DDSError, DDSFile
+from custommipmapsexport.texturearray import combine_layers, encode_layers, validate_layers
+
+
+def write_layer(filepath: Path, value: int, size: int = 4) -> Path:
+    """Write a DDS file with two DXT1 mipmap levels filled with the value."""
+    dds = DDSFile()
+    dds.add_image(0, 32, "dxt1", size, size, bytes([value]) * (size * size // 2))
+    dds.add_image(1, 32, "dxt1", size // 2, size // 2, bytes([value]) * 8)
+    dds.save(filepath)
+    return filepath
+
+
+class TestValidateLayers:
+    """Test suite for the validate_layers function."""
+
+    @pytest.mark.parametrize(
+        ("compression", "file_format", "n_layers", "cubemap"),
+        [("dxt1", "ktx", 2, False), ("r8g8b8", "dds", 2, False), ("dxt5", "dds", 0, False), ("dxt5", "dds", 5, True)],
+        ids=["container", "no_dxgi_format", "no_outputs", "missing_faces"],
+    )
+    def test_invalid(self, compression: str, file_format: str, n_layers: int, cubemap: bool) -> None:
+        """Test that settings which can't be combined into one file raise an error before any output is computed."""
+        # Act & Assert
+        with pytest.raises(ValueError):
+            validate_layers(compression, file_format, n_layers, cubemap=cubemap)
+
+    def test_valid(self) -> None:
+        """Test that two cubes of compressed faces are accepted."""
+        # Act & Assert
+        validate_layers("dxt1", "dds", 12, cubemap=True)
+
+
+class TestEncodeLayers:
+    """Test suite for the encode_layers function."""
+
+    @patch("custommipmapsexport.texturearray.compress_files", return_value=0)
+    def test_one_process_per_file(self, mock_compress: MagicMock, tmp_path: Path) -> None:
+        """Test that each file is encoded on its own and the results keep the order of the files."""
+        # Arrange
+        files = [tmp_path / f"layer{index}.tga" for index in range(3)]
+
+        # Act
+        encoded = encode_layers(files, tmp_path, "dxt1", max_workers=2, mipMode="Generate")
+
+        # Assert
+        assert encoded == [tmp_path / f"layer{index}.dds" for index in range(3)]
+        assert sorted(call.args[0][0] for call in mock_compress.call_args_list) == files
+        assert all(call.kwargs == {"mipMode": "Generate"} for call in mock_compress.call_args_list)
+
+
+class TestCombineLayers:
+    """Test suite for the combine_layers function."""
+
+    def test_cubemap(self, tmp_path: Path) -> None:
+        """Test that six files become the faces of a cubemap, in the order of the files."""
+        # Arrange
+        files = [write_layer(tmp_path / f"face{index}.dds", index) for index in range(6)]
+
+        # Act
+        combine_layers(files, tmp_path / "cube.dds", cubemap=True)
+        loaded = DDSFile(str(tmp_path / "cube.dds"))
+
+        # Assert
+        assert loaded.cubemap
+        assert [bytes(loaded.get_image(1, layer)) for layer in range(6)] == [bytes([index]) * 8 for index in range(6)]
+
+    def test_mismatched_sizes(self, tmp_path: Path) -> None:
+        """Test that files of different sizes can't be combined."""
+        # Arrange
+        files = [write_layer(tmp_path / "small.dds", 0), write_layer(tmp_path / "large.dds", 1, size=8)]
+
+        # Act & Assert
+        with pytest.raises(DDSError):
+            combine_layers(files, tmp_path / "array.dds")
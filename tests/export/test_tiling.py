@@ -0,0 +1,150 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custommipmapsexport import tiling
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.dxt import encode_solid_block
+from custommipmapsexport.intermediate import write_intermediate
+from custommipmapsexport.pixelbuffer import ArrayTexture
+from custommipmapsexport.tiling import can_encode_tiled, encode_tiled, get_tile_level_count, stitch_blocks
+from custommipmapsexport.uncompressed import DEFAULT_GAMMA, generate_mipmaps, get_mip_count
+
+np = pytest.importorskip("numpy")
+
+
+def fake_compress(files: list[Path], destination: Path, compression: str, **kwargs: str) -> int:
+    """Fake encoder that encodes each block independently, as a solid block of its top left pixel."""
+    fmt = tiling.TILED_FORMATS[compression]
+    for file in files:
+        source = DDSFile(str(file))
+        width, height = source.meta.width, source.meta.height
+        pixels = np.frombuffer(source.images[0], dtype=np.uint8).reshape(height, width, -1)
+        blocks = bytearray()
+        for y in range(0, height, 4):
+            for x in range(0, width, 4):
+                pixel = pixels[y, x]
+                rgba = (pixel[0],) * 3 + (255,) if len(pixel) == 1 else (pixel[2], pixel[1], pixel[0], pixel[3])
+                blocks += encode_solid_block(tuple(int(value) for value in rgba), fmt)  # type: ignore[arg-type]
+        dds = DDSFile()
+        dds.add_image(0, 32, fmt, width, height, blocks)
+        dds.save(destination / file.name)
+    return 0
+
+
+@pytest.fixture
+def small_tiles(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Shrink the tiles, so small textures are split into several tiles with a few levels each."""
+    monkeypatch.setattr(tiling, "TILE_SIZE", 16)
+    monkeypatch.setattr(tiling, "MIN_TILE_LEVEL_SIZE", 4)
+    monkeypatch.setattr(tiling, "MIN_TILED_SIZE", 32)
+
+
+class TestCanEncodeTiled:
+    """Test suite for the can_encode_tiled function."""
+
+    @pytest.mark.parametrize(
+        "size, compression, file_format, expected",
+        [
+            ((16384, 8192), "dxt5", "dds", True),
+            ((8192, 8192), "dxt1a", "dds", True),
+            ((4096, 8192), "dxt5", "dds", False),
+            ((8192, 9000), "dxt5", "dds", False),
+            ((8192, 8192), "dxt5a", "dds", False),
+            ((8192, 8192), "dxt5", "ktx", False),
+        ],
+        ids=["large", "dxt1a", "too_small", "not_aligned", "unsupported_format", "other_container"],
+    )
+    def test_textures(self, size: tuple[int, int], compression: str, file_format: str, expected: bool) -> None:
+        """Test that only large, tile aligned textures in S3TC formats are encoded as tiles."""
+        # Arrange
+        sd_tex = MagicMock(**{"getSize.return_value": size})
+
+        # Act & Assert
+        assert can_encode_tiled(sd_tex, compression, file_format) == expected
+
+
+class TestGetTileLevelCount:
+    """Test suite for the get_tile_level_count function."""
+
+    @pytest.mark.parametrize("count, expected", [(14, 6), (3, 3), (1, 1)], ids=["full_chain", "max_mips", "no_mips"])
+    def test_levels(self, count: int, expected: int) -> None:
+        """Test that tiles are encoded down to MIN_TILE_LEVEL_SIZE, but not beyond the texture's levels."""
+        # Act & Assert
+        assert get_tile_level_count(count) == expected
+
+
+class TestStitchBlocks:
+    """Test suite for the stitch_blocks function."""
+
+    def test_rows(self) -> None:
+        """Test that each block row of the tile lands in its row of the level."""
+        # Arrange
+        target = bytearray(4 * 2 * 8)  # 16x8 pixels of DXT1.
+        blocks = bytes(range(2 * 2 * 8))  # 8x8 pixels.
+
+        # Act
+        stitch_blocks(target, blocks, 8, 0, 8, 16, "dxt1")
+
+        # Assert
+        assert target[16:32] == blocks[:16]
+        assert target[48:64] == blocks[16:]
+        assert not any(target[:16] + target[32:48])
+
+
+class TestEncodeTiled:
+    """Test suite for the encode_tiled function."""
+
+    @pytest.mark.parametrize(
+        "bytes_per_pixel, compression, kwargs",
+        [
+            (4, "dxt5", {}),
+            (4, "dxt1", {"-gamma": "1.0", "-maxmips": "4"}),
+            (1, "dxt1", {}),
+            (4, "dxt3", {"-mipMode": "None"}),
+            (8, "dxt5", {}),
+        ],
+        ids=["color", "settings", "grayscale", "no_mipmaps", "16bit"],
+    )
+    @pytest.mark.usefixtures("small_tiles")
+    @patch("custommipmapsexport.tiling.compress_files", side_effect=fake_compress)
+    def test_same_as_whole(
+        self,
+        mock_compress: MagicMock,
+        bytes_per_pixel: int,
+        compression: str,
+        kwargs: dict[str, str],
+        make_texture: Callable[..., Any],
+        tmp_path: Path,
+    ) -> None:
+        """Test that the stitched blocks are identical to encoding the whole texture's levels one by one."""
+        # Arrange
+        rng = np.random.default_rng(0)
+        channels = 1 if bytes_per_pixel == 1 else 4
+        pixels = rng.integers(0, 256, (32, 64, channels), dtype=np.uint8)
+        if bytes_per_pixel > channels:  # 16-bit channels with the pixels as high bytes.
+            low_bytes = rng.integers(0, 256, pixels.shape, dtype=np.uint8)
+            sd_tex = make_texture(64, 32, bytes_per_pixel, np.stack([low_bytes, pixels], axis=-1).tobytes())
+        else:
+            sd_tex = make_texture(64, 32, bytes_per_pixel, pixels.tobytes())
+        count = get_mip_count(64, 32, **kwargs)
+        gamma = float(kwargs.get("-gamma", DEFAULT_GAMMA))
+        levels = generate_mipmaps(pixels, count, gamma, alpha=3 if channels == 4 else None)
+
+        # Act
+        filepath = encode_tiled(tmp_path / "tiled.dds", sd_tex, compression, tmp_path, max_workers=2, **kwargs)
+
+        # Assert
+        (tmp_path / "whole").mkdir()
+        files = [write_intermediate(tmp_path / f"{i}.dds", ArrayTexture(level)) for i, level in enumerate(levels)]
+        fake_compress(files, tmp_path / "whole", compression)
+        expected = [DDSFile(str(tmp_path / "whole" / file.name)).images[0] for file in files]
+        dds = DDSFile(str(filepath))
+        assert dds.count == count
+        assert [bytes(image) for image in dds.images] == [bytes(image) for image in expected]
+        assert mock_compress.call_count == 8 + (count > 3)  # A call per tile, and one for the levels below 4x4 tiles.
+        assert all(call.kwargs["-mipMode"] == "None" for call in mock_compress.call_args_list)
+        assert [path.name for path in tmp_path.iterdir() if path.name.startswith("tiles_")] == []
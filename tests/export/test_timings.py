@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+import pytest
+
+from custommipmapsexport.timings import StageTimings
+
+
+class TestStageTimings:
+    """Test suite for the StageTimings class."""
+
+    @patch("custommipmapsexport.timings.time.perf_counter", side_effect=[1.0, 1.5, 2.0, 2.25, 3.0, 4.0])
+    def test_accumulates(self, mock_perf_counter: object) -> None:
+        """Test that repeated stages add up and stages keep the order they were first entered in."""
+        # Arrange
+        timings = StageTimings()
+
+        # Act
+        for stage in ("encode", "fetch", "encode"):
+            with timings.measure(stage):
+                pass
+
+        # Assert
+        assert timings.as_dict() == {"encode": 1.5, "fetch": 0.25}
+        assert timings.total == 1.75
+
+    def test_measures_on_error(self) -> None:
+        """Test that the time is recorded even if the stage raises an error."""
+        # Arrange
+        timings = StageTimings()
+
+        # Act
+        with pytest.raises(RuntimeError), timings.measure("compute"):
+            raise RuntimeError
+
+        # Assert
+        assert "compute" in timings.seconds
@@ -0,0 +1,192 @@
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from custommipmapsexport import uncompressed
+from custommipmapsexport.ddsfile import DDSFile
+from custommipmapsexport.uncompressed import (
+    can_export_uncompressed,
+    export_uncompressed,
+    generate_mipmaps,
+    get_mip_count,
+    reorder_channels,
+)
+
+
+class TestGetMipCount:
+    """Test suite for the get_mip_count function."""
+
+    @pytest.mark.parametrize(
+        "size, kwargs, expected",
+        [
+            ((256, 256), {}, 9),
+            ((256, 64), {}, 9),
+            ((256, 256), {"-maxmips": "4"}, 4),
+            ((256, 256), {"-mipMode": "None"}, 1),
+            ((1, 1), {}, 1),
+        ],
+        ids=["full_chain", "non_square", "max_mips", "no_mipmaps", "single_pixel"],
+    )
+    def test_count(self, size: tuple[int, int], kwargs: dict[str, str], expected: int) -> None:
+        """Test the number of levels for the encoder's mipmap arguments."""
+        # Act & Assert
+        assert get_mip_count(*size, **kwargs) == expected
+
+
+class TestReorderChannels:
+    """Test suite for the reorder_channels function."""
+
+    @pytest.mark.parametrize(
+        "source, target, pixels, expected",
+        [
+            ("BGRA", "BGRA", b"\x01\x02\x03\x04", b"\x01\x02\x03\x04"),
+            ("BGRA", "BGR", b"\x01\x02\x03\x04\x05\x06\x07\x08", b"\x01\x02\x03\x05\x06\x07"),
+            ("RGBA", "BGRA", b"\x01\x02\x03\x04", b"\x03\x02\x01\x04"),
+            ("BGRA", "A", b"\x01\x02\x03\x04\x05\x06\x07\x08", b"\x04\x08"),
+            ("L", "BGRA", b"\x10\x20", b"\x10\x10\x10\xff\x20\x20\x20\xff"),
+            ("L", "LA", b"\x10", b"\x10\xff"),
+        ],
+        ids=["same", "drop_alpha", "swap_red_blue", "alpha_only", "gray_to_color", "gray_add_alpha"],
+    )
+    def test_reorder(self, source: str, target: str, pixels: bytes, expected: bytes) -> None:
+        """Test picking source channels into the target order."""
+        # Act & Assert
+        assert bytes(reorder_channels(pixels, source, target)) == expected
+
+    def test_luminance(self) -> None:
+        """Test computing the luma of color pixels."""
+        # Arrange
+        pytest.importorskip("numpy")
+
+        # Act
+        result = reorder_channels(b"\xff\xff\xff\x80\x00\x00\x00\x80\x00\xff\x00\x00", "BGRA", "LA")
+
+        # Assert
+        assert bytes(result) == b"\xff\x80\x00\x80\xb6\x00"
+
+
+class TestGenerateMipmaps:
+    """Test suite for the generate_mipmaps function."""
+
+    def test_box_filter(self) -> None:
+        """Test that each level averages 2x2 pixels of the previous level."""
+        # Arrange
+        np = pytest.importorskip("numpy")
+        pixels = np.array([[[0], [255]], [[255], [0]]], dtype=np.uint8)
+
+        # Act
+        levels = generate_mipmaps(pixels, 2, gamma=1.0)
+
+        # Assert
+        assert [level.shape for level in levels] == [(2, 2, 1), (1, 1, 1)]
+        assert levels[1][0, 0, 0] == 128
+
+    def test_gamma_correct(self) -> None:
+        """Test that color channels are averaged in linear space, but alpha is not."""
+        # Arrange
+        np = pytest.importorskip("numpy")
+        pixels = np.array([[[0, 0], [255, 255]]], dtype=np.uint8)
+
+        # Act
+        levels = generate_mipmaps(pixels, 2, gamma=2.2, alpha=1)
+
+        # Assert
+        assert levels[1][0, 0, 0] == round(0.5 ** (1 / 2.2) * 255)
+        assert levels[1][0, 0, 1] == 128
+
+    def test_non_square(self) -> None:
+        """Test that the shorter side stops at one pixel."""
+        # Arrange
+        np = pytest.importorskip("numpy")
+        pixels = np.zeros((1, 8, 4), dtype=np.uint8)
+
+        # Act
+        levels = generate_mipmaps(pixels, 4)
+
+        # Assert
+        assert [level.shape[:2] for level in levels] == [(1, 8), (1, 4), (1, 2), (1, 1)]
+
+
+class TestCanExportUncompressed:
+    """Test suite for the can_export_uncompressed function."""
+
+    def test_compressed_format(self, make_texture: Callable[..., Any]) -> None:
+        """Test that block compressed formats need the encoder."""
+        # Act & Assert
+        assert not can_export_uncompressed(make_texture(4, 4, 4), "dxt1")
+
+    @pytest.mark.parametrize(
+        "bpp, compression, kwargs, expected",
+        [
+            (4, "a8r8g8b8", {"-mipMode": "None"}, True),
+            (4, "a8r8g8b8", {}, False),
+            (4, "l8", {"-mipMode": "None"}, False),
+            (1, "l8", {"-mipMode": "None"}, True),
+            (16, "r8g8b8", {"-mipMode": "None"}, False),
+        ],
+        ids=["reorder_only", "mipmaps", "luminance_of_color", "luminance_of_gray", "float"],
+    )
+    def test_without_numpy(
+        self,
+        make_texture: Callable[..., Any],
+        monkeypatch: pytest.MonkeyPatch,
+        bpp: int,
+        compression: str,
+        kwargs: dict[str, str],
+        expected: bool,
+    ) -> None:
+        """Test that only byte picking is done in-process when NumPy is missing."""
+        # Arrange
+        monkeypatch.setattr(uncompressed, "np", None)
+
+        # Act & Assert
+        assert can_export_uncompressed(make_texture(4, 4, bpp), compression, **kwargs) is expected
+
+
+class TestExportUncompressed:
+    """Test suite for the export_uncompressed function."""
+
+    @pytest.mark.parametrize(
+        "bpp, compression, dxt, bytes_per_pixel",
+        [(4, "a8r8g8b8", "rgba", 4), (4, "r8g8b8", "rgba", 3), (4, "a8", "alpha", 1), (1, "l8", "luminance", 1)],
+        ids=["a8r8g8b8", "r8g8b8", "a8", "l8"],
+    )
+    def test_without_mipmaps(
+        self,
+        make_texture: Callable[..., Any],
+        tmp_path: Path,
+        bpp: int,
+        compression: str,
+        dxt: str,
+        bytes_per_pixel: int,
+    ) -> None:
+        """Test exporting the base level only."""
+        # Arrange
+        tex = make_texture(8, 4, bpp)
+
+        # Act
+        result = export_uncompressed(tmp_path / "out.dds", tex, compression, **{"-mipMode": "None"})
+
+        # Assert
+        dds = DDSFile(result)
+        assert dds.dxt == dxt
+        assert dds.meta.pf_rgbBitCount == bytes_per_pixel * 8
+        assert len(dds.images) == 1
+        assert len(dds.images[0]) == 8 * 4 * bytes_per_pixel
+
+    def test_mipmaps(self, make_texture: Callable[..., Any], tmp_path: Path) -> None:
+        """Test exporting a full mipmap chain from a 16-bit texture."""
+        # Arrange
+        pytest.importorskip("numpy")
+        tex = make_texture(16, 8, 8)
+
+        # Act
+        result = export_uncompressed(tmp_path / "out.dds", tex, "a8l8")
+
+        # Assert
+        dds = DDSFile(result)
+        assert dds.dxt == "luminance_alpha"
+        assert dds.images_size == [(16, 8), (8, 4), (4, 2), (2, 1), (1, 1)]
+        assert [len(image) for image in dds.images] == [w * h * 2 for w, h in dds.images_size]
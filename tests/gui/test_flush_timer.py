@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+from PySide6 import QtCore, QtTest
+
+from custommipmapsexport.logger import (
+    FLUSH_INTERVAL_MS,
+    MainThreadHandler,
+    logger,
+    setup_logger,
+    shutdown_logger,
+    start_flush_timer,
+)
+
+
+class ListHandler(logging.Handler):
+    """Handler that collects the messages of its records and the threads that handled them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+        self.threads: list[threading.Thread] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+        self.threads.append(threading.current_thread())
+
+
+@pytest.fixture
+def handler() -> Iterator[ListHandler]:
+    """Set up the logger with a collecting handler and an event loop, and shut the logger down afterwards."""
+    _ = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    handler = ListHandler()
+    setup_logger(handler)
+    yield handler
+    shutdown_logger()
+
+
+class TestFlushTimer:
+    """Test suite for the start_flush_timer function."""
+
+    def test_event_loop_flushes(self, handler: ListHandler) -> None:
+        """Test that queued records reach the handler on the main thread once the event loop runs."""
+        # Arrange
+        start_flush_timer()
+        worker = threading.Thread(target=logger.warning, args=("worker",))
+
+        # Act
+        logger.warning("main")
+        worker.start()
+        worker.join()
+        before_events = list(handler.messages)
+        deadline = time.monotonic() + 2
+        while len(handler.messages) < 2 and time.monotonic() < deadline:
+            QtTest.QTest.qWait(FLUSH_INTERVAL_MS)
+
+        # Assert
+        assert before_events == []
+        assert handler.messages == ["main", "worker"]
+        assert handler.threads == [threading.main_thread()] * 2
+
+    def test_stopped_on_shutdown(self, handler: ListHandler) -> None:
+        """Test that shutting down the logger stops the timer."""
+        # Arrange
+        start_flush_timer()
+        main_handler = next(h for h in logger.handlers if isinstance(h, MainThreadHandler))
+
+        # Act
+        shutdown_logger()
+
+        # Assert
+        assert main_handler.timer is None
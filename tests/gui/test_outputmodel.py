@@ -0,0 +1,108 @@
+import pytest
+from PySide6 import QtCore, QtTest
+
+from custommipmapsexport.outputmodel import FETCH_BATCH_SIZE, OutputTreeModel
+
+CHECKED = QtCore.Qt.CheckState.Checked
+UNCHECKED = QtCore.Qt.CheckState.Unchecked
+PARTIALLY_CHECKED = QtCore.Qt.CheckState.PartiallyChecked
+CHECK_STATE_ROLE = QtCore.Qt.ItemDataRole.CheckStateRole
+
+
+@pytest.fixture
+def model() -> OutputTreeModel:
+    """Model with two groups of outputs, all of them fetched."""
+    model = OutputTreeModel()
+    model.set_groups({"default": [("base", "1"), ("normal", "2")], "masks": [("mask", "3")]})
+    for row in range(model.rowCount()):
+        model.fetchMore(model.index(row, 0))
+    return model
+
+
+class TestOutputTreeModel:
+    """Test suite for the OutputTreeModel class."""
+
+    def test_consistency(self, model: OutputTreeModel) -> None:
+        """Test that the model passes Qt's model consistency checks."""
+        # Act & Assert
+        QtTest.QAbstractItemModelTester(model, QtTest.QAbstractItemModelTester.FailureReportingMode.Fatal)
+
+    def test_all_checked_by_default(self, model: OutputTreeModel) -> None:
+        """Test that new outputs are checked and the display text is the identifier."""
+        # Act
+        output_index = model.index(1, 0, model.index(0, 0))
+
+        # Assert
+        assert model.get_checked_uids() == ["1", "2", "3"]
+        assert output_index.data() == "normal"
+        assert model.get_uid(output_index) == "2"
+        assert model.get_uid(model.index(0, 0)) is None
+
+    def test_uncheck_output(self, model: OutputTreeModel) -> None:
+        """Test that unchecking an output updates its group's check state."""
+        # Arrange
+        group_index = model.index(0, 0)
+
+        # Act
+        model.setData(model.index(0, 0, group_index), UNCHECKED.value, CHECK_STATE_ROLE)
+
+        # Assert
+        assert model.get_checked_uids() == ["2", "3"]
+        assert model.data(group_index, CHECK_STATE_ROLE) == PARTIALLY_CHECKED
+
+    def test_check_group(self, model: OutputTreeModel) -> None:
+        """Test that checking a group checks all of its outputs."""
+        # Arrange
+        model.set_all_checked(checked=False)
+        group_index = model.index(0, 0)
+
+        # Act
+        model.setData(group_index, CHECKED.value, CHECK_STATE_ROLE)
+
+        # Assert
+        assert model.get_checked_uids() == ["1", "2"]
+        assert model.data(group_index, CHECK_STATE_ROLE) == CHECKED
+        assert model.data(model.index(1, 0), CHECK_STATE_ROLE) == UNCHECKED
+
+    def test_checked_in_tree_order(self, model: OutputTreeModel) -> None:
+        """Test that outputs are returned in tree order, regardless of the order they were checked in."""
+        # Arrange
+        model.set_all_checked(checked=False)
+
+        # Act
+        model.set_output_checked(1, 0, checked=True)
+        model.set_output_checked(0, 1, checked=True)
+        model.set_output_checked(0, 0, checked=True)
+
+        # Assert
+        assert model.get_checked_uids() == ["1", "2", "3"]
+
+    def test_keep_unchecked_on_reset(self, model: OutputTreeModel) -> None:
+        """Test that unchecked outputs stay unchecked when the outputs are replaced, and new ones get checked."""
+        # Arrange
+        model.set_output_checked(0, 1, checked=False)
+
+        # Act
+        model.set_groups({"default": [("base", "1"), ("normal", "2"), ("height", "4")]})
+
+        # Assert
+        assert model.get_checked_uids() == ["1", "4"]
+
+    def test_lazy_rows(self) -> None:
+        """Test that a group's rows are added in batches when the view fetches them."""
+        # Arrange
+        model = OutputTreeModel()
+        n_outputs = FETCH_BATCH_SIZE + 1
+        model.set_groups({"default": [(f"out{i}", str(i)) for i in range(n_outputs)]})
+        group_index = model.index(0, 0)
+
+        # Act
+        row_counts = [model.rowCount(group_index)]
+        while model.canFetchMore(group_index):
+            model.fetchMore(group_index)
+            row_counts.append(model.rowCount(group_index))
+
+        # Assert
+        assert model.hasChildren(group_index)
+        assert row_counts == [0, FETCH_BATCH_SIZE, n_outputs]
+        assert len(model.get_checked_uids()) == n_outputs
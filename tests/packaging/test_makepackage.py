@@ -1,3 +1,5 @@
+import shutil
+import subprocess
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 from zipfile import ZipFile
@@ -8,6 +10,7 @@ from buildscripts.makepackage import (
     IgnoreFileFilter,
     add_file_to_package,
     check_metadata,
+    compile_ui_files,
     get_repository_root,
     package_plugin,
     read_metadata,
@@ -328,6 +331,68 @@ class TestAddFileToPackage:
                 add_file_to_package(zfile, file_path, "invalid_strip_path", "archive_subdir")
 
 
+MINIMAL_UI = """<?xml version="1.0" encoding="UTF-8"?>
+<ui version="4.0">
+ <class>Dialog</class>
+ <widget class="QDialog" name="Dialog"/>
+</ui>
+"""
+
+
+class TestCompileUiFiles:
+    """Test suite for the compile_ui_files function."""
+
+    @pytest.mark.skipif(shutil.which("pyside6-uic") is None, reason="pyside6-uic not installed")
+    def test_compile(self, tmp_path: Path) -> None:
+        """Test that UI files are compiled to modules next to where the UI files are in the plugin."""
+        # Arrange
+        plugin_dir = tmp_path / "test_plugin"
+        (plugin_dir / "res").mkdir(parents=True)
+        (plugin_dir / "res" / "dialog.ui").write_text(MINIMAL_UI)
+        output_dir = tmp_path / "build"
+
+        # Act
+        compiled = compile_ui_files(plugin_dir, output_dir)
+
+        # Assert
+        assert compiled == [output_dir / "test_plugin" / "res" / "ui_dialog.py"]
+        assert "class Ui_Dialog" in compiled[0].read_text()
+
+    def test_no_ui_files(self, tmp_path: Path) -> None:
+        """Test that nothing is compiled without UI files."""
+        # Arrange
+        (tmp_path / "test_plugin").mkdir()
+        (tmp_path / "test_plugin" / "__init__.py").write_text("")
+
+        # Act & Assert
+        assert compile_ui_files(tmp_path / "test_plugin", tmp_path / "build") == []
+
+    @patch("buildscripts.makepackage.shutil.which", return_value=None)
+    def test_uic_missing(self, mock_which: MagicMock, tmp_path: Path) -> None:
+        """Test that UI files are skipped when the compiler is not available."""
+        # Arrange
+        (tmp_path / "test_plugin").mkdir()
+        (tmp_path / "test_plugin" / "dialog.ui").write_text(MINIMAL_UI)
+
+        # Act & Assert
+        assert compile_ui_files(tmp_path / "test_plugin", tmp_path / "build") == []
+
+    @patch("buildscripts.makepackage.shutil.which", return_value="pyside6-uic")
+    @patch(
+        "buildscripts.makepackage.subprocess.run",
+        side_effect=subprocess.CalledProcessError(1, "pyside6-uic", stderr="parse error"),
+    )
+    def test_compile_error(self, mock_run: MagicMock, mock_which: MagicMock, tmp_path: Path) -> None:
+        """Test that a failed compilation raises an OSError."""
+        # Arrange
+        (tmp_path / "test_plugin").mkdir()
+        (tmp_path / "test_plugin" / "dialog.ui").write_text("<ui>")
+
+        # Act & Assert
+        with pytest.raises(OSError, match="parse error"):
+            compile_ui_files(tmp_path / "test_plugin", tmp_path / "build")
+
+
 class TestPackagePlugin:
     """Test suite for the package_plugin function."""
 
@@ -393,6 +458,23 @@ class TestPackagePlugin:
             assert "test_plugin/test_plugin/subfolder/file4.py" in zfile.namelist()
             assert "test_plugin/test_plugin/subfolder/__pycache__/file5.pyc" not in zfile.namelist()
 
+    @pytest.mark.skipif(shutil.which("pyside6-uic") is None, reason="pyside6-uic not installed")
+    @patch("buildscripts.makepackage.get_repository_root")
+    def test_package_compiled_ui(self, mock_get_repository_root: MagicMock, setup_repo: Path) -> None:
+        """Test that compiled UI files are added next to their UI files."""
+        # Arrange
+        mock_get_repository_root.return_value = setup_repo
+        plugin_dir = setup_repo / "src" / "test_plugin"
+        (plugin_dir / "subfolder" / "dialog.ui").write_text(MINIMAL_UI)
+
+        # Act
+        package_plugin(plugin_dir)
+
+        # Assert
+        with ZipFile(setup_repo / "dist" / "test_plugin.sdplugin", "r") as zfile:
+            assert "test_plugin/test_plugin/subfolder/dialog.ui" in zfile.namelist()
+            assert "test_plugin/test_plugin/subfolder/ui_dialog.py" in zfile.namelist()
+
     @patch("buildscripts.makepackage.get_repository_root", side_effect=FileNotFoundError("Repository root not found"))
     def test_package_plugin_repo_root_not_found(self, mock_get_repository_root: MagicMock, setup_repo: Path) -> None:
         """Test package_plugin when repository root is not found."""
@@ -0,0 +1,133 @@
+"""Benchmark opening and reading DDS files from an archive against reading the same files loose from a directory.
+
+Both sides read every mipmap level of every file into the same buffer, so the bytes copied are equal. Loose files are
+opened and read one by one, the archive is memory-mapped once and its levels are copied from the mapping. The files
+are in the page cache for both, from writing them. Run it from the repository root:
+
+    hatch run bench-archive --files 2000 --log2-resolution 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from custommipmapsexport.archive import ArchiveReader, append_to_archive
+from custommipmapsexport.ddsfile import DDS_DXT1, DDSFile, dxt_size
+
+DEFAULT_FILES = 1000
+DEFAULT_LOG2_RESOLUTION = 8
+
+
+def write_files(directory: Path, n_files: int, log2_resolution: int) -> list[Path]:
+    """
+    Write DXT1 files with a full mip chain of random blocks.
+
+    :param directory: The directory to write the files to.
+    :param n_files: The number of files.
+    :param log2_resolution: The size of the files' top level as power of two.
+    :return: The paths of the files.
+    """
+    paths = []
+    for index in range(n_files):
+        dds = DDSFile()
+        for level in range(log2_resolution + 1):
+            size = 2 ** (log2_resolution - level)
+            dds.add_image(level, 32, "dxt1", size, size, os.urandom(dxt_size(size, size, DDS_DXT1)))
+        paths.append(directory / f"texture{index}.dds")
+        dds.save(paths[-1])
+    return paths
+
+
+def read_loose(paths: Sequence[Path], buffer: memoryview) -> int:
+    """Open and read each file into the buffer, and return the number of bytes read."""
+    total = 0
+    for path in paths:
+        with path.open("rb", buffering=0) as fd:
+            total += fd.readinto(buffer)
+    return total
+
+
+def read_archive(archive_path: Path, names: Sequence[str], buffer: memoryview) -> int:
+    """Map the archive, copy each file's levels into the buffer, and return the number of bytes copied."""
+    total = 0
+    with ArchiveReader(archive_path) as reader:
+        for name in names:
+            offset = 0
+            for level in reader.get_levels(name):
+                buffer[offset : offset + level.nbytes] = level
+                offset += level.nbytes
+                level.release()
+            total += offset
+    return total
+
+
+def run_benchmark(n_files: int, log2_resolution: int, repeats: int = 3) -> dict[str, Any]:
+    """
+    Time reading loose files and the archive a few times, keeping the fastest run of each.
+
+    :param n_files: The number of files.
+    :param log2_resolution: The size of the files' top level as power of two.
+    :param repeats: How often to read the files.
+    :return: Seconds, files per second and megabytes per second of each side, and the archive's speedup.
+    """
+    with tempfile.TemporaryDirectory(prefix="SD_DDS_bench_") as temp_dir:
+        paths = write_files(Path(temp_dir), n_files, log2_resolution)
+        names = [path.stem for path in paths]
+        archive_path = Path(temp_dir) / "bench.mipa"
+        append_to_archive(archive_path, zip(names, paths, strict=True))
+        # Copy into a view, since assigning a view to a bytearray's slice copies it to a temporary first.
+        buffer = memoryview(bytearray(max(path.stat().st_size for path in paths)))
+        results: dict[str, Any] = {}
+        for side, read in (
+            ("loose", lambda: read_loose(paths, buffer)),
+            ("archive", lambda: read_archive(archive_path, names, buffer)),
+        ):
+            seconds = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                n_bytes = read()
+                seconds = min(seconds, time.perf_counter() - start)
+            results[side] = {
+                "seconds": seconds,
+                "files_per_second": n_files / seconds,
+                "megabytes_per_second": n_bytes / 1e6 / seconds,
+            }
+    results["speedup"] = results["loose"]["seconds"] / results["archive"]["seconds"]
+    return results
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the benchmark from the command line.
+
+    :param argv: The command line arguments, sys.argv if None.
+    :return: The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES, help="Number of files.")
+    parser.add_argument("--log2-resolution", type=int, default=DEFAULT_LOG2_RESOLUTION, help="Size as power of two.")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per side, the fastest one is kept.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.files, args.log2_resolution, args.repeats)
+    for side in ("loose", "archive"):
+        result = results[side]
+        print(  # noqa: T201
+            f"{side}: {result['seconds']:.3f} s, {result['files_per_second']:.0f} files/s, "
+            f"{result['megabytes_per_second']:.0f} MB/s"
+        )
+    print(f"archive speedup: {results['speedup']:.2f}x")  # noqa: T201
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Benchmark export_dds_files over a matrix of output counts, resolutions and formats with the fake sd package.
+
+Each case runs in a fresh interpreter, so its peak RSS isn't inflated by previous cases. Record a baseline and compare
+later runs against it on the same machine, from the repository root:
+
+    python tests/performance/bench_export.py --output baseline.json
+    python tests/performance/bench_export.py --baseline baseline.json
+
+The comparison exits with status 1 if any case got slower or uses more memory than the tolerance allows.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, NamedTuple
+
+STUBS_DIR = Path(__file__).parents[1] / "stubs"
+SRC_DIR = Path(__file__).parents[2] / "src"
+OUTPUT_COUNTS = (1, 8)
+LOG2_RESOLUTIONS = (9, 11)
+UNCOMPRESSED_FORMATS = ("a8r8g8b8", "r8g8b8", "l8")
+# The encoder is only available on Windows.
+CRUNCH_FORMATS = ("DXT1", "DXT5") if sys.platform == "win32" else ()
+# Relative increase of a case's time or peak RSS over the baseline that counts as regression.
+DEFAULT_TOLERANCE = 0.25
+# Differences below these are noise, regardless of the tolerance.
+MIN_REGRESSION_SECONDS = 0.02
+MIN_REGRESSION_BYTES = 4 * 1024**2
+
+
+class BenchCase(NamedTuple):
+    """A single export in the benchmark matrix."""
+
+    compression: str
+    n_outputs: int
+    log2_resolution: int
+
+    @property
+    def key(self) -> str:
+        """Return the name of the case in the results."""
+        return f"{self.compression}-{self.n_outputs}x{2**self.log2_resolution}"
+
+    @property
+    def megapixels(self) -> float:
+        """Return the number of exported base level pixels in millions."""
+        return self.n_outputs * 4**self.log2_resolution / 1e6
+
+
+def get_cases() -> list[BenchCase]:
+    """Get the full benchmark matrix for this platform."""
+    return [
+        BenchCase(compression, n_outputs, log2_resolution)
+        for compression in (*UNCOMPRESSED_FORMATS, *CRUNCH_FORMATS)
+        for n_outputs in OUTPUT_COUNTS
+        for log2_resolution in LOG2_RESOLUTIONS
+    ]
+
+
+def get_peak_rss() -> int | None:
+    """
+    Get the peak resident set size of the current process.
+
+    :return: The peak RSS in bytes, or None where the resource module isn't available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_case(case: BenchCase) -> dict[str, Any]:
+    """
+    Export the case's outputs in the current process.
+
+    :param case: The case to run.
+    :return: Seconds per stage, the total seconds, the throughput and the peak RSS in bytes.
+    """
+    from custommipmapsexport.graphutils import EXPORT_DONE, export_dds_files
+    from custommipmapsexport.timings import StageTimings
+    from sd.api.sbs.sdsbscompgraph import SDSBSCompGraph
+
+    graph = SDSBSCompGraph("bench", output_size=(case.log2_resolution, case.log2_resolution))
+    uids = [graph.add_output(f"output{i}").getIdentifier() for i in range(case.n_outputs)]
+    timings = StageTimings()
+    with tempfile.TemporaryDirectory(prefix="SD_DDS_bench_") as destination:
+        feedback = export_dds_files(graph, uids, destination, "$(identifier)", case.compression, timings=timings)
+    if feedback != EXPORT_DONE:
+        msg = f"Export of {case.key} failed: {feedback}"
+        raise RuntimeError(msg)
+    return {
+        "seconds": timings.as_dict(),
+        "total": timings.total,
+        "megapixels_per_second": case.megapixels / timings.total if timings.total else None,
+        "peak_rss": get_peak_rss(),
+    }
+
+
+def run_case_isolated(case: BenchCase) -> dict[str, Any]:
+    """
+    Run the case in a fresh interpreter with the fake sd package.
+
+    :param case: The case to run.
+    :return: The results of run_case.
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(STUBS_DIR), str(SRC_DIR)])}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, __file__, "--case", *map(str, case)], env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout)
+
+
+def run_benchmark(cases: Sequence[BenchCase], repeats: int = 3) -> dict[str, Any]:
+    """
+    Run each case a few times and keep its fastest run, to reduce noise.
+
+    :param cases: The cases to run.
+    :param repeats: How often to run each case.
+    :return: The results with information about the environment they were recorded in.
+    """
+    results = {
+        case.key: min((run_case_isolated(case) for _ in range(repeats)), key=lambda result: result["total"])
+        for case in cases
+    }
+    return {"python": platform.python_version(), "platform": platform.platform(), "cases": results}
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """
+    Find the cases that regressed compared to the baseline. Cases missing from either side are skipped.
+
+    :param results: The results of the current run.
+    :param baseline: The results to compare against.
+    :param tolerance: The relative increase of time or peak RSS that's still acceptable.
+    :return: A description of each regression.
+    """
+    regressions = []
+    for key, result in results["cases"].items():
+        if (base := baseline["cases"].get(key)) is None:
+            continue
+        metrics = [("total", "s", MIN_REGRESSION_SECONDS, result["total"], base["total"])]
+        if result["peak_rss"] is not None and base["peak_rss"] is not None:
+            metrics.append(("peak_rss", "B", MIN_REGRESSION_BYTES, result["peak_rss"], base["peak_rss"]))
+        for metric, unit, minimum, value, base_value in metrics:
+            if value > base_value * (1 + tolerance) and value - base_value >= minimum:
+                regressions.append(f"{key}: {metric} {value:.4g} {unit}, baseline {base_value:.4g} {unit}")
+    return regressions
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """
+    Run the benchmark from the command line.
+
+    :param argv: The command line arguments, sys.argv if None.
+    :return: The exit status.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", type=Path, help="Write the results as JSON to this file.")
+    parser.add_argument("--baseline", type=Path, help="Compare the results against this JSON file.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Acceptable relative increase.")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per case, the fastest one is kept.")
+    parser.add_argument(
+        "--case", nargs=3, metavar=("COMPRESSION", "OUTPUTS", "LOG2_RESOLUTION"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args(argv)
+
+    if args.case:
+        compression, n_outputs, log2_resolution = args.case
+        print(json.dumps(run_case(BenchCase(compression, int(n_outputs), int(log2_resolution)))))  # noqa: T201
+        return 0
+
+    results = run_benchmark(get_cases(), args.repeats)
+    for key, result in results["cases"].items():
+        stages = ", ".join(f"{stage} {seconds:.3f}" for stage, seconds in result["seconds"].items())
+        print(f"{key}: {result['total']:.3f} s ({stages}), {result['megapixels_per_second']:.1f} MP/s")  # noqa: T201
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"Regression in {regression}", file=sys.stderr)  # noqa: T201
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+from bench_archive import run_benchmark
+
+
+class TestRunBenchmark:
+    """Test suite for the archive benchmark."""
+
+    def test_smoke(self) -> None:
+        """Test that both sides read the same number of files and report their throughput."""
+        # Act
+        results = run_benchmark(n_files=4, log2_resolution=4, repeats=1)
+
+        # Assert
+        assert results["loose"]["files_per_second"] > 0
+        assert results["archive"]["megabytes_per_second"] > 0
+        assert results["speedup"] > 0
@@ -0,0 +1,53 @@
+from typing import Any
+
+import pytest
+from bench_export import MIN_REGRESSION_BYTES, BenchCase, compare, run_case_isolated
+
+
+def make_results(
+    total: float, peak_rss: int | None = 100 * MIN_REGRESSION_BYTES, key: str = "l8-1x512"
+) -> dict[str, Any]:
+    """Create benchmark results with a single case."""
+    return {"cases": {key: {"seconds": {"compute": total}, "total": total, "peak_rss": peak_rss}}}
+
+
+class TestCompare:
+    """Test suite for the comparison of benchmark results against a baseline."""
+
+    @pytest.mark.parametrize(
+        "results, expected",
+        [
+            (make_results(1.2), []),
+            (make_results(1.5), ["total"]),
+            (make_results(1.0, 200 * MIN_REGRESSION_BYTES), ["peak_rss"]),
+            (make_results(1.0, None), []),
+            (make_results(5.0, key="l8-8x512"), []),
+        ],
+        ids=["within_tolerance", "slower", "more_memory", "no_rss", "new_case"],
+    )
+    def test_regressions(self, results: dict[str, Any], expected: list[str]) -> None:
+        """Test that only increases beyond the tolerance of cases in both results are regressions."""
+        # Act
+        regressions = compare(results, make_results(1.0), tolerance=0.25)
+
+        # Assert
+        assert [regression.split()[1] for regression in regressions] == expected
+
+    def test_noise(self) -> None:
+        """Test that tiny absolute differences aren't regressions, even if they exceed the tolerance."""
+        # Act & Assert
+        assert compare(make_results(0.002), make_results(0.001)) == []
+
+
+class TestRunCase:
+    """Test suite for running a benchmark case."""
+
+    def test_smoke(self) -> None:
+        """Test that a small case runs in a fresh interpreter and reports its stages and throughput."""
+        # Act
+        result = run_case_isolated(BenchCase("a8r8g8b8", 2, 6))
+
+        # Assert
+        assert {"compute", "fetch", "uncompressed"} <= result["seconds"].keys()
+        assert result["total"] == pytest.approx(sum(result["seconds"].values()))
+        assert result["megapixels_per_second"] > 0
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+STUBS_DIR = Path(__file__).parents[1] / "stubs"
+SRC_DIR = Path(__file__).parents[2] / "src"
+# Budget for importing and initializing the plugin, in microseconds.
+PLUGIN_LOAD_BUDGET_US = 20_000
+# Modules that are only needed once a graph view is opened or an export runs.
+DEFERRED_MODULES = (
+    "PySide6",
+    "numpy",
+    "multiprocessing",
+    "subprocess",
+    "custommipmapsexport.toolbar",
+    "custommipmapsexport.gui",
+    "custommipmapsexport.graphutils",
+    "custommipmapsexport.encoderworker",
+)
+MARKER = "--- plugin load ---"
+# Import the stub before the marker, since Designer has its sd package loaded already.
+LOAD_PLUGIN = (
+    "import sys, sd\n"
+    f"print({MARKER!r}, file=sys.stderr, flush=True)\n"
+    "import custommipmapsexport\n"
+    "custommipmapsexport.initializeSDPlugin()\n"
+)
+
+
+def measure_plugin_load() -> tuple[int, list[str]]:
+    """
+    Load the plugin in a fresh interpreter with Python's import time report.
+
+    :return: Cumulative import time of the plugin load in microseconds, and the names of the imported modules.
+    """
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(STUBS_DIR), str(SRC_DIR)])}
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", LOAD_PLUGIN], env=env, capture_output=True, text=True, check=True
+    )
+    report = result.stderr.split(MARKER, 1)[1]
+    total = 0
+    modules = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        modules.append(name.strip())
+        # Nested imports are indented and already included in the cumulative time of their top-level import.
+        if not name[1:].startswith(" "):
+            total += int(cumulative)
+    return total, modules
+
+
+@pytest.fixture(scope="module")
+def plugin_load() -> tuple[int, list[str]]:
+    """Measure the plugin load a few times and keep the fastest, to reduce noise."""
+    return min((measure_plugin_load() for _ in range(3)), key=lambda measurement: measurement[0])
+
+
+def is_deferred(module: str) -> bool:
+    """Check whether the module is one of the deferred modules or a submodule of them."""
+    return any(module == deferred or module.startswith(f"{deferred}.") for deferred in DEFERRED_MODULES)
+
+
+class TestPluginLoad:
+    """Test suite for the time it takes to load the plugin."""
+
+    def test_budget(self, plugin_load: tuple[int, list[str]]) -> None:
+        """Test that importing and initializing the plugin stays within the budget."""
+        # Arrange
+        total, _ = plugin_load
+
+        # Act & Assert
+        assert total <= PLUGIN_LOAD_BUDGET_US, f"Plugin load took {total} us, budget is {PLUGIN_LOAD_BUDGET_US} us."
+
+    def test_deferred_imports(self, plugin_load: tuple[int, list[str]]) -> None:
+        """Test that modules only needed for graph views and exports aren't imported when the plugin loads."""
+        # Arrange
+        _, modules = plugin_load
+
+        # Act
+        imported = [name for name in modules if is_deferred(name)]
+
+        # Assert
+        assert imported == []
@@ -0,0 +1,148 @@
+import logging
+import threading
+from collections.abc import Iterator
+
+import pytest
+
+from custommipmapsexport.logger import (
+    LOG_LEVEL_ENV,
+    MainThreadHandler,
+    flush_logger,
+    get_log_level,
+    logger,
+    setup_logger,
+    shutdown_logger,
+)
+
+
+class ListHandler(logging.Handler):
+    """Handler that collects the messages of its records and the threads that handled them."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+        self.threads: list[threading.Thread] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+        self.threads.append(threading.current_thread())
+
+
+class TestGetLogLevel:
+    """Test suite for the get_log_level function."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            (None, logging.INFO),
+            ("debug", logging.DEBUG),
+            ("WARNING", logging.WARNING),
+            ("5", 5),
+            ("loud", logging.INFO),
+        ],
+        ids=["unset", "lowercase_name", "name", "number", "invalid"],
+    )
+    def test_levels(self, monkeypatch: pytest.MonkeyPatch, value: str | None, expected: int) -> None:
+        """Test that the level is read from the environment, falling back to the default."""
+        # Arrange
+        if value is None:
+            monkeypatch.delenv(LOG_LEVEL_ENV, raising=False)
+        else:
+            monkeypatch.setenv(LOG_LEVEL_ENV, value)
+
+        # Act & Assert
+        assert get_log_level() == expected
+
+
+class TestSetupLogger:
+    """Test suite for the setup_logger, flush_logger and shutdown_logger functions."""
+
+    @pytest.fixture
+    def handler(self) -> Iterator[ListHandler]:
+        """Set up the logger with a collecting handler and shut it down afterwards."""
+        handler = ListHandler()
+        setup_logger(handler)
+        yield handler
+        shutdown_logger()
+
+    def test_main_thread_queued(self, handler: ListHandler) -> None:
+        """Test that logging on the main thread doesn't call the handler, and shutting down flushes and removes it."""
+        # Act
+        logger.warning("queued")
+        before_flush = list(handler.messages)
+        shutdown_logger()
+
+        # Assert
+        assert before_flush == []
+        assert handler.messages == ["queued"]
+        assert handler.threads == [threading.main_thread()]
+        assert not any(isinstance(h, MainThreadHandler) for h in logger.handlers)
+
+    def test_worker_thread_queued(self, handler: ListHandler) -> None:
+        """Test that records of other threads are queued until the main thread flushes them to the handler."""
+
+        # Arrange
+        def log() -> None:
+            logger.warning("queued")
+            flush_logger()
+
+        worker = threading.Thread(target=log)
+
+        # Act
+        worker.start()
+        worker.join()
+        before_flush = list(handler.messages)
+        flush_logger()
+
+        # Assert
+        assert before_flush == []
+        assert handler.messages == ["queued"]
+        assert handler.threads == [threading.main_thread()]
+
+    def test_setup_once(self, handler: ListHandler) -> None:
+        """Test that setting up the logger again doesn't add another handler."""
+        # Act
+        setup_logger(ListHandler())
+
+        # Assert
+        assert sum(isinstance(h, MainThreadHandler) for h in logger.handlers) == 1
+
+    def test_formatted_in_caller(self, handler: ListHandler) -> None:
+        """Test that arguments are merged into the message before they can change, and exceptions are kept as text."""
+        # Arrange
+        values = ["before"]
+
+        def log() -> None:
+            logger.info("value: %s", values)
+            try:
+                raise ValueError("boom")  # noqa: EM101
+            except ValueError:
+                logger.exception("failed")
+
+        worker = threading.Thread(target=log)
+
+        # Act
+        worker.start()
+        worker.join()
+        values[0] = "after"
+        flush_logger()
+
+        # Assert
+        assert handler.messages[0] == "value: ['before']"
+        assert handler.messages[1].startswith("failed\nTraceback")
+        assert handler.messages[1].endswith("ValueError: boom")
+
+    def test_handler_level(self) -> None:
+        """Test that the records are filtered by the level of the handler."""
+        # Arrange
+        handler = ListHandler()
+        handler.setLevel(logging.WARNING)
+        setup_logger(handler)
+
+        # Act
+        logger.info("dropped")
+        logger.warning("kept")
+        shutdown_logger()
+
+        # Assert
+        assert handler.messages == ["kept"]
@@ -0,0 +1,37 @@
+"""Fake of Designer's sd package, so the plugin can be loaded and exported from outside of Designer.
+
+Only the part of the API the plugin uses is implemented. Methods in snake_case are helpers to set up the fake.
+"""
+
+import logging
+
+from sd.api.qtforpythonuimgrwrapper import QtForPythonUIMgrWrapper
+from sd.api.sdapplication import SDApplication
+
+
+class Context:
+    """Fake of the context of the application."""
+
+    def __init__(self) -> None:
+        self.application = SDApplication(QtForPythonUIMgrWrapper())
+
+    def getSDApplication(self) -> SDApplication:  # noqa: N802  # Mimic the API.
+        return self.application
+
+    def createRuntimeLogHandler(self) -> logging.Handler:  # noqa: N802
+        return logging.NullHandler()
+
+
+_context = Context()
+
+
+def getContext() -> Context:  # noqa: N802
+    """Get the context of the application."""
+    return _context
+
+
+def reset_context() -> Context:
+    """Replace the context with a new one without any packages or callbacks."""
+    global _context  # noqa: PLW0603
+    _context = Context()
+    return _context
@@ -0,0 +1,19 @@
+from collections.abc import Callable
+from typing import Any
+
+
+class CallbackRegistry:
+    """Registry for callbacks that hands out ids to unregister them."""
+
+    def __init__(self) -> None:
+        self.callbacks: dict[int, Callable[..., Any]] = {}
+        self._next_id = 1
+
+    def register(self, callback: Callable[..., Any]) -> int:
+        callback_id = self._next_id
+        self._next_id += 1
+        self.callbacks[callback_id] = callback
+        return callback_id
+
+    def unregisterCallback(self, callback_id: int) -> None:  # noqa: N802  # Mimic the API.
+        self.callbacks.pop(callback_id, None)
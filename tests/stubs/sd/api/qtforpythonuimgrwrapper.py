@@ -0,0 +1,13 @@
+from collections.abc import Callable
+
+from sd.api.callbacks import CallbackRegistry
+
+
+class QtForPythonUIMgrWrapper(CallbackRegistry):
+    """Fake of the UI manager, without any UI."""
+
+    def registerGraphViewCreatedCallback(self, callback: Callable[[int], None]) -> int:  # noqa: N802  # Mimic the API.
+        return self.register(callback)
+
+    def getMainWindow(self) -> None:  # noqa: N802
+        return None
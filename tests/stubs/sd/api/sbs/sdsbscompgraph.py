@@ -0,0 +1,5 @@
+from sd.api.sdgraph import SDGraph
+
+
+class SDSBSCompGraph(SDGraph):
+    """Fake of a compositing graph."""
@@ -0,0 +1,40 @@
+from collections.abc import Callable
+
+from sd.api.callbacks import CallbackRegistry
+from sd.api.qtforpythonuimgrwrapper import QtForPythonUIMgrWrapper
+from sd.api.sdpackage import SDPackage
+
+
+class SDPackageMgr:
+    """Fake of the package manager."""
+
+    def __init__(self) -> None:
+        self.packages: list[SDPackage] = []
+
+    def getUserPackages(self) -> list[SDPackage]:  # noqa: N802  # Mimic the API.
+        return list(self.packages)
+
+    def add_user_package(self, package: SDPackage) -> SDPackage:
+        self.packages.append(package)
+        return package
+
+
+class SDApplication(CallbackRegistry):
+    """Fake of the application."""
+
+    def __init__(self, ui_manager: QtForPythonUIMgrWrapper) -> None:
+        super().__init__()
+        self.ui_manager = ui_manager
+        self.package_manager = SDPackageMgr()
+
+    def getQtForPythonUIMgr(self) -> QtForPythonUIMgrWrapper:  # noqa: N802  # Mimic the API.
+        return self.ui_manager
+
+    def getPackageMgr(self) -> SDPackageMgr:  # noqa: N802
+        return self.package_manager
+
+    def registerAfterFileLoadedCallback(self, callback: Callable[[str], None]) -> int:  # noqa: N802
+        return self.register(callback)
+
+    def registerBeforeFileClosedCallback(self, callback: Callable[[str], None]) -> int:  # noqa: N802
+        return self.register(callback)
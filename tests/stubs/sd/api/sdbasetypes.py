@@ -0,0 +1,8 @@
+from typing import NamedTuple
+
+
+class int2(NamedTuple):  # noqa: N801  # Mimic the API.
+    """Pair of integers, which can be unpacked like the original."""
+
+    x: int
+    y: int
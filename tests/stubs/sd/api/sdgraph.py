@@ -0,0 +1,60 @@
+from sd.api.sdbasetypes import int2
+from sd.api.sdnode import SDNode
+from sd.api.sdproperty import SDProperty, SDPropertyCategory, SDPropertyInheritanceMethod
+from sd.api.sdvalueint2 import SDValueInt2
+
+
+class SDGraph:
+    """Fake of a graph with output nodes and an output size."""
+
+    def __init__(self, identifier: str = "graph", output_size: tuple[int, int] = (9, 9)) -> None:
+        self._identifier = identifier
+        self._nodes: dict[str, SDNode] = {}
+        self._output_size_property = SDProperty("$outputsize", SDPropertyCategory.Input)
+        self._output_size = SDValueInt2(int2(*output_size))  # As log2 of the resolution.
+        self._inheritance = SDPropertyInheritanceMethod.RelativeToParent
+        self.compute_count = 0
+
+    def getIdentifier(self) -> str:  # noqa: N802  # Mimic the API.
+        return self._identifier
+
+    def getUrl(self) -> str:  # noqa: N802
+        return f"pkg:///{self._identifier}"
+
+    def getOutputNodes(self) -> list[SDNode]:  # noqa: N802
+        return list(self._nodes.values())
+
+    def getNodeFromId(self, uid: str) -> SDNode | None:  # noqa: N802
+        return self._nodes.get(uid)
+
+    def getPropertyFromId(self, identifier: str, category: SDPropertyCategory) -> SDProperty | None:  # noqa: N802
+        prop = self._output_size_property
+        return prop if (identifier, category) == (prop.getId(), prop.getCategory()) else None
+
+    def getPropertyValue(self, prop: SDProperty) -> SDValueInt2 | None:  # noqa: N802
+        return self._output_size if prop is self._output_size_property else None
+
+    def setPropertyValue(self, prop: SDProperty, value: SDValueInt2) -> None:  # noqa: N802
+        if prop is self._output_size_property:
+            self._output_size = value
+
+    def getPropertyInheritanceMethod(self, prop: SDProperty) -> SDPropertyInheritanceMethod:  # noqa: N802
+        return self._inheritance
+
+    def setPropertyInheritanceMethod(self, prop: SDProperty, method: SDPropertyInheritanceMethod) -> None:  # noqa: N802
+        self._inheritance = method
+
+    def compute(self) -> None:
+        """Render all outputs in the graph's output size."""
+        self.compute_count += 1
+        log2_x, log2_y = self._output_size.get()
+        for node in self._nodes.values():
+            node.compute(2**log2_x, 2**log2_y)
+
+    def add_output(
+        self, output_id: str, bytes_per_pixel: int = 4, fill: bytes | None = None, **annotations: str
+    ) -> SDNode:
+        """Add an output node, whose texture is rendered when the graph is computed."""
+        node = SDNode(str(1000 + len(self._nodes)), output_id, bytes_per_pixel, fill, **annotations)
+        self._nodes[node.getIdentifier()] = node
+        return node
@@ -0,0 +1,35 @@
+from sd.api.sdproperty import SDProperty, SDPropertyCategory
+from sd.api.sdtexture import SDTexture
+from sd.api.sdvaluestring import SDValueString
+from sd.api.sdvaluetexture import SDValueTexture
+
+
+class SDNode:
+    """Fake of an output node with a single texture output."""
+
+    def __init__(
+        self, uid: str, output_id: str, bytes_per_pixel: int = 4, fill: bytes | None = None, **annotations: str
+    ) -> None:
+        self._uid = uid
+        self._output = SDProperty(output_id, SDPropertyCategory.Output)
+        self._bytes_per_pixel = bytes_per_pixel
+        self._fill = fill
+        self.annotations = {"label": output_id, "description": "", "userdata": "", "group": "", **annotations}
+        self._value: SDValueTexture | None = None
+
+    def getIdentifier(self) -> str:  # noqa: N802  # Mimic the API.
+        return self._uid
+
+    def getProperties(self, category: SDPropertyCategory) -> list[SDProperty]:  # noqa: N802
+        return [self._output] if category == SDPropertyCategory.Output else []
+
+    def getAnnotationPropertyValueFromId(self, identifier: str) -> SDValueString | None:  # noqa: N802
+        return SDValueString(self.annotations[identifier]) if identifier in self.annotations else None
+
+    def getPropertyValue(self, prop: SDProperty) -> SDValueTexture | None:  # noqa: N802
+        return self._value if prop is self._output else None
+
+    def compute(self, width: int, height: int) -> None:
+        """Render the output texture in the given size, a gradient unless a pixel to fill it with was given."""
+        data = self._fill * (width * height) if self._fill is not None else None
+        self._value = SDValueTexture(SDTexture(width, height, self._bytes_per_pixel, data))
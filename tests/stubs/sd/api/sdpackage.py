@@ -0,0 +1,18 @@
+from sd.api.sdgraph import SDGraph
+
+
+class SDPackage:
+    """Fake of a package containing graphs."""
+
+    def __init__(self, file_path: str, resources: list[SDGraph] | None = None) -> None:
+        self._file_path = file_path
+        self.resources = list(resources or [])
+
+    def getFilePath(self) -> str:  # noqa: N802  # Mimic the API.
+        return self._file_path
+
+    def findResourceFromUrl(self, url: str) -> SDGraph | None:  # noqa: N802
+        return next((resource for resource in self.resources if resource.getUrl() == url), None)
+
+    def getChildrenResources(self, is_recursive: bool) -> list[SDGraph]:  # noqa: N802
+        return list(self.resources)
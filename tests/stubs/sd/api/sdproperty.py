@@ -0,0 +1,31 @@
+from enum import IntEnum
+
+
+class SDPropertyCategory(IntEnum):
+    """Categories of properties."""
+
+    Annotation = 0
+    Input = 1
+    Output = 2
+
+
+class SDPropertyInheritanceMethod(IntEnum):
+    """Ways a property's value is inherited."""
+
+    RelativeToInput = 0
+    RelativeToParent = 1
+    Absolute = 2
+
+
+class SDProperty:
+    """Fake of a property, identified by its id and category."""
+
+    def __init__(self, identifier: str, category: SDPropertyCategory) -> None:
+        self._identifier = identifier
+        self._category = category
+
+    def getId(self) -> str:  # noqa: N802  # Mimic the API.
+        return self._identifier
+
+    def getCategory(self) -> SDPropertyCategory:  # noqa: N802
+        return self._category
@@ -0,0 +1,63 @@
+import ctypes
+import struct
+from array import array
+from pathlib import Path
+
+from sd.api.sdbasetypes import int2
+
+# Channels and item type of Designer's pixel formats by bytes per pixel, see custommipmapsexport.pixelbuffer.
+LAYOUTS = {1: (1, "B"), 2: (1, "H"), 4: (4, "B"), 8: (4, "H"), 16: (4, "f")}
+MAX_VALUES = {"B": 255, "H": 65535, "f": 1.0}
+
+
+def make_gradient(width: int, height: int, bytes_per_pixel: int) -> bytes:
+    """
+    Create pixels with a horizontal gradient in all channels.
+
+    :param width: Width of the image.
+    :param height: Height of the image.
+    :param bytes_per_pixel: Size of a pixel, one of the keys of LAYOUTS.
+    :return: The pixel data.
+    """
+    channels, typecode = LAYOUTS[bytes_per_pixel]
+    row = array(typecode)
+    for x in range(width):
+        value = x / max(1, width - 1) * MAX_VALUES[typecode]
+        row.extend([value if typecode == "f" else round(value)] * channels)  # type: ignore[list-item]
+    return row.tobytes() * height
+
+
+class SDTexture:
+    """Fake of a texture, whose pixel buffer is owned by ctypes."""
+
+    def __init__(self, width: int, height: int, bytes_per_pixel: int = 4, data: bytes | None = None) -> None:
+        self._size = int2(width, height)
+        self._bytes_per_pixel = bytes_per_pixel
+        if data is None:
+            data = make_gradient(width, height, bytes_per_pixel)
+        self._buffer = (ctypes.c_ubyte * len(data)).from_buffer_copy(data)
+
+    def getSize(self) -> int2:  # noqa: N802  # Mimic the API.
+        return self._size
+
+    def getBytesPerPixel(self) -> int:  # noqa: N802
+        return self._bytes_per_pixel
+
+    def getPixelBufferAddress(self) -> int:  # noqa: N802
+        return ctypes.addressof(self._buffer)
+
+    def save(self, filepath: str) -> None:
+        """Save the texture as uncompressed TGA file with 8 bits per channel."""
+        channels, typecode = LAYOUTS[self._bytes_per_pixel]
+        view = memoryview(self._buffer).cast("B")
+        if typecode == "H":
+            pixels = view[1::2].tobytes()  # High bytes of the little-endian channels.
+        elif typecode == "f":
+            pixels = bytes(min(255, max(0, round(value * 255))) for value in view.cast("f"))
+        else:
+            pixels = view.tobytes()
+        width, height = self._size
+        image_type = 3 if channels == 1 else 2  # Grayscale or true color.
+        descriptor = 0x20 | (8 if channels == 4 else 0)  # Top-left origin and the number of alpha bits.
+        header = struct.pack("<BBBHHBHHHHBB", 0, 0, image_type, 0, 0, 0, 0, 0, width, height, channels * 8, descriptor)
+        Path(filepath).write_bytes(header + pixels)
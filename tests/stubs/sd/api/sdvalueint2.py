@@ -0,0 +1,15 @@
+from sd.api.sdbasetypes import int2
+
+
+class SDValueInt2:
+    """Fake of an int2 value."""
+
+    def __init__(self, value: int2) -> None:
+        self._value = value
+
+    def get(self) -> int2:
+        return self._value
+
+    @classmethod
+    def sNew(cls, value: int2) -> "SDValueInt2":  # noqa: N802  # Mimic the API.
+        return cls(value)
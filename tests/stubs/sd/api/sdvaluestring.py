@@ -0,0 +1,12 @@
+class SDValueString:
+    """Fake of a string value."""
+
+    def __init__(self, value: str) -> None:
+        self._value = value
+
+    def get(self) -> str:
+        return self._value
+
+    @classmethod
+    def sNew(cls, value: str) -> "SDValueString":  # noqa: N802  # Mimic the API.
+        return cls(value)
@@ -0,0 +1,15 @@
+from sd.api.sdtexture import SDTexture
+
+
+class SDValueTexture:
+    """Fake of a texture value."""
+
+    def __init__(self, value: SDTexture) -> None:
+        self._value = value
+
+    def get(self) -> SDTexture:
+        return self._value
+
+    @classmethod
+    def sNew(cls, value: SDTexture) -> "SDValueTexture":  # noqa: N802  # Mimic the API.
+        return cls(value)